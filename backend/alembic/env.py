@@ -31,6 +31,17 @@ target_metadata = Base.metadata
 config.set_main_option("sqlalchemy.url", settings.db.url)
 
 
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """
+    Исключает из автогенерации объекты полнотекстового поиска,
+    которые создаются миграцией вручную: таблицы FTS5 в SQLite
+    и столбец search_vector в PostgreSQL.
+    """
+    if type_ == "table" and name.startswith("complaints_fts"):
+        return False
+    return not (type_ == "column" and name == "search_vector")
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -49,6 +60,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -57,7 +69,9 @@ def run_migrations_offline() -> None:
 
 def do_run_migrations(connection: Connection) -> None:
     context.configure(
-        connection=connection, target_metadata=target_metadata
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -65,3 +65,6 @@ def downgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
     op.drop_table("complaints")
     # ### end Alembic commands ###
+    # В PostgreSQL типы перечислений не удаляются вместе с таблицей
+    sa.Enum(name="sentimentenum").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="statusenum").drop(op.get_bind(), checkfirst=True)
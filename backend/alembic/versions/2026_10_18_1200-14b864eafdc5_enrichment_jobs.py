@@ -0,0 +1,113 @@
+"""enrichment jobs
+
+Revision ID: 14b864eafdc5
+Revises: 9b2e842fdb78
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "14b864eafdc5"
+down_revision: Union[str, Sequence[str], None] = "9b2e842fdb78"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+enrichment_enum = sa.Enum("pending", "done", "failed", name="enrichmentenum")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # В PostgreSQL тип ENUM нужно создать до добавления столбца
+    enrichment_enum.create(op.get_bind(), checkfirst=True)
+    with op.batch_alter_table("complaints") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "enrichment",
+                enrichment_enum,
+                server_default="done",
+                nullable=False,
+            )
+        )
+        batch_op.alter_column(
+            "sentiment",
+            existing_type=sa.Enum(
+                "positive",
+                "negative",
+                "neutral",
+                "unknown",
+                name="sentimentenum",
+            ),
+            nullable=True,
+        )
+        batch_op.alter_column(
+            "category",
+            existing_type=sa.Enum(
+                "Техническая", "Оплата", "Другое", native_enum=False
+            ),
+            nullable=True,
+        )
+    op.create_table(
+        "enrichmentjobs",
+        sa.Column("complaint_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "attempts", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.Column(
+            "available_at",
+            sa.DateTime(),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.Column("last_error", sa.TEXT(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["complaint_id"],
+            ["complaints.id"],
+            name=op.f("fk_enrichmentjobs_complaint_id_complaints"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_enrichmentjobs")),
+        sa.UniqueConstraint(
+            "complaint_id", name=op.f("uq_enrichmentjobs_complaint_id")
+        ),
+    )
+    op.create_index(
+        op.f("ix_enrichmentjobs_available_at"),
+        "enrichmentjobs",
+        ["available_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f("ix_enrichmentjobs_available_at"), table_name="enrichmentjobs"
+    )
+    op.drop_table("enrichmentjobs")
+    with op.batch_alter_table("complaints") as batch_op:
+        batch_op.alter_column(
+            "category",
+            existing_type=sa.Enum(
+                "Техническая", "Оплата", "Другое", native_enum=False
+            ),
+            nullable=False,
+        )
+        batch_op.alter_column(
+            "sentiment",
+            existing_type=sa.Enum(
+                "positive",
+                "negative",
+                "neutral",
+                "unknown",
+                name="sentimentenum",
+            ),
+            nullable=False,
+        )
+        batch_op.drop_column("enrichment")
+    enrichment_enum.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,57 @@
+"""classification cache
+
+Revision ID: 88105340a70e
+Revises: 14b864eafdc5
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "88105340a70e"
+down_revision: Union[str, Sequence[str], None] = "14b864eafdc5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "cachedclassifications",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("namespace", sa.String(), nullable=False),
+        sa.Column("value", sa.String(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "id", name=op.f("pk_cachedclassifications")
+        ),
+        sa.UniqueConstraint(
+            "key", name=op.f("uq_cachedclassifications_key")
+        ),
+    )
+    with op.batch_alter_table("enrichmentjobs") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "use_cache",
+                sa.Boolean(),
+                server_default="1",
+                nullable=False,
+            )
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("enrichmentjobs") as batch_op:
+        batch_op.drop_column("use_cache")
+    op.drop_table("cachedclassifications")
@@ -0,0 +1,37 @@
+"""open complaints index
+
+Revision ID: 5c0d7a3e9f21
+Revises: 88105340a70e
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c0d7a3e9f21"
+down_revision: Union[str, Sequence[str], None] = "88105340a70e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_COMPLAINTS = sa.text("status = 'open' AND category != 'Другое'")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_complaints_open_timestamp",
+        "complaints",
+        ["timestamp"],
+        unique=False,
+        sqlite_where=OPEN_COMPLAINTS,
+        postgresql_where=OPEN_COMPLAINTS,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_complaints_open_timestamp", table_name="complaints")
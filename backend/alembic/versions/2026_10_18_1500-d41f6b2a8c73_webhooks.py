@@ -0,0 +1,76 @@
+"""webhooks
+
+Revision ID: d41f6b2a8c73
+Revises: 5c0d7a3e9f21
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d41f6b2a8c73"
+down_revision: Union[str, Sequence[str], None] = "5c0d7a3e9f21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "webhooktargets",
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column(
+            "category",
+            sa.Enum(
+                "Техническая", "Оплата", "Другое", native_enum=False
+            ),
+            nullable=True,
+        ),
+        sa.Column(
+            "active", sa.Boolean(), server_default="1", nullable=False
+        ),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_webhooktargets")),
+        sa.UniqueConstraint("url", name=op.f("uq_webhooktargets_url")),
+    )
+    op.create_table(
+        "webhookdeadletters",
+        sa.Column("target_id", sa.Integer(), nullable=False),
+        sa.Column("payload", sa.TEXT(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.TEXT(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["target_id"],
+            ["webhooktargets.id"],
+            name=op.f("fk_webhookdeadletters_target_id_webhooktargets"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_webhookdeadletters")),
+    )
+    op.create_index(
+        op.f("ix_webhookdeadletters_target_id"),
+        "webhookdeadletters",
+        ["target_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f("ix_webhookdeadletters_target_id"),
+        table_name="webhookdeadletters",
+    )
+    op.drop_table("webhookdeadletters")
+    op.drop_table("webhooktargets")
@@ -0,0 +1,45 @@
+"""shared store
+
+Revision ID: 7e3a9c1d5b42
+Revises: d41f6b2a8c73
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7e3a9c1d5b42"
+down_revision: Union[str, Sequence[str], None] = "d41f6b2a8c73"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "sharedvalues",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("value", sa.TEXT(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_sharedvalues")),
+        sa.UniqueConstraint("key", name=op.f("uq_sharedvalues_key")),
+    )
+    op.create_index(
+        op.f("ix_sharedvalues_expires_at"),
+        "sharedvalues",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f("ix_sharedvalues_expires_at"), table_name="sharedvalues"
+    )
+    op.drop_table("sharedvalues")
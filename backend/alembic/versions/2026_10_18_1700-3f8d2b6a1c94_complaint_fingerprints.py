@@ -0,0 +1,39 @@
+"""complaint fingerprints
+
+Revision ID: 3f8d2b6a1c94
+Revises: 7e3a9c1d5b42
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f8d2b6a1c94"
+down_revision: Union[str, Sequence[str], None] = "7e3a9c1d5b42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("complaints") as batch_op:
+        batch_op.add_column(sa.Column("fingerprint", sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column("group_id", sa.Integer(), nullable=True))
+    op.create_index(
+        op.f("ix_complaints_group_id"),
+        "complaints",
+        ["group_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_complaints_group_id"), table_name="complaints")
+    with op.batch_alter_table("complaints") as batch_op:
+        batch_op.drop_column("group_id")
+        batch_op.drop_column("fingerprint")
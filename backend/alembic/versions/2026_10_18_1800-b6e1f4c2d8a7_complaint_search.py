@@ -0,0 +1,103 @@
+"""complaint search
+
+Revision ID: b6e1f4c2d8a7
+Revises: 3f8d2b6a1c94
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b6e1f4c2d8a7"
+down_revision: Union[str, Sequence[str], None] = "3f8d2b6a1c94"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Таблица FTS5 без содержимого хранит только индекс, тексты остаются
+# в complaints. Буква "ё" заменяется на "е": unicode61 не считает ее
+# буквой с диакритикой. Триггеры нужно создать заново, если таблица
+# complaints пересоздается в batch-миграции SQLite.
+FOLDED_NEW = "replace(replace(new.text, 'ё', 'е'), 'Ё', 'Е')"
+FOLDED_OLD = "replace(replace(old.text, 'ё', 'е'), 'Ё', 'Е')"
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE complaints_fts USING fts5(
+        text,
+        content='',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='3 5'
+    )
+    """,
+    f"""
+    CREATE TRIGGER complaints_fts_insert AFTER INSERT ON complaints BEGIN
+        INSERT INTO complaints_fts(rowid, text) VALUES (new.id, {FOLDED_NEW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER complaints_fts_delete AFTER DELETE ON complaints BEGIN
+        INSERT INTO complaints_fts(complaints_fts, rowid, text)
+        VALUES ('delete', old.id, {FOLDED_OLD});
+    END
+    """,
+    f"""
+    CREATE TRIGGER complaints_fts_update AFTER UPDATE OF text ON complaints BEGIN
+        INSERT INTO complaints_fts(complaints_fts, rowid, text)
+        VALUES ('delete', old.id, {FOLDED_OLD});
+        INSERT INTO complaints_fts(rowid, text) VALUES (new.id, {FOLDED_NEW});
+    END
+    """,
+    """
+    INSERT INTO complaints_fts(rowid, text)
+    SELECT id, replace(replace(text, 'ё', 'е'), 'Ё', 'Е') FROM complaints
+    """,
+]
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS complaints_fts_update",
+    "DROP TRIGGER IF EXISTS complaints_fts_delete",
+    "DROP TRIGGER IF EXISTS complaints_fts_insert",
+    "DROP TABLE IF EXISTS complaints_fts",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+    elif dialect == "postgresql":
+        op.add_column(
+            "complaints",
+            sa.Column(
+                "search_vector",
+                postgresql.TSVECTOR(),
+                sa.Computed(
+                    "to_tsvector('russian', "
+                    "replace(replace(text, 'ё', 'е'), 'Ё', 'Е'))",
+                    persisted=True,
+                ),
+            ),
+        )
+        op.create_index(
+            "ix_complaints_search_vector",
+            "complaints",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+    elif dialect == "postgresql":
+        op.drop_index("ix_complaints_search_vector", table_name="complaints")
+        op.drop_column("complaints", "search_vector")
@@ -0,0 +1,163 @@
+"""complaint stats
+
+Revision ID: 0c5a7e2b9d16
+Revises: b6e1f4c2d8a7
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0c5a7e2b9d16"
+down_revision: Union[str, Sequence[str], None] = "b6e1f4c2d8a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Триггеры только добавляют строки в complaintstatchanges, поэтому
+# одновременные вставки жалоб не ждут друг друга на общих счетчиках.
+# Удаление жалоб не учитывается: статистика считает полученные жалобы.
+# Триггеры нужно создать заново, если таблица complaints пересоздается
+# в batch-миграции SQLite.
+CHANGE_COLUMNS = "timestamp, status, sentiment, category, delta"
+SQLITE_UPGRADE = [
+    f"""
+    CREATE TRIGGER complaint_stats_insert AFTER INSERT ON complaints BEGIN
+        INSERT INTO complaintstatchanges({CHANGE_COLUMNS})
+        VALUES (
+            new.timestamp, new.status,
+            coalesce(new.sentiment, ''), coalesce(new.category, ''), 1
+        );
+    END
+    """,
+    f"""
+    CREATE TRIGGER complaint_stats_update
+    AFTER UPDATE OF status, sentiment, category ON complaints
+    WHEN old.status IS NOT new.status
+        OR old.sentiment IS NOT new.sentiment
+        OR old.category IS NOT new.category
+    BEGIN
+        INSERT INTO complaintstatchanges({CHANGE_COLUMNS})
+        VALUES (
+            old.timestamp, old.status,
+            coalesce(old.sentiment, ''), coalesce(old.category, ''), -1
+        ), (
+            new.timestamp, new.status,
+            coalesce(new.sentiment, ''), coalesce(new.category, ''), 1
+        );
+    END
+    """,
+    # Существующие жалобы переносятся одной строкой на час и сочетание
+    # значений, в формате дат SQLAlchemy для SQLite
+    f"""
+    INSERT INTO complaintstatchanges({CHANGE_COLUMNS})
+    SELECT
+        strftime('%Y-%m-%d %H:00:00.000000', timestamp) AS hour, status,
+        coalesce(sentiment, ''), coalesce(category, ''), count(*)
+    FROM complaints
+    GROUP BY hour, status, sentiment, category
+    """,
+]
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS complaint_stats_update",
+    "DROP TRIGGER IF EXISTS complaint_stats_insert",
+]
+POSTGRESQL_UPGRADE = [
+    f"""
+    CREATE FUNCTION complaint_stats_track() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' THEN
+            IF (old.status, old.sentiment, old.category)
+                IS NOT DISTINCT FROM (new.status, new.sentiment, new.category)
+            THEN
+                RETURN NULL;
+            END IF;
+            INSERT INTO complaintstatchanges({CHANGE_COLUMNS})
+            VALUES (
+                old.timestamp, old.status::text,
+                coalesce(old.sentiment::text, ''), coalesce(old.category, ''), -1
+            );
+        END IF;
+        INSERT INTO complaintstatchanges({CHANGE_COLUMNS})
+        VALUES (
+            new.timestamp, new.status::text,
+            coalesce(new.sentiment::text, ''), coalesce(new.category, ''), 1
+        );
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER complaint_stats
+    AFTER INSERT OR UPDATE OF status, sentiment, category ON complaints
+    FOR EACH ROW EXECUTE FUNCTION complaint_stats_track()
+    """,
+    f"""
+    INSERT INTO complaintstatchanges({CHANGE_COLUMNS})
+    SELECT
+        date_trunc('hour', timestamp) AS hour, status::text,
+        coalesce(sentiment::text, ''), coalesce(category, ''), count(*)
+    FROM complaints
+    GROUP BY hour, status, sentiment, category
+    """,
+]
+POSTGRESQL_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS complaint_stats ON complaints",
+    "DROP FUNCTION IF EXISTS complaint_stats_track()",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "complaintstatchanges",
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("sentiment", sa.String(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("delta", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_complaintstatchanges")),
+    )
+    op.create_table(
+        "complaintstats",
+        sa.Column("period", sa.String(), nullable=False),
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("sentiment", sa.String(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_complaintstats")),
+        sa.UniqueConstraint(
+            "period",
+            "bucket",
+            "status",
+            "sentiment",
+            "category",
+            name=op.f("uq_complaintstats_period_bucket_status_sentiment_category"),
+        ),
+    )
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+    elif dialect == "postgresql":
+        for statement in POSTGRESQL_UPGRADE:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+    elif dialect == "postgresql":
+        for statement in POSTGRESQL_DOWNGRADE:
+            op.execute(statement)
+    op.drop_table("complaintstats")
+    op.drop_table("complaintstatchanges")
@@ -0,0 +1,51 @@
+"""complaint archives
+
+Revision ID: a93d6f1e4b05
+Revises: 0c5a7e2b9d16
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a93d6f1e4b05"
+down_revision: Union[str, Sequence[str], None] = "0c5a7e2b9d16"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "complaintarchives",
+        sa.Column("month", sa.String(), nullable=False),
+        sa.Column("path", sa.String(), nullable=False),
+        sa.Column("min_id", sa.Integer(), nullable=False),
+        sa.Column("max_id", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_complaintarchives")),
+        sa.UniqueConstraint("path", name=op.f("uq_complaintarchives_path")),
+    )
+    op.create_index(
+        op.f("ix_complaintarchives_min_id"),
+        "complaintarchives",
+        ["min_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_complaintarchives_min_id"), table_name="complaintarchives")
+    op.drop_table("complaintarchives")
@@ -0,0 +1,38 @@
+"""category source
+
+Revision ID: e2c84b7f1a36
+Revises: a93d6f1e4b05
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2c84b7f1a36"
+down_revision: Union[str, Sequence[str], None] = "a93d6f1e4b05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+category_source_enum = sa.Enum("remote", "local", name="categorysourceenum")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # В PostgreSQL тип ENUM нужно создать до добавления столбца.
+    # Столбец добавляется и удаляется без batch-миграции, чтобы SQLite
+    # не пересоздавал таблицу вместе с триггерами статистики и поиска
+    category_source_enum.create(op.get_bind(), checkfirst=True)
+    op.add_column(
+        "complaints",
+        sa.Column("category_source", category_source_enum, nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("complaints", "category_source")
+    category_source_enum.drop(op.get_bind(), checkfirst=True)
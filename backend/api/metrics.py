@@ -0,0 +1,24 @@
+from typing import Annotated
+
+from core.config import settings
+from core.dependencies.metrics import get_metrics_sampler
+from core.metrics import render_metrics
+from fastapi import APIRouter, Depends, Response
+from services.metrics import MetricsSampler
+
+router = APIRouter(tags=["Monitoring"])
+
+
+@router.get(settings.metrics.path, include_in_schema=False)
+async def get_metrics(
+    sampler: Annotated[
+        MetricsSampler,
+        Depends(get_metrics_sampler),
+    ],
+) -> Response:
+    """
+    Выводит метрики всех процессов сервиса в формате Prometheus.
+    """
+    sampler.sample()
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
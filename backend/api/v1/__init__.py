@@ -2,6 +2,8 @@ from core.config import settings
 from fastapi import APIRouter
 
 from .complaints import router as complaints_router
+from .monitoring import router as monitoring_router
+from .webhooks import router as webhooks_router
 
 router = APIRouter(
     prefix=settings.api.v1.prefix,
@@ -10,3 +12,11 @@ router.include_router(
     complaints_router,
     prefix=settings.api.v1.complaints,
 )
+router.include_router(
+    monitoring_router,
+    prefix=settings.api.v1.monitoring,
+)
+router.include_router(
+    webhooks_router,
+    prefix=settings.api.v1.webhooks,
+)
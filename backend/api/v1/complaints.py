@@ -1,19 +1,57 @@
+import asyncio
 import logging
 from typing import Annotated
 
-from aiohttp import ClientSession
+from core.config import settings
 from core.dao.complaint import ComplaintDao
-from core.dependencies.clients import get_client_session
+from core.dependencies.broadcast import get_broadcaster
+from core.dependencies.duplicates import get_duplicate_index
+from core.dependencies.enrichment import (
+    get_classifier,
+    get_enrichment_pipeline,
+)
+from core.dependencies.stats import get_complaint_stats
 from core.models import db_helper
+from core.responses import DuplexStreamingResponse
 from core.schemas.complaint import (
     ComplaintAllInfoSchema,
+    ComplaintFilterSchema,
     ComplaintInSchema,
     ComplaintReadSchema,
+    ComplaintSearchResultSchema,
+    ComplaintSearchSchema,
+    ComplaintStatsQuerySchema,
+    ComplaintStatsSchema,
     OpenComplaintsSchema,
+    StatusChangeResultSchema,
+    StatusChangeSchema,
 )
 from core.schemas.ok import OkSchema
-from fastapi import APIRouter, Depends, status
-from services.complaints import create_new_complaint
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from services.archive import find_archived_complaint
+from services.broadcast import ComplaintBroadcaster, stream_events
+from services.bulk import ingest_complaints
+from services.classification import ComplaintClassifier
+from services.complaints import (
+    change_complaints_status,
+    create_new_complaint,
+    get_complaints_feed,
+    stream_complaints_in_last_hour,
+)
+from services.duplicates import DuplicateIndex
+from services.enrichment import EnrichmentPipeline, accept_new_complaint
+from services.search import search_complaints
+from services.stats import ComplaintStats
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(tags=["Complaints"])
@@ -21,52 +59,313 @@ router = APIRouter(tags=["Complaints"])
 log = logging.getLogger(__name__)
 
 
-@router.get("")
+@router.get("", response_model=OpenComplaintsSchema)
 async def get_complaints(
     session: Annotated[
         AsyncSession,
         Depends(db_helper.get_async_session),
     ],
+    after_id: Annotated[int | None, Query(ge=0)] = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+    collapse_duplicates: bool = True,
 ):
     """
     Выводит список открытых жалоб, которые были созданы в течение последнего часа.
+
+    Если передан after_id, выводятся жалобы с большим ID среди следующих
+    limit записей, а в next_after_id возвращается курсор для следующего
+    запроса. Так жалобы не теряются и не повторяются при любом расписании.
+
+    Список за последний час отправляется по частям по мере чтения
+    из базы данных. Копии других жалоб (с group_id) не выводятся,
+    если не передан параметр collapse_duplicates=false.
     """
-    dao = ComplaintDao(session=session)
-    complaints = await dao.get_complaints_in_last_hour()
+    if after_id is not None:
+        return await get_complaints_feed(
+            session=session,
+            after_id=after_id,
+            limit=limit,
+            collapse_duplicates=collapse_duplicates,
+        )
+    return StreamingResponse(
+        stream_complaints_in_last_hour(
+            session_factory=db_helper.session_factory,
+            chunk_size=settings.listing.chunk_size,
+            collapse_duplicates=collapse_duplicates,
+        ),
+        media_type="application/json",
+    )
+
+
+@router.get(
+    "/search",
+    response_model=ComplaintSearchResultSchema,
+)
+async def search(
+    search: Annotated[ComplaintSearchSchema, Query()],
+    session: Annotated[
+        AsyncSession,
+        Depends(db_helper.get_async_session),
+    ],
+):
+    """
+    Ищет жалобы по тексту.
+
+    В q можно передать слова, фразы в кавычках и начала слов со звездочкой,
+    например q=оплат* "списали дважды". Параметры category, sentiment
+    и status можно передавать несколько раз. Для следующей страницы
+    передается cursor из next_cursor предыдущего ответа.
+    """
+    return await search_complaints(search=search, session=session)
+
+
+@router.get(
+    "/stats",
+    response_model=ComplaintStatsSchema,
+)
+async def get_stats(
+    query: Annotated[ComplaintStatsQuerySchema, Query()],
+    stats: Annotated[
+        ComplaintStats,
+        Depends(get_complaint_stats),
+    ],
+):
+    """
+    Выводит количество жалоб по часам (period=hour) или дням (period=day).
 
-    return OpenComplaintsSchema(
-        complaints=[
-            ComplaintAllInfoSchema.model_validate(complaint, from_attributes=True)
-            for complaint in complaints
-        ]
+    Для каждого часа или дня с since до until выводится общее количество
+    жалоб и количество по значениям столбцов group_by (status, sentiment,
+    category). Параметры category, sentiment и status отбирают жалобы
+    и их можно передавать несколько раз. Новые жалобы учитываются
+    через несколько секунд, ответы кэшируются на STATS__CACHE_TTL секунд.
+    """
+    return Response(
+        content=await stats.get(query),
+        media_type="application/json",
     )
 
 
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {
+            "content": {"text/event-stream": {}},
+            "description": "Поток обогащенных жалоб в формате Server-Sent Events",
+        }
+    },
+)
+async def stream_complaints(
+    filters: Annotated[ComplaintFilterSchema, Query()],
+    broadcaster: Annotated[
+        ComplaintBroadcaster,
+        Depends(get_broadcaster),
+    ],
+):
+    """
+    Отправляет жалобы в момент окончания их обогащения (Server-Sent Events).
+
+    Параметры category, sentiment и status можно передавать несколько раз.
+    Если клиент не успевает читать, поток завершается событием overflow.
+    """
+    return StreamingResponse(
+        stream_events(
+            broadcaster=broadcaster,
+            filters=filters,
+            keepalive=settings.stream.keepalive,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def complaints_websocket(
+    websocket: WebSocket,
+    filters: Annotated[ComplaintFilterSchema, Query()],
+    broadcaster: Annotated[
+        ComplaintBroadcaster,
+        Depends(get_broadcaster),
+    ],
+):
+    """
+    Отправляет жалобы в формате JSON в момент окончания их обогащения.
+
+    Если клиент не успевает читать, соединение закрывается с кодом 1013.
+    """
+    await websocket.accept()
+    with broadcaster.subscribe(filters) as subscription:
+        # Сообщения клиента не используются, чтение нужно,
+        # чтобы сразу узнать об отключении
+        receiver = asyncio.create_task(websocket.receive())
+        next_complaint = asyncio.create_task(subscription.get())
+        try:
+            while True:
+                done, _ = await asyncio.wait(
+                    {receiver, next_complaint},
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if receiver in done:
+                    if receiver.result()["type"] == "websocket.disconnect":
+                        return
+                    receiver = asyncio.create_task(websocket.receive())
+                    continue
+                complaint = next_complaint.result()
+                if complaint is None:
+                    await websocket.close(code=1013, reason="overflow")
+                    return
+                await websocket.send_text(complaint.model_dump_json())
+                next_complaint = asyncio.create_task(subscription.get())
+        finally:
+            receiver.cancel()
+            next_complaint.cancel()
+
+
 @router.post(
     "",
     status_code=status.HTTP_201_CREATED,
     response_model=ComplaintReadSchema,
     response_model_exclude_none=True,
+    responses={status.HTTP_202_ACCEPTED: {"model": ComplaintReadSchema}},
 )
 async def create_complaint(
     complaint: ComplaintInSchema,
+    response: Response,
     session: Annotated[
         AsyncSession,
         Depends(db_helper.get_async_session),
     ],
-    client_session: Annotated[
-        ClientSession,
-        Depends(get_client_session),
+    classifier: Annotated[
+        ComplaintClassifier,
+        Depends(get_classifier),
+    ],
+    pipeline: Annotated[
+        EnrichmentPipeline,
+        Depends(get_enrichment_pipeline),
     ],
+    broadcaster: Annotated[
+        ComplaintBroadcaster,
+        Depends(get_broadcaster),
+    ],
+    duplicates: Annotated[
+        DuplicateIndex,
+        Depends(get_duplicate_index),
+    ],
+    use_cache: bool = True,
 ):
     """
     Создает новую жалобу.
+
+    В фоновом режиме обогащения жалоба сохраняется сразу
+    со статусом "pending" и возвращается код 202.
+    Параметр use_cache=false заставляет заново обратиться к внешним API.
+
+    Почти одинаковая копия открытой жалобы получает ее тональность
+    и категорию, а в group_id возвращается ID первой жалобы группы.
     """
+    if settings.enrichment.mode == "background":
+        response.status_code = status.HTTP_202_ACCEPTED
+        return await accept_new_complaint(
+            complaint=complaint,
+            session=session,
+            pipeline=pipeline,
+            use_cache=use_cache,
+            duplicates=duplicates,
+        )
     return await create_new_complaint(
         complaint=complaint,
         session=session,
-        client_session=client_session,
+        classifier=classifier,
+        use_cache=use_cache,
+        broadcaster=broadcaster,
+        duplicates=duplicates,
+    )
+
+
+@router.post(
+    "/bulk",
+    response_class=DuplexStreamingResponse,
+    responses={
+        status.HTTP_200_OK: {
+            "content": {"application/x-ndjson": {}},
+            "description": "Результат загрузки каждой записи в формате NDJSON",
+        }
+    },
+)
+async def create_complaints_bulk(
+    request: Request,
+    pipeline: Annotated[
+        EnrichmentPipeline,
+        Depends(get_enrichment_pipeline),
+    ],
+    duplicates: Annotated[
+        DuplicateIndex,
+        Depends(get_duplicate_index),
+    ],
+):
+    """
+    Создает жалобы из потока NDJSON или JSON-массива.
+
+    Тело запроса читается по частям, жалобы сохраняются порциями
+    со статусом "pending" и обогащаются в фоне. Для каждой записи
+    возвращается строка с ее номером и ID либо текстом ошибки.
+    """
+    return DuplexStreamingResponse(
+        ingest_complaints(
+            chunks=request.stream(),
+            chunk_size=settings.bulk.chunk_size,
+            pipeline=pipeline,
+            duplicates=duplicates,
+        ),
+    )
+
+
+@router.post(
+    "/status",
+    response_model=StatusChangeResultSchema,
+)
+async def change_statuses(
+    change: StatusChangeSchema,
+    session: Annotated[
+        AsyncSession,
+        Depends(db_helper.get_async_session),
+    ],
+):
+    """
+    Меняет статус нескольких жалоб одним запросом к базе данных.
+
+    Жалобы выбираются по списку ids и/или по условиям, например
+    {"category": "Оплата", "from_status": "open", "before": "2026-01-01T00:00:00"}.
+    По умолчанию жалобы закрываются, "status": "open" открывает их снова.
+    """
+    return await change_complaints_status(change=change, session=session)
+
+
+@router.get(
+    "/{complaint_id}",
+    response_model=ComplaintAllInfoSchema,
+)
+async def get_complaint(
+    complaint_id: int,
+    session: Annotated[
+        AsyncSession,
+        Depends(db_helper.get_async_session),
+    ],
+):
+    """
+    Выводит жалобу по ее ID, в том числе перенесенную в архив.
+    """
+    complaint = await ComplaintDao(session=session).get_by_id(complaint_id)
+    if complaint is not None:
+        return complaint
+    complaint = await find_archived_complaint(
+        config=settings.archive,
+        session=session,
+        complaint_id=complaint_id,
     )
+    if complaint is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return complaint
 
 
 @router.post(
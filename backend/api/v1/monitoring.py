@@ -0,0 +1,71 @@
+from typing import Annotated
+
+from core.dependencies.enrichment import get_classifier
+from core.schemas.monitoring import (
+    CacheStatsSchema,
+    CircuitBreakerStatsSchema,
+    OutboundLimitStatsSchema,
+)
+from fastapi import APIRouter, Depends
+from services.classification import ComplaintClassifier
+
+router = APIRouter(tags=["Monitoring"])
+
+
+@router.get(
+    "/cache",
+    response_model=CacheStatsSchema,
+)
+async def get_cache_stats(
+    classifier: Annotated[
+        ComplaintClassifier,
+        Depends(get_classifier),
+    ],
+):
+    """
+    Выводит счетчики попаданий и промахов кэша классификации.
+    """
+    return CacheStatsSchema(
+        size=classifier.cache.size,
+        kinds=classifier.cache.stats(),
+    )
+
+
+@router.get(
+    "/limits",
+    response_model=dict[str, OutboundLimitStatsSchema],
+)
+async def get_limit_stats(
+    classifier: Annotated[
+        ComplaintClassifier,
+        Depends(get_classifier),
+    ],
+):
+    """
+    Выводит состояние ограничителей запросов к внешним API:
+    текущий лимит одновременных запросов, очередь, число отклоненных
+    запросов и время ожидания в очереди.
+    """
+    return {
+        kind: limiter.stats() for kind, limiter in classifier.limiters.items()
+    }
+
+
+@router.get(
+    "/breakers",
+    response_model=dict[str, CircuitBreakerStatsSchema],
+)
+async def get_breaker_stats(
+    classifier: Annotated[
+        ComplaintClassifier,
+        Depends(get_classifier),
+    ],
+):
+    """
+    Выводит состояние выключателей внешних API: closed - запросы
+    отправляются, open - сразу используется запасной результат,
+    half_open - отправляются пробные запросы.
+    """
+    return {
+        kind: breaker.stats() for kind, breaker in classifier.breakers.items()
+    }
@@ -0,0 +1,112 @@
+from typing import Annotated
+
+from core.dao.webhook import WebhookDeadLetterDao, WebhookTargetDao
+from core.dependencies.webhooks import get_webhook_dispatcher
+from core.models import db_helper
+from core.schemas.ok import OkSchema
+from core.schemas.webhook import (
+    WebhookDeadLetterReadSchema,
+    WebhookTargetCreateSchema,
+    WebhookTargetInSchema,
+    WebhookTargetReadSchema,
+)
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from services.webhooks import WebhookDispatcher
+from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter(tags=["Webhooks"])
+
+
+@router.get(
+    "",
+    response_model=list[WebhookTargetReadSchema],
+)
+async def get_webhooks(
+    session: Annotated[
+        AsyncSession,
+        Depends(db_helper.get_async_session),
+    ],
+):
+    """
+    Выводит список зарегистрированных вебхуков.
+    """
+    return await WebhookTargetDao(session=session).get_all()
+
+
+@router.post(
+    "",
+    status_code=status.HTTP_201_CREATED,
+    response_model=WebhookTargetReadSchema,
+)
+async def create_webhook(
+    webhook: WebhookTargetInSchema,
+    session: Annotated[
+        AsyncSession,
+        Depends(db_helper.get_async_session),
+    ],
+    dispatcher: Annotated[
+        WebhookDispatcher,
+        Depends(get_webhook_dispatcher),
+    ],
+):
+    """
+    Регистрирует вебхук, на который будут отправляться обогащенные жалобы.
+
+    Жалобы отправляются POST-запросом пакетами в формате {"complaints": [...]}.
+    """
+    record = await WebhookTargetDao(session=session).add(
+        WebhookTargetCreateSchema(
+            url=str(webhook.url),
+            category=webhook.category,
+        )
+    )
+    if record is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT)
+    await session.commit()
+    target = WebhookTargetReadSchema.model_validate(record, from_attributes=True)
+    dispatcher.add_target(target)
+    await dispatcher.announce_targets_changed()
+    return target
+
+
+@router.get(
+    "/dead-letters",
+    response_model=list[WebhookDeadLetterReadSchema],
+)
+async def get_dead_letters(
+    session: Annotated[
+        AsyncSession,
+        Depends(db_helper.get_async_session),
+    ],
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+):
+    """
+    Выводит последние пакеты жалоб, которые не удалось доставить.
+    """
+    return await WebhookDeadLetterDao(session=session).get_latest(limit=limit)
+
+
+@router.delete(
+    "/{webhook_id}",
+    response_model=OkSchema,
+)
+async def delete_webhook(
+    webhook_id: int,
+    session: Annotated[
+        AsyncSession,
+        Depends(db_helper.get_async_session),
+    ],
+    dispatcher: Annotated[
+        WebhookDispatcher,
+        Depends(get_webhook_dispatcher),
+    ],
+):
+    """
+    Удаляет вебхук по его ID.
+    """
+    if not await WebhookTargetDao(session=session).delete_by_id(webhook_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    await session.commit()
+    await dispatcher.remove_target(webhook_id)
+    await dispatcher.announce_targets_changed()
+    return OkSchema()
@@ -0,0 +1,94 @@
+"""
+Измеряет скорость пакетной загрузки жалоб.
+
+Жалобы записываются в настроенную базу данных, поэтому запускать
+следует на отдельной копии. Из корня репозитория:
+PYTHONPATH=backend python -m benchmarks.bulk_ingest --count 100000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections.abc import AsyncIterator
+
+from core.config import settings
+from core.models import db_helper
+from services.bulk import ingest_complaints
+
+WORDS = (
+    "не работает оплата карта приложение сайт ошибка деньги списали "
+    "дважды вход пароль страница долго грузится поддержка не отвечает"
+).split()
+
+
+def generate_body(count: int) -> bytes:
+    """
+    Возвращает тело запроса NDJSON со случайными жалобами.
+    """
+    rng = random.Random(0)
+    return b"".join(
+        json.dumps(
+            {"text": " ".join(rng.choices(WORDS, k=rng.randint(5, 30)))},
+            ensure_ascii=False,
+        ).encode()
+        + b"\n"
+        for _ in range(count)
+    )
+
+
+async def stream_body(body: bytes, read_size: int) -> AsyncIterator[bytes]:
+    """
+    Отдает тело запроса частями по read_size байт, как сервер.
+    """
+    for start in range(0, len(body), read_size):
+        yield body[start : start + read_size]
+
+
+async def run(count: int, chunk_size: int, read_size: int) -> dict:
+    """
+    Загружает count жалоб и возвращает количество созданных и ошибок.
+    """
+    body = generate_body(count)
+    created = errors = 0
+    started = time.perf_counter()
+    async for lines in ingest_complaints(
+        chunks=stream_body(body, read_size),
+        chunk_size=chunk_size,
+    ):
+        for line in lines.splitlines():
+            if b'"id"' in line:
+                created += 1
+            else:
+                errors += 1
+    elapsed = time.perf_counter() - started
+    await db_helper.dispose()
+    return {
+        "count": count,
+        "chunk_size": chunk_size,
+        "created": created,
+        "errors": errors,
+        "seconds": elapsed,
+        "throughput_per_s": created / elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=settings.bulk.chunk_size)
+    parser.add_argument("--read-size", type=int, default=64 * 1024)
+    args = parser.parse_args()
+    results = asyncio.run(
+        run(
+            count=args.count,
+            chunk_size=args.chunk_size,
+            read_size=args.read_size,
+        )
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
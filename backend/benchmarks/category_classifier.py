@@ -0,0 +1,173 @@
+"""
+Сравнивает точность и задержку локального классификатора категорий
+и AI-модели на размеченных жалобах.
+
+Запуск из корня репозитория:
+PYTHONPATH=backend python -m benchmarks.category_classifier --remote 50
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+from core.clients.inference import PooledInferenceClient
+from core.config import settings
+from jobs.train_category_model import load_labelled
+from services.local_classifier import CategoryModel
+from services.providers import request_category
+
+
+def describe_latencies(latencies: list[float]) -> dict[str, float]:
+    """
+    Возвращает перцентили задержки в миллисекундах.
+    """
+    values = np.array(latencies) * 1000
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+    }
+
+
+def evaluate_local(
+    model: CategoryModel,
+    texts: list[str],
+    labels: list[str],
+    thresholds: list[float],
+) -> dict:
+    """
+    Оценивает локальную модель на отложенной выборке.
+    """
+    predictions, latencies = [], []
+    for text in texts:
+        started = time.perf_counter()
+        predictions.append(model.predict(text))
+        latencies.append(time.perf_counter() - started)
+
+    correct = [
+        label == predicted for (predicted, _), label in zip(predictions, labels)
+    ]
+    by_threshold = {}
+    for threshold in thresholds:
+        covered = [
+            is_correct
+            for (_, confidence), is_correct in zip(predictions, correct)
+            if confidence >= threshold
+        ]
+        by_threshold[str(threshold)] = {
+            "coverage": len(covered) / len(texts),
+            "accuracy": sum(covered) / len(covered) if covered else None,
+        }
+    return {
+        "accuracy": sum(correct) / len(correct),
+        "throughput_per_s": len(texts) / sum(latencies),
+        **describe_latencies(latencies),
+        "thresholds": by_threshold,
+    }
+
+
+async def evaluate_remote(texts: list[str], labels: list[str]) -> dict:
+    """
+    Оценивает AI-модель на отложенной выборке.
+    """
+    latencies, correct, errors = [], [], 0
+    async with PooledInferenceClient(
+        model=settings.resources.hf.model,
+        token=settings.resources.hf.token,
+        timeout=settings.resources.hf.timeout,
+    ) as inference_client:
+        for text, label in zip(texts, labels):
+            started = time.perf_counter()
+            try:
+                predicted = await request_category(
+                    text=text,
+                    inference_client=inference_client,
+                )
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            correct.append(predicted == label)
+    return {
+        "accuracy": sum(correct) / len(correct) if correct else None,
+        "errors": errors,
+        **(describe_latencies(latencies) if latencies else {}),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--data",
+        help="Файл JSONL с полями text и category. "
+        "По умолчанию используются жалобы из базы данных.",
+    )
+    parser.add_argument("--limit", type=int, default=50_000)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument(
+        "--thresholds",
+        type=float,
+        nargs="+",
+        default=[0.5, 0.7, 0.8, 0.9, 0.95, 0.99],
+    )
+    parser.add_argument(
+        "--remote",
+        type=int,
+        default=0,
+        help="Сколько жалоб из отложенной выборки отправить в AI-модель",
+    )
+    parser.add_argument("--output", help="Файл для сохранения результатов в JSON")
+    args = parser.parse_args()
+
+    if args.data:
+        with open(args.data, encoding="utf-8") as file:
+            rows = [json.loads(line) for line in file if line.strip()]
+        texts = [row["text"] for row in rows]
+        labels = [row["category"] for row in rows]
+    else:
+        texts, labels = asyncio.run(load_labelled(limit=args.limit))
+
+    samples = list(zip(texts, labels))
+    random.Random(0).shuffle(samples)
+    split = int(len(samples) * (1 - args.test_size))
+    train, test = samples[:split], samples[split:]
+    if not train or not test:
+        raise SystemExit("Недостаточно размеченных жалоб для оценки")
+
+    started = time.perf_counter()
+    model = CategoryModel.fit_calibrated(
+        texts=[text for text, _ in train],
+        labels=[label for _, label in train],
+    )
+    results = {
+        "train_size": len(train),
+        "test_size": len(test),
+        "train_seconds": time.perf_counter() - started,
+        "temperature": model.temperature,
+        "local": evaluate_local(
+            model=model,
+            texts=[text for text, _ in test],
+            labels=[label for _, label in test],
+            thresholds=args.thresholds,
+        ),
+    }
+    if args.remote:
+        sample = test[: args.remote]
+        results["remote"] = asyncio.run(
+            evaluate_remote(
+                texts=[text for text, _ in sample],
+                labels=[label for _, label in sample],
+            )
+        )
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
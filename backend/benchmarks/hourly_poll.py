@@ -0,0 +1,160 @@
+"""
+Измеряет время ежечасного запроса открытых жалоб без индекса и с ним.
+
+База данных создается во временном файле и заполняется случайными
+жалобами за последний год. Из корня репозитория:
+PYTHONPATH=backend python -m benchmarks.hourly_poll --rows 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.category_classifier import describe_latencies
+from core.dao.complaint import ComplaintDao
+from core.enums.complaint import EnrichmentEnum, SentimentEnum, StatusEnum
+from core.models import Base, Complaint
+from sqlalchemy import Index, insert, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+CATEGORIES = ["Техническая", "Оплата", "Другое"]
+
+
+def get_open_index() -> Index:
+    """
+    Возвращает индекс для ежечасного опроса из модели жалобы.
+    """
+    return next(
+        index
+        for index in Complaint.__table__.indexes
+        if index.name == "ix_complaints_open_timestamp"
+    )
+
+
+async def seed(
+    engine: AsyncEngine,
+    rows: int,
+    open_share: float,
+    chunk_size: int = 50_000,
+) -> None:
+    """
+    Заполняет таблицу жалобами, равномерно распределенными по году.
+    """
+    rng = random.Random(0)
+    now = datetime.now()
+    step = timedelta(days=365) / rows
+    async with engine.begin() as connection:
+        for start in range(0, rows, chunk_size):
+            await connection.execute(
+                insert(Complaint.__table__),
+                [
+                    {
+                        "text": f"Жалоба {i}",
+                        "status": (
+                            StatusEnum.open
+                            if rng.random() < open_share
+                            else StatusEnum.closed
+                        ),
+                        "timestamp": now - step * (rows - i),
+                        "sentiment": SentimentEnum.neutral,
+                        "category": rng.choice(CATEGORIES),
+                        "enrichment": EnrichmentEnum.done,
+                    }
+                    for i in range(start, min(start + chunk_size, rows))
+                ],
+            )
+
+
+async def measure(
+    session_factory: async_sessionmaker,
+    repeats: int,
+) -> dict:
+    """
+    Выполняет запрос repeats раз и возвращает перцентили времени.
+    """
+    latencies = []
+    async with session_factory() as session:
+        dao = ComplaintDao(session=session)
+        for _ in range(repeats):
+            started = time.perf_counter()
+            complaints = await dao.get_complaints_in_last_hour()
+            latencies.append(time.perf_counter() - started)
+    return {"found": len(complaints), **describe_latencies(latencies)}
+
+
+async def explain(engine: AsyncEngine) -> list[str]:
+    """
+    Возвращает план ежечасного запроса в SQLite.
+    """
+    query = text(
+        "EXPLAIN QUERY PLAN SELECT * FROM complaints "
+        "WHERE timestamp >= :hour_ago AND status = :status "
+        "AND category != :category"
+    )
+    async with engine.connect() as connection:
+        result = await connection.execute(
+            query,
+            {
+                "hour_ago": datetime.now() - timedelta(hours=1),
+                "status": StatusEnum.open,
+                "category": "Другое",
+            },
+        )
+        return [row[-1] for row in result]
+
+
+async def run(rows: int, open_share: float, repeats: int) -> dict:
+    """
+    Сравнивает время запроса до и после создания индекса.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(directory) / 'poll.sqlite3'}"
+        )
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        index = get_open_index()
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            await connection.run_sync(index.drop)
+
+        started = time.perf_counter()
+        await seed(engine, rows, open_share)
+        results = {"rows": rows, "seed_seconds": time.perf_counter() - started}
+
+        results["without_index"] = {
+            "plan": await explain(engine),
+            **await measure(session_factory, repeats),
+        }
+        async with engine.begin() as connection:
+            await connection.run_sync(index.create)
+        results["with_index"] = {
+            "plan": await explain(engine),
+            **await measure(session_factory, repeats),
+        }
+        await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--open-share", type=float, default=0.1)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+    results = asyncio.run(
+        run(rows=args.rows, open_share=args.open_share, repeats=args.repeats)
+    )
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
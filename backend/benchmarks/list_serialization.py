@@ -0,0 +1,179 @@
+"""
+Сравнивает время выдачи списка открытых жалоб за последний час через
+модели pydantic и потоковой сериализацией строк из базы данных.
+
+База данных создается во временном файле. Из корня репозитория:
+PYTHONPATH=backend python -m benchmarks.list_serialization --rows 10000 100000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.category_classifier import describe_latencies
+from benchmarks.hourly_poll import CATEGORIES
+from core.dao.complaint import ComplaintDao
+from core.enums.complaint import EnrichmentEnum, SentimentEnum, StatusEnum
+from core.models import Base, Complaint
+from core.schemas.complaint import ComplaintAllInfoSchema, OpenComplaintsSchema
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from services.complaints import stream_complaints_in_last_hour
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+WORDS = (
+    "не работает оплата карта приложение сайт ошибка деньги списали "
+    "дважды вход пароль страница долго грузится поддержка не отвечает"
+).split()
+
+response_adapter = TypeAdapter(OpenComplaintsSchema)
+
+
+async def seed(engine: AsyncEngine, rows: int, chunk_size: int = 50_000) -> None:
+    """
+    Заполняет таблицу открытыми жалобами за последние полчаса.
+    """
+    rng = random.Random(0)
+    now = datetime.now()
+    step = timedelta(minutes=30) / rows
+    async with engine.begin() as connection:
+        for start in range(0, rows, chunk_size):
+            await connection.execute(
+                insert(Complaint.__table__),
+                [
+                    {
+                        "text": " ".join(rng.choices(WORDS, k=rng.randint(5, 30))),
+                        "status": StatusEnum.open,
+                        "timestamp": now - step * (rows - i),
+                        "sentiment": rng.choice(list(SentimentEnum)),
+                        "category": rng.choice(CATEGORIES[:2]),
+                        "enrichment": EnrichmentEnum.done,
+                    }
+                    for i in range(start, min(start + chunk_size, rows))
+                ],
+            )
+
+
+async def render_models(session_factory: async_sessionmaker) -> tuple[bytes, float]:
+    """
+    Формирует ответ как прежний обработчик: объекты ORM, модели pydantic
+    и сериализация FastAPI. Возвращает тело и время до первого байта.
+    """
+    started = time.perf_counter()
+    async with session_factory() as session:
+        complaints = await ComplaintDao(session=session).get_complaints_in_last_hour()
+    response = OpenComplaintsSchema(
+        complaints=[
+            ComplaintAllInfoSchema.model_validate(complaint, from_attributes=True)
+            for complaint in complaints
+        ]
+    )
+    content = jsonable_encoder(response_adapter.dump_python(response, mode="json"))
+    body = json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode()
+    return body, time.perf_counter() - started
+
+
+async def render_stream(
+    session_factory: async_sessionmaker,
+    chunk_size: int,
+) -> tuple[bytes, float]:
+    """
+    Формирует ответ потоковой сериализацией.
+    Возвращает тело и время до первой порции жалоб.
+    """
+    started = time.perf_counter()
+    first_chunk = None
+    parts = []
+    async for part in stream_complaints_in_last_hour(
+        session_factory=session_factory,
+        chunk_size=chunk_size,
+    ):
+        parts.append(part)
+        if first_chunk is None and len(parts) == 2:
+            first_chunk = time.perf_counter() - started
+    return b"".join(parts), first_chunk or time.perf_counter() - started
+
+
+async def measure(render, repeats: int) -> tuple[dict, bytes]:
+    """
+    Формирует ответ repeats раз и возвращает перцентили времени и тело.
+    """
+    latencies = []
+    first_chunks = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        body, first_chunk = await render()
+        latencies.append(time.perf_counter() - started)
+        first_chunks.append(first_chunk)
+    return {
+        "bytes": len(body),
+        **describe_latencies(latencies),
+        "first_chunk_p50_ms": sorted(first_chunks)[len(first_chunks) // 2] * 1000,
+    }, body
+
+
+async def run(rows: int, repeats: int, chunk_size: int) -> dict:
+    """
+    Заполняет базу данных rows жалобами и сравнивает оба способа выдачи.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(directory) / 'listing.sqlite3'}"
+        )
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        await seed(engine, rows)
+
+        models, models_body = await measure(
+            lambda: render_models(session_factory), repeats
+        )
+        stream, stream_body = await measure(
+            lambda: render_stream(session_factory, chunk_size), repeats
+        )
+        await engine.dispose()
+
+    expected = json.loads(models_body)
+    if json.loads(stream_body) != expected:
+        raise RuntimeError("Ответы моделей и потоковой сериализации различаются")
+    return {
+        "rows": rows,
+        "found": len(expected["complaints"]),
+        "chunk_size": chunk_size,
+        "models": models,
+        "stream": stream,
+        "speedup_p50": models["p50_ms"] / stream["p50_ms"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    results = [
+        asyncio.run(run(rows=rows, repeats=args.repeats, chunk_size=args.chunk_size))
+        for rows in args.rows
+    ]
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
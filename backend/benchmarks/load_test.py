@@ -0,0 +1,450 @@
+"""
+Нагрузочный тест сервиса с заглушками внешних API.
+
+Запускает заглушку API тональности и AI-модели (stubs.providers),
+применяет миграции к временной базе SQLite, запускает сервис
+(backend/main.py) отдельным процессом и в течение --duration секунд
+отправляет запросы из --concurrency одновременных клиентов: создание,
+ежечасный список, ленту по курсору и закрытие жалоб в пропорции --mix.
+По каждому эндпоинту выводятся пропускная способность и перцентили
+задержки, результаты записываются в --output. С --baseline результаты
+сравниваются с предыдущим запуском.
+
+Запуск из корня репозитория:
+PYTHONPATH=backend python -m benchmarks.load_test --concurrency 32 \
+    --duration 30 --category-latency lognormal:800:0.7 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import aiohttp
+import numpy as np
+from prometheus_client.parser import text_string_to_metric_families
+from stubs.providers import add_provider_arguments, create_provider_stub
+
+ROOT = Path(__file__).resolve().parents[2]
+API = "/api/v1/complaints"
+OK_STATUSES = ("200", "201", "202")
+WORDS = [
+    "не работает",
+    "приложение",
+    "списали деньги",
+    "оплата",
+    "ошибка",
+    "вход",
+    "карта",
+    "долго",
+    "поддержка",
+    "возврат",
+]
+
+
+def describe_latencies(latencies: list[float]) -> dict[str, float]:
+    """
+    Возвращает перцентили и максимум задержки в миллисекундах.
+
+    Модуль не импортирует настройки сервиса, чтобы тест запускался
+    без API-ключей, поэтому не использует одноименную функцию
+    из benchmarks.category_classifier.
+    """
+    values = np.array(latencies) * 1000
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+    }
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """
+    Разбирает пропорцию запросов вида "create=5,list=2,feed=2,close=1".
+    """
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("create", "list", "feed", "close"):
+            raise argparse.ArgumentTypeError(f"Неизвестный запрос {name!r}")
+        mix[name] = float(weight)
+    return mix
+
+
+def free_port() -> int:
+    """
+    Возвращает свободный TCP-порт.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def service_env(
+    args: argparse.Namespace,
+    provider_url: str,
+    db_url: str,
+    port: int,
+) -> dict[str, str]:
+    """
+    Возвращает переменные окружения сервиса, направленного на заглушки.
+
+    Ограничители запросов к внешним API по умолчанию выключены, чтобы
+    измерялся сам сервис, а не настроенная скорость запросов.
+    """
+    env = {
+        **os.environ,
+        "API_SENTINEL_URL": f"{provider_url}/sentiment",
+        "API_SENTINEL_KEY": "load-test",
+        "API_SENTINEL_MODE": "remote",
+        "HF_TOKEN": "load-test",
+        "HF_MODEL": provider_url,
+        "DB__URL": db_url,
+        "RUN__HOST": "127.0.0.1",
+        "RUN__PORT": str(port),
+        "RUN__WORKERS": str(args.workers),
+        "RUN__RELOAD": "false",
+        "ENRICHMENT__MODE": args.enrichment_mode,
+        "LOGGING__LOG_LEVEL": "warning",
+    }
+    if args.workers > 1:
+        env["STORE__BACKEND"] = "database"
+    if not args.keep_rate_limits:
+        env["RATE_LIMITS__SENTIMENT__ENABLED"] = "false"
+        env["RATE_LIMITS__CATEGORY__ENABLED"] = "false"
+    for item in args.env:
+        name, _, value = item.partition("=")
+        env[name] = value
+    return env
+
+
+async def wait_ready(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    process: subprocess.Popen,
+    timeout: float = 60.0,
+) -> None:
+    """
+    Ждет, пока сервис начнет отвечать на запросы.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Сервис завершился с кодом {process.returncode}")
+        try:
+            async with session.get(f"{base_url}/openapi.json") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise TimeoutError("Сервис не запустился")
+
+
+class LoadStats:
+    """
+    Время и коды ответов по эндпоинтам, общие для всех клиентов.
+
+    Пока recording равен False (прогрев), ответы не учитываются.
+    """
+
+    def __init__(self) -> None:
+        self.recording = False
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, name: str, status: str, latency: float) -> None:
+        """
+        Учитывает ответ на запрос name.
+        """
+        if self.recording:
+            self.latencies[name].append(latency)
+            self.statuses[name][status] += 1
+
+    def report(self, seconds: float) -> dict:
+        """
+        Возвращает пропускную способность и перцентили задержки.
+        """
+        endpoints = {}
+        for name, latencies in self.latencies.items():
+            statuses = self.statuses[name]
+            errors = sum(
+                count for status, count in statuses.items() if status not in OK_STATUSES
+            )
+            endpoints[name] = {
+                "requests": len(latencies),
+                "errors": errors,
+                "statuses": dict(statuses),
+                "rps": len(latencies) / seconds,
+                **describe_latencies(latencies),
+            }
+        all_latencies = [
+            value for values in self.latencies.values() for value in values
+        ]
+        total = {
+            "requests": len(all_latencies),
+            "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+            "rps": len(all_latencies) / seconds,
+        }
+        if all_latencies:
+            total.update(describe_latencies(all_latencies))
+        return {"endpoints": endpoints, "total": total}
+
+
+class LoadGenerator:
+    """
+    Один клиент: отправляет запросы к сервису по очереди.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str,
+        mix: dict[str, float],
+        stats: LoadStats,
+        seed: int,
+    ) -> None:
+        self._session = session
+        self._base_url = base_url
+        self._names = list(mix)
+        self._weights = list(mix.values())
+        self._stats = stats
+        self._rng = random.Random(seed)
+        self._created: list[int] = []
+        self._after_id = 0
+
+    async def run(self, deadline: float) -> None:
+        """
+        Отправляет запросы по одному до наступления deadline.
+        """
+        while time.monotonic() < deadline:
+            name = self._rng.choices(self._names, self._weights)[0]
+            if name == "close" and not self._created:
+                name = "create"
+            await self._request(name)
+
+    async def _request(self, name: str) -> None:
+        """
+        Отправляет запрос и учитывает время и код ответа.
+        """
+        params: dict[str, str | int] = {}
+        body = None
+        if name == "create":
+            method, path = "POST", API
+            text = " ".join(self._rng.sample(WORDS, 3))
+            body = {"text": f"{text} #{self._rng.getrandbits(48)}"}
+        elif name == "list":
+            method, path = "GET", API
+        elif name == "feed":
+            method, path = "GET", API
+            params = {"after_id": self._after_id, "limit": 100}
+        else:
+            complaint_id = self._created.pop(self._rng.randrange(len(self._created)))
+            method, path = "POST", f"{API}/{complaint_id}"
+
+        started = time.perf_counter()
+        try:
+            async with self._session.request(
+                method,
+                self._base_url + path,
+                params=params,
+                json=body,
+            ) as response:
+                payload = await response.read()
+                status = str(response.status)
+        except (aiohttp.ClientError, TimeoutError) as e:
+            payload, status = b"", type(e).__name__
+        latency = time.perf_counter() - started
+
+        if status in OK_STATUSES and name in ("create", "feed"):
+            data = json.loads(payload)
+            if name == "create":
+                self._created.append(data["id"])
+            else:
+                self._after_id = data["next_after_id"]
+        self._stats.record(name, status, latency)
+
+
+async def read_stage_timings(
+    session: aiohttp.ClientSession,
+    base_url: str,
+) -> dict[str, float]:
+    """
+    Возвращает среднее время этапов обработки жалобы по метрикам сервиса.
+    """
+    try:
+        async with session.get(f"{base_url}/metrics") as response:
+            if response.status != 200:
+                return {}
+            content = await response.text()
+    except aiohttp.ClientError:
+        return {}
+    sums, counts = {}, {}
+    for family in text_string_to_metric_families(content):
+        if family.name != "stage_duration_seconds":
+            continue
+        for sample in family.samples:
+            stage = sample.labels.get("stage")
+            if sample.name.endswith("_sum"):
+                sums[stage] = sample.value
+            elif sample.name.endswith("_count"):
+                counts[stage] = sample.value
+    return {
+        f"{stage}_mean_ms": sums[stage] / counts[stage] * 1000
+        for stage in sums
+        if counts.get(stage)
+    }
+
+
+def compare(results: dict, baseline: dict) -> dict:
+    """
+    Возвращает изменение пропускной способности и p95 относительно
+    предыдущего запуска в процентах.
+    """
+    comparison = {}
+    for name, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous:
+            continue
+        comparison[name] = {
+            key: (current[key] / previous[key] - 1) * 100 if previous[key] else None
+            for key in ("rps", "p50_ms", "p95_ms", "p99_ms")
+        }
+    return comparison
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """
+    Запускает заглушки и сервис и проводит нагрузочный тест.
+    """
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    async with create_provider_stub(args) as stub:
+        with tempfile.TemporaryDirectory() as directory:
+            env = service_env(
+                args,
+                provider_url=stub.url,
+                db_url=f"sqlite+aiosqlite:///{Path(directory) / 'load.sqlite3'}",
+                port=port,
+            )
+            subprocess.run(
+                [sys.executable, "-m", "alembic", "upgrade", "head"],
+                cwd=ROOT,
+                env=env,
+                check=True,
+                capture_output=True,
+            )
+            # Журнал запросов uvicorn (stdout) не выводится, ошибки видны в stderr
+            process = subprocess.Popen(
+                [sys.executable, str(ROOT / "backend" / "main.py")],
+                cwd=ROOT,
+                env=env,
+                stdout=subprocess.DEVNULL,
+            )
+            try:
+                async with aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=args.concurrency),
+                    timeout=aiohttp.ClientTimeout(total=args.request_timeout),
+                ) as session:
+                    await wait_ready(session, base_url, process)
+                    stats = LoadStats()
+                    generators = [
+                        LoadGenerator(
+                            session=session,
+                            base_url=base_url,
+                            mix=args.mix,
+                            stats=stats,
+                            seed=args.seed + i,
+                        )
+                        for i in range(args.concurrency)
+                    ]
+                    started = time.monotonic()
+                    deadline = started + args.warmup + args.duration
+                    tasks = [
+                        asyncio.create_task(generator.run(deadline))
+                        for generator in generators
+                    ]
+                    await asyncio.sleep(args.warmup)
+                    stats.recording = True
+                    measured_from = time.monotonic()
+                    await asyncio.gather(*tasks)
+                    seconds = time.monotonic() - measured_from
+                    stages = await read_stage_timings(session, base_url)
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+    return {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "workers": args.workers,
+            "enrichment_mode": args.enrichment_mode,
+            "mix": args.mix,
+            "keep_rate_limits": args.keep_rate_limits,
+            "env": args.env,
+        },
+        **stats.report(seconds),
+        "stages": stages,
+        "providers": stub.stats(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default="create=5,list=2,feed=2,close=1",
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--enrichment-mode",
+        choices=["sync", "background"],
+        default="sync",
+    )
+    parser.add_argument(
+        "--keep-rate-limits",
+        action="store_true",
+        help="Не выключать ограничители запросов к внешним API",
+    )
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Дополнительная переменная окружения сервиса",
+    )
+    parser.add_argument("--request-timeout", type=float, default=60.0)
+    parser.add_argument("--output", type=Path, default=Path("load_test.json"))
+    parser.add_argument("--baseline", type=Path, help="Результаты прошлого запуска")
+    add_provider_arguments(parser)
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+    results = asyncio.run(run(args))
+    if baseline is not None:
+        results["comparison"] = compare(results, baseline)
+    args.output.write_text(json.dumps(results, ensure_ascii=False, indent=2))
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Измеряет скорость локального анализатора тональности на одном ядре.
+
+Запуск из корня репозитория:
+PYTHONPATH=backend python -m benchmarks.local_sentiment --texts 100000
+"""
+
+import argparse
+import json
+import random
+import time
+
+from services.local_sentiment import LocalSentimentAnalyzer
+
+SAMPLE_TEXTS = [
+    "Приложение не работает уже второй день",
+    "Оплата не прошла, а деньги списали дважды",
+    "Спасибо, все отлично и быстро",
+    "Курьер очень грубо разговаривал",
+    "Где мой заказ?",
+    "The app doesn't work, terrible experience",
+    "Great service, thanks!",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts = [rng.choice(SAMPLE_TEXTS) for _ in range(args.texts)]
+    analyzer = LocalSentimentAnalyzer()
+
+    started = time.perf_counter()
+    for text in texts[: args.batch_size]:
+        analyzer.analyze(text)
+    single = args.batch_size / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for i in range(0, len(texts), args.batch_size):
+        analyzer.analyze_many(texts[i : i + args.batch_size])
+    batched = len(texts) / (time.perf_counter() - started)
+
+    print(
+        json.dumps(
+            {
+                "single_texts_per_s": round(single),
+                "batched_texts_per_s": round(batched),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
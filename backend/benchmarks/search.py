@@ -0,0 +1,181 @@
+"""
+Измеряет время полнотекстового поиска жалоб.
+
+База данных SQLite создается во временном файле миграциями alembic
+и заполняется случайными жалобами, индекс FTS5 заполняется триггерами.
+Из корня репозитория:
+PYTHONPATH=backend python -m benchmarks.search --rows 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.category_classifier import describe_latencies
+from core.enums.complaint import EnrichmentEnum, SentimentEnum, StatusEnum
+from core.models import Complaint
+from core.schemas.complaint import ComplaintSearchSchema
+from services.search import search_complaints
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+ROOT = Path(__file__).resolve().parents[2]
+CATEGORIES = ["Техническая", "Оплата", "Другое"]
+COMMON_WORDS = (
+    "не работает оплата карта приложение сайт ошибка деньги списали "
+    "дважды вход пароль страница долго грузится поддержка не отвечает "
+    "заказ доставка курьер возврат подписка обновление телефон"
+).split()
+SYLLABLES = "ба ве го да жи зо ки ло му на по ры са ту фе хи це чу ша щу".split()
+QUERIES = [
+    ("частое слово", "не"),
+    ("слово", "оплатить"),
+    ("фраза", '"списали дважды"'),
+    ("начало слова", "обнов*"),
+    ("редкое слово", None),  # Подставляется слово из словаря
+    ("два слова", "курьер возврат"),
+]
+
+
+def make_vocabulary(size: int, rng: random.Random) -> list[str]:
+    """
+    Возвращает словарь из частых слов жалоб и случайных слов.
+    """
+    words = {"".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(size)}
+    return COMMON_WORDS + sorted(words)
+
+
+async def seed(
+    engine: AsyncEngine,
+    rows: int,
+    vocabulary: list[str],
+    chunk_size: int = 20_000,
+) -> None:
+    """
+    Заполняет таблицу жалобами, слова которых распределены по закону Ципфа.
+    """
+    rng = random.Random(0)
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    now = datetime.now()
+    step = timedelta(days=365) / rows
+    async with engine.begin() as connection:
+        for start in range(0, rows, chunk_size):
+            await connection.execute(
+                insert(Complaint.__table__),
+                [
+                    {
+                        "text": " ".join(
+                            rng.choices(vocabulary, weights, k=rng.randint(5, 30))
+                        ),
+                        "status": (
+                            StatusEnum.open if rng.random() < 0.2 else StatusEnum.closed
+                        ),
+                        "timestamp": now - step * (rows - i),
+                        "sentiment": SentimentEnum.negative,
+                        "category": rng.choice(CATEGORIES),
+                        "enrichment": EnrichmentEnum.done,
+                    }
+                    for i in range(start, min(start + chunk_size, rows))
+                ],
+            )
+
+
+async def measure(
+    session_factory: async_sessionmaker,
+    params: dict,
+    repeats: int,
+    pages: int,
+) -> dict:
+    """
+    Выполняет поиск repeats раз, каждый раз читая pages страниц,
+    и возвращает перцентили времени одной страницы.
+    """
+    latencies = []
+    found = 0
+    async with session_factory() as session:
+        for _ in range(repeats):
+            cursor = None
+            found = 0
+            for _ in range(pages):
+                search = ComplaintSearchSchema(**params, cursor=cursor)
+                started = time.perf_counter()
+                result = await search_complaints(search=search, session=session)
+                latencies.append(time.perf_counter() - started)
+                found += len(result.complaints)
+                cursor = result.next_cursor
+                if cursor is None:
+                    break
+    return {"found": found, **describe_latencies(latencies)}
+
+
+async def run(rows: int, repeats: int, pages: int, limit: int) -> dict:
+    """
+    Заполняет базу данных и измеряет время поиска разных запросов.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{Path(directory) / 'search.sqlite3'}"
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            cwd=ROOT,
+            env={**os.environ, "DB__URL": url},
+            check=True,
+            capture_output=True,
+        )
+        engine = create_async_engine(url)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        vocabulary = make_vocabulary(20_000, random.Random(1))
+
+        started = time.perf_counter()
+        await seed(engine, rows, vocabulary)
+        results = {"rows": rows, "seed_seconds": time.perf_counter() - started}
+
+        for name, query in QUERIES:
+            query = query or vocabulary[len(vocabulary) // 2]
+            for sort in ("relevance", "newest"):
+                for filters in ({}, {"status": ["open"], "category": ["Оплата"]}):
+                    key = f"{name}, {sort}" + (", фильтры" if filters else "")
+                    results[key] = {
+                        "q": query,
+                        **await measure(
+                            session_factory,
+                            {"q": query, "sort": sort, "limit": limit, **filters},
+                            repeats=repeats,
+                            pages=pages,
+                        ),
+                    }
+        await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    results = asyncio.run(
+        run(
+            rows=args.rows,
+            repeats=args.repeats,
+            pages=args.pages,
+            limit=args.limit,
+        )
+    )
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
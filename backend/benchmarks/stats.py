@@ -0,0 +1,161 @@
+"""
+Сравнивает время подсчета жалоб по часам запросом GROUP BY к таблице
+жалоб и чтением таблицы статистики.
+
+База данных SQLite создается во временном файле миграциями alembic,
+жалобы распределены по последним 30 дням. Из корня репозитория:
+PYTHONPATH=backend python -m benchmarks.stats --rows 100000 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.category_classifier import describe_latencies
+from benchmarks.hourly_poll import CATEGORIES
+from core.config import StatsConfig
+from core.enums.complaint import EnrichmentEnum, SentimentEnum, StatusEnum
+from core.models import Complaint
+from core.schemas.complaint import ComplaintStatsQuerySchema
+from services.stats import ComplaintStats
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+ROOT = Path(__file__).resolve().parents[2]
+BUCKET_FORMATS = {"hour": "%Y-%m-%d %H:00:00", "day": "%Y-%m-%d"}
+CASES = [
+    ("сутки по часам", "hour", 1),
+    ("30 дней по часам", "hour", 30),
+    ("30 дней по дням", "day", 30),
+]
+
+
+async def seed(engine: AsyncEngine, rows: int, chunk_size: int = 50_000) -> None:
+    """
+    Заполняет таблицу жалобами за последние 30 дней.
+    """
+    rng = random.Random(0)
+    now = datetime.now()
+    step = timedelta(days=30) / rows
+    async with engine.begin() as connection:
+        for start in range(0, rows, chunk_size):
+            await connection.execute(
+                insert(Complaint.__table__),
+                [
+                    {
+                        "text": "Жалоба",
+                        "status": rng.choice(list(StatusEnum)),
+                        "timestamp": now - step * (rows - i),
+                        "sentiment": rng.choice(list(SentimentEnum)),
+                        "category": rng.choice(CATEGORIES),
+                        "enrichment": EnrichmentEnum.done,
+                    }
+                    for i in range(start, min(start + chunk_size, rows))
+                ],
+            )
+
+
+async def group_by_complaints(
+    session_factory: async_sessionmaker,
+    period: str,
+    since: datetime,
+):
+    """
+    Считает жалобы по часам или дням, статусу, тональности и категории
+    запросом GROUP BY к таблице жалоб.
+    """
+    bucket = func.strftime(BUCKET_FORMATS[period], Complaint.timestamp)
+    query = (
+        select(
+            bucket,
+            Complaint.status,
+            Complaint.sentiment,
+            Complaint.category,
+            func.count(),
+        )
+        .where(Complaint.timestamp >= since)
+        .group_by(bucket, Complaint.status, Complaint.sentiment, Complaint.category)
+    )
+    async with session_factory() as session:
+        result = await session.execute(query)
+        return result.all()
+
+
+async def measure(call, repeats: int) -> dict:
+    """
+    Вызывает call repeats раз и возвращает перцентили времени.
+    """
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - started)
+    return describe_latencies(latencies)
+
+
+async def run(rows: int, repeats: int) -> dict:
+    """
+    Заполняет базу данных rows жалобами, переносит изменения
+    в статистику и сравнивает оба способа подсчета за сутки и за 30 дней.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{Path(directory) / 'stats.sqlite3'}"
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            cwd=ROOT,
+            env={**os.environ, "DB__URL": url},
+            check=True,
+            capture_output=True,
+        )
+        engine = create_async_engine(url)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        await seed(engine, rows)
+
+        # Кэш выключен, чтобы каждый запрос читал таблицу статистики
+        stats = ComplaintStats(
+            config=StatsConfig(cache_ttl=0),
+            session_factory=session_factory,
+        )
+        started = time.perf_counter()
+        results = {
+            "rows": rows,
+            "compacted": await stats.compact(),
+            "compact_seconds": time.perf_counter() - started,
+        }
+        for name, period, days in CASES:
+            since = datetime.now() - timedelta(days=days)
+            query = ComplaintStatsQuerySchema(period=period, since=since)
+            results[name] = {
+                "group_by": await measure(
+                    lambda: group_by_complaints(session_factory, period, since),
+                    repeats,
+                ),
+                "rollup": await measure(lambda: stats.get(query), repeats),
+            }
+        await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    results = [asyncio.run(run(rows=rows, repeats=args.repeats)) for rows in args.rows]
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
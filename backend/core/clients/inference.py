@@ -0,0 +1,81 @@
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from huggingface_hub import AsyncInferenceClient
+
+
+class PooledInferenceClient(AsyncInferenceClient):
+    """
+    Клиент Hugging Face Inference API с общим пулом соединений.
+
+    Базовый AsyncInferenceClient создает новую сессию aiohttp на каждый
+    запрос и закрывает ее после ответа, поэтому каждый запрос платит
+    за новое TCP/TLS соединение. Здесь все сессии используют один
+    TCPConnector, который не закрывается вместе с ними.
+    """
+
+    def __init__(
+        self,
+        *,
+        pool_size: int = 20,
+        keepalive_timeout: float = 30.0,
+        **kwargs,
+    ) -> None:
+        """
+        Инициализация клиента.
+
+        Параметры:
+        pool_size: Максимальное количество одновременных соединений
+        keepalive_timeout: Время жизни простаивающего соединения в секундах
+
+        Остальные параметры передаются в AsyncInferenceClient.
+        """
+        super().__init__(**kwargs)
+        self._connector = TCPConnector(
+            limit=pool_size,
+            keepalive_timeout=keepalive_timeout,
+        )
+
+    def _get_client_session(self, headers: dict | None = None) -> ClientSession:
+        """
+        Возвращает сессию, работающую поверх общего пула соединений.
+
+        Переопределяет приватный метод AsyncInferenceClient и использует
+        приватный словарь _sessions, поэтому повторяет реализацию
+        huggingface-hub==0.33.2 из requirements.txt. При обновлении
+        huggingface-hub метод нужно сверить с новой версией, это
+        проверяет tests/test_inference_client.py.
+
+        В отличие от базового метода, ответы сессии не отслеживаются
+        и не закрываются в close_session. Клиент не использует потоковые
+        ответы, а обычный ответ базовый класс читает целиком до закрытия
+        сессии, после чего соединение уже возвращено в общий пул. Если
+        понадобятся потоковые ответы (stream=True), их придется закрывать
+        самостоятельно: закрытие сессии не закрывает общий пул.
+        """
+        client_headers = self.headers.copy()
+        if headers is not None:
+            client_headers.update(headers)
+        session = ClientSession(
+            headers=client_headers,
+            cookies=self.cookies,
+            timeout=ClientTimeout(total=self.timeout),
+            trust_env=self.trust_env,
+            connector=self._connector,
+            connector_owner=False,
+        )
+        # Базовый класс отслеживает открытые сессии, чтобы закрыть их в close()
+        self._sessions[session] = set()
+        close = session.close
+
+        async def close_session() -> None:
+            await close()
+            self._sessions.pop(session, None)
+
+        session.close = close_session
+        return session
+
+    async def close(self) -> None:
+        """
+        Закрывает открытые сессии и пул соединений.
+        """
+        await super().close()
+        await self._connector.close()
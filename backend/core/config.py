@@ -2,7 +2,7 @@ import logging
 from typing import Literal
 
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from pydantic_settings import (
     BaseSettings,
     SettingsConfigDict,
@@ -18,15 +18,38 @@ load_dotenv()
 class RunConfig(BaseModel):
     """
     Конфигурация для запуска приложения.
+
+    По умолчанию запускается один процесс. Несколько процессов (workers)
+    требуют общего хранилища состояния STORE__BACKEND=database.
+    С reload=True (для разработки) запускается один процесс, который
+    перезапускается при изменении кода. loop и http в режиме "auto"
+    используют uvloop и httptools, если они установлены.
     """
 
     host: str = "0.0.0.0"
     port: int = 8000
+    workers: int = 1
+    reload: bool = False
+    loop: Literal["auto", "asyncio", "uvloop"] = "auto"
+    http: Literal["auto", "h11", "httptools"] = "auto"
+
+    @property
+    def processes(self) -> int:
+        """
+        Возвращает количество процессов, которые будут запущены.
+        """
+        return 1 if self.reload else self.workers
 
 
 class LoggingConfig(BaseModel):
     """
     Конфигурация логирования приложения.
+
+    С use_queue записи пишутся в лог отдельным потоком. json_format
+    выводит каждую запись JSON-объектом. Аргументы записей длиннее
+    max_arg_length символов обрезаются, а с redact в них маскируются
+    email, телефоны и номера карт. Информационные записи логгеров
+    из sampled_loggers пропускаются с вероятностью sample_rate.
     """
 
     log_level: Literal[
@@ -38,6 +61,12 @@ class LoggingConfig(BaseModel):
     ] = "info"
     log_format: str = LOG_DEFAULT_FORMAT
     date_format: str = "%Y-%m-%d %H:%M:%S"
+    json_format: bool = False
+    use_queue: bool = True
+    max_arg_length: int = 200  # 0 - не обрезать
+    redact: bool = True
+    sample_rate: float = 1.0
+    sampled_loggers: list[str] = ["core.dao"]
 
     @property
     def log_level_value(self) -> int:
@@ -50,14 +79,35 @@ class LoggingConfig(BaseModel):
 class SentinelApi(BaseSettings):
     """
     Конфигурация для работы с API анализа тональности.
+
+    mode определяет источник тональности: локальный словарный анализатор,
+    внешнее API или внешнее API только при низкой уверенности
+    локального анализатора.
     """
 
     url: str = "https://api.apilayer.com/sentiment/analysis"
-    key: str
+    key: str = ""
+    mode: Literal[
+        "local",
+        "remote",
+        "local-then-remote-on-low-confidence",
+    ] = "remote"
+    confidence_threshold: float = 0.5
     model_config = SettingsConfigDict(
         env_prefix="api_sentinel_",
     )
 
+    @model_validator(mode="after")
+    def check_key(self) -> "SentinelApi":
+        """
+        Проверяет, что ключ задан, если используется внешнее API.
+        """
+        if self.mode != "local" and not self.key:
+            raise ValueError(
+                "API_SENTINEL_KEY обязателен, если API_SENTINEL_MODE не local"
+            )
+        return self
+
 
 class HFSettings(BaseSettings):
     """
@@ -66,6 +116,9 @@ class HFSettings(BaseSettings):
 
     token: str
     model: str = "mistralai/Mistral-7B-Instruct-v0.3"
+    timeout: float = 30.0
+    pool_size: int = 20
+    keepalive_timeout: float = 30.0
     model_config = SettingsConfigDict(
         env_prefix="hf_",
     )
@@ -87,6 +140,8 @@ class ApiV1Prefix(BaseModel):
 
     prefix: str = "/v1"
     complaints: str = "/complaints"
+    monitoring: str = "/monitoring"
+    webhooks: str = "/webhooks"
 
 
 class ApiPrefix(BaseModel):
@@ -98,12 +153,42 @@ class ApiPrefix(BaseModel):
     v1: ApiV1Prefix = ApiV1Prefix()
 
 
+class SQLitePragmas(BaseModel):
+    """
+    PRAGMA, которые выполняются при каждом подключении к SQLite.
+
+    Значение None оставляет настройку SQLite по умолчанию.
+    В режиме WAL чтение не блокируется записью, а synchronous=normal
+    не ждет fsync на каждую транзакцию. foreign_keys включает проверку
+    внешних ключей и каскадное удаление (ondelete="CASCADE"), которые
+    SQLite по умолчанию не выполняет.
+    """
+
+    journal_mode: Literal["wal", "delete", "truncate", "memory"] | None = "wal"
+    synchronous: Literal["off", "normal", "full", "extra"] | None = "normal"
+    busy_timeout: int | None = 5000  # Миллисекунды ожидания блокировки
+    mmap_size: int | None = 256 * 1024 * 1024
+    cache_size: int | None = -64000  # Отрицательное значение - размер в КиБ
+    foreign_keys: Literal["on", "off"] | None = "on"
+
+
 class DatabaseConfig(BaseModel):
     """
     Конфигурация базы данных.
+
+    Поддерживаются SQLite (sqlite+aiosqlite://) и PostgreSQL
+    (postgresql+asyncpg://). Параметры пула применяются к обеим базам,
+    PRAGMA - только к SQLite.
     """
 
+    url: str = "sqlite+aiosqlite:///db.sqlite3"
     echo: bool = False
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = False
+    sqlite: SQLitePragmas = SQLitePragmas()
 
     naming_convention: dict[str, str] = {
         "ix": "ix_%(column_0_label)s",
@@ -114,23 +199,346 @@ class DatabaseConfig(BaseModel):
     }
 
     @property
-    def url(self) -> str:
+    def is_sqlite(self) -> bool:
         """
-        Возвращает строку для подключения к базе данных.
+        Возвращает True, если используется SQLite.
         """
-        return "sqlite+aiosqlite:///db.sqlite3"
+        return self.url.startswith("sqlite")
+
+
+class EnrichmentConfig(BaseModel):
+    """
+    Конфигурация определения тональности и категории жалоб.
+
+    В режиме "sync" ответ на создание жалобы ждет внешние API,
+    в режиме "background" жалоба сохраняется сразу, а обогащается
+    пулом фоновых воркеров.
+    """
+
+    mode: Literal["sync", "background"] = "sync"
+    workers: int = 4
+    queue_size: int = 1000
+    max_retries: int = 3
+    retry_delay: float = 5.0
+    poll_interval: float = 1.0
+    # Через сколько секунд задание, взятое упавшим процессом, выполнится снова
+    lease_timeout: float = 300.0
+
+
+class CacheConfig(BaseModel):
+    """
+    Конфигурация кэша результатов определения тональности и категории.
+
+    Первый уровень - LRU-кэш в памяти процесса, второй - таблица
+    в базе данных, которая сохраняется между перезапусками.
+    """
+
+    enabled: bool = True
+    max_size: int = 10_000
+    ttl: float = 3600.0
+    persistent: bool = True
+    persistent_ttl: float = 30 * 24 * 3600.0
+
+
+class BatchingConfig(BaseModel):
+    """
+    Конфигурация пакетного определения категорий.
+
+    Жалобы, поступившие в течение max_wait_ms, классифицируются
+    одним запросом к AI-модели, но не более max_batch_size за раз.
+    """
+
+    enabled: bool = False
+    max_batch_size: int = 16
+    max_wait_ms: float = 50.0
+
+
+class LocalClassifierConfig(BaseModel):
+    """
+    Конфигурация локального классификатора категорий.
+
+    AI-модель запрашивается только если уверенность локальной
+    модели ниже threshold. Уверенность - вероятность, откалиброванная
+    при обучении (см. CategoryModel.calibrate).
+    """
+
+    enabled: bool = False
+    model_path: str = "category_model.npz"
+    threshold: float = 0.9
+    processes: int = 1
+
+
+class BulkConfig(BaseModel):
+    """
+    Конфигурация пакетной загрузки жалоб.
+    """
+
+    chunk_size: int = 1000
+
+
+class ListingConfig(BaseModel):
+    """
+    Конфигурация выдачи списка открытых жалоб за последний час:
+    жалобы читаются из базы данных и отправляются порциями по chunk_size.
+    """
+
+    chunk_size: int = 1000
+
+
+class DuplicatesConfig(BaseModel):
+    """
+    Конфигурация поиска почти одинаковых жалоб.
+
+    Новая жалоба считается копией открытой жалобы за последние window
+    секунд, если их отпечатки отличаются не больше чем на max_distance
+    бит из 64. Кандидаты ищутся по совпадению одной из bands полос
+    отпечатка. Индекс хранит не больше max_size отпечатков и раз
+    в refresh_interval секунд дополняется жалобами других процессов.
+    """
+
+    enabled: bool = True
+    max_distance: int = 6
+    bands: int = 8
+    window: float = 24 * 3600.0
+    max_size: int = 50_000
+    refresh_interval: float = 5.0
+
+
+class SearchConfig(BaseModel):
+    """
+    Конфигурация полнотекстового поиска жалоб.
+
+    При сортировке по релевантности ранжируются только max_ranked
+    последних жалоб, подходящих под запрос (0 - все): ранг вычисляется
+    для каждого совпадения, и для частых слов время поиска иначе
+    растет вместе с таблицей.
+    """
+
+    max_ranked: int = 5000
+
+
+class StatsConfig(BaseModel):
+    """
+    Конфигурация статистики жалоб.
+
+    Изменения количества жалоб переносятся в таблицу статистики раз
+    в compact_interval секунд пакетами по batch_size. Ответы хранятся
+    в памяти процесса cache_ttl секунд (не больше cache_size ответов),
+    а один ответ содержит не больше max_buckets часов или дней.
+    """
+
+    compact_interval: float = 5.0
+    batch_size: int = 10_000
+    cache_ttl: float = 10.0
+    cache_size: int = 256
+    max_buckets: int = 1000
+
+
+class ArchiveConfig(BaseModel):
+    """
+    Конфигурация архивации закрытых жалоб.
+
+    Жалобы, закрытые и созданные раньше чем older_than_days дней назад,
+    переносятся в файлы JSONL.gz в каталоге path порциями по chunk_size
+    с паузой pause секунд между порциями.
+    """
+
+    path: str = "archive"
+    older_than_days: float = 90.0
+    chunk_size: int = 500
+    pause: float = 0.05
+
+
+class WebhookConfig(BaseModel):
+    """
+    Конфигурация доставки обогащенных жалоб на вебхуки.
+
+    Жалобы для каждого адреса собираются в пакеты не больше max_batch_size
+    и отправляются не позже чем через max_delay секунд после первой жалобы.
+    """
+
+    enabled: bool = True
+    max_batch_size: int = 50
+    max_delay: float = 5.0
+    queue_size: int = 10000
+    max_retries: int = 5
+    retry_delay: float = 1.0
+    timeout: float = 10.0
+    refresh_interval: float = 5.0  # Интервал проверки изменений списка вебхуков
+
+
+class StreamConfig(BaseModel):
+    """
+    Конфигурация потоков новых жалоб (SSE и WebSocket).
+
+    buffer_size - сколько жалоб может ждать отправки одному подписчику,
+    после чего он отключается. keepalive - интервал в секундах,
+    через который отправляется пустое сообщение при отсутствии жалоб.
+
+    Если poll включен (а при нескольких процессах он включается всегда),
+    подписчики получают жалобы не от своего процесса, а из базы данных:
+    каждый процесс раз в poll_interval секунд читает новые жалобы
+    порциями по poll_batch_size, как GET /complaints?after_id=.
+    """
+
+    buffer_size: int = 100
+    keepalive: float = 15.0
+    poll: bool = False
+    poll_interval: float = 1.0
+    poll_batch_size: int = 500
+
+
+class OutboundLimitConfig(BaseModel):
+    """
+    Конфигурация ограничения запросов к одному внешнему API.
+
+    rate и burst задаются для всего сервиса и делятся между процессами.
+    Число одновременных запросов меняется от min_concurrency
+    до max_concurrency: растет после успешных ответов и уменьшается
+    в backoff раз при ответах 429 и 5xx, истекшем времени ожидания
+    или росте задержки в latency_tolerance раз относительно обычной.
+    Запрос, ждущий очереди дольше max_wait секунд, отклоняется.
+    """
+
+    enabled: bool = True
+    rate: float = 10.0  # Запросов в секунду
+    burst: float = 20.0
+    initial_concurrency: int = 10
+    min_concurrency: int = 1
+    max_concurrency: int = 50
+    backoff: float = 0.5
+    latency_tolerance: float = 2.0
+    cooldown: float = 1.0  # Минимальный интервал между уменьшениями лимита
+    max_wait: float = 10.0
+    max_queue: int = 1000
+
+
+class RateLimitsConfig(BaseModel):
+    """
+    Конфигурация ограничения запросов к внешним API:
+    sentiment - API тональности, category - AI-модель Hugging Face.
+    """
+
+    sentiment: OutboundLimitConfig = OutboundLimitConfig()
+    category: OutboundLimitConfig = OutboundLimitConfig(
+        rate=5.0,
+        burst=10.0,
+        max_concurrency=20,
+    )
+
+
+class CircuitBreakerConfig(BaseModel):
+    """
+    Конфигурация автоматического выключателя для одного внешнего API.
+
+    Выключатель размыкается, когда среди последних window_size запросов
+    (но не меньше min_calls) доля ошибок и ответов дольше
+    slow_call_threshold секунд достигает failure_rate. Через open_duration
+    секунд отправляется half_open_probes пробных запросов.
+    timeout ограничивает время одного запроса. Если hedge включен,
+    через 95-й перцентиль времени ответа (не меньше hedge_min_delay)
+    отправляется второй такой же запрос.
+    """
+
+    enabled: bool = True
+    window_size: int = 50
+    min_calls: int = 10
+    failure_rate: float = 0.5
+    slow_call_threshold: float = 5.0
+    open_duration: float = 30.0
+    half_open_probes: int = 3
+    timeout: float | None = 5.0
+    hedge: bool = False
+    hedge_min_delay: float = 0.5
+    hedge_min_samples: int = 20
+
+
+class CircuitBreakersConfig(BaseModel):
+    """
+    Конфигурация выключателей внешних API:
+    sentiment - API тональности, category - AI-модель Hugging Face.
+    """
+
+    sentiment: CircuitBreakerConfig = CircuitBreakerConfig()
+    category: CircuitBreakerConfig = CircuitBreakerConfig(
+        slow_call_threshold=15.0,
+        timeout=20.0,
+    )
+
+
+class SharedStoreConfig(BaseModel):
+    """
+    Конфигурация хранилища состояния, общего для всех процессов.
+
+    "memory" хранит значения в памяти процесса и подходит для одного
+    процесса. "database" хранит их в таблице sharedvalues, и значения
+    видны всем процессам, подключенным к той же базе данных.
+    """
+
+    backend: Literal["memory", "database"] = "memory"
+
+
+class MetricsConfig(BaseModel):
+    """
+    Конфигурация метрик в формате Prometheus.
+
+    Метрики выдаются по адресу path. Размеры очередей и пула соединений
+    опрашиваются каждые sample_interval секунд. При запуске нескольких
+    процессов метрики хранятся в файлах каталога multiprocess_dir
+    (по умолчанию временного) и суммируются при выдаче.
+    """
+
+    enabled: bool = True
+    path: str = "/metrics"
+    sample_interval: float = 5.0
+    multiprocess_dir: str | None = None
 
 
 class Settings(BaseSettings):
     """
     Основные настройки приложения.
+
+    Вложенные параметры можно переопределить переменными окружения
+    вида ENRICHMENT__MODE=background.
     """
 
+    model_config = SettingsConfigDict(
+        env_nested_delimiter="__",
+    )
+
     run: RunConfig = RunConfig()
     logging: LoggingConfig = LoggingConfig()
     api: ApiPrefix = ApiPrefix()
     db: DatabaseConfig = DatabaseConfig()
     resources: ApiResources = ApiResources()
+    enrichment: EnrichmentConfig = EnrichmentConfig()
+    cache: CacheConfig = CacheConfig()
+    batching: BatchingConfig = BatchingConfig()
+    local_classifier: LocalClassifierConfig = LocalClassifierConfig()
+    bulk: BulkConfig = BulkConfig()
+    listing: ListingConfig = ListingConfig()
+    duplicates: DuplicatesConfig = DuplicatesConfig()
+    search: SearchConfig = SearchConfig()
+    stats: StatsConfig = StatsConfig()
+    archive: ArchiveConfig = ArchiveConfig()
+    webhooks: WebhookConfig = WebhookConfig()
+    stream: StreamConfig = StreamConfig()
+    store: SharedStoreConfig = SharedStoreConfig()
+    rate_limits: RateLimitsConfig = RateLimitsConfig()
+    breakers: CircuitBreakersConfig = CircuitBreakersConfig()
+    metrics: MetricsConfig = MetricsConfig()
+
+    @model_validator(mode="after")
+    def check_store(self) -> "Settings":
+        """
+        Проверяет, что несколько процессов запускаются с общим хранилищем:
+        в памяти процесса изменения вебхуков не видны другим процессам.
+        """
+        if self.run.processes > 1 and self.store.backend == "memory":
+            raise ValueError(
+                "Для RUN__WORKERS больше 1 нужно задать STORE__BACKEND=database"
+            )
+        return self
 
 
 settings = Settings()
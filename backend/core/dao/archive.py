@@ -0,0 +1,33 @@
+import logging
+from collections.abc import Sequence
+
+from core.models import ComplaintArchive
+from sqlalchemy import select
+
+from .base import BaseDAO
+
+logger = logging.getLogger(__name__)
+
+
+class ComplaintArchiveDao(BaseDAO[ComplaintArchive]):
+    """
+    DAO для работы с манифестом архива жалоб.
+    """
+
+    model = ComplaintArchive
+
+    async def get_paths_for(self, complaint_id: int) -> Sequence[str]:
+        """
+        Получает пути файлов архива, в диапазон ID которых попадает
+        complaint_id, от новых к старым.
+        """
+        query = (
+            select(self.model.path)
+            .where(
+                self.model.min_id <= complaint_id,
+                self.model.max_id >= complaint_id,
+            )
+            .order_by(self.model.id.desc())
+        )
+        result = await self._session.execute(query)
+        return result.scalars().all()
@@ -1,7 +1,10 @@
 import logging
+from typing import Sequence
 
 from core.models import Base
 from pydantic import BaseModel
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -23,22 +26,78 @@ class BaseDAO[M: Base]:
         if self.model is None:
             raise ValueError("Модель должна быть указана в дочернем классе")
 
+    @property
+    def dialect_name(self) -> str:
+        """
+        Возвращает название диалекта базы данных текущей сессии.
+        """
+        return self._session.get_bind().dialect.name
+
+    def _dialect_insert(self) -> sqlite.Insert | postgresql.Insert:
+        """
+        Возвращает INSERT с поддержкой ON CONFLICT для диалекта текущей сессии.
+        """
+        if self.dialect_name == "postgresql":
+            return postgresql.insert(self.model)
+        return sqlite.insert(self.model)
+
+    async def get_by_id(self, instance_id: int) -> M | None:
+        """
+        Получает запись по ее ID.
+        """
+        return await self._session.get(self.model, instance_id)
+
     async def add(self, values: BaseModel) -> M:
         """
         Добавляет новую запись в базу данных.
         """
         values_dict = values.model_dump(exclude_unset=True)
-        logger.info(
-            "Добавление записи %s с параметрами: %s",
-            self.model.__name__,
-            values_dict,
-        )
         try:
             new_instance = self.model(**values_dict)
             self._session.add(new_instance)
             await self._session.flush()
-            logger.info("Запись %s успешно добавлена.", self.model.__name__)
+            # Значения полей не логируются: в них текст жалобы
+            # и другие персональные данные
+            logger.info(
+                "Запись %s с ID %s успешно добавлена.",
+                self.model.__name__,
+                new_instance.id,
+            )
             return new_instance
         except SQLAlchemyError as e:
             await self._session.rollback()
             logger.error("Ошибка при добавлении записи %s", e)
+
+    async def add_many(self, values: Sequence[BaseModel]) -> Sequence[int] | None:
+        """
+        Добавляет несколько записей одним INSERT (executemany)
+        и возвращает их ID в исходном порядке.
+
+        Порядок восстанавливается сортировкой ID: автоинкремент выдает их
+        по порядку строк в VALUES. Флаг sort_by_parameter_order на SQLite
+        отправлял бы каждую строку отдельным запросом. Запрос строится
+        по таблице, а не по модели, чтобы не тратить время на ORM.
+        """
+        if not values:
+            return []
+        rows = [value.model_dump(exclude_unset=True) for value in values]
+        logger.info(
+            "Добавление %s записей %s",
+            len(rows),
+            self.model.__name__,
+        )
+        try:
+            result = await self._session.execute(
+                insert(self.model.__table__).returning(self.model.__table__.c.id),
+                rows,
+            )
+            ids = sorted(result.scalars().all())
+            logger.info(
+                "%s записей %s успешно добавлены.",
+                len(ids),
+                self.model.__name__,
+            )
+            return ids
+        except SQLAlchemyError as e:
+            await self._session.rollback()
+            logger.error("Ошибка при добавлении записей %s", e)
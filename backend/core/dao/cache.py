@@ -0,0 +1,80 @@
+import logging
+from datetime import datetime
+
+from core.models import CachedClassification
+from sqlalchemy import delete, select
+
+from .base import BaseDAO
+
+logger = logging.getLogger(__name__)
+
+
+class CachedClassificationDao(BaseDAO[CachedClassification]):
+    """
+    DAO для работы с закэшированными результатами классификации.
+    """
+
+    model = CachedClassification
+
+    async def get_value(
+        self,
+        key: str,
+        namespace: str,
+        created_after: datetime,
+    ) -> str | None:
+        """
+        Получает актуальное значение по ключу.
+        """
+        query = select(self.model.value).where(
+            self.model.key == key,
+            self.model.namespace == namespace,
+            self.model.created_at >= created_after,
+        )
+        result = await self._session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def put_value(
+        self,
+        key: str,
+        namespace: str,
+        value: str,
+    ) -> None:
+        """
+        Сохраняет значение, перезаписывая существующее с тем же ключом.
+        """
+        values = {
+            "key": key,
+            "namespace": namespace,
+            "value": value,
+            "created_at": datetime.now(),
+        }
+        query = (
+            self._dialect_insert()
+            .values(**values)
+            .on_conflict_do_update(
+                index_elements=[self.model.key],
+                set_=values,
+            )
+        )
+        await self._session.execute(query)
+
+    async def delete_stale(
+        self,
+        prefix: str,
+        namespace: str,
+        created_before: datetime,
+    ) -> int:
+        """
+        Удаляет записи с ключом, начинающимся с prefix, которые получены
+        из другого источника или устарели.
+        """
+        query = delete(self.model).where(
+            self.model.key.startswith(prefix),
+            (self.model.namespace != namespace)
+            | (self.model.created_at < created_before),
+        )
+        result = await self._session.execute(query)
+        logger.info(
+            "Удалено %s устаревших записей кэша %s", result.rowcount, prefix
+        )
+        return result.rowcount
@@ -1,16 +1,38 @@
 import logging
+from collections.abc import AsyncIterator
 from datetime import datetime, timedelta
-from typing import Sequence
+from typing import Collection, Sequence
 
-from core.enums.complaint import StatusEnum
+from core.enums.complaint import (
+    CategoryLiteral,
+    CategorySourceEnum,
+    EnrichmentEnum,
+    SentimentEnum,
+    StatusEnum,
+)
 from core.models import Complaint
 from fastapi import HTTPException, status
-from sqlalchemy import select, update
+from sqlalchemy import (
+    Row,
+    and_,
+    bindparam,
+    column,
+    delete,
+    func,
+    literal_column,
+    or_,
+    select,
+    table,
+    update,
+)
 
 from .base import BaseDAO
 
 logger = logging.getLogger(__name__)
 
+# Таблица FTS5 создается миграцией и не входит в метаданные моделей
+complaints_fts = table("complaints_fts", column("rowid"), column("rank"))
+
 
 class ComplaintDao(BaseDAO[Complaint]):
     """
@@ -19,21 +41,353 @@ class ComplaintDao(BaseDAO[Complaint]):
 
     model = Complaint
 
-    async def get_complaints_in_last_hour(
-        self,
-    ) -> Sequence[Complaint]:
+    def _last_hour_conditions(self, collapse_duplicates: bool = False) -> tuple:
         """
-        Получает список открытых жалоб, созданных в течение последнего часа,
+        Возвращает условия отбора открытых жалоб за последний час.
+        Если collapse_duplicates включен, копии других жалоб не выбираются.
         """
         hour_ago = datetime.now() - timedelta(hours=1)
-        query = select(self.model).where(
+        conditions = (
             self.model.timestamp >= hour_ago,
             self.model.status == StatusEnum.open,
             self.model.category != "Другое",
         )
+        if collapse_duplicates:
+            conditions += (self.model.group_id.is_(None),)
+        return conditions
+
+    async def get_complaints_in_last_hour(
+        self,
+    ) -> Sequence[Complaint]:
+        """
+        Получает список открытых жалоб, созданных в течение последнего часа,
+        """
+        query = select(self.model).where(*self._last_hour_conditions())
+        result = await self._session.execute(query)
+        return result.scalars().all()
+
+    async def stream_complaints_in_last_hour(
+        self,
+        columns: Sequence[str],
+        chunk_size: int,
+        collapse_duplicates: bool = False,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Получает открытые жалобы за последний час порциями по chunk_size
+        строк. Выбираются только столбцы columns, объекты ORM не создаются.
+        """
+        query = (
+            select(*(getattr(self.model, column) for column in columns))
+            .where(*self._last_hour_conditions(collapse_duplicates))
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await self._session.stream(query)
+        async for rows in result.partitions(chunk_size):
+            yield rows
+
+    async def get_after_id(
+        self,
+        after_id: int,
+        limit: int,
+    ) -> Sequence[Complaint]:
+        """
+        Получает до limit жалоб с ID больше after_id в порядке возрастания ID.
+
+        Выборка обрывается перед первой жалобой, которая еще ожидает
+        обогащения, чтобы курсор не перешагнул ее до появления категории.
+        """
+        first_pending = (
+            select(func.min(self.model.id))
+            .where(
+                self.model.id > after_id,
+                self.model.enrichment == EnrichmentEnum.pending,
+            )
+            .scalar_subquery()
+        )
+        query = (
+            select(self.model)
+            .where(
+                self.model.id > after_id,
+                or_(first_pending.is_(None), self.model.id < first_pending),
+            )
+            .order_by(self.model.id)
+            .limit(limit)
+        )
         result = await self._session.execute(query)
         return result.scalars().all()
 
+    async def get_feed_start(self) -> int:
+        """
+        Получает ID, с которого новый читатель начинает выборку
+        get_after_id: ID жалобы перед первой жалобой, ожидающей
+        обогащения, или последний ID, если таких жалоб нет.
+        """
+        first_pending = (
+            select(func.min(self.model.id))
+            .where(self.model.enrichment == EnrichmentEnum.pending)
+            .scalar_subquery()
+        )
+        query = select(
+            func.coalesce(first_pending - 1, func.max(self.model.id), 0),
+        )
+        result = await self._session.execute(query)
+        return result.scalar_one()
+
+    async def search(
+        self,
+        match: str,
+        limit: int,
+        newest: bool = False,
+        after_rank: float | None = None,
+        after_id: int | None = None,
+        categories: Sequence[CategoryLiteral] | None = None,
+        sentiments: Sequence[SentimentEnum] | None = None,
+        statuses: Sequence[StatusEnum] | None = None,
+        max_ranked: int = 0,
+    ) -> Sequence[tuple[Complaint, float]]:
+        """
+        Ищет жалобы по тексту и возвращает до limit жалоб с рангом
+        (чем меньше, тем релевантнее), начиная после позиции
+        after_rank и after_id.
+
+        В SQLite match - запрос FTS5 к таблице complaints_fts, в PostgreSQL -
+        запрос tsquery к столбцу search_vector. Жалобы сортируются
+        по рангу и ID или, если newest включен, по убыванию ID.
+        Если max_ranked больше нуля, по рангу сортируются только
+        max_ranked последних совпадений.
+        """
+        if self.dialect_name == "postgresql":
+            vector = literal_column("complaints.search_vector")
+            ts_query = func.to_tsquery("russian", match)
+            matches = vector.op("@@")(ts_query)
+            rank = -func.ts_rank_cd(vector, ts_query)
+            order_id = self.model.id
+            query = select(self.model, rank).where(matches)
+            boundary = select(self.model.id).where(matches)
+        else:
+            matches = literal_column("complaints_fts").match(match)
+            rank = complaints_fts.c.rank
+            # Сортировка по rowid таблицы FTS позволяет SQLite остановиться
+            # после limit совпадений
+            order_id = complaints_fts.c.rowid
+            query = (
+                select(self.model, rank)
+                .join(complaints_fts, order_id == self.model.id)
+                .where(matches)
+            )
+            boundary = select(order_id).select_from(complaints_fts).where(matches)
+        if not newest and max_ranked > 0:
+            # ID самого старого из max_ranked последних совпадений: перебор
+            # совпадений по ID не вычисляет ранг и не читает жалобы
+            boundary = (
+                boundary.order_by(order_id.desc())
+                .offset(max_ranked - 1)
+                .limit(1)
+                .scalar_subquery()
+            )
+            query = query.where(order_id >= func.coalesce(boundary, 0))
+        if categories:
+            query = query.where(self.model.category.in_(categories))
+        if sentiments:
+            query = query.where(self.model.sentiment.in_(sentiments))
+        if statuses:
+            query = query.where(self.model.status.in_(statuses))
+        if newest:
+            if after_id is not None:
+                query = query.where(order_id < after_id)
+            query = query.order_by(order_id.desc())
+        else:
+            if after_id is not None:
+                query = query.where(
+                    or_(
+                        rank > after_rank,
+                        and_(rank == after_rank, order_id > after_id),
+                    )
+                )
+            query = query.order_by(rank, order_id)
+        result = await self._session.execute(query.limit(limit))
+        return result.tuples().all()
+
+    async def get_labelled(
+        self,
+        limit: int,
+    ) -> Sequence[tuple[str, CategoryLiteral]]:
+        """
+        Получает тексты и категории последних успешно обогащенных жалоб,
+        категорию которых определила AI-модель.
+
+        Предсказания локальной модели и категории по умолчанию после
+        ошибок не выбираются, чтобы модель не обучалась на своих ответах
+        и на "Другое" вместо неизвестной категории.
+        """
+        query = (
+            select(self.model.text, self.model.category)
+            .where(
+                self.model.enrichment == EnrichmentEnum.done,
+                self.model.category_source == CategorySourceEnum.remote,
+                self.model.category.is_not(None),
+            )
+            .order_by(self.model.id.desc())
+            .limit(limit)
+        )
+        result = await self._session.execute(query)
+        return result.tuples().all()
+
+    def _reenrichment_conditions(self) -> tuple:
+        """
+        Возвращает условия отбора жалоб, тональность или категория которых
+        не определены: обогащение завершилось ошибкой, тональность unknown
+        или категория "Другое". Жалобы, ожидающие обогащения, не выбираются.
+        """
+        return (
+            self.model.enrichment != EnrichmentEnum.pending,
+            or_(
+                self.model.enrichment == EnrichmentEnum.failed,
+                self.model.sentiment == SentimentEnum.unknown,
+                self.model.sentiment.is_(None),
+                self.model.category == "Другое",
+                self.model.category.is_(None),
+            ),
+        )
+
+    async def get_reenrichment_candidates(
+        self,
+        after_id: int,
+        limit: int,
+    ) -> Sequence[
+        tuple[
+            int,
+            str,
+            SentimentEnum | None,
+            CategoryLiteral | None,
+            EnrichmentEnum,
+            int | None,
+            CategorySourceEnum | None,
+        ]
+    ]:
+        """
+        Получает ID, текст, тональность, категорию, состояние обогащения,
+        ID первой жалобы группы и источник категории для до limit жалоб
+        с ID больше after_id в порядке возрастания ID, у которых
+        тональность или категория не определены
+        (см. _reenrichment_conditions).
+        """
+        query = (
+            select(
+                self.model.id,
+                self.model.text,
+                self.model.sentiment,
+                self.model.category,
+                self.model.enrichment,
+                self.model.group_id,
+                self.model.category_source,
+            )
+            .where(self.model.id > after_id, *self._reenrichment_conditions())
+            .order_by(self.model.id)
+            .limit(limit)
+        )
+        result = await self._session.execute(query)
+        return result.tuples().all()
+
+    async def set_enrichment_many(
+        self,
+        values: Sequence[dict],
+    ) -> None:
+        """
+        Сохраняет тональность и категорию нескольких жалоб одним
+        запросом UPDATE с набором параметров (executemany).
+
+        Каждый элемент values содержит id, sentiment, category,
+        category_source и enrichment.
+        Успешно обогащенные жалобы передают тональность и категорию своим
+        копиям, у которых они не определены, вторым запросом UPDATE.
+        """
+        if not values:
+            return
+        await self._session.execute(update(self.model), values)
+        done = [
+            {
+                "leader_id": value["id"],
+                "new_sentiment": value["sentiment"],
+                "new_category": value["category"],
+                "new_category_source": value["category_source"],
+            }
+            for value in values
+            if value["enrichment"] == EnrichmentEnum.done
+        ]
+        if done:
+            # UPDATE по условию с набором параметров выполняется через
+            # Core, потому что ORM поддерживает его только по первичному ключу
+            table = self.model.__table__
+            connection = await self._session.connection()
+            await connection.execute(
+                update(table)
+                .where(
+                    table.c.group_id == bindparam("leader_id"),
+                    *self._reenrichment_conditions(),
+                )
+                .values(
+                    sentiment=bindparam("new_sentiment"),
+                    category=bindparam("new_category"),
+                    category_source=bindparam("new_category_source"),
+                    enrichment=EnrichmentEnum.done,
+                ),
+                done,
+            )
+        logger.info(
+            "Обогащено заново %s жалоб, копии обновлены у %s из них",
+            len(values),
+            len(done),
+        )
+
+    async def get_group_fingerprints(
+        self,
+        after_id: int,
+        since: datetime,
+        limit: int,
+    ) -> Sequence[tuple[int, int, datetime]]:
+        """
+        Получает ID, отпечатки и время создания последних limit открытых
+        жалоб с ID больше after_id, созданных не раньше since, которые
+        не являются копиями других жалоб. Жалобы возвращаются
+        в порядке возрастания ID.
+        """
+        query = (
+            select(self.model.id, self.model.fingerprint, self.model.timestamp)
+            .where(
+                self.model.id > after_id,
+                self.model.timestamp >= since,
+                self.model.status == StatusEnum.open,
+                self.model.group_id.is_(None),
+                self.model.fingerprint.is_not(None),
+            )
+            .order_by(self.model.id.desc())
+            .limit(limit)
+        )
+        result = await self._session.execute(query)
+        return result.tuples().all()[::-1]
+
+    async def get_open_by_ids(
+        self,
+        ids: Collection[int],
+    ) -> dict[int, Row]:
+        """
+        Получает ID, тональность, категорию, ее источник и состояние
+        обогащения открытых жалоб из списка ids.
+        """
+        query = select(
+            self.model.id,
+            self.model.sentiment,
+            self.model.category,
+            self.model.category_source,
+            self.model.enrichment,
+        ).where(
+            self.model.id.in_(ids),
+            self.model.status == StatusEnum.open,
+        )
+        result = await self._session.execute(query)
+        return {row.id: row for row in result}
+
     async def close_complaint(
         self,
         complaint_id: int,
@@ -51,3 +405,130 @@ class ComplaintDao(BaseDAO[Complaint]):
         if result.rowcount == 0:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
         logger.info("Жалоба с ID %s успешно закрыта", complaint_id)
+
+    async def set_status(
+        self,
+        status: StatusEnum,
+        ids: Sequence[int] | None = None,
+        category: CategoryLiteral | None = None,
+        from_status: StatusEnum | None = None,
+        before: datetime | None = None,
+    ) -> Sequence[int]:
+        """
+        Устанавливает статус всем жалобам, подходящим под условия,
+        одним запросом UPDATE и возвращает ID измененных жалоб.
+        """
+        conditions = []
+        if ids is not None:
+            conditions.append(self.model.id.in_(ids))
+        if category is not None:
+            conditions.append(self.model.category == category)
+        if from_status is not None:
+            conditions.append(self.model.status == from_status)
+        if before is not None:
+            conditions.append(self.model.timestamp < before)
+        query = (
+            update(self.model)
+            .where(*conditions)
+            .values(status=status)
+            .returning(self.model.id)
+        )
+        result = await self._session.execute(query)
+        updated = result.scalars().all()
+        logger.info("Статус %s установлен %s жалобам", status, len(updated))
+        return updated
+
+    async def set_enrichment(
+        self,
+        complaint_id: int,
+        sentiment: SentimentEnum,
+        category: CategoryLiteral,
+        category_source: CategorySourceEnum | None = None,
+        enrichment: EnrichmentEnum = EnrichmentEnum.done,
+    ) -> None:
+        """
+        Сохраняет тональность, категорию и ее источник, определенные в фоне.
+        Успешный результат сохраняется и у ее копий, которые ожидают
+        обогащения, а после ошибки копии обогащаются сами.
+        """
+        query = (
+            update(self.model)
+            .where(self.model.id == complaint_id)
+            .values(
+                sentiment=sentiment,
+                category=category,
+                category_source=category_source,
+                enrichment=enrichment,
+            )
+        )
+        await self._session.execute(query)
+        if enrichment == EnrichmentEnum.done:
+            await self._session.execute(
+                update(self.model)
+                .where(
+                    self.model.group_id == complaint_id,
+                    self.model.enrichment == EnrichmentEnum.pending,
+                )
+                .values(
+                    sentiment=sentiment,
+                    category=category,
+                    category_source=category_source,
+                    enrichment=enrichment,
+                )
+            )
+        logger.info(
+            "Жалоба с ID %s обогащена: %s, %s (%s)",
+            complaint_id,
+            sentiment,
+            category,
+            enrichment,
+        )
+
+    def _archivable_conditions(self, before: datetime) -> list:
+        """
+        Возвращает условия отбора жалоб для архивации: закрытые жалобы,
+        созданные раньше before, которые не ожидают обогащения.
+        """
+        return [
+            self.model.status == StatusEnum.closed,
+            self.model.timestamp < before,
+            self.model.enrichment != EnrichmentEnum.pending,
+        ]
+
+    async def count_archivable(self, before: datetime) -> int:
+        """
+        Подсчитывает жалобы, которые можно перенести в архив.
+        """
+        query = select(func.count()).where(*self._archivable_conditions(before))
+        result = await self._session.execute(query)
+        return result.scalar_one()
+
+    async def delete_archivable(
+        self,
+        columns: Sequence[str],
+        before: datetime,
+        limit: int,
+    ) -> Sequence[Row]:
+        """
+        Удаляет до limit жалоб с наименьшими ID, которые можно перенести
+        в архив, и возвращает их столбцы columns в порядке возрастания ID.
+
+        Условия повторяются в самом DELETE, чтобы не удалить жалобу,
+        которую другая транзакция успела открыть снова.
+        """
+        conditions = self._archivable_conditions(before)
+        ids = (
+            select(self.model.id)
+            .where(*conditions)
+            .order_by(self.model.id)
+            .limit(limit)
+        )
+        query = (
+            delete(self.model)
+            .where(self.model.id.in_(ids), *conditions)
+            .returning(*(getattr(self.model, column) for column in columns))
+        )
+        result = await self._session.execute(query)
+        rows = sorted(result.all(), key=lambda row: row.id)
+        logger.info("Удалено %s жалоб для архивации", len(rows))
+        return rows
@@ -0,0 +1,112 @@
+import logging
+from datetime import datetime
+from typing import Sequence
+
+from core.models import EnrichmentJob
+from sqlalchemy import delete, select, update
+
+from .base import BaseDAO
+
+logger = logging.getLogger(__name__)
+
+
+class EnrichmentJobDao(BaseDAO[EnrichmentJob]):
+    """
+    DAO для работы с заданиями на обогащение жалоб.
+    """
+
+    model = EnrichmentJob
+
+    async def get_by_complaint_id(
+        self,
+        complaint_id: int,
+    ) -> EnrichmentJob | None:
+        """
+        Получает задание по ID жалобы.
+        """
+        query = select(self.model).where(
+            self.model.complaint_id == complaint_id
+        )
+        result = await self._session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def get_available_complaint_ids(
+        self,
+        limit: int,
+    ) -> Sequence[int]:
+        """
+        Получает ID жалоб, задания которых готовы к выполнению,
+        в порядке их готовности.
+        """
+        query = (
+            select(self.model.complaint_id)
+            .where(self.model.available_at <= datetime.now())
+            .order_by(self.model.available_at, self.model.id)
+            .limit(limit)
+        )
+        result = await self._session.execute(query)
+        return result.scalars().all()
+
+    async def claim(
+        self,
+        complaint_id: int,
+        lease_until: datetime,
+    ) -> EnrichmentJob | None:
+        """
+        Забирает готовое задание, откладывая его до lease_until.
+
+        Обновление атомарно, поэтому из нескольких процессов задание
+        получит только один. Если процесс завершится, не выполнив
+        задание, после lease_until его заберет другой.
+        Возвращает None, если задание не готово или уже забрано.
+        """
+        query = (
+            update(self.model)
+            .where(
+                self.model.complaint_id == complaint_id,
+                self.model.available_at <= datetime.now(),
+            )
+            .values(available_at=lease_until)
+            .returning(self.model)
+        )
+        result = await self._session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def reschedule(
+        self,
+        complaint_id: int,
+        attempts: int,
+        available_at: datetime,
+        error: str,
+    ) -> None:
+        """
+        Откладывает задание после неудачной попытки.
+        """
+        query = (
+            update(self.model)
+            .where(self.model.complaint_id == complaint_id)
+            .values(
+                attempts=attempts,
+                available_at=available_at,
+                last_error=error,
+            )
+        )
+        await self._session.execute(query)
+        logger.info(
+            "Задание для жалобы с ID %s отложено до %s (попытка %s)",
+            complaint_id,
+            available_at,
+            attempts,
+        )
+
+    async def delete_by_complaint_id(
+        self,
+        complaint_id: int,
+    ) -> None:
+        """
+        Удаляет выполненное задание.
+        """
+        query = delete(self.model).where(
+            self.model.complaint_id == complaint_id
+        )
+        await self._session.execute(query)
@@ -0,0 +1,135 @@
+import logging
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+
+from core.models import ComplaintStat, ComplaintStatChange
+from sqlalchemy import Row, delete, func, select
+
+from .base import BaseDAO
+
+logger = logging.getLogger(__name__)
+
+# Ключ строки статистики: период, начало периода, статус, тональность, категория
+StatKey = tuple[str, datetime, str, str, str]
+
+
+class ComplaintStatChangeDao(BaseDAO[ComplaintStatChange]):
+    """
+    DAO для работы с изменениями количества жалоб.
+    """
+
+    model = ComplaintStatChange
+
+    async def take(
+        self,
+        limit: int,
+    ) -> Sequence[tuple[datetime, str, str, str, int]]:
+        """
+        Удаляет до limit самых старых изменений и возвращает их.
+
+        Строки, выбранные другим процессом, пропускаются (в PostgreSQL)
+        или уже удалены к моменту удаления (в SQLite запись
+        выполняется по очереди), поэтому каждое изменение возвращается
+        только одному процессу.
+        """
+        ids = (
+            select(self.model.id)
+            .order_by(self.model.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            delete(self.model)
+            .where(self.model.id.in_(ids))
+            .returning(
+                self.model.timestamp,
+                self.model.status,
+                self.model.sentiment,
+                self.model.category,
+                self.model.delta,
+            )
+        )
+        result = await self._session.execute(query)
+        return result.tuples().all()
+
+
+class ComplaintStatDao(BaseDAO[ComplaintStat]):
+    """
+    DAO для работы с количеством жалоб по периодам.
+    """
+
+    model = ComplaintStat
+
+    async def add_counts(self, counts: Mapping[StatKey, int]) -> None:
+        """
+        Прибавляет counts к количеству жалоб, создавая недостающие строки.
+        """
+        rows = [
+            {
+                "period": period,
+                "bucket": bucket,
+                "status": status,
+                "sentiment": sentiment,
+                "category": category,
+                "count": count,
+            }
+            for (period, bucket, status, sentiment, category), count in counts.items()
+            if count
+        ]
+        if not rows:
+            return
+        insert_query = self._dialect_insert()
+        query = insert_query.on_conflict_do_update(
+            index_elements=[
+                self.model.period,
+                self.model.bucket,
+                self.model.status,
+                self.model.sentiment,
+                self.model.category,
+            ],
+            set_={"count": self.model.count + insert_query.excluded.count},
+        )
+        await self._session.execute(query, rows)
+        logger.info("Обновлено %s строк статистики жалоб", len(rows))
+
+    async def get_counts(
+        self,
+        period: str,
+        since: datetime,
+        until: datetime,
+        group_by: Sequence[str],
+        statuses: Sequence[str] | None = None,
+        sentiments: Sequence[str] | None = None,
+        categories: Sequence[str] | None = None,
+    ) -> Sequence[Row]:
+        """
+        Получает количество жалоб за периоды period, которые начинаются
+        с since включительно до until, по столбцам group_by.
+
+        Строки упорядочены по началу периода и содержат поля bucket,
+        столбцы group_by и count.
+        """
+        columns = [getattr(self.model, name) for name in group_by]
+        query = (
+            select(
+                self.model.bucket,
+                *columns,
+                func.sum(self.model.count).label("count"),
+            )
+            .where(
+                self.model.period == period,
+                self.model.bucket >= since,
+                self.model.bucket < until,
+            )
+            .group_by(self.model.bucket, *columns)
+            .having(func.sum(self.model.count) != 0)
+            .order_by(self.model.bucket, *columns)
+        )
+        if statuses:
+            query = query.where(self.model.status.in_(statuses))
+        if sentiments:
+            query = query.where(self.model.sentiment.in_(sentiments))
+        if categories:
+            query = query.where(self.model.category.in_(categories))
+        result = await self._session.execute(query)
+        return result.all()
@@ -0,0 +1,103 @@
+import logging
+from datetime import datetime
+
+from core.models import SharedValue
+from sqlalchemy import Integer, String, case, cast, delete, or_, select
+
+from .base import BaseDAO
+
+logger = logging.getLogger(__name__)
+
+
+class SharedValueDao(BaseDAO[SharedValue]):
+    """
+    DAO для работы со значениями общего хранилища.
+    """
+
+    model = SharedValue
+
+    def _is_alive(self, now: datetime):
+        """
+        Возвращает условие, что значение еще не устарело.
+        """
+        return or_(self.model.expires_at.is_(None), self.model.expires_at > now)
+
+    async def get_value(self, key: str) -> str | None:
+        """
+        Получает актуальное значение по ключу.
+        """
+        query = select(self.model.value).where(
+            self.model.key == key,
+            self._is_alive(datetime.now()),
+        )
+        result = await self._session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def put_value(
+        self,
+        key: str,
+        value: str,
+        expires_at: datetime | None,
+    ) -> None:
+        """
+        Сохраняет значение, перезаписывая существующее с тем же ключом.
+        """
+        values = {"key": key, "value": value, "expires_at": expires_at}
+        query = (
+            self._dialect_insert()
+            .values(**values)
+            .on_conflict_do_update(
+                index_elements=[self.model.key],
+                set_=values,
+            )
+        )
+        await self._session.execute(query)
+
+    async def increment(
+        self,
+        key: str,
+        amount: int,
+        expires_at: datetime | None,
+    ) -> int:
+        """
+        Атомарно увеличивает счетчик и возвращает его новое значение.
+
+        Отсутствующий или устаревший счетчик начинается заново
+        со значения amount и получает новый срок expires_at.
+        """
+        insert_query = self._dialect_insert().values(
+            key=key,
+            value=str(amount),
+            expires_at=expires_at,
+        )
+        expired = ~self._is_alive(datetime.now())
+        query = insert_query.on_conflict_do_update(
+            index_elements=[self.model.key],
+            set_={
+                "value": case(
+                    (expired, str(amount)),
+                    else_=cast(cast(self.model.value, Integer) + amount, String),
+                ),
+                "expires_at": case(
+                    (expired, insert_query.excluded.expires_at),
+                    else_=self.model.expires_at,
+                ),
+            },
+        ).returning(self.model.value)
+        result = await self._session.execute(query)
+        return int(result.scalar_one())
+
+    async def delete_by_key(self, key: str) -> None:
+        """
+        Удаляет значение по ключу.
+        """
+        await self._session.execute(delete(self.model).where(self.model.key == key))
+
+    async def delete_expired(self) -> int:
+        """
+        Удаляет устаревшие значения.
+        """
+        query = delete(self.model).where(self.model.expires_at <= datetime.now())
+        result = await self._session.execute(query)
+        logger.info("Удалено %s устаревших значений общего хранилища", result.rowcount)
+        return result.rowcount
@@ -0,0 +1,68 @@
+import logging
+from typing import Sequence
+
+from core.models import WebhookDeadLetter, WebhookTarget
+from sqlalchemy import delete, select
+
+from .base import BaseDAO
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookTargetDao(BaseDAO[WebhookTarget]):
+    """
+    DAO для работы с адресами вебхуков.
+    """
+
+    model = WebhookTarget
+
+    async def get_all(self) -> Sequence[WebhookTarget]:
+        """
+        Получает все зарегистрированные вебхуки.
+        """
+        result = await self._session.execute(
+            select(self.model).order_by(self.model.id)
+        )
+        return result.scalars().all()
+
+    async def get_active(self) -> Sequence[WebhookTarget]:
+        """
+        Получает вебхуки, на которые нужно отправлять жалобы.
+        """
+        result = await self._session.execute(
+            select(self.model).where(self.model.active.is_(True))
+        )
+        return result.scalars().all()
+
+    async def delete_by_id(
+        self,
+        target_id: int,
+    ) -> bool:
+        """
+        Удаляет вебхук по ID. Возвращает False, если он не найден.
+        """
+        result = await self._session.execute(
+            delete(self.model).where(self.model.id == target_id)
+        )
+        logger.info("Удаление вебхука с ID %s", target_id)
+        return result.rowcount > 0
+
+
+class WebhookDeadLetterDao(BaseDAO[WebhookDeadLetter]):
+    """
+    DAO для работы с недоставленными пакетами жалоб.
+    """
+
+    model = WebhookDeadLetter
+
+    async def get_latest(
+        self,
+        limit: int,
+    ) -> Sequence[WebhookDeadLetter]:
+        """
+        Получает последние недоставленные пакеты.
+        """
+        result = await self._session.execute(
+            select(self.model).order_by(self.model.id.desc()).limit(limit)
+        )
+        return result.scalars().all()
@@ -0,0 +1,12 @@
+from fastapi.requests import HTTPConnection
+from services.broadcast import ComplaintBroadcaster
+
+
+def get_broadcaster(
+    connection: HTTPConnection,
+) -> ComplaintBroadcaster:
+    """
+    Получает рассылку жалоб из состояния приложения
+    (для HTTP-запросов и WebSocket).
+    """
+    return connection.app.state.broadcaster
@@ -1,4 +1,5 @@
 import aiohttp
+from core.clients.inference import PooledInferenceClient
 from fastapi import Request
 
 
@@ -9,3 +10,12 @@ def get_client_session(
     Получает сессию aiohttp из состояния приложения.
     """
     return request.app.state.client_session
+
+
+def get_inference_client(
+    request: Request,
+) -> PooledInferenceClient:
+    """
+    Получает клиент Hugging Face из состояния приложения.
+    """
+    return request.app.state.inference_client
@@ -0,0 +1,11 @@
+from fastapi import Request
+from services.duplicates import DuplicateIndex
+
+
+def get_duplicate_index(
+    request: Request,
+) -> DuplicateIndex:
+    """
+    Получает индекс отпечатков жалоб из состояния приложения.
+    """
+    return request.app.state.duplicate_index
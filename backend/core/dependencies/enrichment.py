@@ -0,0 +1,21 @@
+from fastapi import Request
+from services.classification import ComplaintClassifier
+from services.enrichment import EnrichmentPipeline
+
+
+def get_enrichment_pipeline(
+    request: Request,
+) -> EnrichmentPipeline:
+    """
+    Получает конвейер фонового обогащения жалоб из состояния приложения.
+    """
+    return request.app.state.enrichment_pipeline
+
+
+def get_classifier(
+    request: Request,
+) -> ComplaintClassifier:
+    """
+    Получает классификатор жалоб из состояния приложения.
+    """
+    return request.app.state.classifier
@@ -0,0 +1,11 @@
+from fastapi import Request
+from services.metrics import MetricsSampler
+
+
+def get_metrics_sampler(
+    request: Request,
+) -> MetricsSampler:
+    """
+    Получает сборщик метрик из состояния приложения.
+    """
+    return request.app.state.metrics_sampler
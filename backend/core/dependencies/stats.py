@@ -0,0 +1,11 @@
+from fastapi import Request
+from services.stats import ComplaintStats
+
+
+def get_complaint_stats(
+    request: Request,
+) -> ComplaintStats:
+    """
+    Получает статистику жалоб из состояния приложения.
+    """
+    return request.app.state.complaint_stats
@@ -0,0 +1,11 @@
+from fastapi import Request
+from services.webhooks import WebhookDispatcher
+
+
+def get_webhook_dispatcher(
+    request: Request,
+) -> WebhookDispatcher:
+    """
+    Получает диспетчер вебхуков из состояния приложения.
+    """
+    return request.app.state.webhook_dispatcher
@@ -22,4 +22,23 @@ class SentimentEnum(StrEnum):
     unknown = "unknown"
 
 
+class EnrichmentEnum(StrEnum):
+    """
+    Enum для состояния определения тональности и категории жалобы.
+    """
+
+    pending = "pending"
+    done = "done"
+    failed = "failed"
+
+
+class CategorySourceEnum(StrEnum):
+    """
+    Enum для источника категории жалобы: AI-модель или локальная модель.
+    """
+
+    remote = "remote"
+    local = "local"
+
+
 CategoryLiteral = Literal["Техническая", "Оплата", "Другое"]
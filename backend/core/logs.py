@@ -0,0 +1,198 @@
+"""
+Модуль настройки логирования.
+
+Записи передаются через очередь в отдельный поток, который форматирует
+их и пишет в поток вывода, поэтому обработчики запросов не ждут
+ввода-вывода. Длинные аргументы записей обрезаются, персональные
+данные (email, телефоны, номера карт) маскируются, а информационные
+записи частых логгеров можно прореживать.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import re
+from collections.abc import Mapping
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+from core.config import LoggingConfig
+
+REDACTED = "***"
+# Аргументы этих типов не меняются после создания записи
+IMMUTABLE_ARGS = (str, int, float, type(None))
+
+
+def redact_card(match: re.Match) -> str:
+    """
+    Маскирует номер карты, только если его контрольная цифра верна
+    (алгоритм Луна), чтобы не маскировать другие длинные числа,
+    например отпечатки жалоб.
+    """
+    digits = [int(char) for char in match.group() if char.isdigit()]
+    total = 0
+    for i, digit in enumerate(reversed(digits)):
+        if i % 2:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return REDACTED if total % 10 == 0 else match.group()
+
+
+REDACT_PATTERNS = [
+    (re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"), REDACTED),  # email
+    # Номер карты; отрицательные числа (отпечатки жалоб) не проверяются
+    (re.compile(r"(?<!-)\b\d(?:[ -]?\d){12,18}\b"), redact_card),
+    (
+        re.compile(r"(?:\+7|\b8)[\s(-]*\d{3}[\s)-]*\d{3}[\s-]*\d{2}[\s-]*\d{2}\b"),
+        REDACTED,
+    ),
+]
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускает только долю sample_rate записей ниже уровня WARNING
+    от логгеров с именами из loggers (и их дочерних логгеров).
+    Предупреждения и ошибки пропускаются всегда.
+    """
+
+    def __init__(self, loggers: list[str], sample_rate: float) -> None:
+        super().__init__()
+        self._prefixes = tuple(loggers)
+        self._sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self._sample_rate >= 1:
+            return True
+        if not record.name.startswith(self._prefixes):
+            return True
+        return random.random() < self._sample_rate
+
+
+class SanitizingFilter(logging.Filter):
+    """
+    Маскирует персональные данные и обрезает аргументы записи
+    длиннее max_length символов (0 - не обрезать).
+
+    Числа не меняются, остальные аргументы заменяются строками,
+    поэтому сообщение форматируется так же, как с исходными значениями.
+    """
+
+    def __init__(self, max_length: int, redact: bool) -> None:
+        super().__init__()
+        self._max_length = max_length
+        self._redact = redact
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.args, Mapping):
+            record.args = {
+                key: self._sanitize(value) for key, value in record.args.items()
+            }
+        elif record.args:
+            record.args = tuple(self._sanitize(arg) for arg in record.args)
+        return True
+
+    def _sanitize(self, value: object) -> object:
+        if value is None or isinstance(value, (int, float)):
+            return value
+        text = str(value)
+        if self._redact:
+            for pattern, replacement in REDACT_PATTERNS:
+                text = pattern.sub(replacement, text)
+        if self._max_length and len(text) > self._max_length:
+            text = f"{text[: self._max_length]}... (+{len(text) - self._max_length})"
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Форматирует запись как один JSON-объект в строке.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "process": record.process,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Передает запись в очередь без форматирования.
+
+    Стандартный QueueHandler форматирует сообщение в потоке, который
+    пишет в лог. Здесь это делает поток QueueListener: записи
+    не покидают процесс, поэтому их не нужно готовить к сериализации.
+    Но аргументы, которые могут измениться до форматирования, заменяются
+    строками в вызывающем потоке, как позже это сделал бы SanitizingFilter.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if not record.args:
+            return record
+        record = copy.copy(record)
+        if isinstance(record.args, Mapping):
+            record.args = {
+                key: self._snapshot(value) for key, value in record.args.items()
+            }
+        else:
+            record.args = tuple(self._snapshot(arg) for arg in record.args)
+        return record
+
+    @staticmethod
+    def _snapshot(value: object) -> object:
+        return value if isinstance(value, IMMUTABLE_ARGS) else str(value)
+
+
+def setup_logging(config: LoggingConfig) -> QueueListener | None:
+    """
+    Настраивает корневой логгер по конфигурации.
+
+    Если config.use_queue включен, запускает поток записи в лог
+    и возвращает его; поток останавливается при завершении процесса,
+    успев записать все записи из очереди.
+    """
+    if config.json_format:
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            fmt=config.log_format,
+            datefmt=config.date_format,
+        )
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+    stream_handler.addFilter(
+        SanitizingFilter(max_length=config.max_arg_length, redact=config.redact)
+    )
+
+    listener = None
+    handler: logging.Handler = stream_handler
+    if config.use_queue:
+        handler = DeferredQueueHandler(queue.SimpleQueue())
+        listener = QueueListener(handler.queue, stream_handler)
+        listener.start()
+        atexit.register(listener.stop)
+    handler.addFilter(
+        SamplingFilter(loggers=config.sampled_loggers, sample_rate=config.sample_rate)
+    )
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(config.log_level_value)
+    return listener
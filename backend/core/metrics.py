@@ -0,0 +1,243 @@
+"""
+Модуль метрик сервиса в формате Prometheus.
+
+При запуске нескольких процессов каждый процесс пишет метрики в файлы
+каталога PROMETHEUS_MULTIPROC_DIR, и при выдаче они суммируются.
+Переменная окружения должна быть задана до импорта prometheus_client
+в процессах сервиса - это делает prepare_multiprocess_dir в main.py.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+
+from aiohttp import ClientResponseError
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MULTIPROC_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса по маршрутам",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds",
+    "Время этапов обработки жалобы",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+OUTBOUND_REQUESTS = Counter(
+    "outbound_requests",
+    "Запросы к внешним API по результату: ok, код ответа, timeout, "
+    "error, rejected (ограничитель), short_circuited (выключатель)",
+    ["api", "outcome"],
+)
+OUTBOUND_SECONDS = Histogram(
+    "outbound_request_duration_seconds",
+    "Время ответа внешних API",
+    ["api"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Соединения пула базы данных: checked_out - выданы сессиям, "
+    "idle - свободны, overflow - открыты сверх pool_size",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+QUEUE_DEPTH = Gauge(
+    "queue_depth",
+    "Количество элементов в очередях сервиса",
+    ["queue"],
+    multiprocess_mode="livesum",
+)
+OUTBOUND_IN_FLIGHT = Gauge(
+    "outbound_in_flight",
+    "Одновременные запросы к внешним API",
+    ["api"],
+    multiprocess_mode="livesum",
+)
+OUTBOUND_CONCURRENCY_LIMIT = Gauge(
+    "outbound_concurrency_limit",
+    "Текущий лимит одновременных запросов к внешним API",
+    ["api"],
+    multiprocess_mode="livesum",
+)
+CIRCUIT_BREAKER_OPEN = Gauge(
+    "circuit_breaker_open",
+    "1, если выключатель внешнего API разомкнут хотя бы в одном процессе",
+    ["api"],
+    multiprocess_mode="livemax",
+)
+WEBHOOK_QUEUE_OVERFLOW = Counter(
+    "webhook_queue_overflow",
+    "Жалобы, которые не поместились в очередь вебхука",
+)
+STREAM_SUBSCRIBERS = Gauge(
+    "stream_subscribers",
+    "Подписчики потоков новых жалоб (SSE и WebSocket)",
+    multiprocess_mode="livesum",
+)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """
+    Учитывает время выполнения блока как этап stage.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - started)
+
+
+async def timed[T](stage: str, awaitable: Awaitable[T]) -> T:
+    """
+    Дожидается результата, учитывая время ожидания как этап stage.
+    """
+    with stage_timer(stage):
+        return await awaitable
+
+
+def outcome_of(error: BaseException | None) -> str:
+    """
+    Возвращает результат запроса к внешнему API для метрик.
+    """
+    if error is None:
+        return "ok"
+    if isinstance(error, ClientResponseError):
+        return str(error.status)
+    if isinstance(error, TimeoutError):
+        return "timeout"
+    if isinstance(error, asyncio.CancelledError):
+        return "cancelled"
+    return "error"
+
+
+@contextmanager
+def track_outbound(api: str) -> Iterator[None]:
+    """
+    Учитывает время и результат запроса к внешнему API.
+    """
+    started = time.perf_counter()
+    error: BaseException | None = None
+    try:
+        yield
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        OUTBOUND_SECONDS.labels(api).observe(time.perf_counter() - started)
+        OUTBOUND_REQUESTS.labels(api, outcome_of(error)).inc()
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware, учитывающее время обработки запросов.
+
+    Запросы группируются по шаблону маршрута (например,
+    /api/v1/complaints/{complaint_id}), а не по фактическому пути,
+    чтобы число рядов метрики не росло с количеством жалоб.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status_code),
+            ).observe(time.perf_counter() - started)
+
+
+def prepare_multiprocess_dir(path: str | None) -> str:
+    """
+    Готовит пустой каталог для метрик процессов и передает его
+    процессам сервиса через переменную окружения.
+
+    Если каталог не задан ни в окружении, ни в настройках,
+    создается временный.
+    """
+    path = (
+        os.environ.get(MULTIPROC_ENV)
+        or path
+        or tempfile.mkdtemp(prefix="complaint-metrics-")
+    )
+    os.makedirs(path, exist_ok=True)
+    for name in os.listdir(path):
+        if name.endswith(".db"):
+            os.remove(os.path.join(path, name))
+    os.environ[MULTIPROC_ENV] = path
+    return path
+
+
+def mark_process_dead() -> None:
+    """
+    Исключает значения текущего процесса из метрик live*
+    при его завершении.
+    """
+    if MULTIPROC_ENV in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Возвращает метрики всех процессов в текстовом формате Prometheus
+    и тип содержимого ответа.
+    """
+    if MULTIPROC_ENV in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
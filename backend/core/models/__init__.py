@@ -1,3 +1,11 @@
+from .archive import ComplaintArchive as ComplaintArchive
 from .base import Base as Base
+from .cache import CachedClassification as CachedClassification
 from .complaint import Complaint as Complaint
+from .enrichment import EnrichmentJob as EnrichmentJob
 from .helper import db_helper as db_helper
+from .stats import ComplaintStat as ComplaintStat
+from .stats import ComplaintStatChange as ComplaintStatChange
+from .store import SharedValue as SharedValue
+from .webhook import WebhookDeadLetter as WebhookDeadLetter
+from .webhook import WebhookTarget as WebhookTarget
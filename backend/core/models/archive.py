@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class ComplaintArchive(Base):
+    """
+    Модель записи манифеста архива: файл JSONL.gz с закрытыми жалобами
+    за месяц month и диапазон их ID для поиска архивной жалобы.
+
+    Путь path задается относительно каталога архива.
+    """
+
+    month: Mapped[str]
+    path: Mapped[str] = mapped_column(unique=True)
+    min_id: Mapped[int] = mapped_column(index=True)
+    max_id: Mapped[int]
+    count: Mapped[int]
+    created_at: Mapped[datetime] = mapped_column(
+        default=datetime.now,
+        server_default=func.now(),
+    )
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class CachedClassification(Base):
+    """
+    Модель для хранения закэшированных результатов классификации текстов.
+
+    namespace - источник результата (модель или URL API), при смене
+    которого запись считается устаревшей.
+    """
+
+    key: Mapped[str] = mapped_column(unique=True)
+    namespace: Mapped[str]
+    value: Mapped[str]
+    created_at: Mapped[datetime] = mapped_column(
+        default=datetime.now,
+        server_default=func.now(),
+    )
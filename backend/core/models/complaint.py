@@ -2,14 +2,18 @@ from datetime import datetime
 
 from core.enums.complaint import (
     CategoryLiteral,
+    CategorySourceEnum,
+    EnrichmentEnum,
     SentimentEnum,
     StatusEnum,
 )
-from sqlalchemy import TEXT, func
+from sqlalchemy import TEXT, BigInteger, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
 
+OPEN_COMPLAINTS = text("status = 'open' AND category != 'Другое'")
+
 
 class Complaint(Base):
     """
@@ -24,5 +28,26 @@ class Complaint(Base):
         default=datetime.now,
         server_default=func.now(),
     )
-    sentiment: Mapped[SentimentEnum]
-    category: Mapped[CategoryLiteral]
+    sentiment: Mapped[SentimentEnum | None]
+    category: Mapped[CategoryLiteral | None]
+    # Кто определил категорию. NULL - категория по умолчанию после ошибки
+    # или жалоба сохранена до появления столбца
+    category_source: Mapped[CategorySourceEnum | None]
+    enrichment: Mapped[EnrichmentEnum] = mapped_column(
+        default=EnrichmentEnum.done, server_default=EnrichmentEnum.done
+    )
+    # Отпечаток SimHash текста для поиска почти одинаковых жалоб
+    fingerprint: Mapped[int | None] = mapped_column(BigInteger)
+    # ID первой жалобы группы, если жалоба является ее копией
+    group_id: Mapped[int | None] = mapped_column(index=True)
+
+    __table_args__ = (
+        # Частичный индекс для ежечасного опроса открытых жалоб
+        # (см. ComplaintDao.get_complaints_in_last_hour)
+        Index(
+            "ix_complaints_open_timestamp",
+            "timestamp",
+            sqlite_where=OPEN_COMPLAINTS,
+            postgresql_where=OPEN_COMPLAINTS,
+        ),
+    )
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import TEXT, ForeignKey, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class EnrichmentJob(Base):
+    """
+    Модель задания на фоновое определение тональности и категории жалобы.
+    """
+
+    complaint_id: Mapped[int] = mapped_column(
+        ForeignKey("complaints.id", ondelete="CASCADE"),
+        unique=True,
+    )
+    attempts: Mapped[int] = mapped_column(default=0, server_default="0")
+    available_at: Mapped[datetime] = mapped_column(
+        default=datetime.now,
+        server_default=func.now(),
+        index=True,
+    )
+    last_error: Mapped[str | None] = mapped_column(TEXT)
+    use_cache: Mapped[bool] = mapped_column(default=True, server_default="1")
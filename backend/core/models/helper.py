@@ -4,8 +4,12 @@
 
 import logging
 from collections.abc import AsyncGenerator
+from functools import partial
+from typing import Any
 
-from core.config import settings
+from core.config import DatabaseConfig, SQLitePragmas, settings
+from core.metrics import stage_timer
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
@@ -20,20 +24,32 @@ class DBHelper:
     Класс - помощник для работы с базой данных.
     """
 
-    def __init__(self, url: str, echo: bool = False) -> None:
+    def __init__(self, config: DatabaseConfig) -> None:
         """
         Инициализация класса.
 
         Параметры:
-        url: Строка для подключения к базе данных
-        echo: Принимает значения True или False
+        config: Строка для подключения к базе данных, параметры пула
+        соединений и PRAGMA для SQLite
 
-        Если установлен в True, то в консоль будут
+        Если config.echo установлен в True, то в консоль будут
         выводиться запросы к базе. По умолчанию False.
         """
         self.engine = create_async_engine(
-            url=url, echo=echo
+            url=config.url,
+            echo=config.echo,
+            pool_size=config.pool_size,
+            max_overflow=config.max_overflow,
+            pool_timeout=config.pool_timeout,
+            pool_recycle=config.pool_recycle,
+            pool_pre_ping=config.pool_pre_ping,
         )  # Двигатель для работы с асинхронной базой данных
+        if config.is_sqlite:
+            event.listen(
+                self.engine.sync_engine,
+                "connect",
+                partial(set_sqlite_pragmas, pragmas=config.sqlite),
+            )
         self.session_factory = async_sessionmaker(
             bind=self.engine,
             autocommit=False,
@@ -52,13 +68,27 @@ class DBHelper:
     ) -> AsyncGenerator[AsyncSession, None]:
         """
         Возвращает сессию для асинхронной работы с базой данных.
+
+        Время фиксации транзакции учитывается как этап db_commit.
         """
         async with self.session_factory() as session:  # type: AsyncSession
             yield session
-            await session.commit()
+            with stage_timer("db_commit"):
+                await session.commit()
 
 
-db_helper = DBHelper(
-    url=settings.db.url,
-    echo=settings.db.echo,
-)
+def set_sqlite_pragmas(
+    dbapi_connection: Any,
+    connection_record: Any,
+    pragmas: SQLitePragmas,
+) -> None:
+    """
+    Выполняет PRAGMA при открытии нового соединения с SQLite.
+    """
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.model_dump(exclude_none=True).items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
+
+
+db_helper = DBHelper(config=settings.db)
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.orm import Mapped
+
+from .base import Base
+
+
+class ComplaintStatChange(Base):
+    """
+    Модель изменения количества жалоб с определенными статусом,
+    тональностью и категорией.
+
+    Записи добавляются триггерами таблицы complaints при создании жалобы
+    (delta=1) и при изменении ее статуса, тональности или категории
+    (delta=-1 для прежних значений и delta=1 для новых), а затем
+    переносятся в ComplaintStat и удаляются. Пустая строка означает,
+    что тональность или категория еще не определена.
+    """
+
+    timestamp: Mapped[datetime]
+    status: Mapped[str]
+    sentiment: Mapped[str]
+    category: Mapped[str]
+    delta: Mapped[int]
+
+
+class ComplaintStat(Base):
+    """
+    Модель количества жалоб, созданных за час или день (period),
+    начинающийся в bucket, с определенными статусом, тональностью
+    и категорией.
+    """
+
+    period: Mapped[str]
+    bucket: Mapped[datetime]
+    status: Mapped[str]
+    sentiment: Mapped[str]
+    category: Mapped[str]
+    count: Mapped[int]
+
+    __table_args__ = (
+        UniqueConstraint("period", "bucket", "status", "sentiment", "category"),
+    )
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import TEXT
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class SharedValue(Base):
+    """
+    Модель значения общего хранилища, доступного всем процессам сервиса.
+
+    Счетчики хранятся как текст с целым числом. Если expires_at задано,
+    после этого момента значение считается отсутствующим.
+    """
+
+    key: Mapped[str] = mapped_column(unique=True)
+    value: Mapped[str] = mapped_column(TEXT)
+    expires_at: Mapped[datetime | None] = mapped_column(index=True)
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from core.enums.complaint import CategoryLiteral
+from sqlalchemy import TEXT, ForeignKey, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class WebhookTarget(Base):
+    """
+    Модель адреса, на который отправляются обогащенные жалобы.
+
+    Если category задана, отправляются только жалобы этой категории.
+    """
+
+    url: Mapped[str] = mapped_column(unique=True)
+    category: Mapped[CategoryLiteral | None]
+    active: Mapped[bool] = mapped_column(default=True, server_default="1")
+
+
+class WebhookDeadLetter(Base):
+    """
+    Модель пакета жалоб, который не удалось доставить на вебхук.
+    """
+
+    target_id: Mapped[int] = mapped_column(
+        ForeignKey("webhooktargets.id", ondelete="CASCADE"),
+        index=True,
+    )
+    payload: Mapped[str] = mapped_column(TEXT)
+    attempts: Mapped[int]
+    last_error: Mapped[str | None] = mapped_column(TEXT)
+    created_at: Mapped[datetime] = mapped_column(
+        default=datetime.now,
+        server_default=func.now(),
+    )
@@ -0,0 +1,19 @@
+import anyio
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    Потоковый ответ, который формируется одновременно с чтением тела запроса.
+
+    Обычный StreamingResponse параллельно ждет отключения клиента
+    и при этом забирает себе части тела запроса. Здесь тело читает
+    только генератор ответа, а отключение клиента он сам получает
+    как исключение ClientDisconnect при чтении.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def listen_for_disconnect(self, receive: Receive) -> None:
+        await anyio.sleep_forever()
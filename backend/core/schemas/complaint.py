@@ -1,11 +1,21 @@
+import base64
 from datetime import datetime
+from typing import Literal, TypedDict
 
 from core.enums.complaint import (
     CategoryLiteral,
+    CategorySourceEnum,
+    EnrichmentEnum,
     SentimentEnum,
     StatusEnum,
 )
-from pydantic import BaseModel
+from pydantic import (
+    BaseModel,
+    Field,
+    TypeAdapter,
+    field_validator,
+    model_validator,
+)
 
 
 class ComplaintInSchema(BaseModel):
@@ -23,6 +33,18 @@ class ComplaintCreateSchema(ComplaintInSchema):
 
     sentiment: SentimentEnum | None = None
     category: CategoryLiteral | None = None
+    enrichment: EnrichmentEnum = EnrichmentEnum.done
+    group_id: int | None = None
+
+
+class ComplaintStoreSchema(ComplaintCreateSchema):
+    """
+    Схема для сохранения жалобы с отпечатком текста
+    и источником категории.
+    """
+
+    fingerprint: int | None = None
+    category_source: CategorySourceEnum | None = None
 
 
 class ComplaintReadSchema(ComplaintCreateSchema):
@@ -42,9 +64,233 @@ class ComplaintAllInfoSchema(ComplaintReadSchema):
     timestamp: datetime
 
 
+class ComplaintRow(TypedDict):
+    """
+    Строка жалобы из базы данных с полями ComplaintAllInfoSchema
+    в том же порядке. Используется для сериализации списков жалоб
+    без создания моделей.
+    """
+
+    text: str
+    sentiment: SentimentEnum | None
+    category: CategoryLiteral | None
+    enrichment: EnrichmentEnum
+    group_id: int | None
+    id: int
+    status: StatusEnum
+    timestamp: datetime
+
+
+complaint_rows_adapter = TypeAdapter(list[ComplaintRow])
+complaint_row_adapter = TypeAdapter(ComplaintRow)
+
+
 class OpenComplaintsSchema(BaseModel):
     """
-    Схема для списка открытых жалоб, созданных в течение последнего часа.
+    Схема для списка открытых жалоб, созданных в течение последнего часа
+    или после жалобы с ID after_id.
     """
 
     complaints: list[ComplaintAllInfoSchema]
+    next_after_id: int | None = None
+
+
+class BulkResultSchema(BaseModel):
+    """
+    Схема результата загрузки одной записи при пакетном создании жалоб.
+    """
+
+    line: int | None = None
+    id: int | None = None
+    error: str | None = None
+
+
+class ComplaintFilterSchema(BaseModel):
+    """
+    Схема условий отбора жалоб для подписки на поток.
+    Пустое условие пропускает любые значения.
+    """
+
+    category: list[CategoryLiteral] | None = None
+    sentiment: list[SentimentEnum] | None = None
+    status: list[StatusEnum] | None = None
+
+    def matches(self, complaint: ComplaintAllInfoSchema) -> bool:
+        """
+        Проверяет, подходит ли жалоба под условия.
+        """
+        return (
+            (not self.category or complaint.category in self.category)
+            and (not self.sentiment or complaint.sentiment in self.sentiment)
+            and (not self.status or complaint.status in self.status)
+        )
+
+
+class SearchCursorSchema(BaseModel):
+    """
+    Схема позиции последней выданной жалобы при поиске:
+    ранг (только для сортировки по релевантности) и ID.
+    """
+
+    rank: float | None = None
+    id: int
+
+    def encode(self) -> str:
+        """
+        Возвращает позицию строкой для параметра cursor.
+        """
+        return base64.urlsafe_b64encode(self.model_dump_json().encode()).decode()
+
+    @classmethod
+    def decode(cls, value: str) -> "SearchCursorSchema":
+        """
+        Восстанавливает позицию из строки параметра cursor.
+        """
+        return cls.model_validate_json(base64.urlsafe_b64decode(value.encode()))
+
+
+class ComplaintSearchSchema(ComplaintFilterSchema):
+    """
+    Схема параметров поиска жалоб по тексту.
+
+    В q можно передать слова, фразы в кавычках ("списали дважды")
+    и начала слов со звездочкой (оплат*). Жалобы сортируются
+    по релевантности или от новых к старым (sort=newest); для следующей
+    страницы передается cursor из предыдущего ответа.
+    """
+
+    q: str = Field(min_length=1, max_length=500)
+    sort: Literal["relevance", "newest"] = "relevance"
+    limit: int = Field(default=20, ge=1, le=100)
+    cursor: str | None = None
+
+    @field_validator("cursor")
+    @classmethod
+    def check_cursor(cls, value: str | None) -> str | None:
+        """
+        Проверяет, что cursor получен из предыдущего ответа.
+        """
+        if value is not None:
+            try:
+                SearchCursorSchema.decode(value)
+            except ValueError:
+                raise ValueError("Некорректный cursor") from None
+        return value
+
+
+class ComplaintSearchResultSchema(BaseModel):
+    """
+    Схема результата поиска жалоб.
+    """
+
+    complaints: list[ComplaintAllInfoSchema]
+    next_cursor: str | None = None
+
+
+class ComplaintStatsQuerySchema(ComplaintFilterSchema):
+    """
+    Схема параметров статистики жалоб.
+
+    Жалобы считаются по часам или дням (period), начинающимся
+    с since до until (по умолчанию за последние сутки или 30 дней),
+    и группируются по столбцам group_by.
+    """
+
+    period: Literal["hour", "day"] = "hour"
+    since: datetime | None = None
+    until: datetime | None = None
+    group_by: list[Literal["status", "sentiment", "category"]] = [
+        "status",
+        "sentiment",
+        "category",
+    ]
+
+    @model_validator(mode="after")
+    def check_range(self) -> "ComplaintStatsQuerySchema":
+        """
+        Проверяет, что since раньше until.
+        """
+        if (
+            self.since is not None
+            and self.until is not None
+            and self.since >= self.until
+        ):
+            raise ValueError("since должно быть раньше until")
+        return self
+
+
+class StatsGroupSchema(TypedDict):
+    """
+    Количество жалоб с одинаковыми значениями столбцов group_by.
+    Остальные столбцы и еще не определенные значения равны null.
+    """
+
+    status: StatusEnum | None
+    sentiment: SentimentEnum | None
+    category: CategoryLiteral | None
+    count: int
+
+
+class StatsBucketSchema(TypedDict):
+    """
+    Количество жалоб, созданных за один час или день.
+    """
+
+    start: datetime
+    total: int
+    groups: list[StatsGroupSchema]
+
+
+class ComplaintStatsSchema(TypedDict):
+    """
+    Статистика жалоб за периоды с since до until. Словари, а не модели,
+    чтобы ответ с тысячами групп сериализовался без проверки каждой.
+    """
+
+    period: Literal["hour", "day"]
+    since: datetime
+    until: datetime
+    buckets: list[StatsBucketSchema]
+
+
+complaint_stats_adapter = TypeAdapter(ComplaintStatsSchema)
+
+
+class StatusChangeSchema(BaseModel):
+    """
+    Схема для изменения статуса нескольких жалоб.
+
+    Жалобы выбираются по списку ids и/или по условиям category,
+    from_status и before (создана раньше указанного времени).
+    """
+
+    status: StatusEnum = StatusEnum.closed
+    ids: list[int] | None = Field(default=None, max_length=10000)
+    category: CategoryLiteral | None = None
+    from_status: StatusEnum | None = None
+    before: datetime | None = None
+
+    @model_validator(mode="after")
+    def check_selection(self) -> "StatusChangeSchema":
+        """
+        Проверяет, что задано хотя бы одно условие отбора жалоб.
+        """
+        if (
+            self.ids is None
+            and self.category is None
+            and self.from_status is None
+            and self.before is None
+        ):
+            raise ValueError("Нужно передать ids или условия отбора жалоб")
+        return self
+
+
+class StatusChangeResultSchema(BaseModel):
+    """
+    Схема результата изменения статуса нескольких жалоб.
+
+    not_found - ID из запроса, которые не найдены или не подошли под условия.
+    """
+
+    updated: int
+    not_found: list[int] = []
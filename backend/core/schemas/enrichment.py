@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class EnrichmentJobCreateSchema(BaseModel):
+    """
+    Схема для создания задания на обогащение жалобы.
+    """
+
+    complaint_id: int
+    use_cache: bool = True
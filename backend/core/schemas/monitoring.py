@@ -0,0 +1,55 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class CacheKindStatsSchema(BaseModel):
+    """
+    Схема счетчиков кэша для одного вида результата.
+    """
+
+    memory_hits: int
+    persistent_hits: int
+    misses: int
+
+
+class CacheStatsSchema(BaseModel):
+    """
+    Схема состояния кэша классификации.
+    """
+
+    size: int
+    kinds: dict[str, CacheKindStatsSchema]
+
+
+class OutboundLimitStatsSchema(BaseModel):
+    """
+    Схема метрик ограничителя запросов к внешнему API в текущем процессе.
+    """
+
+    limit: int
+    in_flight: int
+    queued: int
+    rate: float
+    accepted: int
+    rejected: int
+    overloads: int
+    decreases: int
+    wait_p50_ms: float
+    wait_p95_ms: float
+    wait_max_ms: float
+
+
+class CircuitBreakerStatsSchema(BaseModel):
+    """
+    Схема состояния выключателя внешнего API в текущем процессе.
+    """
+
+    state: Literal["closed", "open", "half_open"]
+    calls: int
+    failure_rate: float
+    opened: int
+    short_circuited: int
+    hedges: int
+    hedge_wins: int
+    hedge_delay_ms: float | None
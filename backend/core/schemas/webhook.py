@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from core.enums.complaint import CategoryLiteral
+from pydantic import BaseModel, HttpUrl
+
+
+class WebhookTargetInSchema(BaseModel):
+    """
+    Схема для регистрации вебхука.
+    """
+
+    url: HttpUrl
+    category: CategoryLiteral | None = None
+
+
+class WebhookTargetCreateSchema(BaseModel):
+    """
+    Схема для сохранения вебхука в базе данных.
+    """
+
+    url: str
+    category: CategoryLiteral | None = None
+
+
+class WebhookTargetReadSchema(WebhookTargetCreateSchema):
+    """
+    Схема для чтения информации о вебхуке.
+    """
+
+    id: int
+    active: bool
+
+
+class WebhookDeadLetterCreateSchema(BaseModel):
+    """
+    Схема для сохранения недоставленного пакета жалоб.
+    """
+
+    target_id: int
+    payload: str
+    attempts: int
+    last_error: str | None = None
+
+
+class WebhookDeadLetterReadSchema(WebhookDeadLetterCreateSchema):
+    """
+    Схема для чтения недоставленного пакета жалоб.
+    """
+
+    id: int
+    created_at: datetime
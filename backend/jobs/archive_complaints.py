@@ -0,0 +1,82 @@
+"""
+Переносит закрытые жалобы старше --older-than-days дней из таблицы
+complaints в файлы JSONL.gz по месяцам и записывает их в манифест.
+
+Жалобы обрабатываются по возрастанию ID порциями по --chunk-size,
+каждая порция удаляется и записывается в архив одной короткой
+транзакцией, поэтому задание можно прервать и запустить снова
+(например, раз в сутки по расписанию). С --dry-run база данных
+не меняется: только подсчитываются жалобы.
+
+Запуск из корня репозитория:
+PYTHONPATH=backend python -m jobs.archive_complaints --older-than-days 90
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from core.config import settings
+from core.dao.complaint import ComplaintDao
+from core.logs import setup_logging
+from core.models import db_helper
+from services.archive import archive_complaints
+
+log = logging.getLogger(__name__)
+
+
+async def run(args: argparse.Namespace) -> Counter:
+    """
+    Подсчитывает или переносит в архив жалобы.
+    """
+    try:
+        if args.dry_run:
+            async with db_helper.session_factory() as session:
+                count = await ComplaintDao(session=session).count_archivable(
+                    before=datetime.now() - timedelta(days=args.older_than_days),
+                )
+            return Counter(archivable=count)
+        started = time.perf_counter()
+        counters = await archive_complaints(
+            config=settings.archive,
+            older_than_days=args.older_than_days,
+            chunk_size=args.chunk_size,
+            max_chunks=args.max_chunks,
+        )
+        counters["seconds"] = round(time.perf_counter() - started)
+        return counters
+    finally:
+        await db_helper.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--older-than-days",
+        type=float,
+        default=settings.archive.older_than_days,
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=settings.archive.chunk_size,
+    )
+    parser.add_argument(
+        "--max-chunks",
+        type=int,
+        help="Перенести не больше N порций",
+    )
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    setup_logging(settings.logging)
+
+    counters = asyncio.run(run(args))
+    print(json.dumps(counters, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+Повторно определяет тональность и категорию жалоб, для которых внешние API
+вернули ошибку: с состоянием обогащения failed, тональностью unknown
+или категорией "Другое".
+
+Жалобы просматриваются по возрастанию ID порциями по --chunk-size,
+каждая порция сохраняется одним пакетным UPDATE, копии обогащенной
+жалобы получают ее результат без отдельных запросов к API, а ID последней
+обработанной жалобы записывается в файл --checkpoint, поэтому
+прерванный запуск продолжается с того же места. С --dry-run внешние API
+не вызываются и база данных не меняется: только подсчитываются жалобы.
+
+Запуск из корня репозитория:
+PYTHONPATH=backend python -m jobs.backfill_enrichment --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter
+from pathlib import Path
+
+import aiohttp
+from aiohttp import ClientTimeout
+from core.clients.inference import PooledInferenceClient
+from core.config import settings
+from core.dao.complaint import ComplaintDao
+from core.enums.complaint import (
+    CategoryLiteral,
+    CategorySourceEnum,
+    EnrichmentEnum,
+    SentimentEnum,
+)
+from core.logs import setup_logging
+from core.models import db_helper
+from services.cache import ClassificationCache
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.classification import ComplaintClassifier
+from services.local_classifier import LocalCategoryClassifier
+from services.rate_limit import OutboundLimiter, RateLimitExceeded
+
+log = logging.getLogger(__name__)
+
+Row = tuple[
+    int,
+    str,
+    SentimentEnum | None,
+    CategoryLiteral | None,
+    EnrichmentEnum,
+    int | None,
+    CategorySourceEnum | None,
+]
+
+
+def load_checkpoint(path: Path) -> dict:
+    """
+    Загружает состояние прерванного запуска.
+    """
+    if not path.exists():
+        return {"after_id": 0, "counters": {}}
+    return json.loads(path.read_text())
+
+
+def save_checkpoint(path: Path, after_id: int, counters: Counter) -> None:
+    """
+    Атомарно сохраняет ID последней обработанной жалобы и счетчики.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps({"after_id": after_id, "counters": counters}))
+    os.replace(tmp_path, path)
+
+
+async def reenrich(
+    classifier: ComplaintClassifier,
+    row: Row,
+    semaphore: asyncio.Semaphore,
+    max_retries: int,
+    retry_delay: float,
+) -> tuple[dict | None, bool]:
+    """
+    Заново определяет неизвестные тональность и категорию жалобы.
+    У жалобы, обогащение которой завершилось ошибкой, определяются
+    обе, потому что любая из них может быть значением по умолчанию.
+
+    Если API временно недоступно (выключатель разомкнут или запрос
+    отклонен ограничителем), запрос повторяется до max_retries раз.
+    Возвращает новые значения для UPDATE (или None, если ничего
+    не изменилось) и признак ошибки.
+    """
+    complaint_id, text, sentiment, category, enrichment, _, category_source = row
+    new_sentiment, new_category = sentiment, category
+    new_category_source = category_source
+    failed = enrichment == EnrichmentEnum.failed
+    sentiment_done = not failed and sentiment not in (None, SentimentEnum.unknown)
+    category_done = not failed and category not in (None, "Другое")
+    error = False
+    async with semaphore:
+        for attempt in range(max_retries + 1):
+            try:
+                if not sentiment_done:
+                    new_sentiment = await classifier.request_sentiment(text)
+                    sentiment_done = True
+                if not category_done:
+                    (
+                        new_category,
+                        new_category_source,
+                    ) = await classifier.request_category(text)
+                    category_done = True
+            except (CircuitOpenError, RateLimitExceeded):
+                if attempt == max_retries:
+                    error = True
+                    break
+                await asyncio.sleep(retry_delay * 2**attempt)
+            except Exception:
+                log.exception(
+                    "Ошибка при повторном обогащении жалобы с ID %s",
+                    complaint_id,
+                )
+                error = True
+                break
+            else:
+                break
+    # Жалоба остается failed, пока обе ее оценки не получены заново
+    new_enrichment = EnrichmentEnum.failed if failed and error else EnrichmentEnum.done
+    if (new_sentiment, new_category, new_enrichment) == (
+        sentiment,
+        category,
+        enrichment,
+    ):
+        return None, error
+    return {
+        "id": complaint_id,
+        "sentiment": new_sentiment or SentimentEnum.unknown,
+        "category": new_category or "Другое",
+        "category_source": new_category_source,
+        "enrichment": new_enrichment,
+    }, error
+
+
+async def backfill(
+    classifier: ComplaintClassifier | None,
+    checkpoint: Path,
+    chunk_size: int,
+    concurrency: int,
+    max_retries: int,
+    retry_delay: float,
+    limit: int | None,
+) -> Counter:
+    """
+    Просматривает жалобы порциями и обогащает их заново.
+
+    Если classifier не передан, жалобы только подсчитываются.
+    """
+    state = load_checkpoint(checkpoint) if classifier is not None else {}
+    after_id = state.get("after_id", 0)
+    counters = Counter(state.get("counters", {}))
+    if after_id:
+        log.info("Продолжение с жалобы с ID больше %s", after_id)
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    processed = 0
+    while limit is None or processed < limit:
+        size = chunk_size if limit is None else min(chunk_size, limit - processed)
+        async with db_helper.session_factory() as session:
+            rows = await ComplaintDao(session=session).get_reenrichment_candidates(
+                after_id=after_id,
+                limit=size,
+            )
+        if not rows:
+            break
+        after_id = rows[-1][0]
+        processed += len(rows)
+        counters["scanned"] += len(rows)
+        if classifier is None:
+            counters["failed"] += sum(row[4] == EnrichmentEnum.failed for row in rows)
+            counters["unknown_sentiment"] += sum(
+                row[2] in (None, SentimentEnum.unknown) for row in rows
+            )
+            counters["other_category"] += sum(
+                row[3] in (None, "Другое") for row in rows
+            )
+            continue
+
+        # Сначала обогащаются жалобы, которые не являются копиями жалоб
+        # из этой же порции: set_enrichment_many передает их результат
+        # копиям, и копии обогащаются отдельно, только если первая
+        # жалоба группы осталась без результата
+        chunk_ids = {row[0] for row in rows}
+        copies = [row for row in rows if row[5] in chunk_ids]
+        enriched: set[int] = set()
+        for phase in ([row for row in rows if row[5] not in chunk_ids], copies):
+            phase = [row for row in phase if row[5] not in enriched]
+            if not phase:
+                continue
+            results = await asyncio.gather(
+                *(
+                    reenrich(classifier, row, semaphore, max_retries, retry_delay)
+                    for row in phase
+                )
+            )
+            values = [value for value, _ in results if value is not None]
+            async with db_helper.session_factory() as session:
+                await ComplaintDao(session=session).set_enrichment_many(values)
+                await session.commit()
+            enriched.update(
+                value["id"]
+                for value in values
+                if value["enrichment"] == EnrichmentEnum.done
+            )
+            counters["updated"] += len(values)
+            counters["errors"] += sum(error for _, error in results)
+        counters["inherited"] += sum(row[5] in enriched for row in copies)
+        save_checkpoint(checkpoint, after_id, counters)
+
+        elapsed = time.perf_counter() - started
+        log.info(
+            "Обработано %s жалоб (до ID %s), обновлено %s, ошибок %s, %.1f жалоб/с",
+            processed,
+            after_id,
+            counters["updated"],
+            counters["errors"],
+            processed / elapsed,
+        )
+    elapsed = time.perf_counter() - started
+    counters["seconds"] = round(elapsed)
+    counters["per_second"] = round(processed / elapsed) if elapsed else 0
+    return counters
+
+
+async def run(args: argparse.Namespace) -> Counter:
+    """
+    Создает классификатор с теми же кэшем, ограничителями и выключателями,
+    что и у сервиса, и запускает обработку.
+    """
+    if args.dry_run:
+        try:
+            return await backfill(
+                classifier=None,
+                checkpoint=args.checkpoint,
+                chunk_size=args.chunk_size,
+                concurrency=args.concurrency,
+                max_retries=args.max_retries,
+                retry_delay=args.retry_delay,
+                limit=args.limit,
+            )
+        finally:
+            await db_helper.dispose()
+
+    async with (
+        aiohttp.ClientSession(
+            timeout=ClientTimeout(total=10),
+        ) as client_session,
+        PooledInferenceClient(
+            model=settings.resources.hf.model,
+            token=settings.resources.hf.token,
+            timeout=settings.resources.hf.timeout,
+            pool_size=settings.resources.hf.pool_size,
+            keepalive_timeout=settings.resources.hf.keepalive_timeout,
+        ) as inference_client,
+    ):
+        local_classifier = None
+        if settings.local_classifier.enabled:
+            local_classifier = LocalCategoryClassifier(
+                config=settings.local_classifier,
+            )
+            local_classifier.start()
+        classifier = ComplaintClassifier(
+            client_session=client_session,
+            inference_client=inference_client,
+            cache=ClassificationCache(
+                config=settings.cache,
+                namespaces={
+                    "sentiment": settings.resources.sentinel.url,
+                    "category": settings.resources.hf.model,
+                },
+            ),
+            limiters={
+                kind: OutboundLimiter(name=kind, config=config)
+                for kind, config in settings.rate_limits
+            },
+            breakers={
+                kind: CircuitBreaker(name=kind, config=config)
+                for kind, config in settings.breakers
+            },
+            local_classifier=local_classifier,
+        )
+        try:
+            return await backfill(
+                classifier=classifier,
+                checkpoint=args.checkpoint,
+                chunk_size=args.chunk_size,
+                concurrency=args.concurrency,
+                max_retries=args.max_retries,
+                retry_delay=args.retry_delay,
+                limit=args.limit,
+            )
+        finally:
+            if local_classifier is not None:
+                local_classifier.close()
+            await db_helper.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--limit", type=int, help="Обработать не больше N жалоб")
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=Path("backfill_enrichment.json"),
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Начать сначала, удалив файл --checkpoint",
+    )
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--retry-delay", type=float, default=1.0)
+    args = parser.parse_args()
+    setup_logging(settings.logging)
+    if args.restart:
+        args.checkpoint.unlink(missing_ok=True)
+
+    counters = asyncio.run(run(args))
+    print(json.dumps(counters, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
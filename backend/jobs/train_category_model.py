@@ -0,0 +1,60 @@
+"""
+Обучает локальный классификатор категорий на жалобах из базы данных,
+категорию которых определила AI-модель, и калибрует его вероятности
+на отложенной части жалоб (--calibration-size).
+
+Запуск из корня репозитория:
+PYTHONPATH=backend python -m jobs.train_category_model --limit 50000
+"""
+
+import argparse
+import asyncio
+import logging
+
+from core.config import settings
+from core.dao.complaint import ComplaintDao
+from core.logs import setup_logging
+from core.models import db_helper
+from services.local_classifier import CategoryModel
+
+log = logging.getLogger(__name__)
+
+
+async def load_labelled(limit: int) -> tuple[list[str], list[str]]:
+    """
+    Загружает тексты и категории жалоб, размеченных AI-моделью.
+    """
+    async with db_helper.session_factory() as session:
+        rows = await ComplaintDao(session=session).get_labelled(limit=limit)
+    await db_helper.dispose()
+    return [text for text, _ in rows], [category for _, category in rows]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--limit", type=int, default=50_000)
+    parser.add_argument("--output", default=settings.local_classifier.model_path)
+    parser.add_argument("--calibration-size", type=float, default=0.2)
+    args = parser.parse_args()
+    setup_logging(settings.logging)
+
+    texts, labels = asyncio.run(load_labelled(limit=args.limit))
+    if len(set(labels)) < 2:
+        log.error("Для обучения нужны жалобы хотя бы двух категорий")
+        return
+    model = CategoryModel.fit_calibrated(
+        texts=texts,
+        labels=labels,
+        calibration_size=args.calibration_size,
+    )
+    model.save(args.output)
+    log.info(
+        "Модель обучена на %s жалобах (температура %.2f) и сохранена в %s",
+        len(texts),
+        model.temperature,
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,41 +6,183 @@ import aiohttp
 import uvicorn
 from aiohttp import ClientTimeout
 from api import router as api_router
+from api.metrics import router as metrics_router
+from core.clients.inference import PooledInferenceClient
 from core.config import settings
+from core.logs import setup_logging
+from core.metrics import (
+    MetricsMiddleware,
+    mark_process_dead,
+    prepare_multiprocess_dir,
+)
 from core.models import db_helper
 from fastapi import FastAPI
+from services.batching import CategoryBatcher
+from services.broadcast import ComplaintBroadcaster
+from services.cache import ClassificationCache
+from services.circuit_breaker import CircuitBreaker
+from services.classification import ComplaintClassifier
+from services.duplicates import DuplicateIndex
+from services.enrichment import EnrichmentPipeline
+from services.local_classifier import LocalCategoryClassifier
+from services.metrics import MetricsSampler
+from services.rate_limit import OutboundLimiter
+from services.shared_store import create_shared_store
+from services.stats import ComplaintStats
+from services.webhooks import WebhookDispatcher
 
-logging.basicConfig(
-    level=settings.logging.log_level_value,
-    format=settings.logging.log_format,
-)
+setup_logging(settings.logging)
+log = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """
-    Устанавливает сессию для aiohttp и сбрасывает соединение
-    с базой данных после завершения работы приложения.
+    Устанавливает сессию для aiohttp и клиент Hugging Face, создает
+    общее хранилище и классификатор с кэшем, загружает индекс отпечатков
+    жалоб, запускает фоновое обогащение жалоб, перенос статистики жалоб,
+    доставку на вебхуки и сбор метрик
+    и сбрасывает соединение с базой данных после завершения работы приложения.
     """
-    async with aiohttp.ClientSession(
-        headers={"apikey": settings.resources.sentinel.key},
-        timeout=ClientTimeout(total=10),
-    ) as client_session:
+    async with (
+        aiohttp.ClientSession(
+            timeout=ClientTimeout(total=10),
+        ) as client_session,
+        PooledInferenceClient(
+            model=settings.resources.hf.model,
+            token=settings.resources.hf.token,
+            timeout=settings.resources.hf.timeout,
+            pool_size=settings.resources.hf.pool_size,
+            keepalive_timeout=settings.resources.hf.keepalive_timeout,
+        ) as inference_client,
+    ):
         app.state.client_session = client_session
+        app.state.inference_client = inference_client
+        store = create_shared_store(settings.store)
+        await store.purge_expired()
+        app.state.shared_store = store
+        cache = ClassificationCache(
+            config=settings.cache,
+            namespaces={
+                "sentiment": settings.resources.sentinel.url,
+                "category": settings.resources.hf.model,
+            },
+        )
+        await cache.purge_stale()
+        limiters = {
+            kind: OutboundLimiter(
+                name=kind,
+                config=config,
+                processes=settings.run.processes,
+            )
+            for kind, config in settings.rate_limits
+        }
+        breakers = {
+            kind: CircuitBreaker(name=kind, config=config)
+            for kind, config in settings.breakers
+        }
+        batcher = (
+            CategoryBatcher(
+                inference_client=inference_client,
+                config=settings.batching,
+                limiter=limiters["category"],
+                breaker=breakers["category"],
+            )
+            if settings.batching.enabled
+            else None
+        )
+        local_classifier = None
+        if settings.local_classifier.enabled:
+            local_classifier = LocalCategoryClassifier(
+                config=settings.local_classifier,
+            )
+            local_classifier.start()
+        classifier = ComplaintClassifier(
+            client_session=client_session,
+            inference_client=inference_client,
+            cache=cache,
+            limiters=limiters,
+            breakers=breakers,
+            batcher=batcher,
+            local_classifier=local_classifier,
+        )
+        app.state.classifier = classifier
+        duplicate_index = DuplicateIndex(config=settings.duplicates)
+        app.state.duplicate_index = duplicate_index
+        await duplicate_index.start()
+        complaint_stats = ComplaintStats(
+            config=settings.stats,
+            session_factory=db_helper.session_factory,
+        )
+        app.state.complaint_stats = complaint_stats
+        await complaint_stats.start()
+        dispatcher = WebhookDispatcher(
+            client_session=client_session,
+            config=settings.webhooks,
+            store=store,
+        )
+        app.state.webhook_dispatcher = dispatcher
+        await dispatcher.start()
+        # Процесс видит только свои жалобы, поэтому при нескольких
+        # процессах подписчики потоков получают жалобы из базы данных
+        broadcaster = ComplaintBroadcaster(
+            config=settings.stream,
+            poll=settings.stream.poll or settings.run.processes > 1,
+        )
+        broadcaster.add_listener(dispatcher.publish)
+        app.state.broadcaster = broadcaster
+        await broadcaster.start()
+        pipeline = EnrichmentPipeline(
+            classifier=classifier,
+            config=settings.enrichment,
+            broadcaster=broadcaster,
+        )
+        app.state.enrichment_pipeline = pipeline
+        await pipeline.start()
+        sampler = MetricsSampler(
+            config=settings.metrics,
+            classifier=classifier,
+            pipeline=pipeline,
+            dispatcher=dispatcher,
+            broadcaster=broadcaster,
+        )
+        app.state.metrics_sampler = sampler
+        if settings.metrics.enabled:
+            await sampler.start()
         yield
+        await sampler.stop()
+        await pipeline.stop()
+        await broadcaster.stop()
+        await dispatcher.stop()
+        await duplicate_index.stop()
+        await complaint_stats.stop()
+        if batcher is not None:
+            await batcher.close()
+        if local_classifier is not None:
+            local_classifier.close()
     await db_helper.dispose()
+    mark_process_dead()
 
 
 main_app = FastAPI(
     lifespan=lifespan,
 )
 main_app.include_router(api_router)
+if settings.metrics.enabled:
+    main_app.add_middleware(MetricsMiddleware)
+    main_app.include_router(metrics_router)
 
 
 if __name__ == "__main__":
+    workers = settings.run.processes
+    if workers > 1 and settings.metrics.enabled:
+        prepare_multiprocess_dir(settings.metrics.multiprocess_dir)
     uvicorn.run(
         "main:main_app",
         host=settings.run.host,
         port=settings.run.port,
-        reload=True,
+        workers=workers,
+        reload=settings.run.reload,
+        loop=settings.run.loop,
+        http=settings.run.http,
     )
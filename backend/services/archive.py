@@ -0,0 +1,175 @@
+"""
+Модуль архивации закрытых жалоб.
+
+Закрытые жалобы старше заданного возраста удаляются из таблицы
+complaints порциями и записываются в файлы JSONL.gz по месяцам
+создания: <каталог архива>/<ГГГГ-ММ>/<первый ID>-<последний ID>.jsonl.gz.
+Для каждого файла в манифест (таблицу complaintarchives) записывается
+диапазон ID, по которому архивная жалоба находится без чтения
+остальных файлов.
+"""
+
+import asyncio
+import gzip
+import logging
+import os
+from collections import Counter
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from core.config import ArchiveConfig
+from core.dao.archive import ComplaintArchiveDao
+from core.dao.complaint import ComplaintDao
+from core.models import ComplaintArchive, db_helper
+from core.schemas.complaint import (
+    ComplaintAllInfoSchema,
+    ComplaintRow,
+    complaint_row_adapter,
+)
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+log = logging.getLogger(__name__)
+
+COLUMNS = list(ComplaintRow.__annotations__)
+
+
+def write_archive_file(path: Path, rows: Sequence[Row]) -> None:
+    """
+    Записывает жалобы в файл JSONL.gz, по одной в строке.
+
+    Файл сначала пишется во временный и переименовывается после fsync,
+    поэтому в манифест никогда не попадает недописанный файл.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as file:
+        for row in rows:
+            file.write(complaint_row_adapter.dump_json(dict(zip(COLUMNS, row))))
+            file.write(b"\n")
+    with open(tmp_path, "rb") as raw:
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_archive_file(path: Path, complaint_id: int) -> ComplaintAllInfoSchema | None:
+    """
+    Ищет жалобу по ID в файле архива.
+    """
+    marker = f'"id":{complaint_id},'.encode()
+    with gzip.open(path, "rb") as file:
+        for line in file:
+            if marker in line:
+                complaint = ComplaintAllInfoSchema.model_validate_json(line)
+                if complaint.id == complaint_id:
+                    return complaint
+    return None
+
+
+async def archive_chunk(
+    config: ArchiveConfig,
+    before: datetime,
+    chunk_size: int,
+) -> Counter:
+    """
+    Переносит в архив до chunk_size жалоб с наименьшими ID.
+
+    Жалобы удаляются, записываются в файлы и попадают в манифест
+    в одной транзакции: если запись файла не удалась, жалобы остаются
+    в таблице, а файл без записи в манифесте перезаписывается
+    при следующем запуске.
+    """
+    root = Path(config.path)
+    counters = Counter()
+    async with db_helper.session_factory() as session:
+        rows = await ComplaintDao(session=session).delete_archivable(
+            columns=COLUMNS,
+            before=before,
+            limit=chunk_size,
+        )
+        if not rows:
+            return counters
+        months: dict[str, list[Row]] = {}
+        for row in rows:
+            months.setdefault(row.timestamp.strftime("%Y-%m"), []).append(row)
+        for month, month_rows in months.items():
+            relative_path = f"{month}/{month_rows[0].id}-{month_rows[-1].id}.jsonl.gz"
+            await asyncio.to_thread(
+                write_archive_file,
+                root / relative_path,
+                month_rows,
+            )
+            session.add(
+                ComplaintArchive(
+                    month=month,
+                    path=relative_path,
+                    min_id=month_rows[0].id,
+                    max_id=month_rows[-1].id,
+                    count=len(month_rows),
+                )
+            )
+            counters["files"] += 1
+        await session.commit()
+    counters["archived"] += len(rows)
+    return counters
+
+
+async def archive_complaints(
+    config: ArchiveConfig,
+    older_than_days: float,
+    chunk_size: int,
+    max_chunks: int | None = None,
+) -> Counter:
+    """
+    Переносит в архив закрытые жалобы, созданные раньше чем
+    older_than_days дней назад, порциями по chunk_size.
+
+    Каждая порция - отдельная короткая транзакция, между порциями
+    делается пауза config.pause секунд, чтобы не задерживать запись
+    новых жалоб. Прерванный запуск можно просто повторить.
+    """
+    before = datetime.now() - timedelta(days=older_than_days)
+    counters = Counter()
+    while max_chunks is None or counters["chunks"] < max_chunks:
+        chunk_counters = await archive_chunk(
+            config=config,
+            before=before,
+            chunk_size=chunk_size,
+        )
+        if not chunk_counters["archived"]:
+            break
+        counters.update(chunk_counters)
+        counters["chunks"] += 1
+        log.info(
+            "В архив перенесено %s жалоб, файлов %s",
+            counters["archived"],
+            counters["files"],
+        )
+        await asyncio.sleep(config.pause)
+    return counters
+
+
+async def find_archived_complaint(
+    config: ArchiveConfig,
+    session: AsyncSession,
+    complaint_id: int,
+) -> ComplaintAllInfoSchema | None:
+    """
+    Ищет жалобу в архиве по ID: по манифесту выбираются файлы,
+    в диапазон ID которых она попадает, и читаются в отдельном потоке.
+    """
+    paths = await ComplaintArchiveDao(session=session).get_paths_for(complaint_id)
+    for path in paths:
+        try:
+            complaint = await asyncio.to_thread(
+                read_archive_file,
+                Path(config.path) / path,
+                complaint_id,
+            )
+        except OSError:
+            log.exception("Ошибка при чтении файла архива %s", path)
+            continue
+        if complaint is not None:
+            return complaint
+    return None
@@ -0,0 +1,163 @@
+"""
+Модуль пакетного определения категорий жалоб.
+"""
+
+import asyncio
+import logging
+
+from core.clients.inference import PooledInferenceClient
+from core.config import BatchingConfig
+from core.enums.complaint import CategoryLiteral
+
+from .circuit_breaker import CircuitBreaker, call_with_breaker
+from .providers import (
+    BatchParseError,
+    parse_categories,
+    request_categories,
+    request_category,
+)
+from .rate_limit import OutboundLimiter
+
+log = logging.getLogger(__name__)
+
+
+class CategoryBatcher:
+    """
+    Собирает жалобы, поступившие в течение короткого окна,
+    и определяет их категории одним запросом к AI-модели.
+
+    Пакетный запрос проходит через тот же выключатель, ограничитель
+    и время ожидания, что и одиночные, и учитывается выключателем
+    как один запрос. Если пакетный ответ не удалось разобрать,
+    каждая жалоба классифицируется отдельным запросом.
+    """
+
+    def __init__(
+        self,
+        inference_client: PooledInferenceClient,
+        config: BatchingConfig,
+        limiter: OutboundLimiter,
+        breaker: CircuitBreaker,
+    ) -> None:
+        """
+        Инициализация планировщика.
+
+        Параметры:
+        inference_client: Клиент Hugging Face для определения категории
+        config: Максимальный размер пакета и время ожидания
+        limiter: Ограничитель запросов к AI-модели
+        breaker: Выключатель AI-модели
+        """
+        self._inference_client = inference_client
+        self._config = config
+        self._limiter = limiter
+        self._breaker = breaker
+        self._pending: list[tuple[str, asyncio.Future[CategoryLiteral]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def classify(self, text: str) -> CategoryLiteral:
+        """
+        Добавляет текст в текущий пакет и ждет его категорию.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self._config.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self._config.max_wait_ms / 1000,
+                self._flush,
+            )
+        return await future
+
+    async def close(self) -> None:
+        """
+        Отправляет накопленный пакет и дожидается всех запросов.
+        """
+        self._flush()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _flush(self) -> None:
+        """
+        Отправляет накопленный пакет в фоновой задаче.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._classify_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _classify_batch(
+        self,
+        batch: list[tuple[str, asyncio.Future[CategoryLiteral]]],
+    ) -> None:
+        """
+        Определяет категории пакета и передает результаты ожидающим.
+        """
+        texts = [text for text, _ in batch]
+        if len(batch) > 1:
+            try:
+                content = await call_with_breaker(
+                    kind="category",
+                    breaker=self._breaker,
+                    limiter=self._limiter,
+                    request=lambda: request_categories(
+                        texts=texts,
+                        inference_client=self._inference_client,
+                    ),
+                )
+                categories = parse_categories(content, count=len(texts))
+            except BatchParseError as e:
+                log.warning(
+                    "Не удалось разобрать ответ на пакет из %s жалоб, "
+                    "жалобы будут классифицированы по одной: %s",
+                    len(batch),
+                    e,
+                )
+            except Exception as e:
+                self._resolve(batch, [e] * len(batch))
+                return
+            else:
+                self._resolve(batch, categories)
+                return
+
+        results = await asyncio.gather(
+            *[self._classify_one(text) for text in texts],
+            return_exceptions=True,
+        )
+        self._resolve(batch, results)
+
+    async def _classify_one(self, text: str) -> CategoryLiteral:
+        """
+        Определяет категорию одной жалобы отдельным запросом.
+        """
+        return await call_with_breaker(
+            kind="category",
+            breaker=self._breaker,
+            limiter=self._limiter,
+            request=lambda: request_category(
+                text=text,
+                inference_client=self._inference_client,
+            ),
+        )
+
+    @staticmethod
+    def _resolve(
+        batch: list[tuple[str, asyncio.Future[CategoryLiteral]]],
+        results: list[CategoryLiteral | BaseException],
+    ) -> None:
+        """
+        Устанавливает результаты или ошибки для ожидающих корутин.
+        """
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,238 @@
+"""
+Модуль рассылки обогащенных жалоб подписчикам потоков и слушателям.
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
+
+from core.config import StreamConfig
+from core.dao.complaint import ComplaintDao
+from core.models import db_helper
+from core.schemas.complaint import ComplaintAllInfoSchema, ComplaintFilterSchema
+from sqlalchemy.exc import SQLAlchemyError
+
+log = logging.getLogger(__name__)
+
+Listener = Callable[[ComplaintAllInfoSchema], Awaitable[None]]
+
+
+class Subscription:
+    """
+    Подписка на жалобы с ограниченным буфером.
+
+    Если подписчик не успевает читать и буфер переполняется,
+    подписка отключается: накопленные жалобы отбрасываются,
+    а get возвращает None.
+    """
+
+    def __init__(
+        self,
+        filters: ComplaintFilterSchema,
+        buffer_size: int,
+    ) -> None:
+        """
+        Инициализация подписки.
+
+        Параметры:
+        filters: Условия отбора жалоб
+        buffer_size: Сколько жалоб может ждать чтения
+        """
+        self.filters = filters
+        self.dropped = False
+        self._queue: asyncio.Queue[ComplaintAllInfoSchema | None] = asyncio.Queue(
+            maxsize=buffer_size
+        )
+
+    def offer(self, complaint: ComplaintAllInfoSchema) -> bool:
+        """
+        Кладет жалобу в буфер. Возвращает False, если подписчик отключен.
+        """
+        if self.dropped:
+            return False
+        try:
+            self._queue.put_nowait(complaint)
+        except asyncio.QueueFull:
+            self.dropped = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+            return False
+        return True
+
+    async def get(self) -> ComplaintAllInfoSchema | None:
+        """
+        Ждет следующую жалобу. None означает, что подписка отключена.
+        """
+        return await self._queue.get()
+
+
+class ComplaintBroadcaster:
+    """
+    Раздает обогащенные жалобы подписчикам потоков (SSE, WebSocket)
+    и слушателям вроде доставки на вебхуки.
+
+    Слушатели получают жалобы, созданные или обогащенные тем же
+    процессом, поэтому каждая жалоба передается им один раз. Подписчики
+    потоков по умолчанию тоже получают жалобы своего процесса, а если
+    включен опрос (poll), - все жалобы из базы данных: так подписчик
+    любого процесса видит жалобы, обработанные остальными процессами.
+    """
+
+    def __init__(self, config: StreamConfig, poll: bool = False) -> None:
+        """
+        Инициализация рассылки.
+
+        Параметры:
+        config: Размер буфера подписчика и параметры опроса
+        poll: Получать жалобы для подписчиков из базы данных
+        """
+        self._config = config
+        self._poll = poll
+        self._subscriptions: set[Subscription] = set()
+        self._listeners: list[Listener] = []
+        self._last_id: int | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def subscribers(self) -> int:
+        """
+        Возвращает количество подписчиков.
+        """
+        return len(self._subscriptions)
+
+    async def start(self) -> None:
+        """
+        Запускает опрос базы данных, если он включен.
+        """
+        if self._poll:
+            self._task = asyncio.create_task(self._run(), name="stream-poll")
+
+    async def stop(self) -> None:
+        """
+        Останавливает опрос базы данных.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def add_listener(self, listener: Listener) -> None:
+        """
+        Добавляет корутину, которая вызывается для каждой жалобы.
+        """
+        self._listeners.append(listener)
+
+    @contextmanager
+    def subscribe(self, filters: ComplaintFilterSchema) -> Iterator[Subscription]:
+        """
+        Подписывает на жалобы до выхода из контекста.
+        """
+        subscription = Subscription(
+            filters=filters,
+            buffer_size=self._config.buffer_size,
+        )
+        self._subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._subscriptions.discard(subscription)
+
+    async def publish(self, complaint: ComplaintAllInfoSchema) -> None:
+        """
+        Раздает жалобу слушателям и, если опрос выключен,
+        подходящим подписчикам.
+        """
+        if not self._poll:
+            self._offer(complaint)
+        for listener in self._listeners:
+            await listener(complaint)
+
+    async def poll(self) -> None:
+        """
+        Раздает подписчикам жалобы, сохраненные после прошлого опроса.
+
+        Пока подписчиков нет, база данных не читается. Первый опрос
+        после их появления только запоминает, с какой жалобы начать.
+        Копии других жалоб не раздаются.
+        """
+        if not self._subscriptions:
+            self._last_id = None
+            return
+        async with db_helper.session_factory() as session:
+            dao = ComplaintDao(session=session)
+            if self._last_id is None:
+                self._last_id = await dao.get_feed_start()
+                return
+            while True:
+                records = await dao.get_after_id(
+                    after_id=self._last_id,
+                    limit=self._config.poll_batch_size,
+                )
+                for record in records:
+                    self._last_id = record.id
+                    if record.group_id is None:
+                        self._offer(
+                            ComplaintAllInfoSchema.model_validate(
+                                record, from_attributes=True
+                            )
+                        )
+                if len(records) < self._config.poll_batch_size:
+                    return
+
+    def _offer(self, complaint: ComplaintAllInfoSchema) -> None:
+        """
+        Кладет жалобу в буферы подходящих подписчиков и отключает тех,
+        кто не успевает читать.
+        """
+        for subscription in list(self._subscriptions):
+            if not subscription.filters.matches(complaint):
+                continue
+            if not subscription.offer(complaint):
+                self._subscriptions.discard(subscription)
+                log.warning(
+                    "Подписчик не успевает читать жалобы и отключен "
+                    "(буфер %s жалоб)",
+                    self._config.buffer_size,
+                )
+
+    async def _run(self) -> None:
+        """
+        Опрашивает базу данных каждые poll_interval секунд.
+        """
+        while True:
+            await asyncio.sleep(self._config.poll_interval)
+            try:
+                await self.poll()
+            except SQLAlchemyError:
+                log.exception("Ошибка при чтении новых жалоб для подписчиков")
+
+
+async def stream_events(
+    broadcaster: ComplaintBroadcaster,
+    filters: ComplaintFilterSchema,
+    keepalive: float,
+) -> AsyncIterator[bytes]:
+    """
+    Возвращает жалобы в формате Server-Sent Events.
+
+    Каждая жалоба отправляется событием complaint с ID жалобы в поле id.
+    Если подписчик отключен из-за переполнения буфера, поток завершается
+    событием overflow, и пропущенные жалобы можно дочитать
+    через GET /complaints?after_id=.
+    """
+    with broadcaster.subscribe(filters) as subscription:
+        while True:
+            try:
+                complaint = await asyncio.wait_for(subscription.get(), keepalive)
+            except TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if complaint is None:
+                yield b"event: overflow\ndata: {}\n\n"
+                return
+            yield (
+                f"id: {complaint.id}\nevent: complaint\n"
+                f"data: {complaint.model_dump_json()}\n\n"
+            ).encode()
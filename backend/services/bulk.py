@@ -0,0 +1,118 @@
+"""
+Модуль пакетной загрузки жалоб.
+"""
+
+import logging
+from collections.abc import AsyncIterable, AsyncIterator
+
+from core.dao.complaint import ComplaintDao
+from core.dao.enrichment import EnrichmentJobDao
+from core.enums.complaint import EnrichmentEnum
+from core.models import db_helper
+from core.schemas.complaint import BulkResultSchema, ComplaintInSchema
+from core.schemas.enrichment import EnrichmentJobCreateSchema
+from pydantic import ValidationError
+
+from .duplicates import DuplicateIndex, fingerprint
+from .enrichment import EnrichmentPipeline, pending_complaint
+from .streaming import iter_records
+
+log = logging.getLogger(__name__)
+
+
+def _result_line(**kwargs) -> bytes:
+    """
+    Возвращает строку NDJSON с результатом загрузки.
+    """
+    return (
+        BulkResultSchema(**kwargs).model_dump_json(exclude_none=True).encode() + b"\n"
+    )
+
+
+async def _insert_chunk(
+    chunk: list[tuple[int, ComplaintInSchema]],
+    pipeline: EnrichmentPipeline | None,
+    duplicates: DuplicateIndex | None,
+) -> bytes:
+    """
+    Сохраняет порцию жалоб и задания на их обогащение в одной транзакции.
+
+    Копии жалоб из индекса duplicates, которые уже обогащены, получают
+    их тональность и категорию без заданий. Копии внутри одной порции
+    не связываются друг с другом.
+    """
+    values = [fingerprint(complaint.text) for _, complaint in chunk]
+    async with db_helper.session_factory() as session:
+        if duplicates is not None:
+            leaders = await duplicates.find_groups(session=session, values=values)
+        else:
+            leaders = [None] * len(chunk)
+        models = [
+            pending_complaint(complaint.text, value, leader)
+            for (_, complaint), value, leader in zip(chunk, values, leaders)
+        ]
+        ids = await ComplaintDao(session=session).add_many(models)
+        if ids is not None:
+            pending_ids = [
+                id_
+                for id_, model in zip(ids, models)
+                if model.enrichment == EnrichmentEnum.pending
+            ]
+            job_ids = await EnrichmentJobDao(session=session).add_many(
+                [EnrichmentJobCreateSchema(complaint_id=id_) for id_ in pending_ids],
+            )
+            if job_ids is None:
+                ids = None
+            else:
+                await session.commit()
+    if ids is None:
+        return b"".join(
+            _result_line(line=line, error="Ошибка базы данных") for line, _ in chunk
+        )
+    if duplicates is not None:
+        for id_, value, leader in zip(ids, values, leaders):
+            if leader is None:
+                duplicates.add(id_, value)
+    if pipeline is not None:
+        pipeline.notify_many(pending_ids)
+    return b"".join(
+        _result_line(line=line, id=id_) for (line, _), id_ in zip(chunk, ids)
+    )
+
+
+async def ingest_complaints(
+    chunks: AsyncIterable[bytes],
+    chunk_size: int,
+    pipeline: EnrichmentPipeline | None = None,
+    duplicates: DuplicateIndex | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Сохраняет жалобы из потока NDJSON или JSON-массива порциями
+    по chunk_size и возвращает результат для каждой записи в формате NDJSON.
+
+    Жалобы сохраняются со статусом обогащения "pending". Если конвейер
+    не передан, задания будут загружены им из базы данных позже.
+    """
+    chunk: list[tuple[int, ComplaintInSchema]] = []
+    try:
+        async for line, raw in iter_records(chunks):
+            try:
+                complaint = ComplaintInSchema.model_validate_json(raw)
+            except ValidationError as e:
+                yield _result_line(
+                    line=line,
+                    error=e.errors(include_url=False)[0]["msg"],
+                )
+                continue
+            chunk.append((line, complaint))
+            if len(chunk) >= chunk_size:
+                yield await _insert_chunk(chunk, pipeline, duplicates)
+                chunk = []
+    except ValueError as e:
+        log.warning("Ошибка разбора потока жалоб: %s", e)
+        if chunk:
+            yield await _insert_chunk(chunk, pipeline, duplicates)
+        yield _result_line(error=str(e))
+        return
+    if chunk:
+        yield await _insert_chunk(chunk, pipeline, duplicates)
@@ -0,0 +1,168 @@
+"""
+Модуль кэширования результатов классификации текстов жалоб.
+"""
+
+import hashlib
+import logging
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+
+from core.config import CacheConfig
+from core.dao.cache import CachedClassificationDao
+from core.models import db_helper
+from sqlalchemy.exc import SQLAlchemyError
+
+log = logging.getLogger(__name__)
+
+
+class ClassificationCache:
+    """
+    Двухуровневый кэш результатов классификации, адресуемый хэшем текста.
+
+    Тексты, отличающиеся только регистром и пробелами, считаются
+    одинаковыми. Каждый вид результата (kind) привязан к своему
+    источнику (namespace), поэтому при смене модели старые
+    результаты перестают находиться и удаляются при запуске.
+    """
+
+    def __init__(
+        self,
+        config: CacheConfig,
+        namespaces: dict[str, str],
+    ) -> None:
+        """
+        Инициализация кэша.
+
+        Параметры:
+        config: Настройки размера, времени жизни и уровней кэша
+        namespaces: Источник результата для каждого вида, например
+        {"category": "mistralai/Mistral-7B-Instruct-v0.3"}
+        """
+        self._config = config
+        self._namespaces = namespaces
+        self._memory: OrderedDict[tuple[str, str], tuple[float, str]] = (
+            OrderedDict()
+        )
+        self._stats: dict[str, Counter[str]] = {
+            kind: Counter() for kind in namespaces
+        }
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        """
+        Возвращает хэш текста, нормализованного по регистру и пробелам.
+        """
+        normalized = " ".join(text.casefold().split())
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    async def get(self, kind: str, text: str) -> str | None:
+        """
+        Возвращает закэшированный результат или None.
+        """
+        if not self._config.enabled:
+            return None
+        key = self.make_key(text)
+        entry = self._memory.get((kind, key))
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._memory.move_to_end((kind, key))
+                self._stats[kind]["memory_hits"] += 1
+                return value
+            del self._memory[(kind, key)]
+
+        if self._config.persistent:
+            try:
+                async with db_helper.session_factory() as session:
+                    value = await CachedClassificationDao(
+                        session=session
+                    ).get_value(
+                        key=f"{kind}:{key}",
+                        namespace=self._namespaces[kind],
+                        created_after=datetime.now()
+                        - timedelta(seconds=self._config.persistent_ttl),
+                    )
+            except SQLAlchemyError:
+                log.exception("Ошибка при чтении кэша классификации")
+                value = None
+            if value is not None:
+                self._remember(kind, key, value)
+                self._stats[kind]["persistent_hits"] += 1
+                return value
+
+        self._stats[kind]["misses"] += 1
+        return None
+
+    async def set(self, kind: str, text: str, value: str) -> None:
+        """
+        Сохраняет результат на всех уровнях кэша.
+        """
+        if not self._config.enabled:
+            return
+        key = self.make_key(text)
+        self._remember(kind, key, value)
+        if not self._config.persistent:
+            return
+        try:
+            async with db_helper.session_factory() as session:
+                await CachedClassificationDao(session=session).put_value(
+                    key=f"{kind}:{key}",
+                    namespace=self._namespaces[kind],
+                    value=value,
+                )
+                await session.commit()
+        except SQLAlchemyError:
+            log.exception("Ошибка при записи в кэш классификации")
+
+    async def purge_stale(self) -> None:
+        """
+        Удаляет из базы данных результаты, полученные от прежних
+        источников или устаревшие по времени.
+        """
+        if not (self._config.enabled and self._config.persistent):
+            return
+        created_before = datetime.now() - timedelta(
+            seconds=self._config.persistent_ttl
+        )
+        async with db_helper.session_factory() as session:
+            dao = CachedClassificationDao(session=session)
+            for kind, namespace in self._namespaces.items():
+                await dao.delete_stale(
+                    prefix=f"{kind}:",
+                    namespace=namespace,
+                    created_before=created_before,
+                )
+            await session.commit()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        Возвращает счетчики попаданий и промахов для каждого вида результата.
+        """
+        return {
+            kind: {
+                "memory_hits": counter["memory_hits"],
+                "persistent_hits": counter["persistent_hits"],
+                "misses": counter["misses"],
+            }
+            for kind, counter in self._stats.items()
+        }
+
+    @property
+    def size(self) -> int:
+        """
+        Возвращает количество записей в памяти.
+        """
+        return len(self._memory)
+
+    def _remember(self, kind: str, key: str, value: str) -> None:
+        """
+        Сохраняет результат в памяти, вытесняя самые давние записи.
+        """
+        self._memory[(kind, key)] = (
+            time.monotonic() + self._config.ttl,
+            value,
+        )
+        self._memory.move_to_end((kind, key))
+        while len(self._memory) > self._config.max_size:
+            self._memory.popitem(last=False)
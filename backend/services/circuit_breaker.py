@@ -0,0 +1,290 @@
+"""
+Модуль защиты от недоступных внешних API: автоматический выключатель
+и дублирование медленных запросов.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from enum import StrEnum
+
+from core.config import CircuitBreakerConfig
+from core.metrics import OUTBOUND_REQUESTS, track_outbound
+
+from .rate_limit import OutboundLimiter, RateLimitExceeded
+
+log = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """
+    Выключатель разомкнут: запрос к внешнему API не отправлялся.
+    """
+
+
+class CircuitState(StrEnum):
+    """
+    Состояние выключателя.
+    """
+
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель для одного внешнего API.
+
+    В замкнутом состоянии учитываются результаты последних window_size
+    запросов; ошибкой считается и запрос дольше slow_call_threshold.
+    Когда доля ошибок достигает failure_rate (но не раньше min_calls
+    запросов), выключатель размыкается, и запросы сразу завершаются
+    ошибкой CircuitOpenError. Через open_duration секунд пропускается
+    half_open_probes пробных запросов: если все успешны, выключатель
+    замыкается, при первой ошибке снова размыкается.
+    """
+
+    def __init__(self, name: str, config: CircuitBreakerConfig) -> None:
+        """
+        Инициализация выключателя.
+
+        Параметры:
+        name: Название API для логов и метрик
+        config: Допустимая доля ошибок, время размыкания и параметры
+        дублирования запросов
+        """
+        self.name = name
+        self._config = config
+        self.state = CircuitState.closed
+        self._outcomes: deque[bool] = deque(maxlen=config.window_size)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._latencies: deque[float] = deque(maxlen=200)
+        self._counters = {
+            "opened": 0,
+            "short_circuited": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+        }
+
+    @property
+    def timeout(self) -> float | None:
+        """
+        Возвращает время ожидания одного запроса в секундах.
+        """
+        return self._config.timeout
+
+    @asynccontextmanager
+    async def protect(self) -> AsyncIterator[None]:
+        """
+        Пропускает запрос, если выключатель замкнут, и учитывает результат.
+
+        Ошибки RateLimitExceeded не учитываются: запрос не отправлялся.
+        """
+        if not self._config.enabled:
+            yield
+            return
+        probe = self._admit()
+        started = time.monotonic()
+        try:
+            yield
+        except RateLimitExceeded:
+            if probe:
+                self._probes -= 1
+            raise
+        except Exception:
+            self._record(success=False, probe=probe)
+            raise
+        except BaseException:
+            if probe:
+                self._probes -= 1
+            raise
+        else:
+            latency = time.monotonic() - started
+            self._record(
+                success=latency <= self._config.slow_call_threshold,
+                probe=probe,
+            )
+
+    def observe(self, latency: float) -> None:
+        """
+        Учитывает время успешного ответа для расчета задержки дублирования.
+        """
+        self._latencies.append(latency)
+
+    def hedge_delay(self) -> float | None:
+        """
+        Возвращает, через сколько секунд отправить дублирующий запрос:
+        95-й перцентиль времени ответа, но не меньше hedge_min_delay.
+        None, если дублирование выключено или замеров мало.
+        """
+        if (
+            not self._config.hedge
+            or len(self._latencies) < self._config.hedge_min_samples
+        ):
+            return None
+        latencies = sorted(self._latencies)
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        return max(self._config.hedge_min_delay, p95)
+
+    async def hedge[T](self, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Выполняет запрос, а если ответа нет дольше hedge_delay,
+        отправляет такой же второй и возвращает первый успешный ответ.
+        """
+        delay = self.hedge_delay()
+        if delay is None:
+            return await request()
+        first = asyncio.ensure_future(request())
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+        self._counters["hedges"] += 1
+        second = asyncio.ensure_future(request())
+        pending = {first, second}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self._counters["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> dict[str, str | float | int | None]:
+        """
+        Возвращает состояние выключателя и счетчики.
+        """
+        failures = self._outcomes.count(False)
+        delay = self.hedge_delay()
+        return {
+            "state": self.state,
+            "calls": len(self._outcomes),
+            "failure_rate": failures / len(self._outcomes) if self._outcomes else 0.0,
+            **self._counters,
+            "hedge_delay_ms": delay * 1000 if delay is not None else None,
+        }
+
+    def _admit(self) -> bool:
+        """
+        Решает, можно ли отправить запрос. Возвращает True для пробного.
+        """
+        if self.state == CircuitState.open:
+            if time.monotonic() - self._opened_at < self._config.open_duration:
+                self._short_circuit()
+            self._transition(CircuitState.half_open)
+            self._probes = 0
+            self._probe_successes = 0
+        if self.state == CircuitState.half_open:
+            if self._probes >= self._config.half_open_probes:
+                self._short_circuit()
+            self._probes += 1
+            return True
+        return False
+
+    def _short_circuit(self) -> None:
+        """
+        Отклоняет запрос без обращения к API.
+        """
+        self._counters["short_circuited"] += 1
+        raise CircuitOpenError(f"Выключатель {self.name} разомкнут")
+
+    def _record(self, success: bool, probe: bool) -> None:
+        """
+        Учитывает результат запроса и меняет состояние.
+        """
+        if probe:
+            if self.state != CircuitState.half_open:
+                return
+            if not success:
+                self._open("пробный запрос завершился ошибкой")
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self._config.half_open_probes:
+                self._outcomes.clear()
+                self._transition(CircuitState.closed)
+            return
+        if self.state != CircuitState.closed:
+            return
+        self._outcomes.append(success)
+        if len(self._outcomes) < self._config.min_calls:
+            return
+        failure_rate = self._outcomes.count(False) / len(self._outcomes)
+        if failure_rate >= self._config.failure_rate:
+            self._open(
+                f"{failure_rate:.0%} ошибок и медленных ответов "
+                f"из последних {len(self._outcomes)} запросов"
+            )
+
+    def _open(self, reason: str) -> None:
+        """
+        Размыкает выключатель.
+        """
+        self._opened_at = time.monotonic()
+        self._counters["opened"] += 1
+        self._transition(CircuitState.open, reason)
+
+    def _transition(self, state: CircuitState, reason: str | None = None) -> None:
+        """
+        Меняет состояние и записывает переход в лог.
+        """
+        previous, self.state = self.state, state
+        if state == CircuitState.open:
+            log.warning(
+                "Выключатель %s: %s -> %s (%s), запросы не отправляются %s с",
+                self.name,
+                previous,
+                state,
+                reason,
+                self._config.open_duration,
+            )
+        else:
+            log.info("Выключатель %s: %s -> %s", self.name, previous, state)
+
+
+async def call_with_breaker[T](
+    kind: str,
+    breaker: CircuitBreaker,
+    limiter: OutboundLimiter,
+    request: Callable[[], Awaitable[T]],
+) -> T:
+    """
+    Отправляет запрос к внешнему API через выключатель и ограничитель.
+
+    Каждая попытка ограничена временем breaker.timeout,
+    медленная попытка может быть продублирована. Выключатель учитывает
+    один результат на вызов, даже если запрос был продублирован.
+    """
+
+    async def attempt() -> T:
+        async with limiter.acquire():
+            started = time.monotonic()
+            with track_outbound(kind):
+                async with asyncio.timeout(breaker.timeout):
+                    result = await request()
+            breaker.observe(time.monotonic() - started)
+            return result
+
+    try:
+        async with breaker.protect():
+            return await breaker.hedge(attempt)
+    except CircuitOpenError:
+        OUTBOUND_REQUESTS.labels(kind, "short_circuited").inc()
+        raise
+    except RateLimitExceeded:
+        OUTBOUND_REQUESTS.labels(kind, "rejected").inc()
+        raise
@@ -0,0 +1,242 @@
+"""
+Модуль определения тональности и категории жалоб.
+"""
+
+import logging
+from collections.abc import Awaitable, Callable
+
+from aiohttp import ClientResponseError, ClientSession
+from core.clients.inference import PooledInferenceClient
+from core.config import settings
+from core.enums.complaint import CategoryLiteral, CategorySourceEnum, SentimentEnum
+
+from .batching import CategoryBatcher
+from .cache import ClassificationCache
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, call_with_breaker
+from .local_classifier import LocalCategoryClassifier
+from .local_sentiment import LocalSentimentAnalyzer
+from .providers import request_category, request_sentiment
+from .rate_limit import OutboundLimiter, RateLimitExceeded
+
+log = logging.getLogger(__name__)
+
+
+class ComplaintClassifier:
+    """
+    Определяет тональность и категорию жалоб через внешние API,
+    используя общие клиенты и кэш результатов.
+
+    Методы request_* пробрасывают ошибки внешних API (это нужно
+    фоновым воркерам для повторов), методы get_* возвращают
+    значения по умолчанию вместе с признаком fallback. Если выключатель
+    API разомкнут, методы get_* сразу возвращают оценку локального
+    анализатора или модели, тоже с признаком fallback.
+    """
+
+    def __init__(
+        self,
+        client_session: ClientSession,
+        inference_client: PooledInferenceClient,
+        cache: ClassificationCache,
+        limiters: dict[str, OutboundLimiter],
+        breakers: dict[str, CircuitBreaker],
+        batcher: CategoryBatcher | None = None,
+        local_classifier: LocalCategoryClassifier | None = None,
+        local_sentiment: LocalSentimentAnalyzer | None = None,
+    ) -> None:
+        """
+        Инициализация классификатора.
+
+        Параметры:
+        client_session: Сессия aiohttp для запросов к API тональности
+        inference_client: Клиент Hugging Face для определения категории
+        cache: Кэш результатов классификации
+        limiters: Ограничители запросов к внешним API по видам результата
+        ("sentiment" и "category")
+        breakers: Выключатели внешних API по видам результата
+        batcher: Планировщик пакетных запросов категорий.
+        Если не передан, каждая жалоба отправляется отдельным запросом.
+        local_classifier: Локальная модель, которая опрашивается
+        до AI-модели
+        local_sentiment: Словарный анализатор тональности, используется
+        в зависимости от settings.resources.sentinel.mode
+        """
+        self._client_session = client_session
+        self._inference_client = inference_client
+        self.cache = cache
+        self.limiters = limiters
+        self.breakers = breakers
+        self._batcher = batcher
+        self._local_classifier = local_classifier
+        self._local_sentiment = local_sentiment or LocalSentimentAnalyzer()
+
+    async def request_sentiment(
+        self,
+        text: str,
+        use_cache: bool = True,
+    ) -> SentimentEnum:
+        """
+        Определяет тональность текста локально или через внешнее API,
+        используя кэш.
+
+        В режиме local-then-remote-on-low-confidence при ошибке
+        внешнего API возвращается результат локального анализатора.
+        """
+        mode = settings.resources.sentinel.mode
+        if mode != "remote":
+            local_sentiment, confidence = self._local_sentiment.analyze(text)
+            if (
+                mode == "local"
+                or confidence >= settings.resources.sentinel.confidence_threshold
+            ):
+                return local_sentiment
+        if use_cache:
+            cached = await self.cache.get("sentiment", text)
+            if cached is not None:
+                return SentimentEnum(cached)
+        try:
+            sentiment = await self._call_remote(
+                "sentiment",
+                lambda: request_sentiment(
+                    text=text,
+                    client_session=self._client_session,
+                ),
+            )
+        except CircuitOpenError:
+            if mode == "remote":
+                raise
+            return local_sentiment
+        except Exception:
+            if mode == "remote":
+                raise
+            log.warning(
+                "Внешнее API тональности недоступно, "
+                "используется локальная оценка",
+                exc_info=True,
+            )
+            return local_sentiment
+        if sentiment != SentimentEnum.unknown:
+            await self.cache.set("sentiment", text, sentiment)
+        return sentiment
+
+    async def request_category(
+        self,
+        text: str,
+        use_cache: bool = True,
+    ) -> tuple[CategoryLiteral, CategorySourceEnum]:
+        """
+        Определяет категорию жалобы, используя кэш и локальную модель.
+
+        Возвращает категорию и ее источник. В кэше хранятся только ответы
+        AI-модели, поэтому источник закэшированной категории - remote.
+        """
+        if use_cache:
+            cached = await self.cache.get("category", text)
+            if cached is not None:
+                return cached, CategorySourceEnum.remote
+        if self._local_classifier is not None:
+            prediction = await self._local_classifier.predict(text)
+            if (
+                prediction is not None
+                and prediction[1] >= self._local_classifier.threshold
+            ):
+                return prediction[0], CategorySourceEnum.local
+        if self._batcher is not None:
+            category = await self._batcher.classify(text)
+        else:
+            category = await self._call_remote(
+                "category",
+                lambda: request_category(
+                    text=text,
+                    inference_client=self._inference_client,
+                ),
+            )
+        await self.cache.set("category", text, category)
+        return category, CategorySourceEnum.remote
+
+    async def _call_remote[T](
+        self,
+        kind: str,
+        request: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Отправляет запрос к внешнему API через выключатель и ограничитель.
+        """
+        return await call_with_breaker(
+            kind=kind,
+            breaker=self.breakers[kind],
+            limiter=self.limiters[kind],
+            request=request,
+        )
+
+    async def get_sentiment(
+        self,
+        text: str,
+        use_cache: bool = True,
+    ) -> tuple[SentimentEnum, bool]:
+        """
+        Определяет тональность текста.
+
+        Возвращает тональность и признак fallback: True, если из-за ошибки
+        внешнего API вместо результата возвращено значение по умолчанию
+        или оценка локального анализатора.
+        """
+        try:
+            sentiment = await self.request_sentiment(
+                text=text,
+                use_cache=use_cache,
+            )
+        except ClientResponseError as e:
+            log.exception(
+                "Ошибочный ответ от %s со статус кодом %s",
+                settings.resources.sentinel.url,
+                e.status,
+            )
+        except TimeoutError as e:
+            log.exception(
+                "Время ожидания ответа от %s истекло: %s",
+                settings.resources.sentinel.url,
+                e,
+            )
+        except RateLimitExceeded as e:
+            log.warning("%s", e)
+        except CircuitOpenError:
+            sentiment, _ = self._local_sentiment.analyze(text)
+            return sentiment, True
+        except Exception:
+            log.exception(
+                "Ошибка при запросе тональности к %s",
+                settings.resources.sentinel.url,
+            )
+        else:
+            return sentiment, False
+        return SentimentEnum.unknown, True
+
+    async def get_category(
+        self,
+        text: str,
+        use_cache: bool = True,
+    ) -> tuple[CategoryLiteral, CategorySourceEnum | None]:
+        """
+        Определяет категорию жалобы с помощью AI-модели.
+
+        Возвращает категорию и ее источник. Источник None (fallback)
+        означает, что из-за ошибки AI-модели вместо результата возвращена
+        категория "Другое" или оценка локальной модели ниже порога
+        уверенности.
+        """
+        try:
+            return await self.request_category(
+                text=text,
+                use_cache=use_cache,
+            )
+        except RateLimitExceeded as e:
+            log.warning("%s", e)
+        except CircuitOpenError:
+            if self._local_classifier is not None:
+                prediction = await self._local_classifier.predict(text)
+                if prediction is not None:
+                    return prediction[0], None
+        except Exception:
+            log.exception("Ошибка при определении категории для: %s", text)
+        return "Другое", None
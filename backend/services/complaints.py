@@ -1,115 +1,212 @@
 import asyncio
 import logging
+from collections.abc import AsyncIterator
 
-from aiohttp import ClientResponseError, ClientSession
-from core.config import settings
 from core.dao.complaint import ComplaintDao
-from core.enums.complaint import CategoryLiteral, SentimentEnum
+from core.enums.complaint import EnrichmentEnum, StatusEnum
+from core.metrics import stage_timer, timed
+from core.models import Complaint
 from core.schemas.complaint import (
-    ComplaintCreateSchema,
+    ComplaintAllInfoSchema,
     ComplaintInSchema,
     ComplaintReadSchema,
+    ComplaintRow,
+    ComplaintStoreSchema,
+    OpenComplaintsSchema,
+    StatusChangeResultSchema,
+    StatusChangeSchema,
+    complaint_rows_adapter,
 )
-from huggingface_hub import AsyncInferenceClient
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .broadcast import ComplaintBroadcaster
+from .classification import ComplaintClassifier
+from .duplicates import DuplicateIndex, fingerprint, inherits_enrichment
 
 log = logging.getLogger(__name__)
 
 
-async def get_category(
-    text: str,
-) -> CategoryLiteral:
+def complaint_to_schema(record: Complaint) -> ComplaintReadSchema:
     """
-    Определяет категорию жалобы с помощью AI-модели.
+    Преобразует запись жалобы в схему ответа.
     """
-    client = AsyncInferenceClient(
-        model=settings.resources.hf.model,
-        token=settings.resources.hf.token,
+    schema = ComplaintReadSchema.model_validate(
+        record,
+        from_attributes=True,
     )
-    try:
-        response = await client.chat_completion(
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"Определи категорию этой жалобы: \n\n{text}\n\n"
-                    f'Варианты: "Техническая", "Оплата", "Другое". '
-                    f"Дай ответ только одним из этих слов.",
-                }
-            ],
-        )
-        content = response.choices[0].message.content.lower()
-        # Бывают случаи, когда модель выдает ответ, который точно не
-        # соответствует ожидаемым категориям
-        if "техн" in content:
-            return "Техническая"
-        if "опл" in content:
-            return "Оплата"
-    except Exception:
-        log.exception("Ошибка при определении категории для: %s", text)
-    return "Другое"
-
-
-async def get_sentiment(
-    text: str,
-    client_session: ClientSession,
-) -> SentimentEnum:
-    """
-    Определяет тональность текста.
-    """
-    try:
-        async with client_session.post(
-            settings.resources.sentinel.url,
-            data=text,
-            raise_for_status=True,
-        ) as response:
-            json = await response.json()
-            result = json["sentiment"]
-            if result in SentimentEnum:
-                return result
-    except ClientResponseError as e:
-        log.exception(
-            "Ошибочный ответ от %s со статус кодом %s",
-            settings.resources.sentinel.url,
-            e.status,
-        )
-    except TimeoutError as e:
-        log.exception(
-            "Время ожидания ответа от %s истекло: %s",
-            settings.resources.sentinel.url,
-            e,
-        )
-    return SentimentEnum.unknown
+    if schema.category == "Другое":
+        schema.category = None
+    return schema
 
 
 async def create_new_complaint(
     complaint: ComplaintInSchema,
     session: AsyncSession,
-    client_session: ClientSession,
+    classifier: ComplaintClassifier,
+    use_cache: bool = True,
+    broadcaster: ComplaintBroadcaster | None = None,
+    duplicates: DuplicateIndex | None = None,
 ) -> ComplaintReadSchema:
     """
-    Создает новую жалобу, определяя ее тональность и категорию.
+    Создает новую жалобу, определяя ее тональность и категорию,
+    и передает ее подписчикам и на вебхуки после фиксации транзакции.
+
+    Если внешние API не вернули результат, жалоба сохраняется
+    со значениями по умолчанию и состоянием обогащения failed.
+
+    Если жалоба почти совпадает с открытой жалобой из индекса duplicates,
+    она становится копией этой жалобы: получает ее тональность
+    и категорию без обращения к внешним API и не передается подписчикам.
+
+    Время каждого этапа учитывается в метрике stage_duration_seconds.
     """
+    value = fingerprint(complaint.text)
+    leader = None
+    if duplicates is not None:
+        with stage_timer("duplicates"):
+            (leader,) = await duplicates.find_groups(session=session, values=[value])
 
-    sentiment, category = await asyncio.gather(
-        get_sentiment(
-            text=complaint.text,
-            client_session=client_session,
-        ),
-        get_category(text=complaint.text),
-    )
+    enrichment = EnrichmentEnum.done
+    if inherits_enrichment(leader):
+        sentiment, category = leader.sentiment, leader.category
+        category_source = leader.category_source
+    else:
+        sentiment_result, category_result = await asyncio.gather(
+            timed(
+                "sentiment",
+                classifier.get_sentiment(
+                    text=complaint.text,
+                    use_cache=use_cache,
+                ),
+            ),
+            timed(
+                "category",
+                classifier.get_category(
+                    text=complaint.text,
+                    use_cache=use_cache,
+                ),
+            ),
+        )
+        sentiment, sentiment_fallback = sentiment_result
+        category, category_source = category_result
+        # Значения по умолчанию сохраняются, но жалоба не считается
+        # обогащенной: ее не наследуют копии, а задача
+        # backfill_enrichment определит тональность и категорию заново
+        if sentiment_fallback or category_source is None:
+            enrichment = EnrichmentEnum.failed
 
-    model = ComplaintCreateSchema(
+    model = ComplaintStoreSchema(
         text=complaint.text,
         sentiment=sentiment,
         category=category,
+        category_source=category_source,
+        enrichment=enrichment,
+        fingerprint=value,
+        group_id=leader.id if leader is not None else None,
+    )
+    with stage_timer("db_insert"):
+        record = await ComplaintDao(session=session).add(
+            model,
+        )
+    # Фиксируем транзакцию до добавления в индекс копий и рассылки,
+    # чтобы подписчики не получили жалобу, которой нет в базе данных
+    with stage_timer("db_commit"):
+        await session.commit()
+    if leader is None and duplicates is not None:
+        duplicates.add(record.id, value, record.timestamp)
+    if broadcaster is not None and leader is None:
+        with stage_timer("publish"):
+            await broadcaster.publish(
+                ComplaintAllInfoSchema.model_validate(record, from_attributes=True)
+            )
+    with stage_timer("serialization"):
+        return complaint_to_schema(record)
+
+
+async def stream_complaints_in_last_hour(
+    session_factory: async_sessionmaker[AsyncSession],
+    chunk_size: int,
+    collapse_duplicates: bool = True,
+) -> AsyncIterator[bytes]:
+    """
+    Возвращает JSON в формате OpenComplaintsSchema со списком открытых
+    жалоб за последний час по частям. Если collapse_duplicates включен,
+    копии других жалоб не выводятся.
+
+    Строки читаются порциями по chunk_size и сериализуются сразу в байты
+    без создания объектов ORM и моделей pydantic. Сессия открывается
+    внутри генератора, потому что зависимости FastAPI закрываются
+    до отправки тела потокового ответа.
+    """
+    columns = list(ComplaintRow.__annotations__)
+    yield b'{"complaints":['
+    separator = b""
+    async with session_factory() as session:
+        dao = ComplaintDao(session=session)
+        async for rows in dao.stream_complaints_in_last_hour(
+            columns=columns,
+            chunk_size=chunk_size,
+            collapse_duplicates=collapse_duplicates,
+        ):
+            chunk = complaint_rows_adapter.dump_json(
+                [dict(zip(columns, row)) for row in rows]
+            )
+            yield separator + chunk[1:-1]  # Без квадратных скобок массива
+            separator = b","
+    yield b'],"next_after_id":null}'
+
+
+async def get_complaints_feed(
+    session: AsyncSession,
+    after_id: int,
+    limit: int,
+    collapse_duplicates: bool = True,
+) -> OpenComplaintsSchema:
+    """
+    Возвращает открытые жалобы с известной категорией, кроме "Другое",
+    среди следующих limit жалоб после after_id и курсор для следующего запроса.
+    Если collapse_duplicates включен, копии других жалоб не выводятся.
+
+    Курсор сдвигается на последнюю просмотренную жалобу, даже если она
+    не попала в ответ, поэтому каждый запрос читает только новые строки.
+    """
+    records = await ComplaintDao(session=session).get_after_id(
+        after_id=after_id,
+        limit=limit,
     )
-    record = await ComplaintDao(session=session).add(
-        model,
+    return OpenComplaintsSchema(
+        complaints=[
+            ComplaintAllInfoSchema.model_validate(record, from_attributes=True)
+            for record in records
+            if record.status == StatusEnum.open
+            and record.category not in (None, "Другое")
+            and not (collapse_duplicates and record.group_id is not None)
+        ],
+        next_after_id=records[-1].id if records else after_id,
     )
-    schema = ComplaintReadSchema.model_validate(
-        record,
-        from_attributes=True,
+
+
+async def change_complaints_status(
+    change: StatusChangeSchema,
+    session: AsyncSession,
+) -> StatusChangeResultSchema:
+    """
+    Меняет статус выбранных жалоб и сообщает, какие из переданных ID
+    не найдены.
+    """
+    updated = await ComplaintDao(session=session).set_status(
+        status=change.status,
+        ids=change.ids,
+        category=change.category,
+        from_status=change.from_status,
+        before=change.before,
+    )
+    updated_ids = set(updated)
+    return StatusChangeResultSchema(
+        updated=len(updated),
+        not_found=[
+            complaint_id
+            for complaint_id in dict.fromkeys(change.ids or ())
+            if complaint_id not in updated_ids
+        ],
     )
-    if schema.category == "Другое":
-        schema.category = None
-    return schema
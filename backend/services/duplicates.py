@@ -0,0 +1,281 @@
+"""
+Модуль поиска почти одинаковых жалоб.
+
+Для текста жалобы вычисляется 64-битный отпечаток SimHash по
+4-символьным фрагментам нормализованного текста: у текстов, которые
+отличаются несколькими словами или знаками препинания, отпечатки
+различаются в нескольких битах, у разных текстов - примерно в половине.
+
+Отпечатки недавних открытых жалоб хранятся в индексе LSH в памяти
+процесса: 64 бита делятся на полосы, и кандидатами считаются жалобы,
+совпадающие с новой хотя бы в одной полосе. Для кандидатов расстояние
+Хэмминга проверяется точно.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+
+import numpy as np
+from core.config import DuplicatesConfig
+from core.dao.complaint import ComplaintDao
+from core.enums.complaint import EnrichmentEnum, SentimentEnum
+from core.models import Complaint, db_helper
+from sqlalchemy import Row
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+log = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"\w+")
+SHINGLE_LENGTH = 4
+FINGERPRINT_BITS = 64
+FINGERPRINT_MASK = (1 << FINGERPRINT_BITS) - 1
+MAX_CANDIDATES = 3  # Сколько ближайших жалоб проверять в базе данных
+
+
+def fingerprint(text: str) -> int:
+    """
+    Возвращает отпечаток SimHash текста как знаковое 64-битное число,
+    чтобы его можно было хранить в столбце BIGINT.
+
+    Используется blake2b, а не hash(), чтобы отпечатки совпадали
+    во всех процессах и между запусками.
+    """
+    normalized = " ".join(WORD_PATTERN.findall(text.casefold()))
+    if len(normalized) <= SHINGLE_LENGTH:
+        shingles = {normalized}
+    else:
+        shingles = {
+            normalized[i : i + SHINGLE_LENGTH]
+            for i in range(len(normalized) - SHINGLE_LENGTH + 1)
+        }
+    hashes = np.fromiter(
+        (
+            int.from_bytes(
+                hashlib.blake2b(shingle.encode(), digest_size=8).digest(),
+                "little",
+            )
+            for shingle in shingles
+        ),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    bits = np.unpackbits(
+        hashes.view(np.uint8).reshape(-1, 8),
+        axis=1,
+        bitorder="little",
+    )
+    # Бит отпечатка равен 1, если он установлен у большинства фрагментов
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 > len(shingles)
+    return int(np.packbits(votes, bitorder="little").view("<i8")[0])
+
+
+class DuplicateIndex:
+    """
+    Индекс LSH отпечатков открытых жалоб, которые не являются копиями
+    других жалоб (первых жалоб групп).
+
+    Индекс ограничен max_size записями и жалобами за последние window
+    секунд: лишние и устаревшие записи удаляются в порядке добавления.
+    При запуске индекс заполняется из таблицы жалоб, а затем раз
+    в refresh_interval секунд дополняется жалобами, сохраненными
+    другими процессами.
+    """
+
+    def __init__(self, config: DuplicatesConfig) -> None:
+        """
+        Инициализация индекса.
+
+        Параметры:
+        config: Порог расстояния, количество полос, размер и окно индекса
+        """
+        self._config = config
+        self._band_width = -(-FINGERPRINT_BITS // config.bands)
+        self._band_mask = (1 << self._band_width) - 1
+        self._values: dict[int, int] = {}
+        self._timestamps: OrderedDict[int, datetime] = OrderedDict()
+        self._bands: list[dict[int, set[int]]] = [{} for _ in range(config.bands)]
+        self._last_id = 0
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Возвращает True, если поиск копий включен.
+        """
+        return self._config.enabled
+
+    async def start(self) -> None:
+        """
+        Заполняет индекс из базы данных и запускает его периодическое
+        дополнение.
+        """
+        if not self.enabled:
+            return
+        await self.refresh()
+        log.info("Индекс копий жалоб загружен: %s отпечатков", len(self))
+        self._task = asyncio.create_task(self._run(), name="duplicate-index")
+
+    async def stop(self) -> None:
+        """
+        Останавливает дополнение индекса.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def refresh(self) -> None:
+        """
+        Добавляет в индекс первые жалобы групп, сохраненные после
+        последней загрузки. При первой загрузке выбираются последние
+        max_size жалоб за window секунд.
+        """
+        async with db_helper.session_factory() as session:
+            rows = await ComplaintDao(session=session).get_group_fingerprints(
+                after_id=self._last_id,
+                since=datetime.now() - timedelta(seconds=self._config.window),
+                limit=self._config.max_size,
+            )
+        for complaint_id, value, timestamp in rows:
+            self.add(complaint_id, value, timestamp)
+            self._last_id = max(self._last_id, complaint_id)
+
+    def add(
+        self,
+        complaint_id: int,
+        value: int | None,
+        timestamp: datetime | None = None,
+    ) -> None:
+        """
+        Добавляет отпечаток первой жалобы группы.
+        """
+        if not self.enabled or value is None or complaint_id in self._values:
+            return
+        value &= FINGERPRINT_MASK
+        self._values[complaint_id] = value
+        self._timestamps[complaint_id] = timestamp or datetime.now()
+        for band, key in zip(self._bands, self._band_keys(value)):
+            band.setdefault(key, set()).add(complaint_id)
+        self._evict()
+
+    def discard(self, complaint_id: int) -> None:
+        """
+        Удаляет жалобу из индекса, если она там есть.
+        """
+        value = self._values.pop(complaint_id, None)
+        if value is None:
+            return
+        del self._timestamps[complaint_id]
+        for band, key in zip(self._bands, self._band_keys(value)):
+            members = band.get(key)
+            if members is not None:
+                members.discard(complaint_id)
+                if not members:
+                    del band[key]
+
+    def candidates(self, value: int) -> list[int]:
+        """
+        Возвращает ID жалоб, отпечатки которых отличаются от value
+        не больше чем на max_distance бит, от ближайших к дальним.
+        """
+        if not self.enabled or not self._values:
+            return []
+        value &= FINGERPRINT_MASK
+        found = set().union(
+            *(
+                band.get(key, ())
+                for band, key in zip(self._bands, self._band_keys(value))
+            )
+        )
+        max_distance = self._config.max_distance
+        # Значения в индексе уже без знака, поэтому маска не нужна
+        scored = [
+            (score, complaint_id)
+            for complaint_id in found
+            if (score := (value ^ self._values[complaint_id]).bit_count())
+            <= max_distance
+        ]
+        scored.sort()
+        return [complaint_id for _, complaint_id in scored]
+
+    async def find_groups(
+        self,
+        session: AsyncSession,
+        values: Sequence[int],
+    ) -> list[Row | None]:
+        """
+        Находит для каждого отпечатка открытую жалобу, с которой
+        начинается его группа, одним запросом к базе данных.
+
+        Возвращает строки с полями id, sentiment, category, enrichment
+        или None. Закрытые и удаленные жалобы удаляются из индекса.
+        """
+        matches = [self.candidates(value)[:MAX_CANDIDATES] for value in values]
+        ids = {complaint_id for ids in matches for complaint_id in ids}
+        if not ids:
+            return [None] * len(values)
+        leaders = await ComplaintDao(session=session).get_open_by_ids(ids)
+        for complaint_id in ids - leaders.keys():
+            self.discard(complaint_id)
+        return [
+            next((leaders[i] for i in candidates if i in leaders), None)
+            for candidates in matches
+        ]
+
+    def _band_keys(self, value: int) -> list[int]:
+        """
+        Возвращает значения полос отпечатка.
+        """
+        return [
+            (value >> (i * self._band_width)) & self._band_mask
+            for i in range(self._config.bands)
+        ]
+
+    def _evict(self) -> None:
+        """
+        Удаляет лишние и устаревшие записи в порядке добавления.
+        """
+        expired = datetime.now() - timedelta(seconds=self._config.window)
+        while self._timestamps:
+            complaint_id, timestamp = next(iter(self._timestamps.items()))
+            if len(self._values) <= self._config.max_size and timestamp >= expired:
+                break
+            self.discard(complaint_id)
+
+    async def _run(self) -> None:
+        """
+        Дополняет индекс каждые refresh_interval секунд.
+        """
+        while True:
+            await asyncio.sleep(self._config.refresh_interval)
+            try:
+                await self.refresh()
+            except SQLAlchemyError:
+                log.exception("Ошибка при обновлении индекса копий жалоб")
+
+
+def inherits_enrichment(leader: Row | Complaint | None) -> bool:
+    """
+    Проверяет, можно ли взять тональность и категорию у первой
+    жалобы группы вместо обращения к внешним API.
+
+    Наследуются только результаты успешного обогащения. Тональность
+    unknown и категория "Другое" не наследуются, даже если обогащение
+    завершено: так сохранялись ошибки внешних API до появления
+    состояния failed, и копия должна получить свой результат.
+    """
+    return (
+        leader is not None
+        and leader.enrichment == EnrichmentEnum.done
+        and leader.sentiment not in (None, SentimentEnum.unknown)
+        and leader.category not in (None, "Другое")
+    )
@@ -0,0 +1,366 @@
+"""
+Модуль фонового определения тональности и категории жалоб.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Sequence
+
+from core.config import EnrichmentConfig
+from core.dao.complaint import ComplaintDao
+from core.dao.enrichment import EnrichmentJobDao
+from core.enums.complaint import EnrichmentEnum, SentimentEnum
+from core.models import db_helper
+from core.schemas.complaint import (
+    ComplaintAllInfoSchema,
+    ComplaintInSchema,
+    ComplaintReadSchema,
+    ComplaintStoreSchema,
+)
+from core.schemas.enrichment import EnrichmentJobCreateSchema
+from sqlalchemy import Row
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .broadcast import ComplaintBroadcaster
+from .classification import ComplaintClassifier
+from .complaints import complaint_to_schema
+from .duplicates import DuplicateIndex, fingerprint, inherits_enrichment
+
+log = logging.getLogger(__name__)
+
+
+class EnrichmentPipeline:
+    """
+    Конвейер фонового обогащения жалоб.
+
+    Задания хранятся в таблице enrichmentjobs и переживают перезапуск,
+    а в памяти находится только ограниченная очередь ID жалоб,
+    которую разбирает пул asyncio-воркеров. Перед выполнением задание
+    забирается атомарным UPDATE, поэтому при запуске нескольких
+    процессов каждую жалобу обогащает только один из них.
+    """
+
+    def __init__(
+        self,
+        classifier: ComplaintClassifier,
+        config: EnrichmentConfig,
+        broadcaster: ComplaintBroadcaster | None = None,
+    ) -> None:
+        """
+        Инициализация конвейера.
+
+        Параметры:
+        classifier: Классификатор тональности и категории жалоб
+        config: Настройки количества воркеров, очереди и повторов
+        broadcaster: Рассылка обогащенных жалоб подписчикам и на вебхуки
+        """
+        self._classifier = classifier
+        self._config = config
+        self._broadcaster = broadcaster
+        self._queue: asyncio.Queue[int] = asyncio.Queue(
+            maxsize=config.queue_size
+        )
+        self._scheduled: set[int] = set()  # ID жалоб в очереди и в работе
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def depth(self) -> int:
+        """
+        Возвращает количество заданий в очереди.
+        """
+        return self._queue.qsize()
+
+    async def start(self) -> None:
+        """
+        Запускает воркеры и загрузку отложенных заданий из базы данных.
+        """
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"enrichment-worker-{i}")
+            for i in range(self._config.workers)
+        ]
+        self._tasks.append(
+            asyncio.create_task(self._feed(), name="enrichment-feeder")
+        )
+        log.info(
+            "Конвейер обогащения запущен с %s воркерами",
+            self._config.workers,
+        )
+
+    async def stop(self) -> None:
+        """
+        Останавливает воркеры. Незавершенные задания остаются в базе данных.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        log.info("Конвейер обогащения остановлен.")
+
+    def notify(self, complaint_id: int) -> None:
+        """
+        Ставит в очередь задание, уже сохраненное в базе данных.
+
+        Если очередь заполнена, задание будет загружено из базы позже.
+        """
+        if complaint_id in self._scheduled:
+            return
+        try:
+            self._queue.put_nowait(complaint_id)
+        except asyncio.QueueFull:
+            log.warning(
+                "Очередь обогащения заполнена, жалоба с ID %s "
+                "будет обработана позже",
+                complaint_id,
+            )
+            return
+        self._scheduled.add(complaint_id)
+
+    def notify_many(self, complaint_ids: Sequence[int]) -> None:
+        """
+        Ставит в очередь несколько заданий, уже сохраненных в базе данных.
+
+        Задания, не поместившиеся в очередь, будут загружены из базы позже.
+        """
+        for i, complaint_id in enumerate(complaint_ids):
+            if self._queue.full():
+                log.info(
+                    "Очередь обогащения заполнена, %s жалоб будут обработаны позже",
+                    len(complaint_ids) - i,
+                )
+                return
+            self.notify(complaint_id)
+
+    async def _feed(self) -> None:
+        """
+        Периодически дополняет очередь готовыми заданиями из базы данных.
+        """
+        while True:
+            free = self._queue.maxsize - self._queue.qsize()
+            if free > 0:
+                try:
+                    async with db_helper.session_factory() as session:
+                        complaint_ids = await EnrichmentJobDao(
+                            session=session
+                        ).get_available_complaint_ids(
+                            limit=free + len(self._scheduled),
+                        )
+                except SQLAlchemyError:
+                    log.exception("Ошибка при загрузке заданий на обогащение")
+                else:
+                    for complaint_id in complaint_ids:
+                        self.notify(complaint_id)
+            await asyncio.sleep(self._config.poll_interval)
+
+    async def _work(self) -> None:
+        """
+        Обрабатывает задания из очереди.
+        """
+        while True:
+            complaint_id = await self._queue.get()
+            try:
+                await self._process(complaint_id)
+            except Exception:
+                log.exception(
+                    "Непредвиденная ошибка при обогащении жалобы с ID %s",
+                    complaint_id,
+                )
+            finally:
+                self._scheduled.discard(complaint_id)
+                self._queue.task_done()
+
+    async def _process(self, complaint_id: int) -> None:
+        """
+        Определяет тональность и категорию жалобы и сохраняет результат.
+
+        Копия другой жалобы получает ее тональность и категорию, а пока
+        первая жалоба группы ожидает обогащения, задание копии откладывается.
+        При ошибке внешнего API задание откладывается с экспоненциальной
+        задержкой, а после исчерпания попыток жалоба помечается как failed.
+        """
+        async with db_helper.session_factory() as session:
+            job = await EnrichmentJobDao(session=session).claim(
+                complaint_id=complaint_id,
+                lease_until=datetime.now()
+                + timedelta(seconds=self._config.lease_timeout),
+            )
+            await session.commit()
+            complaint = await ComplaintDao(session=session).get_by_id(
+                complaint_id
+            )
+        if job is None:
+            return
+        # Копия могла быть обогащена вместе с первой жалобой группы
+        if complaint is None or complaint.enrichment != EnrichmentEnum.pending:
+            async with db_helper.session_factory() as session:
+                await EnrichmentJobDao(
+                    session=session
+                ).delete_by_complaint_id(complaint_id)
+                await session.commit()
+            return
+
+        leader = None
+        if complaint.group_id is not None:
+            async with db_helper.session_factory() as session:
+                leader = await ComplaintDao(session=session).get_by_id(
+                    complaint.group_id
+                )
+                if leader is not None and leader.enrichment == EnrichmentEnum.pending:
+                    await EnrichmentJobDao(session=session).reschedule(
+                        complaint_id=complaint_id,
+                        attempts=job.attempts,
+                        available_at=datetime.now()
+                        + timedelta(seconds=self._config.retry_delay),
+                        error="Ожидается обогащение первой жалобы группы",
+                    )
+                    await session.commit()
+                    return
+
+        if inherits_enrichment(leader):
+            sentiment, category = leader.sentiment, leader.category
+            category_source = leader.category_source
+        else:
+            # Соединение с базой данных не удерживается на время запросов к API
+            sentiment, category_result = await asyncio.gather(
+                self._classifier.request_sentiment(
+                    text=complaint.text,
+                    use_cache=job.use_cache,
+                ),
+                self._classifier.request_category(
+                    text=complaint.text,
+                    use_cache=job.use_cache,
+                ),
+                return_exceptions=True,
+            )
+            if isinstance(category_result, Exception):
+                category, category_source = category_result, None
+            else:
+                category, category_source = category_result
+        errors = [
+            result
+            for result in (sentiment, category)
+            if isinstance(result, Exception)
+        ]
+
+        enrichment = None
+        async with db_helper.session_factory() as session:
+            job_dao = EnrichmentJobDao(session=session)
+            if not errors:
+                enrichment = EnrichmentEnum.done
+                await ComplaintDao(session=session).set_enrichment(
+                    complaint_id=complaint_id,
+                    sentiment=sentiment,
+                    category=category,
+                    category_source=category_source,
+                )
+                await job_dao.delete_by_complaint_id(complaint_id)
+            elif job.attempts >= self._config.max_retries:
+                log.error(
+                    "Не удалось обогатить жалобу с ID %s за %s попыток: %r",
+                    complaint_id,
+                    job.attempts + 1,
+                    errors[0],
+                )
+                enrichment = EnrichmentEnum.failed
+                if isinstance(sentiment, Exception):
+                    sentiment = SentimentEnum.unknown
+                if isinstance(category, Exception):
+                    category = "Другое"
+                await ComplaintDao(session=session).set_enrichment(
+                    complaint_id=complaint_id,
+                    sentiment=sentiment,
+                    category=category,
+                    category_source=category_source,
+                    enrichment=enrichment,
+                )
+                await job_dao.delete_by_complaint_id(complaint_id)
+            else:
+                delay = self._config.retry_delay * 2**job.attempts
+                await job_dao.reschedule(
+                    complaint_id=complaint_id,
+                    attempts=job.attempts + 1,
+                    available_at=datetime.now() + timedelta(seconds=delay),
+                    error=repr(errors[0]),
+                )
+            await session.commit()
+
+        # Копии других жалоб не передаются подписчикам и на вебхуки
+        if (
+            enrichment is not None
+            and self._broadcaster is not None
+            and complaint.group_id is None
+        ):
+            await self._broadcaster.publish(
+                ComplaintAllInfoSchema(
+                    id=complaint.id,
+                    text=complaint.text,
+                    status=complaint.status,
+                    timestamp=complaint.timestamp,
+                    sentiment=sentiment,
+                    category=category,
+                    enrichment=enrichment,
+                )
+            )
+
+
+def pending_complaint(
+    text: str,
+    value: int,
+    leader: Row | None,
+) -> ComplaintStoreSchema:
+    """
+    Возвращает схему новой жалобы, ожидающей обогащения.
+
+    Копия обогащенной жалобы leader сразу получает ее тональность
+    и категорию. Все поля заданы явно, чтобы схемы можно было сохранить
+    одним запросом INSERT.
+    """
+    inherited = inherits_enrichment(leader)
+    return ComplaintStoreSchema(
+        text=text,
+        sentiment=leader.sentiment if inherited else None,
+        category=leader.category if inherited else None,
+        category_source=leader.category_source if inherited else None,
+        enrichment=EnrichmentEnum.done if inherited else EnrichmentEnum.pending,
+        fingerprint=value,
+        group_id=leader.id if leader is not None else None,
+    )
+
+
+async def accept_new_complaint(
+    complaint: ComplaintInSchema,
+    session: AsyncSession,
+    pipeline: EnrichmentPipeline,
+    use_cache: bool = True,
+    duplicates: DuplicateIndex | None = None,
+) -> ComplaintReadSchema:
+    """
+    Сохраняет жалобу без ожидания внешних API и ставит
+    определение ее тональности и категории в фоновую очередь.
+
+    Копия обогащенной открытой жалобы из индекса duplicates сразу
+    получает ее тональность и категорию и в очередь не ставится.
+    """
+    value = fingerprint(complaint.text)
+    leader = None
+    if duplicates is not None:
+        (leader,) = await duplicates.find_groups(session=session, values=[value])
+    record = await ComplaintDao(session=session).add(
+        pending_complaint(complaint.text, value, leader),
+    )
+    if record.enrichment == EnrichmentEnum.pending:
+        await EnrichmentJobDao(session=session).add(
+            EnrichmentJobCreateSchema(
+                complaint_id=record.id,
+                use_cache=use_cache,
+            ),
+        )
+    # Фиксируем транзакцию до постановки в очередь, чтобы воркер
+    # гарантированно увидел и жалобу, и задание
+    await session.commit()
+    if leader is None and duplicates is not None:
+        duplicates.add(record.id, value, record.timestamp)
+    if record.enrichment == EnrichmentEnum.pending:
+        pipeline.notify(record.id)
+    return complaint_to_schema(record)
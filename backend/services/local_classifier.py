@@ -0,0 +1,334 @@
+"""
+Модуль локального определения категорий жалоб на CPU.
+
+Используется наивный байесовский классификатор над TF-IDF признаками
+(слова, их начала и биграммы), хэшированными в вектор фиксированной
+длины. Модель обучается на размеченных жалобах из базы данных
+и работает без доступа к сети.
+
+Вероятности наивного байесовского классификатора почти всегда близки
+к 0 или 1, потому что признаки считаются независимыми. Поэтому оценки
+делятся на температуру, подобранную на отложенной выборке, и только
+после этого сравниваются с порогом уверенности.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import random
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from core.config import LocalClassifierConfig
+from core.enums.complaint import CategoryLiteral
+
+log = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"\w+")
+PREFIX_LENGTH = 5
+# Температуры, среди которых выбирается лучшая при калибровке
+TEMPERATURES = np.geomspace(0.1, 10_000, 401)
+
+
+def extract_features(text: str) -> list[str]:
+    """
+    Возвращает признаки текста: слова, их начала и пары соседних слов.
+
+    Начала слов грубо заменяют стемминг для русского языка.
+    """
+    words = WORD_PATTERN.findall(text.casefold())
+    features = [f"w:{word}" for word in words]
+    features.extend(
+        f"p:{word[:PREFIX_LENGTH]}"
+        for word in words
+        if len(word) > PREFIX_LENGTH
+    )
+    features.extend(f"b:{a} {b}" for a, b in zip(words, words[1:]))
+    return features
+
+
+def vectorize(text: str, dim: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Возвращает индексы и сублинейные частоты признаков текста.
+
+    Используется crc32, а не hash(), чтобы индексы совпадали
+    во всех процессах и между запусками.
+    """
+    indices = np.fromiter(
+        (zlib.crc32(feature.encode()) % dim for feature in extract_features(text)),
+        dtype=np.int64,
+    )
+    indices, counts = np.unique(indices, return_counts=True)
+    return indices, 1 + np.log(counts, dtype=np.float32)
+
+
+class CategoryModel:
+    """
+    Наивный байесовский классификатор категорий жалоб.
+    """
+
+    def __init__(
+        self,
+        labels: list[str],
+        idf: np.ndarray,
+        log_prior: np.ndarray,
+        log_likelihood: np.ndarray,
+        temperature: float = 1.0,
+    ) -> None:
+        """
+        Инициализация обученной модели.
+
+        Параметры:
+        labels: Названия категорий
+        idf: Обратная документная частота каждого признака
+        log_prior: Логарифмы априорных вероятностей категорий
+        log_likelihood: Логарифмы вероятностей признаков в категориях
+        temperature: Делитель оценок перед вычислением вероятностей
+        """
+        self.labels = labels
+        self.idf = idf
+        self.log_prior = log_prior
+        self.log_likelihood = log_likelihood
+        self.temperature = temperature
+
+    @property
+    def dim(self) -> int:
+        """
+        Возвращает размерность пространства признаков.
+        """
+        return self.idf.shape[0]
+
+    @classmethod
+    def fit(
+        cls,
+        texts: list[str],
+        labels: list[str],
+        dim: int = 2**18,
+        alpha: float = 0.1,
+    ) -> "CategoryModel":
+        """
+        Обучает модель на размеченных текстах.
+
+        Параметры:
+        texts: Тексты жалоб
+        labels: Категории жалоб
+        dim: Размерность пространства признаков
+        alpha: Параметр сглаживания Лапласа
+        """
+        classes = sorted(set(labels))
+        class_index = {label: i for i, label in enumerate(classes)}
+        vectors = [vectorize(text, dim) for text in texts]
+
+        document_frequency = np.zeros(dim, dtype=np.float32)
+        for indices, _ in vectors:
+            document_frequency[indices] += 1
+        idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1
+
+        weights = np.zeros((len(classes), dim), dtype=np.float32)
+        class_counts = np.zeros(len(classes), dtype=np.float32)
+        for (indices, values), label in zip(vectors, labels):
+            row = class_index[label]
+            weights[row, indices] += values * idf[indices]
+            class_counts[row] += 1
+
+        weights += alpha
+        log_likelihood = np.log(weights) - np.log(
+            weights.sum(axis=1, keepdims=True)
+        )
+        log_prior = np.log(class_counts / class_counts.sum())
+        return cls(
+            labels=classes,
+            idf=idf.astype(np.float32),
+            log_prior=log_prior.astype(np.float32),
+            log_likelihood=log_likelihood.astype(np.float32),
+        )
+
+    @classmethod
+    def fit_calibrated(
+        cls,
+        texts: list[str],
+        labels: list[str],
+        calibration_size: float = 0.2,
+        seed: int = 0,
+    ) -> "CategoryModel":
+        """
+        Обучает модель на части размеченных текстов и калибрует
+        ее вероятности на остальных calibration_size текстов.
+        """
+        samples = list(zip(texts, labels))
+        random.Random(seed).shuffle(samples)
+        split = len(samples) - max(1, int(len(samples) * calibration_size))
+        train, held_out = samples[:split], samples[split:]
+        model = cls.fit(
+            texts=[text for text, _ in train],
+            labels=[label for _, label in train],
+        )
+        model.calibrate(
+            texts=[text for text, _ in held_out],
+            labels=[label for _, label in held_out],
+        )
+        return model
+
+    def calibrate(self, texts: list[str], labels: list[str]) -> float:
+        """
+        Подбирает температуру, при которой вероятности на отложенных
+        текстах лучше всего предсказывают верную категорию (минимум
+        средней логарифмической функции потерь), и возвращает ее.
+
+        Тексты категорий, которых нет в модели, пропускаются.
+        """
+        class_index = {label: i for i, label in enumerate(self.labels)}
+        samples = [
+            (text, class_index[label])
+            for text, label in zip(texts, labels)
+            if label in class_index
+        ]
+        if not samples:
+            return self.temperature
+        scores = np.stack([self._scores(text) for text, _ in samples])
+        targets = np.array([target for _, target in samples])
+        scaled = scores[None, :, :] / TEMPERATURES[:, None, None]
+        top = scaled.max(axis=2, keepdims=True)
+        log_norm = np.log(np.exp(scaled - top).sum(axis=2)) + top[:, :, 0]
+        losses = (log_norm - scaled[:, np.arange(len(samples)), targets]).mean(
+            axis=1
+        )
+        self.temperature = float(TEMPERATURES[int(losses.argmin())])
+        return self.temperature
+
+    def _scores(self, text: str) -> np.ndarray:
+        """
+        Возвращает логарифмы ненормированных вероятностей категорий.
+        """
+        indices, values = vectorize(text, self.dim)
+        return self.log_prior + self.log_likelihood[:, indices] @ (
+            values * self.idf[indices]
+        )
+
+    def predict(self, text: str) -> tuple[str, float]:
+        """
+        Возвращает наиболее вероятную категорию и ее откалиброванную
+        вероятность.
+        """
+        scores = self._scores(text) / self.temperature
+        probabilities = np.exp(scores - scores.max())
+        probabilities /= probabilities.sum()
+        best = int(probabilities.argmax())
+        return self.labels[best], float(probabilities[best])
+
+    def save(self, path: str | Path) -> None:
+        """
+        Сохраняет модель в файл .npz.
+        """
+        np.savez_compressed(
+            path,
+            labels=np.array(self.labels),
+            idf=self.idf,
+            log_prior=self.log_prior,
+            log_likelihood=self.log_likelihood,
+            temperature=self.temperature,
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "CategoryModel":
+        """
+        Загружает модель из файла .npz.
+
+        У моделей, сохраненных без калибровки, температура равна 1.
+        """
+        with np.load(path) as data:
+            return cls(
+                labels=[str(label) for label in data["labels"]],
+                idf=data["idf"],
+                log_prior=data["log_prior"],
+                log_likelihood=data["log_likelihood"],
+                temperature=(
+                    float(data["temperature"]) if "temperature" in data else 1.0
+                ),
+            )
+
+
+_worker_model: CategoryModel | None = None  # Модель в процессе пула
+
+
+def _init_worker(path: str) -> None:
+    """
+    Загружает модель в процессе пула.
+    """
+    global _worker_model
+    _worker_model = CategoryModel.load(path)
+
+
+def _predict_in_worker(text: str) -> tuple[str, float]:
+    """
+    Определяет категорию в процессе пула.
+    """
+    return _worker_model.predict(text)
+
+
+class LocalCategoryClassifier:
+    """
+    Определяет категории жалоб локальной моделью в пуле процессов,
+    чтобы вычисления не блокировали цикл событий.
+    """
+
+    def __init__(self, config: LocalClassifierConfig) -> None:
+        """
+        Инициализация классификатора.
+
+        Параметры:
+        config: Путь к модели, порог уверенности и количество процессов
+        """
+        self._config = config
+        self._pool: ProcessPoolExecutor | None = None
+
+    @property
+    def threshold(self) -> float:
+        """
+        Возвращает порог уверенности, ниже которого нужен запрос к AI-модели.
+        """
+        return self._config.threshold
+
+    def start(self) -> bool:
+        """
+        Запускает пул процессов. Возвращает False, если модель не обучена.
+        """
+        path = Path(self._config.model_path)
+        if not path.exists():
+            log.warning(
+                "Файл локальной модели %s не найден, "
+                "категории будут определяться только AI-моделью",
+                path,
+            )
+            return False
+        self._pool = ProcessPoolExecutor(
+            max_workers=self._config.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(str(path),),
+        )
+        log.info("Локальный классификатор категорий загружен из %s", path)
+        return True
+
+    def close(self) -> None:
+        """
+        Останавливает пул процессов.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def predict(self, text: str) -> tuple[CategoryLiteral, float] | None:
+        """
+        Возвращает категорию и уверенность или None, если модель не загружена.
+        """
+        if self._pool is None:
+            return None
+        return await asyncio.get_running_loop().run_in_executor(
+            self._pool,
+            _predict_in_worker,
+            text,
+        )
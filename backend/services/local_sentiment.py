@@ -0,0 +1,143 @@
+"""
+Модуль локального определения тональности текстов по словарю.
+"""
+
+import re
+from itertools import chain
+
+import numpy as np
+from core.enums.complaint import SentimentEnum
+
+from .sentiment_lexicon import INTENSIFIERS, NEGATORS, STEMS, WORDS
+
+TOKEN_PATTERN = re.compile(r"\w+|[.,;:!?]")
+PUNCTUATION = frozenset(".,;:!?")
+MIN_STEM_LENGTH = 4
+NEGATION_WINDOW = 3  # Сколько слов после отрицания меняют знак
+NEGATION_FACTOR = -0.75
+INTENSIFIER_FACTOR = 1.5
+NORMALIZATION = 4.0
+POLARITY_THRESHOLD = 0.1
+MEMO_SIZE = 100_000
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Разбивает текст на слова в нижнем регистре и знаки препинания,
+    которые ограничивают действие отрицания.
+    """
+    return TOKEN_PATTERN.findall(text.casefold().replace("n't", " not"))
+
+
+class LocalSentimentAnalyzer:
+    """
+    Определяет тональность русских и английских текстов по словарю.
+
+    Веса слов пакета текстов собираются в один массив NumPy, после
+    чего отрицания, усилители и суммирование по текстам выполняются
+    векторно. Итоговая оценка нормализуется в диапазон [-1, 1].
+    """
+
+    def __init__(self) -> None:
+        """
+        Инициализация анализатора.
+        """
+        self._memo: dict[str, float] = {}
+        self._max_stem = max(map(len, STEMS))
+
+    def _weight(self, token: str) -> float:
+        """
+        Возвращает вес слова, подбирая самую длинную подходящую основу.
+        """
+        weight = self._memo.get(token)
+        if weight is not None:
+            return weight
+        weight = WORDS.get(token, 0.0)
+        if not weight:
+            for length in range(
+                min(len(token), self._max_stem), MIN_STEM_LENGTH - 1, -1
+            ):
+                stem_weight = STEMS.get(token[:length])
+                if stem_weight is not None:
+                    weight = stem_weight
+                    break
+        if len(self._memo) >= MEMO_SIZE:
+            self._memo.clear()
+        self._memo[token] = weight
+        return weight
+
+    def analyze_many(
+        self,
+        texts: list[str],
+    ) -> list[tuple[SentimentEnum, float]]:
+        """
+        Возвращает тональность и уверенность для каждого текста.
+
+        Уверенность равна 0, если в тексте нет ни одного слова из словаря.
+        """
+        token_lists = [tokenize(text) for text in texts]
+        tokens = list(chain.from_iterable(token_lists))
+        count = len(tokens)
+        doc_ids = np.repeat(
+            np.arange(len(texts)),
+            [len(token_list) for token_list in token_lists],
+        )
+        weights = np.fromiter(map(self._weight, tokens), np.float64, count)
+        is_negator = np.fromiter(
+            (token in NEGATORS for token in tokens), bool, count
+        )
+        is_intensifier = np.fromiter(
+            (token in INTENSIFIERS for token in tokens), bool, count
+        )
+        is_punctuation = np.fromiter(
+            (token in PUNCTUATION for token in tokens), bool, count
+        )
+        if not count:
+            return [(SentimentEnum.neutral, 0.0)] * len(texts)
+
+        positions = np.arange(count)
+        # Позиции последнего отрицания и знака препинания перед каждым словом
+        last_negator = np.maximum.accumulate(
+            np.where(is_negator, positions, -1)
+        )
+        last_negator = np.concatenate(([-1], last_negator[:-1]))
+        last_punctuation = np.maximum.accumulate(
+            np.where(is_punctuation, positions, -1)
+        )
+        negated = (
+            (last_negator > last_punctuation)
+            & (positions - last_negator <= NEGATION_WINDOW)
+            & (doc_ids[np.maximum(last_negator, 0)] == doc_ids)
+        )
+        boosted = np.concatenate(([False], is_intensifier[:-1])) & np.concatenate(
+            ([False], doc_ids[1:] == doc_ids[:-1])
+        )
+        weights = (
+            weights
+            * np.where(negated, NEGATION_FACTOR, 1.0)
+            * np.where(boosted, INTENSIFIER_FACTOR, 1.0)
+        )
+
+        totals = np.bincount(doc_ids, weights=weights, minlength=len(texts))
+        hits = np.bincount(
+            doc_ids, weights=weights != 0, minlength=len(texts)
+        )
+        scores = totals / np.sqrt(totals**2 + NORMALIZATION)
+
+        results = []
+        for score, hit_count in zip(scores.tolist(), hits.tolist()):
+            if score >= POLARITY_THRESHOLD:
+                results.append((SentimentEnum.positive, score))
+            elif score <= -POLARITY_THRESHOLD:
+                results.append((SentimentEnum.negative, -score))
+            else:
+                results.append(
+                    (SentimentEnum.neutral, 0.5 if hit_count else 0.0)
+                )
+        return results
+
+    def analyze(self, text: str) -> tuple[SentimentEnum, float]:
+        """
+        Возвращает тональность и уверенность для одного текста.
+        """
+        return self.analyze_many([text])[0]
@@ -0,0 +1,110 @@
+"""
+Модуль сбора метрик состояния сервиса: пула соединений с базой данных,
+очередей, ограничителей и выключателей внешних API.
+"""
+
+import asyncio
+import logging
+
+from core.config import MetricsConfig
+from core.metrics import (
+    CIRCUIT_BREAKER_OPEN,
+    DB_POOL_CONNECTIONS,
+    OUTBOUND_CONCURRENCY_LIMIT,
+    OUTBOUND_IN_FLIGHT,
+    QUEUE_DEPTH,
+    STREAM_SUBSCRIBERS,
+)
+from core.models import db_helper
+from sqlalchemy.pool import QueuePool
+
+from .broadcast import ComplaintBroadcaster
+from .circuit_breaker import CircuitState
+from .classification import ComplaintClassifier
+from .enrichment import EnrichmentPipeline
+from .webhooks import WebhookDispatcher
+
+log = logging.getLogger(__name__)
+
+
+class MetricsSampler:
+    """
+    Периодически записывает в метрики текущее состояние сервиса.
+
+    Счетчики и время запросов учитываются в момент событий, а размеры
+    очередей и пула опрашиваются раз в sample_interval секунд: так
+    на обработку запросов не тратится дополнительное время, а при
+    нескольких процессах в метрики попадает состояние каждого из них.
+    """
+
+    def __init__(
+        self,
+        config: MetricsConfig,
+        classifier: ComplaintClassifier,
+        pipeline: EnrichmentPipeline,
+        dispatcher: WebhookDispatcher,
+        broadcaster: ComplaintBroadcaster,
+    ) -> None:
+        """
+        Инициализация сборщика.
+
+        Параметры:
+        config: Интервал опроса
+        classifier: Классификатор с ограничителями и выключателями
+        pipeline: Конвейер фонового обогащения
+        dispatcher: Доставка жалоб на вебхуки
+        broadcaster: Рассылка жалоб подписчикам потоков
+        """
+        self._config = config
+        self._classifier = classifier
+        self._pipeline = pipeline
+        self._dispatcher = dispatcher
+        self._broadcaster = broadcaster
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """
+        Запускает периодический опрос.
+        """
+        self.sample()
+        self._task = asyncio.create_task(self._run(), name="metrics-sampler")
+
+    async def stop(self) -> None:
+        """
+        Останавливает опрос.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def sample(self) -> None:
+        """
+        Записывает текущее состояние в метрики.
+        """
+        pool = db_helper.engine.pool
+        if isinstance(pool, QueuePool):
+            DB_POOL_CONNECTIONS.labels("checked_out").set(pool.checkedout())
+            DB_POOL_CONNECTIONS.labels("idle").set(pool.checkedin())
+            DB_POOL_CONNECTIONS.labels("overflow").set(max(0, pool.overflow()))
+        QUEUE_DEPTH.labels("enrichment").set(self._pipeline.depth)
+        QUEUE_DEPTH.labels("webhooks").set(self._dispatcher.depth)
+        for kind, limiter in self._classifier.limiters.items():
+            stats = limiter.stats()
+            QUEUE_DEPTH.labels(f"outbound_{kind}").set(stats["queued"])
+            OUTBOUND_IN_FLIGHT.labels(kind).set(stats["in_flight"])
+            OUTBOUND_CONCURRENCY_LIMIT.labels(kind).set(stats["limit"])
+        for kind, breaker in self._classifier.breakers.items():
+            CIRCUIT_BREAKER_OPEN.labels(kind).set(breaker.state == CircuitState.open)
+        STREAM_SUBSCRIBERS.set(self._broadcaster.subscribers)
+
+    async def _run(self) -> None:
+        """
+        Опрашивает состояние каждые sample_interval секунд.
+        """
+        while True:
+            await asyncio.sleep(self._config.sample_interval)
+            try:
+                self.sample()
+            except Exception:
+                log.exception("Ошибка при сборе метрик")
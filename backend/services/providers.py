@@ -0,0 +1,115 @@
+"""
+Модуль запросов к внешним API классификации жалоб.
+
+Функции модуля не подавляют ошибки - это делает ComplaintClassifier.
+"""
+
+import json
+
+from aiohttp import ClientSession
+from core.clients.inference import PooledInferenceClient
+from core.config import settings
+from core.enums.complaint import CategoryLiteral, SentimentEnum
+
+
+async def request_category(
+    text: str,
+    inference_client: PooledInferenceClient,
+) -> CategoryLiteral:
+    """
+    Запрашивает категорию жалобы у AI-модели.
+    """
+    response = await inference_client.chat_completion(
+        messages=[
+            {
+                "role": "user",
+                "content": f"Определи категорию этой жалобы: \n\n{text}\n\n"
+                f'Варианты: "Техническая", "Оплата", "Другое". '
+                f"Дай ответ только одним из этих слов.",
+            }
+        ],
+    )
+    return parse_category(response.choices[0].message.content)
+
+
+def parse_category(content: str) -> CategoryLiteral:
+    """
+    Приводит ответ модели к одной из категорий.
+    """
+    content = content.lower()
+    # Бывают случаи, когда модель выдает ответ, который точно не
+    # соответствует ожидаемым категориям
+    if "техн" in content:
+        return "Техническая"
+    if "опл" in content:
+        return "Оплата"
+    return "Другое"
+
+
+class BatchParseError(ValueError):
+    """
+    Ответ модели на пакетный запрос не удалось разобрать.
+    """
+
+
+async def request_categories(
+    texts: list[str],
+    inference_client: PooledInferenceClient,
+) -> str:
+    """
+    Запрашивает категории нескольких жалоб одним запросом к AI-модели
+    и возвращает текст ответа, который разбирает parse_categories.
+    """
+    response = await inference_client.chat_completion(
+        messages=[
+            {
+                "role": "user",
+                "content": "Определи категорию каждой жалобы из JSON-массива: "
+                f"\n\n{json.dumps(texts, ensure_ascii=False)}\n\n"
+                f'Варианты: "Техническая", "Оплата", "Другое". '
+                f"Дай ответ только JSON-массивом из {len(texts)} строк "
+                f"с категориями в том же порядке, без пояснений.",
+            }
+        ],
+        max_tokens=16 * len(texts),
+    )
+    return response.choices[0].message.content
+
+
+def parse_categories(content: str, count: int) -> list[CategoryLiteral]:
+    """
+    Приводит ответ модели на пакетный запрос к списку из count категорий.
+
+    Если ответ не является JSON-массивом нужной длины,
+    выбрасывает BatchParseError.
+    """
+    start, end = content.find("["), content.rfind("]")
+    if start == -1 or end < start:
+        raise BatchParseError(content)
+    try:
+        answers = json.loads(content[start : end + 1])
+    except json.JSONDecodeError as e:
+        raise BatchParseError(content) from e
+    if not isinstance(answers, list) or len(answers) != count:
+        raise BatchParseError(content)
+    return [parse_category(str(answer)) for answer in answers]
+
+
+async def request_sentiment(
+    text: str,
+    client_session: ClientSession,
+) -> SentimentEnum:
+    """
+    Запрашивает тональность текста у стороннего API.
+    """
+    async with client_session.post(
+        settings.resources.sentinel.url,
+        data=text,
+        headers={"apikey": settings.resources.sentinel.key},
+        raise_for_status=True,
+    ) as response:
+        json = await response.json()
+        result = json["sentiment"]
+        if result in SentimentEnum:
+            return result
+    return SentimentEnum.unknown
@@ -0,0 +1,294 @@
+"""
+Модуль ограничения исходящих запросов к внешним API.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from aiohttp import ClientResponseError
+from core.config import OutboundLimitConfig
+
+log = logging.getLogger(__name__)
+
+EWMA_FAST = 0.3  # Вес нового замера в текущей задержке
+EWMA_SLOW = 0.02  # Вес нового замера в базовой задержке
+MIN_LATENCY_INCREASE = 0.01  # Меньший рост задержки в секундах не учитывается
+
+
+class RateLimitExceeded(Exception):
+    """
+    Запрос к внешнему API отклонен ограничителем: очередь переполнена
+    или ожидание заняло бы больше допустимого.
+    """
+
+
+def is_overload(error: BaseException) -> bool:
+    """
+    Возвращает True, если ошибка означает перегрузку внешнего API:
+    ответ 429, 5xx или истекшее время ожидания.
+    """
+    if isinstance(error, ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, TimeoutError)
+
+
+class TokenBucket:
+    """
+    Корзина токенов: в среднем rate запросов в секунду,
+    но не больше burst запросов подряд.
+
+    Токены резервируются заранее, поэтому ожидающие получают
+    их в порядке очереди.
+    """
+
+    def __init__(self, rate: float, burst: float) -> None:
+        """
+        Инициализация корзины.
+
+        Параметры:
+        rate: Скорость пополнения, токенов в секунду
+        burst: Вместимость корзины
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated_at = time.monotonic()
+
+    def reserve(self, max_wait: float) -> float | None:
+        """
+        Резервирует токен и возвращает, сколько секунд нужно подождать
+        до его появления. Если ждать пришлось бы дольше max_wait,
+        токен не резервируется и возвращается None.
+        """
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst,
+            self._tokens + (now - self._updated_at) * self.rate,
+        )
+        self._updated_at = now
+        wait = max(0.0, (1 - self._tokens) / self.rate)
+        if wait > max_wait:
+            return None
+        self._tokens -= 1
+        return wait
+
+    def cancel(self) -> None:
+        """
+        Возвращает токен, если зарезервировавший его запрос отменен.
+        """
+        self._tokens = min(self.burst, self._tokens + 1)
+
+
+class OutboundLimiter:
+    """
+    Ограничитель запросов к одному внешнему API.
+
+    Скорость ограничивается корзиной токенов, а число одновременных
+    запросов - адаптивным лимитом (AIMD): после каждого успешного ответа
+    лимит растет на 1/limit, а при ответе 429 или 5xx, истекшем времени
+    ожидания или росте задержки выше latency_tolerance от базовой
+    уменьшается в backoff раз, но не чаще раза в cooldown секунд.
+
+    Запрос, который не дождется очереди за max_wait секунд,
+    отклоняется с ошибкой RateLimitExceeded.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: OutboundLimitConfig,
+        processes: int = 1,
+    ) -> None:
+        """
+        Инициализация ограничителя.
+
+        Параметры:
+        name: Название API для логов и метрик
+        config: Скорость, границы лимита и параметры ожидания
+        processes: Количество процессов сервиса; каждому достается
+        своя доля скорости config.rate
+        """
+        self.name = name
+        self._config = config
+        self._bucket = TokenBucket(
+            rate=config.rate / processes,
+            burst=max(1.0, config.burst / processes),
+        )
+        self._limit = float(config.initial_concurrency)
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._queued = 0
+        self._latency: float | None = None
+        self._baseline: float | None = None
+        self._decreased_at = float("-inf")
+        self._waits: deque[float] = deque(maxlen=1000)
+        self._counters = {
+            "accepted": 0,
+            "rejected": 0,
+            "overloads": 0,
+            "decreases": 0,
+        }
+
+    @property
+    def limit(self) -> int:
+        """
+        Возвращает текущий лимит одновременных запросов.
+        """
+        return int(self._limit)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """
+        Ждет разрешения на запрос и учитывает его результат.
+        """
+        if not self._config.enabled:
+            yield
+            return
+        started = time.monotonic()
+        await self._wait_turn(started)
+        self._waits.append(time.monotonic() - started)
+        self._counters["accepted"] += 1
+        call_started = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            if is_overload(e):
+                self._counters["overloads"] += 1
+                self._decrease(f"ошибка {e!r}")
+            raise
+        else:
+            self._record_latency(time.monotonic() - call_started)
+        finally:
+            self._in_flight -= 1
+            self._wake()
+
+    def stats(self) -> dict[str, float | int]:
+        """
+        Возвращает метрики ограничителя: текущий лимит, очередь,
+        счетчики и время ожидания в очереди в миллисекундах.
+        """
+        waits = sorted(self._waits)
+
+        def percentile(share: float) -> float:
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(share * len(waits)))] * 1000
+
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+            "rate": self._bucket.rate,
+            **self._counters,
+            "wait_p50_ms": percentile(0.5),
+            "wait_p95_ms": percentile(0.95),
+            "wait_max_ms": waits[-1] * 1000 if waits else 0.0,
+        }
+
+    async def _wait_turn(self, started: float) -> None:
+        """
+        Ждет токен и свободное место среди одновременных запросов.
+        """
+        if self._queued >= self._config.max_queue:
+            self._reject("очередь заполнена")
+        wait = self._bucket.reserve(self._config.max_wait)
+        if wait is None:
+            self._reject("превышена скорость запросов")
+        self._queued += 1
+        try:
+            if wait:
+                try:
+                    await asyncio.sleep(wait)
+                except asyncio.CancelledError:
+                    self._bucket.cancel()
+                    raise
+            while self._waiters and self._waiters[0].done():
+                self._waiters.popleft()
+            if self._in_flight < self.limit and not self._waiters:
+                self._in_flight += 1
+                return
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+            timeout = self._config.max_wait - (time.monotonic() - started)
+            try:
+                await asyncio.wait_for(asyncio.shield(future), max(timeout, 0))
+            except TimeoutError:
+                if not future.done():
+                    future.cancel()
+                    self._reject("превышено время ожидания в очереди")
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Место уже выделено, но запрос отменен
+                    self._in_flight -= 1
+                    self._wake()
+                else:
+                    future.cancel()
+                raise
+        finally:
+            self._queued -= 1
+
+    def _wake(self) -> None:
+        """
+        Выделяет освободившиеся места ожидающим в порядке очереди.
+        """
+        while self._waiters and self._in_flight < self.limit:
+            future = self._waiters.popleft()
+            if future.done():
+                continue
+            self._in_flight += 1
+            future.set_result(None)
+
+    def _reject(self, reason: str) -> None:
+        """
+        Отклоняет запрос.
+        """
+        self._counters["rejected"] += 1
+        raise RateLimitExceeded(f"Запрос к {self.name} отклонен: {reason}")
+
+    def _record_latency(self, latency: float) -> None:
+        """
+        Учитывает задержку успешного ответа и меняет лимит.
+        """
+        if self._latency is None:
+            self._latency = self._baseline = latency
+        else:
+            self._latency += EWMA_FAST * (latency - self._latency)
+            self._baseline += EWMA_SLOW * (latency - self._baseline)
+        if (
+            self._latency > self._baseline * self._config.latency_tolerance
+            and self._latency - self._baseline > MIN_LATENCY_INCREASE
+        ):
+            self._decrease(
+                f"задержка {self._latency * 1000:.0f} мс "
+                f"при базовой {self._baseline * 1000:.0f} мс"
+            )
+            return
+        self._limit = min(
+            float(self._config.max_concurrency),
+            self._limit + 1 / self._limit,
+        )
+        self._wake()
+
+    def _decrease(self, reason: str) -> None:
+        """
+        Уменьшает лимит одновременных запросов.
+        """
+        now = time.monotonic()
+        if now - self._decreased_at < self._config.cooldown:
+            return
+        self._decreased_at = now
+        self._limit = max(
+            float(self._config.min_concurrency),
+            self._limit * self._config.backoff,
+        )
+        self._counters["decreases"] += 1
+        log.warning(
+            "Лимит одновременных запросов к %s снижен до %s: %s",
+            self.name,
+            self.limit,
+            reason,
+        )
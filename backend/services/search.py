@@ -0,0 +1,141 @@
+"""
+Модуль полнотекстового поиска жалоб.
+
+Запрос разбирается на слова, фразы в кавычках и начала слов
+со звездочкой и преобразуется в запрос FTS5 для SQLite или tsquery
+для PostgreSQL. FTS5 не умеет приводить русские слова к основе,
+поэтому слово без кавычек ищется по первым PREFIX_LENGTH буквам:
+"оплатить" находит "оплата" и "оплатил".
+"""
+
+import logging
+import re
+
+from core.config import settings
+from core.dao.complaint import ComplaintDao
+from core.schemas.complaint import (
+    ComplaintAllInfoSchema,
+    ComplaintSearchResultSchema,
+    ComplaintSearchSchema,
+    SearchCursorSchema,
+)
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+log = logging.getLogger(__name__)
+
+TERM_PATTERN = re.compile(r'"([^"]*)"?|(\S+)')
+WORD_PATTERN = re.compile(r"\w+")
+PREFIX_LENGTH = 5
+MIN_PREFIX_LENGTH = 3  # Более короткие слова ищутся целиком
+
+# Элемент запроса: слова фразы и признак поиска по началу последнего слова
+SearchTerm = tuple[tuple[str, ...], bool]
+
+
+def parse_query(query: str) -> list[SearchTerm]:
+    """
+    Разбирает поисковый запрос на фразы в кавычках, начала слов
+    со звездочкой и отдельные слова. Знаки препинания отбрасываются.
+    """
+    terms = []
+    # Индекс хранит тексты с "е" вместо "ё"
+    folded = query.casefold().replace("ё", "е")
+    for phrase, token in TERM_PATTERN.findall(folded):
+        if phrase:
+            words = WORD_PATTERN.findall(phrase)
+            if words:
+                terms.append((tuple(words), False))
+            continue
+        words = WORD_PATTERN.findall(token)
+        if not words:
+            continue
+        if token.endswith("*"):
+            terms.append((tuple(words), True))
+        elif len(words) > 1:
+            # "Wi-Fi" и подобные слова ищутся как фраза
+            terms.append((tuple(words), False))
+        elif len(words[0]) >= MIN_PREFIX_LENGTH:
+            terms.append(((words[0][:PREFIX_LENGTH],), True))
+        else:
+            terms.append(((words[0],), False))
+    return terms
+
+
+def to_fts5(terms: list[SearchTerm]) -> str:
+    """
+    Возвращает запрос FTS5, в котором должны совпасть все элементы.
+    """
+    return " ".join(
+        f'"{" ".join(words)}"' + ("*" if prefix else "") for words, prefix in terms
+    )
+
+
+def to_tsquery(terms: list[SearchTerm]) -> str:
+    """
+    Возвращает запрос tsquery для PostgreSQL, в котором должны совпасть
+    все элементы. Слова приводятся к основе словарем russian,
+    поэтому слова без звездочки ищутся целиком.
+    """
+    parts = []
+    for words, prefix in terms:
+        lexemes = [f"'{word}'" for word in words]
+        if prefix:
+            lexemes[-1] += ":*"
+        parts.append(f"({' <-> '.join(lexemes)})")
+    return " & ".join(parts)
+
+
+async def search_complaints(
+    search: ComplaintSearchSchema,
+    session: AsyncSession,
+) -> ComplaintSearchResultSchema:
+    """
+    Ищет жалобы по тексту с фильтрами по категории, тональности
+    и статусу и возвращает страницу результатов и курсор следующей.
+    """
+    terms = parse_query(search.q)
+    if not terms:
+        return ComplaintSearchResultSchema(complaints=[])
+    newest = search.sort == "newest"
+    cursor = None
+    if search.cursor is not None:
+        cursor = SearchCursorSchema.decode(search.cursor)
+        if (cursor.rank is None) != newest:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="cursor получен для другой сортировки",
+            )
+
+    dao = ComplaintDao(session=session)
+    if dao.dialect_name == "postgresql":
+        match = to_tsquery(terms)
+    else:
+        match = to_fts5(terms)
+    rows = await dao.search(
+        match=match,
+        limit=search.limit + 1,
+        newest=newest,
+        after_rank=cursor.rank if cursor is not None else None,
+        after_id=cursor.id if cursor is not None else None,
+        categories=search.category,
+        sentiments=search.sentiment,
+        statuses=search.status,
+        max_ranked=settings.search.max_ranked,
+    )
+
+    next_cursor = None
+    if len(rows) > search.limit:
+        rows = rows[: search.limit]
+        last, rank = rows[-1]
+        next_cursor = SearchCursorSchema(
+            rank=None if newest else rank,
+            id=last.id,
+        ).encode()
+    return ComplaintSearchResultSchema(
+        complaints=[
+            ComplaintAllInfoSchema.model_validate(record, from_attributes=True)
+            for record, _ in rows
+        ],
+        next_cursor=next_cursor,
+    )
@@ -0,0 +1,178 @@
+"""
+Словарь тональности для локального анализатора.
+
+Ключи STEMS - основы слов (не короче 4 символов), которые сравниваются
+с началом слова, ключи WORDS - слова целиком. Значения - вес тональности
+от -3 (резко негативно) до 3 (резко позитивно).
+"""
+
+STEMS: dict[str, float] = {
+    # Русский, негатив
+    "плох": -2.0,
+    "ужас": -2.5,
+    "отврат": -3.0,
+    "кошмар": -2.5,
+    "ненавиж": -3.0,
+    "ненавид": -3.0,
+    "раздраж": -2.0,
+    "разочаров": -2.0,
+    "обман": -2.5,
+    "груб": -2.0,
+    "хамил": -2.5,
+    "хамст": -2.5,
+    "медлен": -1.5,
+    "долго": -1.0,
+    "ошиб": -1.5,
+    "сбой": -1.5,
+    "слома": -2.0,
+    "полома": -2.0,
+    "проблем": -1.5,
+    "завис": -1.5,
+    "вылет": -1.5,
+    "глюч": -1.5,
+    "тормоз": -1.5,
+    "недовол": -2.0,
+    "невозмож": -1.5,
+    "отказ": -1.0,
+    "списа": -0.5,
+    "украл": -2.5,
+    "украд": -2.5,
+    "мошен": -3.0,
+    "беспредел": -2.5,
+    "безобраз": -2.5,
+    "позор": -2.0,
+    "отстой": -2.0,
+    "хуже": -2.0,
+    "худш": -2.5,
+    "жаль": -1.0,
+    "печал": -1.5,
+    "злой": -1.5,
+    "злюс": -1.5,
+    "возмущ": -2.0,
+    "бесполез": -2.0,
+    "неудоб": -1.5,
+    "некачеств": -2.0,
+    "брак": -1.5,
+    "дефект": -1.5,
+    "задерж": -1.0,
+    "опозда": -1.5,
+    "потерял": -1.5,
+    "игнор": -1.5,
+    "беси": -2.5,
+    "неприем": -2.0,
+    "непонят": -1.0,
+    "жалоб": -1.0,
+    "верните": -1.0,
+    "дважды": -0.5,
+    # Русский, позитив
+    "хорош": 1.5,
+    "отличн": 2.5,
+    "прекрас": 2.5,
+    "замечат": 2.0,
+    "спасиб": 1.5,
+    "благодар": 2.0,
+    "довол": 2.0,
+    "нрав": 1.5,
+    "любл": 2.0,
+    "быстр": 1.0,
+    "удобн": 1.5,
+    "рекоменд": 1.5,
+    "супер": 2.0,
+    "молодц": 2.0,
+    "помог": 1.5,
+    "вежлив": 1.5,
+    "качеств": 1.0,
+    "работа": 1.0,
+    "радуе": 1.5,
+    "рады": 1.5,
+    "восхит": 2.5,
+    "понрав": 2.0,
+    "идеальн": 2.5,
+    "лучш": 2.0,
+    # Английский
+    "terribl": -2.5,
+    "horribl": -2.5,
+    "crash": -2.0,
+    "fail": -2.0,
+    "error": -1.5,
+    "problem": -1.5,
+    "annoy": -2.0,
+    "disappoint": -2.0,
+    "useless": -2.0,
+    "refund": -0.5,
+    "hate": -2.5,
+    "frustrat": -2.0,
+    "broke": -2.0,
+    "charged": -0.5,
+    "excellent": 2.5,
+    "awesome": 2.5,
+    "amazing": 2.5,
+    "thank": 1.5,
+    "helpful": 1.5,
+    "satisf": 1.5,
+    "perfect": 2.5,
+    "recommend": 1.5,
+    "work": 1.0,
+    "love": 2.0,
+}
+
+WORDS: dict[str, float] = {
+    "рад": 1.5,
+    "рада": 1.5,
+    "зло": -1.5,
+    "хам": -2.5,
+    "bad": -2.0,
+    "awful": -2.5,
+    "worst": -3.0,
+    "worse": -2.0,
+    "bug": -1.5,
+    "bugs": -1.5,
+    "slow": -1.5,
+    "issue": -1.0,
+    "scam": -3.0,
+    "fraud": -3.0,
+    "rude": -2.0,
+    "angry": -2.0,
+    "stuck": -1.5,
+    "unable": -1.5,
+    "good": 1.5,
+    "great": 2.0,
+    "nice": 1.5,
+    "like": 1.0,
+    "fast": 1.0,
+    "happy": 2.0,
+}
+
+NEGATORS: frozenset[str] = frozenset(
+    {
+        "не",
+        "нет",
+        "ни",
+        "без",
+        "никогда",
+        "нисколько",
+        "not",
+        "no",
+        "never",
+        "none",
+        "nothing",
+        "without",
+    }
+)
+
+INTENSIFIERS: frozenset[str] = frozenset(
+    {
+        "очень",
+        "слишком",
+        "совсем",
+        "крайне",
+        "абсолютно",
+        "совершенно",
+        "very",
+        "extremely",
+        "really",
+        "so",
+        "too",
+        "totally",
+    }
+)
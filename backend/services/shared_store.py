@@ -0,0 +1,202 @@
+"""
+Модуль общего хранилища состояния, которое должно быть одинаковым
+во всех процессах сервиса: счетчиков, версий и коротких значений.
+"""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+
+from core.config import SharedStoreConfig
+from core.dao.store import SharedValueDao
+from core.models import db_helper
+
+log = logging.getLogger(__name__)
+
+
+class SharedStore(ABC):
+    """
+    Хранилище строк и счетчиков со временем жизни.
+
+    ttl задается в секундах; None означает бессрочное значение.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> str | None:
+        """
+        Возвращает значение или None, если его нет или оно устарело.
+        """
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        """
+        Сохраняет значение.
+        """
+
+    @abstractmethod
+    async def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        """
+        Атомарно увеличивает счетчик и возвращает новое значение.
+
+        ttl применяется, только когда счетчик создается заново,
+        поэтому счетчик с ttl считает события в фиксированном окне.
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """
+        Удаляет значение.
+        """
+
+    async def purge_expired(self) -> None:
+        """
+        Удаляет устаревшие значения.
+        """
+
+
+class MemoryStore(SharedStore):
+    """
+    Хранилище в памяти процесса.
+
+    Подходит для запуска с одним процессом: при нескольких процессах
+    у каждого будет своя копия значений.
+    """
+
+    def __init__(self) -> None:
+        """
+        Инициализация хранилища.
+        """
+        self._values: dict[str, tuple[float | None, str]] = {}
+
+    async def get(self, key: str) -> str | None:
+        """
+        Возвращает значение или None, если его нет или оно устарело.
+        Устаревшее значение удаляется.
+        """
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._values[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        """
+        Сохраняет значение в памяти процесса.
+        """
+        self._values[key] = (self._expires_at(ttl), value)
+
+    async def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        """
+        Увеличивает счетчик и возвращает новое значение.
+
+        Внутри процесса операция атомарна: между чтением и записью
+        нет переключения задач. Срок существующего счетчика не меняется.
+        """
+        current = await self.get(key)
+        if current is None:
+            value = amount
+            expires_at = self._expires_at(ttl)
+        else:
+            value = int(current) + amount
+            expires_at = self._values[key][0]
+        self._values[key] = (expires_at, str(value))
+        return value
+
+    async def delete(self, key: str) -> None:
+        """
+        Удаляет значение.
+        """
+        self._values.pop(key, None)
+
+    async def purge_expired(self) -> None:
+        """
+        Удаляет устаревшие значения.
+        """
+        now = time.monotonic()
+        for key, (expires_at, _) in list(self._values.items()):
+            if expires_at is not None and expires_at <= now:
+                del self._values[key]
+
+    @staticmethod
+    def _expires_at(ttl: float | None) -> float | None:
+        """
+        Возвращает момент устаревания по часам time.monotonic.
+        """
+        return None if ttl is None else time.monotonic() + ttl
+
+
+class DatabaseStore(SharedStore):
+    """
+    Хранилище в таблице sharedvalues базы данных сервиса.
+
+    Доступно всем процессам, которые подключены к той же базе.
+    """
+
+    async def get(self, key: str) -> str | None:
+        """
+        Возвращает значение или None, если его нет или оно устарело.
+        """
+        async with db_helper.session_factory() as session:
+            return await SharedValueDao(session=session).get_value(key)
+
+    async def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        """
+        Сохраняет значение, заменяя существующее.
+        """
+        async with db_helper.session_factory() as session:
+            await SharedValueDao(session=session).put_value(
+                key=key,
+                value=value,
+                expires_at=self._expires_at(ttl),
+            )
+            await session.commit()
+
+    async def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        """
+        Атомарно увеличивает счетчик одним запросом к базе данных
+        и возвращает новое значение.
+        """
+        async with db_helper.session_factory() as session:
+            value = await SharedValueDao(session=session).increment(
+                key=key,
+                amount=amount,
+                expires_at=self._expires_at(ttl),
+            )
+            await session.commit()
+        return value
+
+    async def delete(self, key: str) -> None:
+        """
+        Удаляет значение.
+        """
+        async with db_helper.session_factory() as session:
+            await SharedValueDao(session=session).delete_by_key(key)
+            await session.commit()
+
+    async def purge_expired(self) -> None:
+        """
+        Удаляет устаревшие значения из таблицы.
+        """
+        async with db_helper.session_factory() as session:
+            await SharedValueDao(session=session).delete_expired()
+            await session.commit()
+
+    @staticmethod
+    def _expires_at(ttl: float | None) -> datetime | None:
+        """
+        Возвращает время устаревания для столбца expires_at.
+        """
+        return None if ttl is None else datetime.now() + timedelta(seconds=ttl)
+
+
+def create_shared_store(config: SharedStoreConfig) -> SharedStore:
+    """
+    Создает хранилище, выбранное в настройках.
+    """
+    if config.backend == "database":
+        return DatabaseStore()
+    return MemoryStore()
@@ -0,0 +1,212 @@
+"""
+Модуль статистики жалоб по часам и дням.
+
+Триггеры таблицы complaints записывают каждое изменение количества
+жалоб (создание жалобы, смена статуса, тональности или категории)
+в таблицу изменений. Фоновая задача периодически переносит изменения
+в таблицу статистики, где хранится количество жалоб за каждый час
+и день, поэтому время ответа зависит от длины запрошенного периода,
+а не от размера таблицы жалоб.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+
+from core.config import StatsConfig
+from core.dao.stats import ComplaintStatChangeDao, ComplaintStatDao, StatKey
+from core.enums.complaint import SentimentEnum, StatusEnum
+from core.schemas.complaint import (
+    ComplaintStatsQuerySchema,
+    StatsGroupSchema,
+    complaint_stats_adapter,
+)
+from fastapi import HTTPException, status
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+log = logging.getLogger(__name__)
+
+PERIODS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+DEFAULT_BUCKETS = {"hour": 24, "day": 30}
+# Значения столбцов статистики хранятся строками
+ENUM_VALUES = {
+    "status": {item.value: item for item in StatusEnum},
+    "sentiment": {item.value: item for item in SentimentEnum},
+}
+
+
+def bucket_start(value: datetime, period: str) -> datetime:
+    """
+    Возвращает начало часа или дня, в который попадает value.
+    """
+    value = value.replace(minute=0, second=0, microsecond=0)
+    if period == "day":
+        value = value.replace(hour=0)
+    return value
+
+
+class ComplaintStats:
+    """
+    Статистика жалоб: перенос изменений в таблицу статистики
+    и выдача количества жалоб с кэшем ответов в памяти процесса.
+    """
+
+    def __init__(
+        self,
+        config: StatsConfig,
+        session_factory: async_sessionmaker,
+    ) -> None:
+        """
+        Инициализация статистики.
+
+        Параметры:
+        config: Интервал и размер пакета переноса, настройки кэша
+        session_factory: Фабрика сессий базы данных
+        """
+        self._config = config
+        self._session_factory = session_factory
+        self._cache: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """
+        Запускает периодический перенос изменений.
+        """
+        self._task = asyncio.create_task(self._run(), name="complaint-stats")
+
+    async def stop(self) -> None:
+        """
+        Останавливает перенос изменений.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def compact(self) -> int:
+        """
+        Переносит все накопленные изменения в таблицу статистики
+        пакетами по batch_size и возвращает количество изменений.
+
+        Каждый пакет удаляется из таблицы изменений и добавляется
+        к статистике в одной транзакции.
+        """
+        total = 0
+        while True:
+            async with self._session_factory() as session:
+                changes = await ComplaintStatChangeDao(session=session).take(
+                    limit=self._config.batch_size,
+                )
+                counts: Counter[StatKey] = Counter()
+                for timestamp, complaint_status, sentiment, category, delta in changes:
+                    for period in PERIODS:
+                        key = (
+                            period,
+                            bucket_start(timestamp, period),
+                            complaint_status,
+                            sentiment,
+                            category,
+                        )
+                        counts[key] += delta
+                await ComplaintStatDao(session=session).add_counts(counts)
+                await session.commit()
+            total += len(changes)
+            if len(changes) < self._config.batch_size:
+                return total
+
+    async def get(self, query: ComplaintStatsQuerySchema) -> bytes:
+        """
+        Возвращает количество жалоб по периодам в JSON из кэша
+        или таблицы статистики.
+        """
+        key = query.model_dump_json()
+        entry = self._cache.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.monotonic():
+                return result
+            del self._cache[key]
+
+        result = await self._load(query)
+        self._cache[key] = (time.monotonic() + self._config.cache_ttl, result)
+        while len(self._cache) > self._config.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    async def _load(self, query: ComplaintStatsQuerySchema) -> bytes:
+        """
+        Читает количество жалоб из таблицы статистики и сериализует в JSON.
+        """
+        step = PERIODS[query.period]
+        group_by = list(dict.fromkeys(query.group_by))
+        if query.until is None:
+            until = bucket_start(datetime.now(), query.period) + step
+        else:
+            until = bucket_start(query.until, query.period)
+            if until < query.until:
+                until += step
+        if query.since is None:
+            since = until - step * DEFAULT_BUCKETS[query.period]
+        else:
+            since = bucket_start(query.since, query.period)
+        if (until - since) / step > self._config.max_buckets:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Период содержит больше {self._config.max_buckets} "
+                f"интервалов {query.period}",
+            )
+
+        async with self._session_factory() as session:
+            rows = await ComplaintStatDao(session=session).get_counts(
+                period=query.period,
+                since=since,
+                until=until,
+                group_by=group_by,
+                statuses=query.status,
+                sentiments=query.sentiment,
+                categories=query.category,
+            )
+        groups: dict[datetime, list[StatsGroupSchema]] = {}
+        for bucket, *values, count in rows:
+            group = {"status": None, "sentiment": None, "category": None}
+            for name, value in zip(group_by, values):
+                # Пустая строка - значение еще не определено
+                group[name] = ENUM_VALUES.get(name, {}).get(value, value) or None
+            group["count"] = count
+            groups.setdefault(bucket, []).append(group)
+        buckets = []
+        start = since
+        while start < until:
+            bucket_groups = groups.get(start, [])
+            buckets.append(
+                {
+                    "start": start,
+                    "total": sum(group["count"] for group in bucket_groups),
+                    "groups": bucket_groups,
+                }
+            )
+            start += step
+        return complaint_stats_adapter.dump_json(
+            {
+                "period": query.period,
+                "since": since,
+                "until": until,
+                "buckets": buckets,
+            }
+        )
+
+    async def _run(self) -> None:
+        """
+        Переносит изменения каждые compact_interval секунд.
+        """
+        while True:
+            try:
+                compacted = await self.compact()
+                if compacted:
+                    log.debug("В статистику перенесено %s изменений", compacted)
+            except SQLAlchemyError:
+                log.exception("Ошибка при переносе изменений в статистику жалоб")
+            await asyncio.sleep(self._config.compact_interval)
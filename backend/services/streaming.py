@@ -0,0 +1,121 @@
+"""
+Модуль потокового разбора NDJSON и JSON-массивов.
+"""
+
+import re
+from collections.abc import AsyncIterable, AsyncIterator
+
+JSON_TOKENS = re.compile(rb'[\[\]{}",\\]')
+WHITESPACE = b" \t\r\n"
+
+
+class JsonArraySplitter:
+    """
+    Выделяет элементы JSON-массива верхнего уровня по мере поступления
+    данных, не загружая массив целиком.
+
+    Элементы возвращаются в виде байтов и разбираются вызывающим кодом.
+    """
+
+    def __init__(self) -> None:
+        """
+        Инициализация разборщика.
+        """
+        self._buffer = b""
+        self._depth = 0  # 1 - внутри массива верхнего уровня
+        self._in_string = False
+        self._escaped = -1  # Позиция экранированного символа в буфере
+        self.finished = False
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        """
+        Принимает очередную порцию данных и возвращает
+        полностью полученные элементы.
+        """
+        if self.finished:
+            if chunk.strip(WHITESPACE):
+                raise ValueError("Данные после конца JSON-массива")
+            return []
+        scanned = len(self._buffer)
+        self._buffer += chunk
+        elements = []
+        consumed = 0  # Начало текущего элемента в буфере
+        for match in JSON_TOKENS.finditer(self._buffer, scanned):
+            position = match.start()
+            token = match.group()
+            if position == self._escaped:
+                continue
+            if self._in_string:
+                if token == b"\\":
+                    self._escaped = position + 1
+                elif token == b'"':
+                    self._in_string = False
+                continue
+            if self._depth == 0:
+                if token != b"[" or self._buffer[:position].strip(WHITESPACE):
+                    raise ValueError("Ожидался JSON-массив")
+                self._depth = 1
+                consumed = position + 1
+            elif token == b'"':
+                self._in_string = True
+            elif token in (b"[", b"{"):
+                self._depth += 1
+            elif token in (b"]", b"}"):
+                self._depth -= 1
+                if self._depth == 0:
+                    element = self._buffer[consumed:position].strip(WHITESPACE)
+                    if element or elements:
+                        elements.append(element)
+                    if self._buffer[position + 1 :].strip(WHITESPACE):
+                        raise ValueError("Данные после конца JSON-массива")
+                    self.finished = True
+                    self._buffer = b""
+                    return elements
+            elif token == b"," and self._depth == 1:
+                elements.append(self._buffer[consumed:position].strip(WHITESPACE))
+                consumed = position + 1
+        self._buffer = self._buffer[consumed:]
+        self._escaped -= consumed
+        return elements
+
+
+async def iter_records(
+    chunks: AsyncIterable[bytes],
+) -> AsyncIterator[tuple[int, bytes]]:
+    """
+    Возвращает номер и содержимое каждой записи потока.
+
+    Если первый значимый символ потока - "[", поток разбирается как
+    JSON-массив (номер записи - номер элемента), иначе как NDJSON
+    (номер записи - номер строки, пустые строки пропускаются).
+    """
+    splitter: JsonArraySplitter | None = None
+    buffer = b""
+    number = 0
+    detected = False
+    async for chunk in chunks:
+        if not detected:
+            buffer += chunk
+            stripped = buffer.lstrip(WHITESPACE)
+            if not stripped:
+                continue
+            detected = True
+            if stripped.startswith(b"["):
+                splitter = JsonArraySplitter()
+            chunk, buffer = buffer, b""
+        if splitter is not None:
+            for element in splitter.feed(chunk):
+                number += 1
+                yield number, element
+            continue
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            if line.strip(WHITESPACE):
+                yield number, line
+    if splitter is not None:
+        if not splitter.finished:
+            raise ValueError("JSON-массив не завершен")
+    elif buffer.strip(WHITESPACE):
+        yield number + 1, buffer
@@ -0,0 +1,354 @@
+"""
+Модуль доставки обогащенных жалоб на вебхуки.
+"""
+
+import asyncio
+import logging
+
+from aiohttp import ClientError, ClientSession, ClientTimeout
+from core.config import WebhookConfig
+from core.dao.webhook import WebhookDeadLetterDao, WebhookTargetDao
+from core.enums.complaint import StatusEnum
+from core.metrics import WEBHOOK_QUEUE_OVERFLOW
+from core.models import db_helper
+from core.schemas.complaint import ComplaintAllInfoSchema, OpenComplaintsSchema
+from core.schemas.webhook import (
+    WebhookDeadLetterCreateSchema,
+    WebhookTargetReadSchema,
+)
+from sqlalchemy.exc import SQLAlchemyError
+
+from .shared_store import SharedStore
+
+log = logging.getLogger(__name__)
+
+RETRYABLE_CLIENT_ERRORS = {408, 429}
+TARGETS_VERSION_KEY = "webhooks:targets:version"
+QUEUE_FULL_ERROR = "Очередь вебхука заполнена"
+
+
+class WebhookDispatcher:
+    """
+    Отправляет обогащенные жалобы на зарегистрированные вебхуки.
+
+    Для каждого вебхука работает отдельная задача со своей очередью:
+    жалобы собираются в пакеты, пакеты отправляются по очереди с повторами,
+    а разные вебхуки обслуживаются параллельно через общую сессию aiohttp.
+    Пакеты, которые не удалось доставить, сохраняются в таблицу
+    webhookdeadletters. Жалобы, не поместившиеся в заполненную очередь,
+    тоже сохраняются туда, но задачей вебхука после отправки текущего
+    пакета, а не в publish.
+
+    При изменении списка вебхуков увеличивается версия в общем хранилище,
+    и остальные процессы сервиса перечитывают список из базы данных.
+    """
+
+    def __init__(
+        self,
+        client_session: ClientSession,
+        config: WebhookConfig,
+        store: SharedStore,
+    ) -> None:
+        """
+        Инициализация диспетчера.
+
+        Параметры:
+        client_session: Общая сессия aiohttp
+        config: Размер пакетов, задержка и параметры повторов
+        store: Общее хранилище, в котором хранится версия списка вебхуков
+        """
+        self._client_session = client_session
+        self._config = config
+        self._store = store
+        self._targets: dict[int, WebhookTargetReadSchema] = {}
+        self._queues: dict[int, asyncio.Queue[ComplaintAllInfoSchema]] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._overflow: dict[int, list[ComplaintAllInfoSchema]] = {}
+        self.overflowed = 0
+        self._version: str | None = None
+        self._refresh_task: asyncio.Task | None = None
+
+    @property
+    def targets(self) -> list[WebhookTargetReadSchema]:
+        """
+        Возвращает вебхуки, на которые отправляются жалобы.
+        """
+        return list(self._targets.values())
+
+    @property
+    def depth(self) -> int:
+        """
+        Возвращает количество жалоб в очередях всех вебхуков.
+        """
+        return sum(queue.qsize() for queue in self._queues.values())
+
+    async def start(self) -> None:
+        """
+        Загружает активные вебхуки из базы данных и запускает их задачи.
+        """
+        if not self._config.enabled:
+            return
+        self._version = await self._store.get(TARGETS_VERSION_KEY)
+        await self._load_targets()
+        self._refresh_task = asyncio.create_task(
+            self._refresh(),
+            name="webhook-refresh",
+        )
+        log.info("Доставка на вебхуки запущена для %s адресов", len(self._targets))
+
+    async def stop(self) -> None:
+        """
+        Останавливает задачи вебхуков.
+
+        Жалобы, которые не успели отправить, сохраняются как недоставленные.
+        """
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._queues.clear()
+        self._overflow.clear()
+        self._targets.clear()
+        log.info("Доставка на вебхуки остановлена.")
+
+    def add_target(self, target: WebhookTargetReadSchema) -> None:
+        """
+        Начинает отправку жалоб на вебхук.
+        """
+        if not self._config.enabled or not target.active:
+            return
+        if target.id in self._targets:
+            return
+        self._targets[target.id] = target
+        self._queues[target.id] = asyncio.Queue(maxsize=self._config.queue_size)
+        self._tasks[target.id] = asyncio.create_task(
+            self._run(target),
+            name=f"webhook-{target.id}",
+        )
+
+    async def remove_target(self, target_id: int) -> None:
+        """
+        Прекращает отправку жалоб на вебхук и отбрасывает его очередь.
+        """
+        self._targets.pop(target_id, None)
+        self._queues.pop(target_id, None)
+        self._overflow.pop(target_id, None)
+        task = self._tasks.pop(target_id, None)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def announce_targets_changed(self) -> None:
+        """
+        Сообщает остальным процессам, что список вебхуков изменился.
+        """
+        await self._store.incr(TARGETS_VERSION_KEY)
+
+    async def _load_targets(self) -> None:
+        """
+        Приводит отправку в соответствие с активными вебхуками в базе данных.
+        """
+        async with db_helper.session_factory() as session:
+            records = await WebhookTargetDao(session=session).get_active()
+        targets = {
+            record.id: WebhookTargetReadSchema.model_validate(
+                record, from_attributes=True
+            )
+            for record in records
+        }
+        for target_id in self._targets.keys() - targets.keys():
+            await self.remove_target(target_id)
+        for target in targets.values():
+            self.add_target(target)
+
+    async def _refresh(self) -> None:
+        """
+        Периодически проверяет версию списка вебхуков и перечитывает его,
+        если список изменил другой процесс.
+        """
+        while True:
+            await asyncio.sleep(self._config.refresh_interval)
+            try:
+                version = await self._store.get(TARGETS_VERSION_KEY)
+                if version != self._version:
+                    self._version = version
+                    await self._load_targets()
+                    log.info(
+                        "Список вебхуков обновлен: %s адресов",
+                        len(self._targets),
+                    )
+            except SQLAlchemyError:
+                log.exception("Ошибка при обновлении списка вебхуков")
+
+    async def publish(self, complaint: ComplaintAllInfoSchema) -> None:
+        """
+        Ставит жалобу в очереди подходящих вебхуков.
+
+        Как и при опросе, отправляются только открытые жалобы
+        с известной категорией, кроме "Другое". Метод не ждет ни сети,
+        ни базы данных: жалобы сверх размера очереди учитываются
+        в счетчике и откладываются до записи задачей вебхука.
+        """
+        if complaint.status != StatusEnum.open or complaint.category in (
+            None,
+            "Другое",
+        ):
+            return
+        for target in self.targets:
+            if target.category not in (None, complaint.category):
+                continue
+            queue = self._queues.get(target.id)
+            if queue is None:
+                # Вебхук удален, пока жалоба ставилась в другие очереди
+                continue
+            try:
+                queue.put_nowait(complaint)
+            except asyncio.QueueFull:
+                log.warning(
+                    "Очередь вебхука %s заполнена, жалоба с ID %s не отправлена",
+                    target.url,
+                    complaint.id,
+                )
+                self.overflowed += 1
+                WEBHOOK_QUEUE_OVERFLOW.inc()
+                self._overflow.setdefault(target.id, []).append(complaint)
+
+    async def _run(self, target: WebhookTargetReadSchema) -> None:
+        """
+        Собирает жалобы в пакеты и отправляет их на вебхук.
+
+        После каждого пакета сохраняет как недоставленные жалобы,
+        которые за это время не поместились в очередь.
+        """
+        queue = self._queues[target.id]
+        loop = asyncio.get_running_loop()
+        batch: list[ComplaintAllInfoSchema] = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                deadline = loop.time() + self._config.max_delay
+                while len(batch) < self._config.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except TimeoutError:
+                        break
+                await self._deliver(target, batch)
+                batch = self._overflow.pop(target.id, [])
+                if batch:
+                    await self._store_dead_letter(
+                        target=target,
+                        batch=batch,
+                        attempts=0,
+                        error=QUEUE_FULL_ERROR,
+                    )
+                batch = []
+        except asyncio.CancelledError:
+            if target.id in self._targets:
+                batch.extend(self._overflow.pop(target.id, []))
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                if batch:
+                    await self._store_dead_letter(
+                        target=target,
+                        batch=batch,
+                        attempts=0,
+                        error="Сервис остановлен до отправки",
+                    )
+            raise
+
+    async def _deliver(
+        self,
+        target: WebhookTargetReadSchema,
+        batch: list[ComplaintAllInfoSchema],
+    ) -> None:
+        """
+        Отправляет пакет жалоб с экспоненциальной задержкой между попытками.
+
+        Ответы 4xx, кроме 408 и 429, не повторяются.
+        """
+        payload = OpenComplaintsSchema(complaints=batch).model_dump_json(
+            exclude_none=True
+        )
+        attempts = 0
+        error = None
+        while attempts <= self._config.max_retries:
+            if attempts:
+                await asyncio.sleep(self._config.retry_delay * 2 ** (attempts - 1))
+            attempts += 1
+            try:
+                async with self._client_session.post(
+                    target.url,
+                    data=payload,
+                    headers={"Content-Type": "application/json"},
+                    timeout=ClientTimeout(total=self._config.timeout),
+                ) as response:
+                    if response.status < 400:
+                        log.info(
+                            "На вебхук %s отправлено %s жалоб",
+                            target.url,
+                            len(batch),
+                        )
+                        return
+                    error = f"HTTP {response.status}"
+                    if (
+                        response.status < 500
+                        and response.status not in RETRYABLE_CLIENT_ERRORS
+                    ):
+                        break
+            except (ClientError, TimeoutError) as e:
+                error = repr(e)
+            log.warning(
+                "Ошибка отправки на вебхук %s (попытка %s): %s",
+                target.url,
+                attempts,
+                error,
+            )
+        log.error(
+            "Не удалось отправить %s жалоб на вебхук %s за %s попыток",
+            len(batch),
+            target.url,
+            attempts,
+        )
+        await self._store_dead_letter(
+            target=target,
+            batch=batch,
+            attempts=attempts,
+            error=error,
+        )
+
+    async def _store_dead_letter(
+        self,
+        target: WebhookTargetReadSchema,
+        batch: list[ComplaintAllInfoSchema],
+        attempts: int,
+        error: str | None,
+    ) -> None:
+        """
+        Сохраняет недоставленный пакет жалоб.
+        """
+        try:
+            async with db_helper.session_factory() as session:
+                await WebhookDeadLetterDao(session=session).add(
+                    WebhookDeadLetterCreateSchema(
+                        target_id=target.id,
+                        payload=OpenComplaintsSchema(complaints=batch).model_dump_json(
+                            exclude_none=True
+                        ),
+                        attempts=attempts,
+                        last_error=error,
+                    )
+                )
+                await session.commit()
+        except SQLAlchemyError:
+            log.exception(
+                "Ошибка при сохранении недоставленного пакета для вебхука %s",
+                target.url,
+            )
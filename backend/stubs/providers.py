@@ -0,0 +1,312 @@
+"""
+Локальный HTTP-сервер, который заменяет API тональности apilayer
+и chat completion API Hugging Face. Подходит для нагрузочных тестов
+без обращения к платным API.
+
+Для сервиса нужно задать API_SENTINEL_URL=<адрес>/sentiment
+и HF_MODEL=<адрес> (клиент Hugging Face сам добавит /v1/chat/completions).
+
+Запуск из корня репозитория:
+PYTHONPATH=backend python -m stubs.providers --port 9100 \
+    --category-latency lognormal:800:0.5 --category-error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+
+from aiohttp import web
+
+SENTIMENTS = ["positive", "negative", "neutral"]
+CATEGORIES = ["Техническая", "Оплата", "Другое"]
+
+
+class Latency:
+    """
+    Распределение времени ответа.
+
+    Задается строкой "<распределение>:<среднее, мс>[:<параметр>]":
+    fixed:100 - всегда 100 мс, uniform:100:50 - от 50 до 150 мс,
+    exponential:100 - экспоненциальное со средним 100 мс,
+    lognormal:100:0.5 - логнормальное со средним 100 мс и sigma 0.5
+    (длинный хвост, как у настоящих API).
+    """
+
+    DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+    def __init__(self, spec: str) -> None:
+        distribution, _, rest = spec.partition(":")
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Неизвестное распределение {distribution!r}")
+        mean, _, parameter = rest.partition(":")
+        self.spec = spec
+        self.distribution = distribution
+        self.mean = float(mean or 0) / 1000
+        if distribution == "lognormal":
+            self.parameter = float(parameter or 0.5)
+        else:
+            # Для uniform - полуширина интервала в секундах
+            self.parameter = float(parameter) / 1000 if parameter else self.mean / 2
+
+    def sample(self, rng: random.Random) -> float:
+        """
+        Возвращает случайное время ответа в секундах.
+        """
+        if self.mean <= 0 or self.distribution == "fixed":
+            return max(self.mean, 0.0)
+        if self.distribution == "uniform":
+            return max(
+                0.0, rng.uniform(self.mean - self.parameter, self.mean + self.parameter)
+            )
+        if self.distribution == "exponential":
+            return rng.expovariate(1 / self.mean)
+        sigma = self.parameter
+        return rng.lognormvariate(math.log(self.mean) - sigma**2 / 2, sigma)
+
+
+class ProviderBehavior:
+    """
+    Поведение одного заменяемого API: время ответа и доля ошибок.
+    """
+
+    def __init__(
+        self,
+        latency: Latency,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+    ) -> None:
+        """
+        Инициализация поведения.
+
+        Параметры:
+        latency: Распределение времени ответа
+        error_rate: Доля запросов, завершающихся ошибкой
+        error_status: Код ответа для таких запросов
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.errors = 0
+
+    def stats(self) -> dict:
+        """
+        Возвращает настройки и счетчики запросов.
+        """
+        return {
+            "latency": self.latency.spec,
+            "error_rate": self.error_rate,
+            "error_status": self.error_status,
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+
+class ProviderStub:
+    """
+    Сервер-заглушка внешних API классификации.
+
+    POST /sentiment отвечает как API тональности apilayer,
+    POST /v1/chat/completions - как chat completion API Hugging Face,
+    в том числе на пакетные запросы категорий. Счетчики запросов
+    возвращает метод stats() и адрес GET /stats.
+    """
+
+    def __init__(
+        self,
+        sentiment: ProviderBehavior,
+        category: ProviderBehavior,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int | None = None,
+    ) -> None:
+        """
+        Инициализация сервера.
+
+        Параметры:
+        sentiment: Поведение API тональности
+        category: Поведение AI-модели
+        host: Адрес для прослушивания
+        port: Порт, 0 - выбрать свободный
+        seed: Начальное значение генератора случайных чисел
+        """
+        self.sentiment = sentiment
+        self.category = category
+        self._host = host
+        self._port = port
+        self._rng = random.Random(seed)
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def url(self) -> str:
+        """
+        Возвращает адрес сервера.
+        """
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+
+    def stats(self) -> dict:
+        """
+        Возвращает счетчики запросов к каждому API.
+        """
+        return {
+            "sentiment": self.sentiment.stats(),
+            "category": self.category.stats(),
+        }
+
+    def make_app(self) -> web.Application:
+        """
+        Создает приложение aiohttp с обработчиками заглушки.
+        """
+        app = web.Application()
+        app.router.add_post("/sentiment", self._handle_sentiment)
+        app.router.add_post("/v1/chat/completions", self._handle_chat)
+        app.router.add_get("/stats", self._get_stats)
+        return app
+
+    async def start(self) -> None:
+        """
+        Запускает сервер.
+        """
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self._host, self._port).start()
+
+    async def stop(self) -> None:
+        """
+        Останавливает сервер.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "ProviderStub":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+    async def _respond(self, behavior: ProviderBehavior) -> web.Response | None:
+        """
+        Ждет время ответа и возвращает ошибку, если она выпала.
+        """
+        behavior.requests += 1
+        await asyncio.sleep(behavior.latency.sample(self._rng))
+        if self._rng.random() < behavior.error_rate:
+            behavior.errors += 1
+            return web.json_response(
+                {"message": "stub error"},
+                status=behavior.error_status,
+            )
+        return None
+
+    async def _handle_sentiment(self, request: web.Request) -> web.Response:
+        text = await request.text()
+        error = await self._respond(self.sentiment)
+        if error is not None:
+            return error
+        return web.json_response(
+            {
+                "language": "russian",
+                "content_type": "text",
+                "content": text,
+                "sentiment": self._rng.choice(SENTIMENTS),
+                "score": round(self._rng.random(), 3),
+            }
+        )
+
+    async def _handle_chat(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        error = await self._respond(self.category)
+        if error is not None:
+            return error
+        content = payload["messages"][-1]["content"]
+        if "JSON-массива" in content:
+            # Пакетный запрос: массив жалоб находится между пустыми строками
+            texts = json.loads(content.split("\n\n")[1])
+            answer = json.dumps(
+                [self._rng.choice(CATEGORIES) for _ in texts],
+                ensure_ascii=False,
+            )
+        else:
+            answer = self._rng.choice(CATEGORIES)
+        return web.json_response(
+            {
+                "id": f"stub-{self.category.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get("model", "stub"),
+                "system_fingerprint": "stub",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": answer},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": len(content),
+                    "completion_tokens": len(answer),
+                    "total_tokens": len(content) + len(answer),
+                },
+            }
+        )
+
+    async def _get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+
+def add_provider_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Добавляет параметры поведения заглушки в разбор командной строки.
+    """
+    parser.add_argument("--sentiment-latency", type=Latency, default="lognormal:150")
+    parser.add_argument("--sentiment-error-rate", type=float, default=0.0)
+    parser.add_argument("--sentiment-error-status", type=int, default=503)
+    parser.add_argument("--category-latency", type=Latency, default="lognormal:800")
+    parser.add_argument("--category-error-rate", type=float, default=0.0)
+    parser.add_argument("--category-error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def create_provider_stub(
+    args: argparse.Namespace,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> ProviderStub:
+    """
+    Создает заглушку по параметрам командной строки.
+    """
+    return ProviderStub(
+        sentiment=ProviderBehavior(
+            latency=args.sentiment_latency,
+            error_rate=args.sentiment_error_rate,
+            error_status=args.sentiment_error_status,
+        ),
+        category=ProviderBehavior(
+            latency=args.category_latency,
+            error_rate=args.category_error_rate,
+            error_status=args.category_error_status,
+        ),
+        host=host,
+        port=port,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_provider_arguments(parser)
+    args = parser.parse_args()
+    stub = create_provider_stub(args)
+    web.run_app(stub.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Локальный HTTP-сервер, который принимает пакеты жалоб вместо настоящего
+вебхука. Подходит для тестов и ручной проверки доставки.
+
+Запуск из корня репозитория:
+PYTHONPATH=backend python -m stubs.webhook --port 9000 --fail-first 2
+"""
+
+import argparse
+import asyncio
+
+from aiohttp import web
+
+
+class WebhookStub:
+    """
+    Сервер-заглушка вебхука.
+
+    Принятые пакеты доступны в атрибуте batches и по адресу GET /received.
+    Первые fail_first запросов получают ответ с кодом fail_status,
+    чтобы можно было проверить повторы и недоставленные пакеты.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        fail_first: int = 0,
+        fail_status: int = 500,
+    ) -> None:
+        """
+        Инициализация сервера.
+
+        Параметры:
+        host: Адрес для прослушивания
+        port: Порт, 0 - выбрать свободный
+        fail_first: Сколько первых запросов завершить ошибкой
+        fail_status: Код ответа для таких запросов
+        """
+        self._host = host
+        self._port = port
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.requests = 0
+        self.batches: list[list[dict]] = []
+        self._received = asyncio.Event()
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def url(self) -> str:
+        """
+        Возвращает адрес, который нужно зарегистрировать как вебхук.
+        """
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}/webhook"
+
+    @property
+    def complaints(self) -> list[dict]:
+        """
+        Возвращает все принятые жалобы в порядке получения.
+        """
+        return [complaint for batch in self.batches for complaint in batch]
+
+    def make_app(self) -> web.Application:
+        """
+        Создает приложение aiohttp с обработчиками заглушки.
+        """
+        app = web.Application()
+        app.router.add_post("/webhook", self._handle)
+        app.router.add_get("/received", self._get_received)
+        return app
+
+    async def start(self) -> None:
+        """
+        Запускает сервер.
+        """
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self._host, self._port).start()
+
+    async def stop(self) -> None:
+        """
+        Останавливает сервер.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def wait_for(self, count: int, timeout: float = 10.0) -> list[dict]:
+        """
+        Ждет, пока будет принято не меньше count жалоб, и возвращает их.
+        """
+        async with asyncio.timeout(timeout):
+            while len(self.complaints) < count:
+                self._received.clear()
+                await self._received.wait()
+        return self.complaints
+
+    async def __aenter__(self) -> "WebhookStub":
+        """
+        Запускает сервер при входе в контекст.
+        """
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        """
+        Останавливает сервер при выходе из контекста.
+        """
+        await self.stop()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """
+        Принимает пакет жалоб или отвечает ошибкой, пока не исчерпаны
+        первые fail_first запросов.
+        """
+        self.requests += 1
+        if self.requests <= self.fail_first:
+            return web.json_response({"ok": False}, status=self.fail_status)
+        payload = await request.json()
+        self.batches.append(payload["complaints"])
+        self._received.set()
+        return web.json_response({"ok": True})
+
+    async def _get_received(self, request: web.Request) -> web.Response:
+        """
+        Возвращает количество запросов и принятые пакеты.
+        """
+        return web.json_response({"requests": self.requests, "batches": self.batches})
+
+
+def main() -> None:
+    """
+    Запускает заглушку с параметрами командной строки.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--fail-first", type=int, default=0)
+    parser.add_argument("--fail-status", type=int, default=500)
+    args = parser.parse_args()
+    stub = WebhookStub(fail_first=args.fail_first, fail_status=args.fail_status)
+    web.run_app(stub.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Общие настройки тестов.
+
+Тесты используют отдельную базу данных SQLite во временном каталоге,
+схема которой создается миграциями alembic. Запуск из корня репозитория:
+python -m pytest backend/tests
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parents[1]
+ROOT = BACKEND.parent
+DB_PATH = Path(tempfile.mkdtemp(prefix="complaints-tests-")) / "test.sqlite3"
+
+# Настройки читаются при импорте core.config, поэтому задаются до него
+os.environ["DB__URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ.setdefault("HF_TOKEN", "test")
+os.environ.setdefault("API_SENTINEL_KEY", "test")
+sys.path.insert(0, str(BACKEND))
+
+from core.models import db_helper  # noqa: E402
+
+
+def run_async[T](coroutine: Awaitable[T]) -> T:
+    """
+    Выполняет корутину в новом цикле событий и закрывает соединения
+    с базой данных, которые привязаны к этому циклу.
+    """
+
+    async def main() -> T:
+        try:
+            return await coroutine
+        finally:
+            await db_helper.dispose()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database() -> None:
+    """
+    Создает схему тестовой базы данных миграциями.
+    """
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=ROOT,
+        env=os.environ.copy(),
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def run() -> Callable[[Awaitable], object]:
+    """
+    Возвращает функцию, которая выполняет корутину теста.
+    """
+    return run_async
@@ -0,0 +1,121 @@
+"""
+Тесты архивации закрытых жалоб и поиска жалоб в архиве.
+"""
+
+from datetime import datetime
+
+import pytest
+from api.v1.complaints import get_complaint
+from core.config import ArchiveConfig, settings
+from core.enums.complaint import StatusEnum
+from core.models import Complaint, ComplaintArchive, db_helper
+from fastapi import HTTPException
+from services.archive import archive_complaints, find_archived_complaint
+from sqlalchemy import delete, select
+
+# Текст, статус и время создания жалоб, которые создаются перед архивацией
+COMPLAINTS = [
+    ("Не проходит оплата", StatusEnum.closed, datetime(2020, 1, 15)),
+    ("Не открывается сайт", StatusEnum.open, datetime(2020, 1, 20)),
+    ("Дважды списали деньги", StatusEnum.closed, datetime(2020, 2, 10)),
+    ("Вернули деньги", StatusEnum.closed, datetime.now()),
+]
+
+
+async def archive(config: ArchiveConfig) -> tuple[list[int], dict, list[int]]:
+    """
+    Заменяет жалобы в базе данных жалобами COMPLAINTS и переносит
+    в архив закрытые жалобы старше 90 дней порциями по одной.
+    Возвращает ID созданных жалоб, счетчики и ID оставшихся жалоб.
+    """
+    async with db_helper.session_factory() as session:
+        await session.execute(delete(Complaint))
+        await session.execute(delete(ComplaintArchive))
+        records = [
+            Complaint(text=text, status=status, category="Оплата", timestamp=timestamp)
+            for text, status, timestamp in COMPLAINTS
+        ]
+        session.add_all(records)
+        await session.commit()
+        ids = [record.id for record in records]
+
+    counters = await archive_complaints(
+        config=config,
+        older_than_days=90,
+        chunk_size=1,
+    )
+    async with db_helper.session_factory() as session:
+        result = await session.execute(select(Complaint.id).order_by(Complaint.id))
+        return ids, dict(counters), list(result.scalars().all())
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch) -> ArchiveConfig:
+    """
+    Возвращает настройки архива во временном каталоге, которые
+    использует и эндпоинт GET /complaints/{id}.
+    """
+    monkeypatch.setattr(settings.archive, "path", str(tmp_path))
+    monkeypatch.setattr(settings.archive, "pause", 0.0)
+    return settings.archive
+
+
+def test_archives_old_closed_complaints_by_month(run, config, tmp_path):
+    """
+    Закрытые жалобы старше заданного возраста удаляются из таблицы
+    и записываются в файлы по месяцам создания.
+    """
+    ids, counters, remaining = run(archive(config))
+
+    assert counters == {"archived": 2, "files": 2, "chunks": 2}
+    assert remaining == [ids[1], ids[3]]
+    assert sorted(path.parent.name for path in tmp_path.rglob("*.jsonl.gz")) == [
+        "2020-01",
+        "2020-02",
+    ]
+
+
+def test_finds_archived_complaint(run, config):
+    """
+    Архивная жалоба находится по ID с теми же полями, что были в таблице,
+    а отсутствующая в архиве - нет.
+    """
+
+    async def main() -> list:
+        ids, _, _ = await archive(config)
+        async with db_helper.session_factory() as session:
+            return [
+                await find_archived_complaint(config, session, complaint_id)
+                for complaint_id in ids
+            ]
+
+    found = run(main())
+
+    assert [complaint is not None for complaint in found] == [True, False, True, False]
+    assert (found[0].text, found[0].status, found[0].timestamp) == COMPLAINTS[0]
+    assert (found[2].text, found[2].category) == (COMPLAINTS[2][0], "Оплата")
+
+
+def test_get_complaint_returns_archived(run, config):
+    """
+    GET /complaints/{id} возвращает жалобу из таблицы или архива,
+    а для неизвестного ID - 404.
+    """
+
+    async def main() -> tuple[list, int]:
+        ids, _, _ = await archive(config)
+        async with db_helper.session_factory() as session:
+            complaints = [
+                await get_complaint(complaint_id=complaint_id, session=session)
+                for complaint_id in ids[:2]
+            ]
+            try:
+                await get_complaint(complaint_id=ids[-1] + 100, session=session)
+            except HTTPException as e:
+                return [(c.id, c.text) for c in complaints], e.status_code
+        return [(c.id, c.text) for c in complaints], 200
+
+    complaints, missing_status = run(main())
+
+    assert [text for _, text in complaints] == [COMPLAINTS[0][0], COMPLAINTS[1][0]]
+    assert missing_status == 404
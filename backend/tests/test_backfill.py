@@ -0,0 +1,129 @@
+"""
+Тесты повторного обогащения жалоб с продолжением с контрольной точки.
+"""
+
+import json
+
+from core.enums.complaint import CategorySourceEnum, EnrichmentEnum, SentimentEnum
+from core.models import Complaint, db_helper
+from jobs.backfill_enrichment import backfill
+from sqlalchemy import delete, select
+
+
+class CountingClassifier:
+    """
+    Классификатор, который запоминает тексты запросов.
+    """
+
+    def __init__(self) -> None:
+        self.texts: list[str] = []
+
+    async def request_sentiment(self, text: str) -> SentimentEnum:
+        """
+        Возвращает отрицательную тональность.
+        """
+        self.texts.append(text)
+        return SentimentEnum.negative
+
+    async def request_category(self, text: str) -> tuple[str, CategorySourceEnum]:
+        """
+        Возвращает категорию, определенную AI-моделью.
+        """
+        return "Оплата", CategorySourceEnum.remote
+
+
+async def create_failed(count: int) -> list[int]:
+    """
+    Заменяет жалобы в базе данных жалобами, обогащение которых
+    завершилось ошибкой, и одной успешно обогащенной. Возвращает ID
+    жалоб с ошибкой.
+    """
+    async with db_helper.session_factory() as session:
+        await session.execute(delete(Complaint))
+        records = [
+            Complaint(
+                text=f"Жалоба {i}",
+                sentiment=SentimentEnum.unknown,
+                category="Другое",
+                enrichment=EnrichmentEnum.failed,
+            )
+            for i in range(count)
+        ]
+        session.add_all(records)
+        session.add(
+            Complaint(
+                text="Обогащенная жалоба",
+                sentiment=SentimentEnum.neutral,
+                category="Техническая",
+                enrichment=EnrichmentEnum.done,
+            )
+        )
+        await session.commit()
+        return [record.id for record in records]
+
+
+async def run_backfill(classifier, checkpoint, limit: int | None = None):
+    """
+    Запускает повторное обогащение порциями по 2 жалобы.
+    """
+    return await backfill(
+        classifier=classifier,
+        checkpoint=checkpoint,
+        chunk_size=2,
+        concurrency=2,
+        max_retries=0,
+        retry_delay=0.0,
+        limit=limit,
+    )
+
+
+def test_resumes_from_checkpoint(run, tmp_path):
+    """
+    Прерванный запуск продолжается после последней сохраненной жалобы:
+    уже обогащенные жалобы не запрашиваются заново, а счетчики
+    продолжают накапливаться.
+    """
+    checkpoint = tmp_path / "backfill.json"
+
+    async def main() -> tuple:
+        ids = await create_failed(5)
+        first_classifier, second_classifier = CountingClassifier(), CountingClassifier()
+        await run_backfill(first_classifier, checkpoint, limit=3)
+        state = json.loads(checkpoint.read_text())
+        counters = await run_backfill(second_classifier, checkpoint)
+        async with db_helper.session_factory() as session:
+            result = await session.execute(
+                select(Complaint.enrichment).where(Complaint.id.in_(ids))
+            )
+            enrichments = set(result.scalars().all())
+        return ids, state, counters, first_classifier, second_classifier, enrichments
+
+    ids, state, counters, first, second, enrichments = run(main())
+
+    assert state["after_id"] == ids[2]
+    assert state["counters"]["updated"] == 3
+    assert first.texts == ["Жалоба 0", "Жалоба 1", "Жалоба 2"]
+    assert second.texts == ["Жалоба 3", "Жалоба 4"]
+    assert counters["scanned"] == 5
+    assert counters["updated"] == 5
+    assert enrichments == {EnrichmentEnum.done}
+    assert json.loads(checkpoint.read_text())["after_id"] == ids[-1]
+
+
+def test_dry_run_does_not_touch_checkpoint(run, tmp_path):
+    """
+    Без классификатора жалобы только подсчитываются, а контрольная
+    точка не читается и не записывается.
+    """
+    checkpoint = tmp_path / "backfill.json"
+    checkpoint.write_text(json.dumps({"after_id": 10**9, "counters": {}}))
+
+    async def main():
+        await create_failed(3)
+        return await run_backfill(None, checkpoint)
+
+    counters = run(main())
+
+    assert counters["scanned"] == 3
+    assert counters["failed"] == 3
+    assert json.loads(checkpoint.read_text())["after_id"] == 10**9
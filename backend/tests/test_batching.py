@@ -0,0 +1,126 @@
+"""
+Тесты пакетного определения категорий жалоб.
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+from core.config import BatchingConfig, CircuitBreakerConfig, OutboundLimitConfig
+from services.batching import CategoryBatcher
+from services.circuit_breaker import CircuitBreaker
+from services.rate_limit import OutboundLimiter
+
+
+class FakeInferenceClient:
+    """
+    Клиент AI-модели, который возвращает заданные ответы
+    и запоминает запросы.
+    """
+
+    def __init__(self, *answers: str | None) -> None:
+        """
+        Инициализация клиента.
+
+        Параметры:
+        answers: Ответы на запросы по порядку, None - ответ не приходит
+        """
+        self.answers = list(answers)
+        self.prompts: list[str] = []
+
+    async def chat_completion(self, messages: list[dict], **kwargs) -> SimpleNamespace:
+        """
+        Возвращает следующий ответ в формате chat_completion.
+        """
+        self.prompts.append(messages[0]["content"])
+        answer = self.answers.pop(0)
+        if answer is None:
+            await asyncio.sleep(60)
+        message = SimpleNamespace(content=answer)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def make_batcher(
+    client: FakeInferenceClient,
+    timeout: float = 2.0,
+) -> tuple[CategoryBatcher, CircuitBreaker]:
+    """
+    Создает планировщик с пакетами до 3 жалоб и его выключатель.
+    """
+    breaker = CircuitBreaker(
+        name="category",
+        config=CircuitBreakerConfig(timeout=timeout, min_calls=100),
+    )
+    batcher = CategoryBatcher(
+        inference_client=client,
+        config=BatchingConfig(enabled=True, max_batch_size=3, max_wait_ms=20.0),
+        limiter=OutboundLimiter(
+            name="category",
+            config=OutboundLimitConfig(enabled=False),
+        ),
+        breaker=breaker,
+    )
+    return batcher, breaker
+
+
+async def classify(batcher: CategoryBatcher, texts: list[str]) -> list:
+    """
+    Определяет категории текстов одновременно и закрывает планировщик.
+    """
+    results = await asyncio.gather(
+        *[batcher.classify(text) for text in texts],
+        return_exceptions=True,
+    )
+    await batcher.close()
+    return results
+
+
+def test_classifies_batch_with_one_request(run):
+    """
+    Жалобы из одного окна классифицируются одним запросом,
+    который выключатель учитывает как один.
+    """
+    client = FakeInferenceClient('["Оплата", "Техническая", "Другое"]')
+    batcher, breaker = make_batcher(client)
+
+    results = run(classify(batcher, ["a", "b", "c"]))
+
+    assert results == ["Оплата", "Техническая", "Другое"]
+    assert len(client.prompts) == 1
+    assert json.dumps(["a", "b", "c"]) in client.prompts[0]
+    assert breaker.stats()["calls"] == 1
+
+
+def test_falls_back_to_single_requests(run):
+    """
+    Если ответ на пакет не удалось разобрать, каждая жалоба
+    классифицируется отдельным запросом.
+    """
+    client = FakeInferenceClient('["Оплата"]', "Оплата", "Техническая")
+    batcher, breaker = make_batcher(client)
+
+    results = run(classify(batcher, ["a", "b"]))
+
+    assert results == ["Оплата", "Техническая"]
+    assert len(client.prompts) == 3
+    assert breaker.stats()["calls"] == 3
+
+
+def test_batch_request_times_out(run):
+    """
+    Зависший пакетный запрос ограничен временем выключателя,
+    все ожидающие получают ошибку, а выключатель учитывает одну ошибку.
+    """
+    client = FakeInferenceClient(None)
+    batcher, breaker = make_batcher(client, timeout=0.1)
+
+    started = time.monotonic()
+    results = run(classify(batcher, ["a", "b", "c"]))
+
+    assert time.monotonic() - started < 1.0
+    assert all(isinstance(result, TimeoutError) for result in results)
+    assert len(client.prompts) == 1
+    assert breaker.stats()["calls"] == 1
+    assert breaker.stats()["failure_rate"] == pytest.approx(1.0)
@@ -0,0 +1,92 @@
+"""
+Тесты рассылки жалоб подписчикам потоков через опрос базы данных.
+"""
+
+import asyncio
+from datetime import datetime
+
+from core.config import StreamConfig
+from core.enums.complaint import EnrichmentEnum, SentimentEnum, StatusEnum
+from core.models import Complaint, db_helper
+from core.schemas.complaint import ComplaintAllInfoSchema, ComplaintFilterSchema
+from services.broadcast import ComplaintBroadcaster
+from sqlalchemy import delete, update
+
+
+async def add_complaint(enrichment: EnrichmentEnum, **kwargs) -> int:
+    """
+    Сохраняет жалобу и возвращает ее ID.
+    """
+    async with db_helper.session_factory() as session:
+        record = Complaint(
+            text="Не проходит оплата",
+            sentiment=SentimentEnum.negative,
+            category="Оплата",
+            enrichment=enrichment,
+            **kwargs,
+        )
+        session.add(record)
+        await session.commit()
+        return record.id
+
+
+async def received(subscription) -> list[int]:
+    """
+    Возвращает ID жалоб, которые уже лежат в буфере подписки.
+    """
+    ids = []
+    while True:
+        try:
+            complaint = await asyncio.wait_for(subscription.get(), 0.01)
+        except TimeoutError:
+            return ids
+        ids.append(complaint.id)
+
+
+def test_poll_delivers_complaints_of_other_processes(run):
+    """
+    При опросе подписчик получает жалобы из базы данных, в том числе
+    сохраненные другим процессом, без копий и не раньше, чем обогатится
+    жалоба, ожидающая обогащения. Жалобы своего процесса не дублируются.
+    """
+
+    async def main() -> list[list[int]]:
+        async with db_helper.session_factory() as session:
+            await session.execute(delete(Complaint))
+            await session.commit()
+        old = await add_complaint(EnrichmentEnum.done)
+        broadcaster = ComplaintBroadcaster(
+            config=StreamConfig(poll_batch_size=2),
+            poll=True,
+        )
+        with broadcaster.subscribe(ComplaintFilterSchema()) as subscription:
+            await broadcaster.poll()
+            first = await add_complaint(EnrichmentEnum.done)
+            copy = await add_complaint(EnrichmentEnum.done, group_id=first)
+            pending = await add_complaint(EnrichmentEnum.pending)
+            last = await add_complaint(EnrichmentEnum.failed)
+            await broadcaster.publish(
+                ComplaintAllInfoSchema(
+                    id=last,
+                    text="Не проходит оплата",
+                    status=StatusEnum.open,
+                    timestamp=datetime.now(),
+                )
+            )
+            await broadcaster.poll()
+            before_enrichment = await received(subscription)
+            async with db_helper.session_factory() as session:
+                await session.execute(
+                    update(Complaint)
+                    .where(Complaint.id == pending)
+                    .values(enrichment=EnrichmentEnum.done)
+                )
+                await session.commit()
+            await broadcaster.poll()
+            after_enrichment = await received(subscription)
+        return [[old, first, copy, pending, last], before_enrichment, after_enrichment]
+
+    (_, first, _, pending, last), before, after = run(main())
+
+    assert before == [first]
+    assert after == [pending, last]
@@ -0,0 +1,304 @@
+"""
+Тесты автоматического выключателя и дублирования медленных запросов.
+"""
+
+import asyncio
+import time
+
+import pytest
+from core.config import CircuitBreakerConfig, OutboundLimitConfig
+from services.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    call_with_breaker,
+)
+from services.rate_limit import OutboundLimiter, RateLimitExceeded
+
+
+def make_breaker(**kwargs) -> CircuitBreaker:
+    """
+    Создает выключатель, который размыкается после 2 ошибок из 4 запросов.
+    """
+    config = {
+        "window_size": 4,
+        "min_calls": 4,
+        "failure_rate": 0.5,
+        "open_duration": 0.05,
+        "half_open_probes": 2,
+        **kwargs,
+    }
+    return CircuitBreaker(name="test", config=CircuitBreakerConfig(**config))
+
+
+async def succeed(breaker: CircuitBreaker, duration: float = 0.0) -> None:
+    """
+    Выполняет через выключатель успешный запрос длительностью duration.
+    """
+    async with breaker.protect():
+        await asyncio.sleep(duration)
+
+
+async def fail(breaker: CircuitBreaker, error: Exception | None = None) -> None:
+    """
+    Выполняет через выключатель запрос, который завершается ошибкой.
+    """
+    with pytest.raises(type(error) if error is not None else RuntimeError):
+        async with breaker.protect():
+            raise error if error is not None else RuntimeError("ошибка API")
+
+
+def test_opens_at_failure_rate(run):
+    """
+    Выключатель размыкается, когда среди min_calls запросов доля ошибок
+    достигает failure_rate, и после этого не пропускает запросы.
+    """
+    breaker = make_breaker()
+
+    async def main() -> None:
+        await succeed(breaker)
+        await fail(breaker)
+        await succeed(breaker)
+        assert breaker.state == CircuitState.closed
+        await fail(breaker)
+        assert breaker.state == CircuitState.open
+        with pytest.raises(CircuitOpenError):
+            await succeed(breaker)
+
+    run(main())
+
+    assert breaker.stats()["opened"] == 1
+    assert breaker.stats()["short_circuited"] == 1
+
+
+def test_slow_calls_count_as_failures(run):
+    """
+    Запрос дольше slow_call_threshold считается ошибкой.
+    """
+    breaker = make_breaker(slow_call_threshold=0.02)
+
+    async def main() -> None:
+        for duration in (0.0, 0.05, 0.0, 0.05):
+            await succeed(breaker, duration)
+
+    run(main())
+
+    assert breaker.state == CircuitState.open
+
+
+def test_rate_limit_rejections_are_not_counted(run):
+    """
+    Запросы, отклоненные ограничителем, не учитываются выключателем.
+    """
+    breaker = make_breaker()
+
+    async def main() -> None:
+        for _ in range(4):
+            await fail(breaker, RateLimitExceeded("очередь заполнена"))
+
+    run(main())
+
+    assert breaker.state == CircuitState.closed
+    assert breaker.stats()["calls"] == 0
+
+
+async def trip(breaker: CircuitBreaker) -> None:
+    """
+    Размыкает выключатель и ждет окончания open_duration.
+    """
+    for _ in range(4):
+        await fail(breaker)
+    assert breaker.state == CircuitState.open
+    await asyncio.sleep(0.06)
+
+
+def test_half_open_probes_close_breaker(run):
+    """
+    После open_duration пропускается half_open_probes пробных запросов,
+    лишние отклоняются, а успех всех проб замыкает выключатель.
+    """
+    breaker = make_breaker()
+
+    async def main() -> None:
+        await trip(breaker)
+        probes = [asyncio.create_task(succeed(breaker, 0.02)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert breaker.state == CircuitState.half_open
+        with pytest.raises(CircuitOpenError):
+            await succeed(breaker)
+        await asyncio.gather(*probes)
+
+    run(main())
+
+    assert breaker.state == CircuitState.closed
+    assert breaker.stats()["calls"] == 0
+
+
+def test_failed_probe_reopens_breaker(run):
+    """
+    Ошибка пробного запроса снова размыкает выключатель.
+    """
+    breaker = make_breaker()
+
+    async def main() -> None:
+        await trip(breaker)
+        await succeed(breaker)
+        await fail(breaker)
+
+    run(main())
+
+    assert breaker.state == CircuitState.open
+    assert breaker.stats()["opened"] == 2
+
+
+def test_disabled_breaker_never_opens(run):
+    """
+    Выключенный выключатель пропускает все запросы.
+    """
+    breaker = make_breaker(enabled=False)
+
+    async def main() -> None:
+        for _ in range(8):
+            await fail(breaker)
+        await succeed(breaker)
+
+    run(main())
+
+    assert breaker.state == CircuitState.closed
+
+
+def test_hedge_delay_is_p95_with_floor():
+    """
+    Задержка дублирования - 95-й перцентиль времени ответа,
+    но не меньше hedge_min_delay и только после hedge_min_samples замеров.
+    """
+    breaker = make_breaker(hedge=True, hedge_min_delay=0.05, hedge_min_samples=20)
+    for _ in range(19):
+        breaker.observe(0.1)
+    assert breaker.hedge_delay() is None
+
+    breaker.observe(0.3)
+    assert breaker.hedge_delay() == 0.1
+
+    breaker = make_breaker(hedge=True, hedge_min_delay=0.5, hedge_min_samples=1)
+    breaker.observe(0.1)
+    assert breaker.hedge_delay() == 0.5
+    assert make_breaker(hedge=False).hedge_delay() is None
+
+
+def hedged_breaker() -> CircuitBreaker:
+    """
+    Создает выключатель, который дублирует запросы через 0.05 секунды.
+    """
+    breaker = make_breaker(hedge=True, hedge_min_delay=0.05, hedge_min_samples=1)
+    breaker.observe(0.01)
+    return breaker
+
+
+def test_hedge_returns_faster_duplicate(run):
+    """
+    Если первый запрос не ответил за hedge_delay, отправляется второй,
+    возвращается первый успешный ответ, а оставшийся запрос отменяется.
+    """
+    breaker = hedged_breaker()
+    calls = []
+    cancelled = []
+
+    async def request() -> int:
+        number = len(calls)
+        calls.append(number)
+        try:
+            await asyncio.sleep(1.0 if number == 0 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(number)
+            raise
+        return number
+
+    started = time.monotonic()
+    result = run(breaker.hedge(request))
+
+    assert result == 1
+    assert time.monotonic() - started < 0.5
+    assert cancelled == [0]
+    assert breaker.stats()["hedges"] == 1
+    assert breaker.stats()["hedge_wins"] == 1
+
+
+def test_hedge_raises_when_both_fail(run):
+    """
+    Если оба запроса завершились ошибкой, выбрасывается ошибка.
+    """
+    breaker = hedged_breaker()
+
+    async def request() -> None:
+        await asyncio.sleep(0.1)
+        raise RuntimeError("ошибка API")
+
+    with pytest.raises(RuntimeError):
+        run(breaker.hedge(request))
+    assert breaker.stats()["hedges"] == 1
+
+
+def test_call_with_breaker_applies_timeout(run):
+    """
+    Попытка ограничена временем breaker.timeout, истекшее время
+    учитывается выключателем как одна ошибка.
+    """
+    breaker = make_breaker(timeout=0.05)
+    limiter = OutboundLimiter(name="test", config=OutboundLimitConfig(enabled=False))
+
+    async def request() -> None:
+        await asyncio.sleep(1.0)
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        run(call_with_breaker("test", breaker, limiter, request))
+
+    assert time.monotonic() - started < 0.5
+    assert breaker.stats()["calls"] == 1
+    assert breaker.stats()["failure_rate"] == 1.0
+
+
+def test_call_with_breaker_records_one_outcome_per_call(run):
+    """
+    Продублированный запрос учитывается выключателем как один.
+    """
+    breaker = hedged_breaker()
+    limiter = OutboundLimiter(name="test", config=OutboundLimitConfig(enabled=False))
+    calls = 0
+
+    async def request() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.2 if calls == 1 else 0.01)
+        return calls
+
+    result = run(call_with_breaker("test", breaker, limiter, request))
+
+    assert result == 2
+    assert calls == 2
+    assert breaker.stats()["calls"] == 1
+    assert breaker.stats()["hedges"] == 1
+
+
+def test_call_with_breaker_short_circuits(run):
+    """
+    Разомкнутый выключатель отклоняет вызов без запроса к API.
+    """
+    breaker = make_breaker(open_duration=60.0)
+    limiter = OutboundLimiter(name="test", config=OutboundLimitConfig(enabled=False))
+    calls = 0
+
+    async def request() -> None:
+        nonlocal calls
+        calls += 1
+
+    async def main() -> None:
+        for _ in range(4):
+            await fail(breaker)
+        with pytest.raises(CircuitOpenError):
+            await call_with_breaker("test", breaker, limiter, request)
+
+    run(main())
+
+    assert calls == 0
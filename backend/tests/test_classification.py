@@ -0,0 +1,181 @@
+"""
+Тесты определения тональности и категории жалоб в синхронном режиме.
+"""
+
+import asyncio
+
+import aiohttp
+import pytest
+from core.config import (
+    CacheConfig,
+    CircuitBreakerConfig,
+    OutboundLimitConfig,
+    settings,
+)
+from core.enums.complaint import CategorySourceEnum, EnrichmentEnum, SentimentEnum
+from core.models import Complaint, db_helper
+from core.schemas.complaint import ComplaintInSchema
+from services.cache import ClassificationCache
+from services.circuit_breaker import CircuitBreaker
+from services.classification import ComplaintClassifier
+from services.complaints import create_new_complaint
+from services.rate_limit import OutboundLimiter
+
+
+class FailingInferenceClient:
+    """
+    Клиент AI-модели, который всегда отвечает ошибкой.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def chat_completion(self, messages: list[dict], **kwargs) -> None:
+        """
+        Выбрасывает ошибку соединения.
+        """
+        self.calls += 1
+        raise ConnectionError("AI-модель недоступна")
+
+
+class FakeClassifier:
+    """
+    Классификатор с заданными результатами get_sentiment и get_category.
+    """
+
+    def __init__(
+        self,
+        sentiment: tuple[SentimentEnum, bool],
+        category: tuple[str, CategorySourceEnum | None],
+    ) -> None:
+        self.sentiment = sentiment
+        self.category = category
+
+    async def get_sentiment(self, text: str, use_cache: bool = True) -> tuple:
+        """
+        Возвращает заданную тональность и признак fallback.
+        """
+        return self.sentiment
+
+    async def get_category(self, text: str, use_cache: bool = True) -> tuple:
+        """
+        Возвращает заданную категорию и ее источник.
+        """
+        return self.category
+
+
+def make_classifier(
+    client_session: aiohttp.ClientSession,
+    inference_client: FailingInferenceClient,
+    **breaker_config,
+) -> ComplaintClassifier:
+    """
+    Создает классификатор без кэша и ограничителей.
+    """
+    return ComplaintClassifier(
+        client_session=client_session,
+        inference_client=inference_client,
+        cache=ClassificationCache(
+            config=CacheConfig(enabled=False),
+            namespaces={"sentiment": "test", "category": "test"},
+        ),
+        limiters={
+            kind: OutboundLimiter(name=kind, config=OutboundLimitConfig(enabled=False))
+            for kind in ("sentiment", "category")
+        },
+        breakers={
+            kind: CircuitBreaker(
+                name=kind,
+                config=CircuitBreakerConfig(**breaker_config),
+            )
+            for kind in ("sentiment", "category")
+        },
+    )
+
+
+def test_get_category_reports_fallback(run):
+    """
+    При ошибке AI-модели get_category возвращает "Другое" без источника
+    категории, а при разомкнутом выключателе - без запроса к модели.
+    """
+    inference_client = FailingInferenceClient()
+
+    async def main() -> list[tuple]:
+        async with aiohttp.ClientSession() as client_session:
+            classifier = make_classifier(
+                client_session,
+                inference_client,
+                min_calls=1,
+                open_duration=60.0,
+            )
+            return [
+                await classifier.get_category("Не проходит оплата"),
+                await classifier.get_category("Не проходит оплата"),
+            ]
+
+    results = run(main())
+
+    assert results == [("Другое", None), ("Другое", None)]
+    assert inference_client.calls == 1
+
+
+@pytest.mark.parametrize(
+    ("sentiment", "category", "expected"),
+    [
+        (
+            (SentimentEnum.negative, False),
+            ("Оплата", CategorySourceEnum.remote),
+            EnrichmentEnum.done,
+        ),
+        (
+            (SentimentEnum.unknown, True),
+            ("Оплата", CategorySourceEnum.local),
+            EnrichmentEnum.failed,
+        ),
+        (
+            (SentimentEnum.negative, False),
+            ("Другое", None),
+            EnrichmentEnum.failed,
+        ),
+    ],
+)
+def test_sync_mode_marks_fallback_as_failed(run, sentiment, category, expected):
+    """
+    Жалоба, для которой классификатор вернул значение по умолчанию,
+    сохраняется с состоянием обогащения failed.
+    """
+
+    async def main() -> Complaint:
+        async with db_helper.session_factory() as session:
+            schema = await create_new_complaint(
+                complaint=ComplaintInSchema(text="Дважды списали деньги"),
+                session=session,
+                classifier=FakeClassifier(sentiment=sentiment, category=category),
+            )
+            return await session.get(Complaint, schema.id)
+
+    record = run(main())
+
+    assert record.enrichment == expected
+    assert (record.sentiment, record.category, record.category_source) == (
+        sentiment[0],
+        *category,
+    )
+
+
+def test_get_sentiment_reports_fallback(run, monkeypatch):
+    """
+    При ошибке API тональности get_sentiment возвращает unknown
+    с признаком fallback.
+    """
+    monkeypatch.setattr(settings.resources.sentinel, "url", "http://127.0.0.1:9")
+
+    async def main() -> tuple:
+        async with aiohttp.ClientSession() as client_session:
+            classifier = make_classifier(client_session, FailingInferenceClient())
+            return await asyncio.wait_for(
+                classifier.get_sentiment("Дважды списали деньги"),
+                timeout=5,
+            )
+
+    assert run(main()) == (SentimentEnum.unknown, True)
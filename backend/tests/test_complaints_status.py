@@ -0,0 +1,150 @@
+"""
+Тесты изменения статуса нескольких жалоб.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from core.enums.complaint import StatusEnum
+from core.models import Complaint, db_helper
+from core.schemas.complaint import StatusChangeResultSchema, StatusChangeSchema
+from pydantic import ValidationError
+from services.complaints import change_complaints_status
+from sqlalchemy import delete, select
+
+NOW = datetime.now()
+DAY_AGO = NOW - timedelta(days=1)
+
+# Текст, статус, категория и время создания жалоб, которые создаются
+# перед каждым тестом, ID - номер в списке начиная с 1
+COMPLAINTS = [
+    ("Не проходит оплата", StatusEnum.open, "Оплата", DAY_AGO),
+    ("Дважды списали деньги", StatusEnum.open, "Оплата", NOW),
+    ("Не открывается сайт", StatusEnum.open, "Техническая", DAY_AGO),
+    ("Вернули деньги", StatusEnum.closed, "Оплата", DAY_AGO),
+]
+
+
+@pytest.fixture
+def ids(run) -> list[int]:
+    """
+    Заменяет жалобы в базе данных жалобами COMPLAINTS и возвращает их ID.
+    """
+
+    async def create() -> list[int]:
+        async with db_helper.session_factory() as session:
+            await session.execute(delete(Complaint))
+            records = [
+                Complaint(
+                    text=text,
+                    status=status,
+                    category=category,
+                    timestamp=timestamp,
+                )
+                for text, status, category, timestamp in COMPLAINTS
+            ]
+            session.add_all(records)
+            await session.commit()
+            return [record.id for record in records]
+
+    return run(create())
+
+
+async def change(**kwargs) -> tuple[StatusChangeResultSchema, dict[int, StatusEnum]]:
+    """
+    Меняет статус жалоб и возвращает результат и статусы всех жалоб.
+    """
+    async with db_helper.session_factory() as session:
+        result = await change_complaints_status(
+            change=StatusChangeSchema(**kwargs),
+            session=session,
+        )
+        await session.commit()
+        rows = await session.execute(
+            select(Complaint.id, Complaint.status).order_by(Complaint.id)
+        )
+        return result, dict(rows.tuples().all())
+
+
+def test_closes_by_ids_and_reports_not_found(run, ids):
+    """
+    Жалобы закрываются по списку ID, отсутствующие ID возвращаются
+    в not_found по одному разу в порядке запроса.
+    """
+    missing = ids[-1] + 100
+
+    result, statuses = run(change(ids=[ids[0], missing, ids[2], missing]))
+
+    assert result.updated == 2
+    assert result.not_found == [missing]
+    assert statuses == {
+        ids[0]: StatusEnum.closed,
+        ids[1]: StatusEnum.open,
+        ids[2]: StatusEnum.closed,
+        ids[3]: StatusEnum.closed,
+    }
+
+
+def test_ids_not_matching_conditions_are_not_found(run, ids):
+    """
+    ID, которые не подошли под условия отбора, тоже попадают в not_found.
+    """
+    result, statuses = run(
+        change(ids=ids, category="Оплата", from_status=StatusEnum.open)
+    )
+
+    assert result.updated == 2
+    assert result.not_found == [ids[2], ids[3]]
+    assert statuses[ids[2]] == StatusEnum.open
+
+
+def test_selects_by_conditions(run, ids):
+    """
+    Без списка ID статус меняется всем жалобам, подходящим под условия,
+    а not_found пуст.
+    """
+    result, statuses = run(
+        change(
+            category="Оплата",
+            from_status=StatusEnum.open,
+            before=NOW - timedelta(hours=1),
+        )
+    )
+
+    assert result == StatusChangeResultSchema(updated=1, not_found=[])
+    assert [
+        complaint_id
+        for complaint_id, status in statuses.items()
+        if status == StatusEnum.closed
+    ] == [ids[0], ids[3]]
+
+
+def test_reopens_complaints(run, ids):
+    """
+    Статус open открывает закрытые жалобы.
+    """
+    result, statuses = run(
+        change(status=StatusEnum.open, from_status=StatusEnum.closed)
+    )
+
+    assert result.updated == 1
+    assert set(statuses.values()) == {StatusEnum.open}
+
+
+def test_empty_ids_change_nothing(run, ids):
+    """
+    Пустой список ID не выбирает ни одной жалобы.
+    """
+    result, statuses = run(change(ids=[]))
+
+    assert result == StatusChangeResultSchema(updated=0, not_found=[])
+    assert list(statuses.values()).count(StatusEnum.closed) == 1
+
+
+def test_requires_selection():
+    """
+    Запрос без ID и условий отбора отклоняется, чтобы случайно
+    не изменить статус всех жалоб.
+    """
+    with pytest.raises(ValidationError):
+        StatusChangeSchema(status=StatusEnum.closed)
@@ -0,0 +1,181 @@
+"""
+Тесты наследования тональности и категории копиями жалоб.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from core.dao.complaint import ComplaintDao
+from core.enums.complaint import CategorySourceEnum, EnrichmentEnum, SentimentEnum
+from core.models import Complaint, db_helper
+from services.duplicates import fingerprint, inherits_enrichment
+from sqlalchemy import delete, select
+
+
+def leader(**kwargs) -> SimpleNamespace:
+    """
+    Создает строку успешно обогащенной первой жалобы группы.
+    """
+    values = {
+        "id": 1,
+        "sentiment": SentimentEnum.negative,
+        "category": "Оплата",
+        "enrichment": EnrichmentEnum.done,
+        **kwargs,
+    }
+    return SimpleNamespace(**values)
+
+
+@pytest.mark.parametrize(
+    ("row", "expected"),
+    [
+        (leader(), True),
+        (None, False),
+        (leader(enrichment=EnrichmentEnum.pending), False),
+        (leader(enrichment=EnrichmentEnum.failed), False),
+        (leader(sentiment=SentimentEnum.unknown), False),
+        (leader(category="Другое"), False),
+        (leader(sentiment=None), False),
+    ],
+)
+def test_inherits_only_real_results(row, expected):
+    """
+    Копия наследует только результат успешного обогащения.
+    """
+    assert inherits_enrichment(row) is expected
+
+
+def test_fingerprint_of_near_duplicates_is_close():
+    """
+    Отпечатки текстов, отличающихся знаками препинания и регистром,
+    совпадают, а разных текстов - отличаются во многих битах.
+    """
+    first = fingerprint("Не проходит оплата картой, деньги списаны")
+    second = fingerprint("не проходит оплата картой деньги списаны!")
+    other = fingerprint("Приложение падает при запуске на телефоне")
+
+    assert first == second
+    assert (first ^ other).bit_count() > 10
+
+
+async def create_group(
+    leader_enrichment: EnrichmentEnum,
+    copy_enrichment: EnrichmentEnum,
+) -> tuple[int, list[int]]:
+    """
+    Заменяет жалобы в базе данных группой из первой жалобы без результата
+    обогащения и двух копий: без результата и со своим результатом.
+    Возвращает ID первой жалобы и копий.
+    """
+    async with db_helper.session_factory() as session:
+        await session.execute(delete(Complaint))
+        first = Complaint(
+            text="Не проходит оплата",
+            sentiment=SentimentEnum.unknown,
+            category="Другое",
+            enrichment=leader_enrichment,
+        )
+        session.add(first)
+        await session.flush()
+        copies = [
+            Complaint(
+                text="Не проходит оплата!",
+                sentiment=SentimentEnum.unknown,
+                category="Другое",
+                enrichment=copy_enrichment,
+                group_id=first.id,
+            ),
+            Complaint(
+                text="Не проходит оплата!!",
+                sentiment=SentimentEnum.neutral,
+                category="Техническая",
+                group_id=first.id,
+            ),
+        ]
+        session.add_all(copies)
+        await session.commit()
+        return first.id, [copy.id for copy in copies]
+
+
+async def get_enrichment(ids: list[int]) -> list[tuple]:
+    """
+    Возвращает тональность, категорию и состояние обогащения жалоб.
+    """
+    async with db_helper.session_factory() as session:
+        result = await session.execute(
+            select(Complaint.sentiment, Complaint.category, Complaint.enrichment)
+            .where(Complaint.id.in_(ids))
+            .order_by(Complaint.id)
+        )
+        return [tuple(row) for row in result]
+
+
+def test_set_enrichment_many_updates_copies(run):
+    """
+    Новый результат первой жалобы сохраняется у ее копий без результата,
+    а копии со своим результатом не меняются.
+    """
+
+    async def main() -> list[tuple]:
+        leader_id, copy_ids = await create_group(
+            EnrichmentEnum.failed,
+            EnrichmentEnum.done,
+        )
+        async with db_helper.session_factory() as session:
+            await ComplaintDao(session=session).set_enrichment_many(
+                [
+                    {
+                        "id": leader_id,
+                        "sentiment": SentimentEnum.negative,
+                        "category": "Оплата",
+                        "category_source": CategorySourceEnum.remote,
+                        "enrichment": EnrichmentEnum.done,
+                    }
+                ]
+            )
+            await session.commit()
+        return await get_enrichment([leader_id, *copy_ids])
+
+    assert run(main()) == [
+        (SentimentEnum.negative, "Оплата", EnrichmentEnum.done),
+        (SentimentEnum.negative, "Оплата", EnrichmentEnum.done),
+        (SentimentEnum.neutral, "Техническая", EnrichmentEnum.done),
+    ]
+
+
+def test_failed_result_is_not_copied(run):
+    """
+    Ошибка обогащения первой жалобы не передается ее копиям,
+    ожидающим обогащения, и при повторном обогащении.
+    """
+
+    async def main() -> list[tuple]:
+        leader_id, copy_ids = await create_group(
+            EnrichmentEnum.pending,
+            EnrichmentEnum.pending,
+        )
+        async with db_helper.session_factory() as session:
+            dao = ComplaintDao(session=session)
+            await dao.set_enrichment(
+                complaint_id=leader_id,
+                sentiment=SentimentEnum.unknown,
+                category="Другое",
+                enrichment=EnrichmentEnum.failed,
+            )
+            await dao.set_enrichment_many(
+                [
+                    {
+                        "id": leader_id,
+                        "sentiment": SentimentEnum.negative,
+                        "category": "Другое",
+                        "category_source": None,
+                        "enrichment": EnrichmentEnum.failed,
+                    }
+                ]
+            )
+            await session.commit()
+        return await get_enrichment(copy_ids[:1])
+
+    assert run(main()) == [
+        (SentimentEnum.unknown, "Другое", EnrichmentEnum.pending),
+    ]
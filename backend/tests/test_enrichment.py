@@ -0,0 +1,184 @@
+"""
+Тесты заданий фонового обогащения: захват, истечение аренды и повторы.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from core.config import EnrichmentConfig
+from core.dao.enrichment import EnrichmentJobDao
+from core.enums.complaint import CategorySourceEnum, EnrichmentEnum, SentimentEnum
+from core.models import Complaint, EnrichmentJob, db_helper
+from services.enrichment import EnrichmentPipeline
+from sqlalchemy import delete, select
+
+
+class FlakyClassifier:
+    """
+    Классификатор, тональность которого определяется только после
+    failures ошибок.
+    """
+
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+
+    async def request_sentiment(self, text: str, use_cache: bool = True):
+        """
+        Выбрасывает ошибку, пока не исчерпаны failures.
+        """
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("API тональности недоступно")
+        return SentimentEnum.negative
+
+    async def request_category(self, text: str, use_cache: bool = True):
+        """
+        Возвращает категорию, определенную AI-моделью.
+        """
+        return "Оплата", CategorySourceEnum.remote
+
+
+async def create_pending() -> int:
+    """
+    Заменяет жалобы в базе данных жалобой, ожидающей обогащения,
+    с готовым заданием и возвращает ее ID.
+    """
+    async with db_helper.session_factory() as session:
+        await session.execute(delete(EnrichmentJob))
+        await session.execute(delete(Complaint))
+        complaint = Complaint(
+            text="Дважды списали деньги",
+            enrichment=EnrichmentEnum.pending,
+        )
+        session.add(complaint)
+        await session.flush()
+        session.add(
+            EnrichmentJob(
+                complaint_id=complaint.id,
+                available_at=datetime.now() - timedelta(seconds=1),
+            )
+        )
+        await session.commit()
+        return complaint.id
+
+
+async def claim(complaint_id: int, lease: float) -> EnrichmentJob | None:
+    """
+    Забирает задание жалобы на lease секунд.
+    """
+    async with db_helper.session_factory() as session:
+        job = await EnrichmentJobDao(session=session).claim(
+            complaint_id=complaint_id,
+            lease_until=datetime.now() + timedelta(seconds=lease),
+        )
+        await session.commit()
+        return job
+
+
+async def get_state(complaint_id: int) -> tuple[tuple, EnrichmentJob | None]:
+    """
+    Возвращает тональность, категорию, ее источник и состояние
+    обогащения жалобы, а также ее задание.
+    """
+    async with db_helper.session_factory() as session:
+        result = await session.execute(
+            select(
+                Complaint.sentiment,
+                Complaint.category,
+                Complaint.category_source,
+                Complaint.enrichment,
+            ).where(Complaint.id == complaint_id)
+        )
+        job = await EnrichmentJobDao(session=session).get_by_complaint_id(complaint_id)
+        return tuple(result.one()), job
+
+
+def test_claimed_job_is_taken_again_after_lease(run):
+    """
+    Забранное задание не выдается повторно, пока не истечет аренда,
+    а после ее истечения его забирает другой воркер.
+    """
+
+    async def main() -> list[bool]:
+        complaint_id = await create_pending()
+        first = await claim(complaint_id, lease=0.2)
+        second = await claim(complaint_id, lease=0.2)
+        await asyncio.sleep(0.3)
+        third = await claim(complaint_id, lease=0.2)
+        return [job is not None for job in (first, second, third)]
+
+    assert run(main()) == [True, False, True]
+
+
+def test_concurrent_claims_take_job_once(run):
+    """
+    Из одновременных попыток забрать задание удается только одна.
+    """
+
+    async def main() -> list[EnrichmentJob | None]:
+        complaint_id = await create_pending()
+        return await asyncio.gather(*(claim(complaint_id, lease=60) for _ in range(5)))
+
+    jobs = run(main())
+
+    assert sum(job is not None for job in jobs) == 1
+
+
+def test_retries_and_marks_failed(run):
+    """
+    После ошибки API задание откладывается с увеличением счетчика попыток,
+    а после max_retries повторов жалоба помечается как failed
+    и задание удаляется.
+    """
+    config = EnrichmentConfig(max_retries=1, retry_delay=0.0)
+
+    async def main() -> list:
+        complaint_id = await create_pending()
+        pipeline = EnrichmentPipeline(
+            classifier=FlakyClassifier(failures=2),
+            config=config,
+        )
+        await pipeline._process(complaint_id)
+        after_retry = await get_state(complaint_id)
+        await pipeline._process(complaint_id)
+        return [after_retry, await get_state(complaint_id)]
+
+    (retry_state, retry_job), (final_state, final_job) = run(main())
+
+    assert retry_state == (None, None, None, EnrichmentEnum.pending)
+    assert retry_job.attempts == 1
+    assert "ConnectionError" in retry_job.last_error
+    assert final_state == (
+        SentimentEnum.unknown,
+        "Оплата",
+        CategorySourceEnum.remote,
+        EnrichmentEnum.failed,
+    )
+    assert final_job is None
+
+
+def test_retry_succeeds(run):
+    """
+    Если повтор удался, жалоба обогащается, а задание удаляется.
+    """
+    config = EnrichmentConfig(max_retries=3, retry_delay=0.0)
+
+    async def main() -> list:
+        complaint_id = await create_pending()
+        pipeline = EnrichmentPipeline(
+            classifier=FlakyClassifier(failures=1),
+            config=config,
+        )
+        await pipeline._process(complaint_id)
+        await pipeline._process(complaint_id)
+        return await get_state(complaint_id)
+
+    state, job = run(main())
+
+    assert state == (
+        SentimentEnum.negative,
+        "Оплата",
+        CategorySourceEnum.remote,
+        EnrichmentEnum.done,
+    )
+    assert job is None
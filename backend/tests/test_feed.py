@@ -0,0 +1,102 @@
+"""
+Тесты ленты жалоб GET /complaints?after_id= с жалобами,
+ожидающими обогащения.
+"""
+
+from core.enums.complaint import EnrichmentEnum, StatusEnum
+from core.models import Complaint, db_helper
+from services.complaints import get_complaints_feed
+from sqlalchemy import delete, update
+
+# Статус, категория и состояние обогащения жалоб, ID - номер в списке
+# начиная с 1, четвертая жалоба - копия первой
+COMPLAINTS = [
+    (StatusEnum.open, "Оплата", EnrichmentEnum.done),
+    (StatusEnum.closed, "Оплата", EnrichmentEnum.done),
+    (StatusEnum.open, "Другое", EnrichmentEnum.failed),
+    (StatusEnum.open, "Оплата", EnrichmentEnum.done),
+    (StatusEnum.open, None, EnrichmentEnum.pending),
+    (StatusEnum.open, "Техническая", EnrichmentEnum.done),
+]
+
+
+async def create() -> list[int]:
+    """
+    Заменяет жалобы в базе данных жалобами COMPLAINTS и возвращает их ID.
+    """
+    async with db_helper.session_factory() as session:
+        await session.execute(delete(Complaint))
+        records = [
+            Complaint(
+                text=f"Жалоба {i}",
+                status=status,
+                category=category,
+                enrichment=enrichment,
+            )
+            for i, (status, category, enrichment) in enumerate(COMPLAINTS)
+        ]
+        session.add_all(records)
+        await session.flush()
+        records[3].group_id = records[0].id
+        await session.commit()
+        return [record.id for record in records]
+
+
+async def read(after_id: int, limit: int = 10, **kwargs) -> tuple[list[int], int]:
+    """
+    Возвращает ID жалоб из ленты после after_id и курсор.
+    """
+    async with db_helper.session_factory() as session:
+        feed = await get_complaints_feed(
+            session=session,
+            after_id=after_id,
+            limit=limit,
+            **kwargs,
+        )
+    return [complaint.id for complaint in feed.complaints], feed.next_after_id
+
+
+def test_cursor_stops_before_pending_complaint(run):
+    """
+    Курсор не переходит жалобу, ожидающую обогащения, и она попадает
+    в ленту после обогащения вместе со следующими жалобами.
+    """
+
+    async def main() -> tuple[list[int], list]:
+        ids = await create()
+        before = await read(after_id=0)
+        waiting = await read(after_id=before[1])
+        async with db_helper.session_factory() as session:
+            await session.execute(
+                update(Complaint)
+                .where(Complaint.id == ids[4])
+                .values(category="Оплата", enrichment=EnrichmentEnum.done)
+            )
+            await session.commit()
+        after = await read(after_id=waiting[1])
+        return ids, [before, waiting, after]
+
+    ids, (before, waiting, after) = run(main())
+
+    assert before == ([ids[0]], ids[3])
+    assert waiting == ([], ids[3])
+    assert after == ([ids[4], ids[5]], ids[5])
+
+
+def test_cursor_moves_past_skipped_complaints(run):
+    """
+    Курсор сдвигается на последнюю просмотренную жалобу, даже если
+    она не попала в ответ, а копии выводятся с collapse_duplicates=False.
+    """
+
+    async def main() -> tuple[list[int], list]:
+        ids = await create()
+        return ids, [
+            await read(after_id=0, limit=3),
+            await read(after_id=0, collapse_duplicates=False),
+        ]
+
+    ids, (limited, with_copies) = run(main())
+
+    assert limited == ([ids[0]], ids[2])
+    assert with_copies == ([ids[0], ids[3]], ids[3])
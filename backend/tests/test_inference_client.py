@@ -0,0 +1,60 @@
+"""
+Тесты клиента Hugging Face Inference API с общим пулом соединений.
+
+PooledInferenceClient переопределяет приватный метод
+AsyncInferenceClient._get_client_session и использует приватный словарь
+_sessions, поэтому тесты падают, если они изменились в huggingface-hub.
+"""
+
+import inspect
+
+import huggingface_hub
+from core.clients.inference import PooledInferenceClient
+from huggingface_hub import AsyncInferenceClient
+
+
+def test_huggingface_hub_version_is_pinned():
+    """
+    Переопределение повторяет реализацию версии из requirements.txt.
+    """
+    assert huggingface_hub.__version__ == "0.33.2"
+
+
+def test_base_client_private_api():
+    """
+    Базовый клиент создает сессии методом _get_client_session(headers)
+    и хранит открытые сессии в словаре _sessions.
+    """
+    parameters = inspect.signature(AsyncInferenceClient._get_client_session).parameters
+
+    assert list(parameters) == ["self", "headers"]
+    assert isinstance(AsyncInferenceClient()._sessions, dict)
+
+
+def test_sessions_share_pool_and_are_tracked(run):
+    """
+    Сессии используют общий пул соединений, регистрируются в _sessions
+    и удаляются из него при закрытии, а пул закрывается вместе с клиентом.
+    """
+
+    async def main() -> None:
+        client = PooledInferenceClient(pool_size=5, headers={"X-Client": "test"})
+        first = client._get_client_session(headers={"X-Request": "1"})
+        second = client._get_client_session()
+        assert first.connector is client._connector
+        assert second.connector is client._connector
+        assert first.headers["X-Client"] == "test"
+        assert first.headers["X-Request"] == "1"
+        assert set(client._sessions) == {first, second}
+
+        await first.close()
+        assert first.closed
+        assert set(client._sessions) == {second}
+        assert not client._connector.closed
+
+        await client.close()
+        assert second.closed
+        assert client._sessions == {}
+        assert client._connector.closed
+
+    run(main())
@@ -0,0 +1,102 @@
+"""
+Тесты локального классификатора категорий и выборки жалоб для его обучения.
+"""
+
+import random
+
+from core.dao.complaint import ComplaintDao
+from core.enums.complaint import CategorySourceEnum, EnrichmentEnum, SentimentEnum
+from core.models import Complaint, db_helper
+from services.local_classifier import CategoryModel
+from sqlalchemy import delete
+
+WORDS = {
+    "Оплата": ["оплата", "карта", "списали", "деньги", "счет", "возврат"],
+    "Техническая": ["приложение", "ошибка", "вход", "экран", "падает", "сайт"],
+}
+COMMON = ["не", "работает", "снова", "вчера", "почему", "опять", "совсем"]
+
+
+def make_texts(count: int, seed: int) -> tuple[list[str], list[str]]:
+    """
+    Создает длинные тексты двух категорий, в которых много общих слов,
+    а каждая пятая метка перепутана.
+    """
+    rng = random.Random(seed)
+    texts, labels = [], []
+    for i in range(count):
+        label = list(WORDS)[i % 2]
+        words = rng.choices(WORDS[label], k=4) + rng.choices(COMMON, k=20)
+        if rng.random() < 0.2:
+            label = list(WORDS)[(i + 1) % 2]
+        texts.append(" ".join(words))
+        labels.append(label)
+    return texts, labels
+
+
+def test_calibration_lowers_overconfidence():
+    """
+    После калибровки средняя уверенность модели близка к доле верных
+    ответов, а без нее - почти равна 1.
+    """
+    texts, labels = make_texts(400, seed=1)
+    test_texts, test_labels = make_texts(200, seed=2)
+
+    def confidence(model: CategoryModel) -> tuple[float, float]:
+        predictions = [model.predict(text) for text in test_texts]
+        accuracy = sum(
+            label == expected for (label, _), expected in zip(predictions, test_labels)
+        ) / len(test_texts)
+        return sum(p for _, p in predictions) / len(test_texts), accuracy
+
+    raw_confidence, accuracy = confidence(CategoryModel.fit(texts=texts, labels=labels))
+    model = CategoryModel.fit_calibrated(texts=texts, labels=labels)
+    calibrated_confidence, _ = confidence(model)
+
+    assert model.temperature > 1
+    assert raw_confidence > 0.95
+    assert abs(calibrated_confidence - accuracy) < 0.1
+
+
+def test_saved_model_keeps_temperature(tmp_path):
+    """
+    Температура сохраняется вместе с моделью.
+    """
+    texts, labels = make_texts(100, seed=1)
+    model = CategoryModel.fit(texts=texts, labels=labels)
+    model.temperature = 3.5
+    model.save(tmp_path / "model.npz")
+
+    assert CategoryModel.load(tmp_path / "model.npz").temperature == 3.5
+
+
+def test_get_labelled_returns_only_remote_categories(run):
+    """
+    Для обучения выбираются только жалобы, категорию которых определила
+    AI-модель: без предсказаний локальной модели и категорий после ошибок.
+    """
+
+    async def main() -> list[tuple]:
+        async with db_helper.session_factory() as session:
+            await session.execute(delete(Complaint))
+            session.add_all(
+                [
+                    Complaint(
+                        text=f"Жалоба {source}",
+                        sentiment=SentimentEnum.negative,
+                        category="Оплата",
+                        category_source=source,
+                        enrichment=enrichment,
+                    )
+                    for source, enrichment in [
+                        (CategorySourceEnum.remote, EnrichmentEnum.done),
+                        (CategorySourceEnum.local, EnrichmentEnum.done),
+                        (None, EnrichmentEnum.failed),
+                        (None, EnrichmentEnum.done),
+                    ]
+                ]
+            )
+            await session.commit()
+            return list(await ComplaintDao(session=session).get_labelled(limit=10))
+
+    assert run(main()) == [("Жалоба remote", "Оплата")]
@@ -0,0 +1,62 @@
+"""
+Тесты маскирования персональных данных и передачи записей в очередь лога.
+"""
+
+import logging
+import queue
+
+import pytest
+from core.logs import DeferredQueueHandler, SanitizingFilter
+from services.duplicates import fingerprint
+
+
+def sanitize(*args: object) -> str:
+    """
+    Возвращает сообщение записи с аргументами args после SanitizingFilter.
+    """
+    record = logging.LogRecord(
+        "test", logging.INFO, __file__, 1, " ".join(["%s"] * len(args)), args, None
+    )
+    SanitizingFilter(max_length=0, redact=True).filter(record)
+    return record.getMessage()
+
+
+@pytest.mark.parametrize(
+    "card",
+    ["4111111111111111", "4111 1111 1111 1111", "5500-0000-0000-0004"],
+)
+def test_masks_card_numbers(card):
+    """
+    Номера карт с верной контрольной цифрой маскируются.
+    """
+    assert sanitize(f"Карта {card} не работает") == "Карта *** не работает"
+
+
+def test_keeps_fingerprints():
+    """
+    Отпечатки жалоб и числа с неверной контрольной цифрой не маскируются.
+    """
+    values = [
+        fingerprint("Не проходит оплата картой"),
+        fingerprint("Приложение падает при запуске"),
+        4111111111111112,
+        -4111111111111111,
+    ]
+
+    assert sanitize(str(values)) == str(values)
+
+
+def test_queue_handler_snapshots_mutable_args():
+    """
+    Изменяемые аргументы записываются такими, какими были при вызове лога.
+    """
+    handler = DeferredQueueHandler(queue.SimpleQueue())
+    values = {"status": "open"}
+    record = logging.LogRecord(
+        "test", logging.INFO, __file__, 1, "%s %s", (values, 1), None
+    )
+
+    handler.enqueue(handler.prepare(record))
+    values["status"] = "closed"
+
+    assert handler.queue.get_nowait().getMessage() == "{'status': 'open'} 1"
@@ -0,0 +1,282 @@
+"""
+Тесты ограничения исходящих запросов.
+"""
+
+import asyncio
+
+import pytest
+from aiohttp import ClientResponseError, RequestInfo
+from core.config import OutboundLimitConfig
+from services.rate_limit import (
+    OutboundLimiter,
+    RateLimitExceeded,
+    TokenBucket,
+    is_overload,
+)
+from yarl import URL
+
+
+def response_error(status: int) -> ClientResponseError:
+    """
+    Создает ошибку ответа внешнего API с кодом status.
+    """
+    return ClientResponseError(
+        request_info=RequestInfo(URL("http://api"), "POST", {}, URL("http://api")),
+        history=(),
+        status=status,
+    )
+
+
+def make_limiter(**kwargs) -> OutboundLimiter:
+    """
+    Создает ограничитель без ограничения скорости с параметрами kwargs.
+    """
+    return OutboundLimiter(
+        name="test",
+        config=OutboundLimitConfig(rate=1000.0, burst=1000.0, **kwargs),
+    )
+
+
+async def call(limiter: OutboundLimiter, duration: float = 0.0) -> None:
+    """
+    Выполняет через ограничитель запрос длительностью duration секунд.
+    """
+    async with limiter.acquire():
+        await asyncio.sleep(duration)
+
+
+async def fail_with(limiter: OutboundLimiter, error: BaseException) -> None:
+    """
+    Выполняет через ограничитель запрос, который завершается ошибкой.
+    """
+    async with limiter.acquire():
+        raise error
+
+
+@pytest.mark.parametrize(
+    ("error", "expected"),
+    [
+        (response_error(429), True),
+        (response_error(500), True),
+        (response_error(503), True),
+        (response_error(400), False),
+        (response_error(404), False),
+        (TimeoutError(), True),
+        (ValueError(), False),
+    ],
+)
+def test_is_overload(error, expected):
+    """
+    Перегрузкой считаются ответы 429 и 5xx и истекшее время ожидания.
+    """
+    assert is_overload(error) is expected
+
+
+def test_token_bucket_burst_then_rate():
+    """
+    Корзина сразу выдает burst токенов, а следующие - со скоростью rate.
+    """
+    bucket = TokenBucket(rate=10.0, burst=3.0)
+
+    assert [bucket.reserve(max_wait=1.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve(max_wait=1.0) == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve(max_wait=1.0) == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_rejects_long_wait_without_reserving():
+    """
+    Если ждать пришлось бы дольше max_wait, токен не резервируется,
+    а отмененный резерв возвращается в корзину.
+    """
+    bucket = TokenBucket(rate=10.0, burst=1.0)
+    bucket.reserve(max_wait=1.0)
+
+    assert bucket.reserve(max_wait=0.05) is None
+    assert bucket.reserve(max_wait=1.0) == pytest.approx(0.1, abs=0.01)
+    bucket.cancel()
+    assert bucket.reserve(max_wait=1.0) == pytest.approx(0.1, abs=0.01)
+
+
+def test_limits_concurrency(run):
+    """
+    Одновременно выполняется не больше limit запросов,
+    остальные ждут очереди и выполняются позже.
+    """
+    limiter = make_limiter(initial_concurrency=2, max_concurrency=2)
+    in_flight = 0
+    peak = 0
+
+    async def tracked() -> None:
+        nonlocal in_flight, peak
+        async with limiter.acquire():
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+
+    async def main() -> None:
+        await asyncio.gather(*[tracked() for _ in range(6)])
+
+    run(main())
+
+    assert peak == 2
+    assert limiter.stats()["accepted"] == 6
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_rejects_when_queue_is_full(run):
+    """
+    Запрос сверх max_queue ожидающих сразу отклоняется.
+    """
+    limiter = make_limiter(initial_concurrency=1, max_concurrency=1, max_queue=1)
+
+    async def main() -> list:
+        return await asyncio.gather(
+            call(limiter, 0.05),
+            call(limiter),
+            call(limiter),
+            return_exceptions=True,
+        )
+
+    results = run(main())
+
+    assert results[:2] == [None, None]
+    assert isinstance(results[2], RateLimitExceeded)
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_rejects_after_max_wait(run):
+    """
+    Запрос, который не получил место за max_wait секунд, отклоняется,
+    а место достается следующему в очереди.
+    """
+    limiter = make_limiter(initial_concurrency=1, max_concurrency=1, max_wait=0.05)
+
+    async def main() -> list:
+        return await asyncio.gather(
+            call(limiter, 0.2),
+            call(limiter),
+            return_exceptions=True,
+        )
+
+    results = run(main())
+
+    assert results[0] is None
+    assert isinstance(results[1], RateLimitExceeded)
+    assert limiter.stats()["in_flight"] == 0
+    run(call(limiter))
+
+
+def test_rejects_when_rate_exceeded(run):
+    """
+    Если токена пришлось бы ждать дольше max_wait, запрос отклоняется.
+    """
+    limiter = OutboundLimiter(
+        name="test",
+        config=OutboundLimitConfig(rate=1.0, burst=1.0, max_wait=0.1),
+    )
+
+    run(call(limiter))
+    with pytest.raises(RateLimitExceeded):
+        run(call(limiter))
+
+
+def test_rate_is_shared_between_processes():
+    """
+    Каждый процесс получает свою долю скорости и корзины.
+    """
+    limiter = OutboundLimiter(
+        name="test",
+        config=OutboundLimitConfig(rate=10.0, burst=20.0),
+        processes=4,
+    )
+
+    assert limiter.stats()["rate"] == 2.5
+
+
+def test_additive_increase(run):
+    """
+    Каждый успешный ответ увеличивает лимит на 1/limit.
+    """
+    limiter = make_limiter(initial_concurrency=2, max_concurrency=3)
+
+    async def main() -> None:
+        for _ in range(4):
+            await call(limiter)
+
+    run(main())
+
+    # 2 -> 2.5 -> 2.9 -> 3.24 (ограничено max_concurrency)
+    assert limiter.limit == 3
+
+
+def test_multiplicative_decrease_on_overload(run):
+    """
+    Ответ 503 уменьшает лимит в backoff раз, но не чаще раза
+    в cooldown секунд и не ниже min_concurrency.
+    """
+    limiter = make_limiter(
+        initial_concurrency=8,
+        min_concurrency=3,
+        backoff=0.5,
+        cooldown=60.0,
+    )
+
+    for expected in (4, 4):
+        with pytest.raises(ClientResponseError):
+            run(fail_with(limiter, response_error(503)))
+        assert limiter.limit == expected
+    assert limiter.stats()["overloads"] == 2
+    assert limiter.stats()["decreases"] == 1
+
+    limiter = make_limiter(initial_concurrency=4, min_concurrency=3, cooldown=0.0)
+    for _ in range(3):
+        with pytest.raises(ClientResponseError):
+            run(fail_with(limiter, response_error(500)))
+    assert limiter.limit == 3
+
+
+def test_client_errors_do_not_decrease_limit(run):
+    """
+    Ответы 4xx, кроме 429, не уменьшают лимит.
+    """
+    limiter = make_limiter(initial_concurrency=4)
+
+    with pytest.raises(ClientResponseError):
+        run(fail_with(limiter, response_error(400)))
+
+    assert limiter.limit == 4
+    assert limiter.stats()["decreases"] == 0
+
+
+def test_decrease_on_latency_growth(run):
+    """
+    Рост задержки выше latency_tolerance от базовой уменьшает лимит.
+    """
+    limiter = make_limiter(initial_concurrency=10, latency_tolerance=2.0)
+
+    async def main() -> None:
+        await call(limiter, 0.01)
+        await call(limiter, 0.2)
+
+    run(main())
+
+    assert limiter.limit == 5
+    assert limiter.stats()["decreases"] == 1
+
+
+def test_disabled_limiter_passes_through(run):
+    """
+    Выключенный ограничитель не ограничивает и не считает запросы.
+    """
+    limiter = OutboundLimiter(
+        name="test",
+        config=OutboundLimitConfig(enabled=False, initial_concurrency=1),
+    )
+
+    async def main() -> None:
+        await asyncio.gather(*[call(limiter, 0.01) for _ in range(5)])
+
+    run(main())
+
+    assert limiter.stats()["accepted"] == 0
@@ -0,0 +1,109 @@
+"""
+Тесты статистики жалоб: триггеры таблицы complaints и перенос изменений.
+"""
+
+import json
+from datetime import datetime
+
+from core.config import StatsConfig
+from core.dao.complaint import ComplaintDao
+from core.enums.complaint import SentimentEnum, StatusEnum
+from core.models import Complaint, ComplaintStat, ComplaintStatChange, db_helper
+from core.schemas.complaint import ComplaintStatsQuerySchema
+from services.stats import ComplaintStats
+from sqlalchemy import delete
+
+HOUR = datetime(2020, 1, 1, 10, 15)
+NEXT_HOUR = datetime(2020, 1, 1, 11, 30)
+
+
+async def collect_stats(query: ComplaintStatsQuerySchema) -> tuple[list[int], dict]:
+    """
+    Создает жалобы, закрывает одну из них по ID и остальные жалобы
+    категории "Оплата" до 11:00 одним UPDATE. Возвращает количество
+    изменений, перенесенных двумя вызовами compact, и статистику.
+    """
+    async with db_helper.session_factory() as session:
+        await session.execute(delete(Complaint))
+        await session.execute(delete(ComplaintStatChange))
+        await session.execute(delete(ComplaintStat))
+        records = [
+            Complaint(
+                text=text,
+                sentiment=sentiment,
+                category=category,
+                timestamp=timestamp,
+            )
+            for text, sentiment, category, timestamp in [
+                ("Не проходит оплата", SentimentEnum.negative, "Оплата", HOUR),
+                ("Дважды списали деньги", SentimentEnum.negative, "Оплата", HOUR),
+                ("Не открывается сайт", SentimentEnum.neutral, "Техническая", HOUR),
+                ("Не вернули деньги", SentimentEnum.negative, "Оплата", NEXT_HOUR),
+            ]
+        ]
+        session.add_all(records)
+        await session.commit()
+        dao = ComplaintDao(session=session)
+        await dao.close_complaint(records[0].id)
+        await dao.set_status(
+            status=StatusEnum.closed,
+            category="Оплата",
+            before=datetime(2020, 1, 1, 11),
+        )
+        await session.commit()
+
+    stats = ComplaintStats(
+        config=StatsConfig(batch_size=3),
+        session_factory=db_helper.session_factory,
+    )
+    compacted = [await stats.compact(), await stats.compact()]
+    return compacted, json.loads(await stats.get(query))
+
+
+def test_triggers_and_compact_count_complaints(run):
+    """
+    Создание жалобы, смена статуса по ID и пакетный UPDATE попадают
+    в статистику, а повторная смена статуса на тот же не учитывается.
+    """
+    query = ComplaintStatsQuerySchema(
+        period="hour",
+        since=datetime(2020, 1, 1, 10),
+        until=datetime(2020, 1, 1, 12),
+        group_by=["status", "category"],
+    )
+
+    compacted, stats = run(collect_stats(query))
+
+    # 4 вставки и по 2 изменения на каждую из 2 закрытых жалоб
+    assert compacted == [8, 0]
+    assert [
+        (
+            bucket["total"],
+            [
+                (group["status"], group["category"], group["count"])
+                for group in bucket["groups"]
+            ],
+        )
+        for bucket in stats["buckets"]
+    ] == [
+        (3, [("closed", "Оплата", 2), ("open", "Техническая", 1)]),
+        (1, [("open", "Оплата", 1)]),
+    ]
+
+
+def test_daily_stats_group_by_sentiment(run):
+    """
+    Те же изменения учитываются в статистике по дням.
+    """
+    query = ComplaintStatsQuerySchema(
+        period="day",
+        since=datetime(2020, 1, 1),
+        until=datetime(2020, 1, 2),
+        group_by=["sentiment"],
+    )
+
+    _, stats = run(collect_stats(query))
+
+    assert [
+        (group["sentiment"], group["count"]) for group in stats["buckets"][0]["groups"]
+    ] == [("negative", 3), ("neutral", 1)]
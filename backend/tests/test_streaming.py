@@ -0,0 +1,167 @@
+"""
+Тесты потокового разбора NDJSON и JSON-массивов.
+"""
+
+import json
+from collections.abc import AsyncIterator
+
+import pytest
+from services.streaming import JsonArraySplitter, iter_records
+
+ARRAY = json.dumps(
+    [
+        {"text": "Простая жалоба"},
+        {"text": 'Кавычки \\" и скобки ] } [ {, запятые'},
+        {"text": "Экранированная обратная косая черта \\\\"},
+        {"text": "Вложенные", "tags": [[1, 2], {"a": [3]}]},
+        "строка",
+        42,
+    ],
+    ensure_ascii=False,
+).encode()
+
+
+def split(data: bytes, size: int) -> list[bytes]:
+    """
+    Делит данные на части по size байтов.
+    """
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def feed_all(chunks: list[bytes]) -> list[bytes]:
+    """
+    Передает части разборщику и возвращает все элементы массива.
+    """
+    splitter = JsonArraySplitter()
+    elements = []
+    for chunk in chunks:
+        elements.extend(splitter.feed(chunk))
+    assert splitter.finished
+    return elements
+
+
+async def collect(chunks: list[bytes]) -> list[tuple[int, bytes]]:
+    """
+    Возвращает все записи потока из частей chunks.
+    """
+
+    async def stream() -> AsyncIterator[bytes]:
+        for chunk in chunks:
+            yield chunk
+
+    return [record async for record in iter_records(stream())]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, len(ARRAY)])
+def test_splitter_handles_any_chunk_boundaries(size):
+    """
+    Элементы выделяются одинаково при любом делении данных на части,
+    в том числе внутри строк и экранированных символов.
+    """
+    elements = feed_all(split(ARRAY, size))
+
+    assert [json.loads(element) for element in elements] == json.loads(ARRAY)
+
+
+def test_splitter_returns_elements_as_soon_as_they_end():
+    """
+    Элемент возвращается, как только получена запятая после него.
+    """
+    splitter = JsonArraySplitter()
+
+    assert splitter.feed(b' [{"a": 1}, {"b"') == [b'{"a": 1}']
+    assert splitter.feed(b": 2}]") == [b'{"b": 2}']
+    assert splitter.finished
+
+
+@pytest.mark.parametrize("data", [b"[]", b" [ ] ", b"[\n]\n"])
+def test_splitter_empty_array(data):
+    """
+    Пустой массив не содержит элементов.
+    """
+    assert feed_all([data]) == []
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        [b'{"a": 1}'],
+        [b"x["],
+        [b"[1]", b"[2]"],
+        [b"[1] x"],
+    ],
+)
+def test_splitter_rejects_invalid_data(chunks):
+    """
+    Данные не массивом и данные после конца массива отклоняются.
+    """
+    splitter = JsonArraySplitter()
+    with pytest.raises(ValueError):
+        for chunk in chunks:
+            splitter.feed(chunk)
+
+
+def test_splitter_allows_trailing_whitespace():
+    """
+    Пробелы после конца массива допускаются.
+    """
+    splitter = JsonArraySplitter()
+    splitter.feed(b"[1]")
+
+    assert splitter.feed(b" \r\n") == []
+
+
+@pytest.mark.parametrize("size", [1, 5, 1000])
+def test_iter_records_ndjson(run, size):
+    """
+    NDJSON разбирается по строкам, номер записи - номер строки,
+    пустые строки пропускаются, последняя строка без перевода строки
+    тоже возвращается.
+    """
+    data = b'{"text": "a"}\n\n  \n{"text": "b"}\r\n{"text": "c"}'
+
+    records = run(collect(split(data, size)))
+
+    assert [number for number, _ in records] == [1, 4, 5]
+    assert [json.loads(line)["text"] for _, line in records] == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("size", [1, 5, 1000])
+def test_iter_records_json_array(run, size):
+    """
+    Поток, который начинается с "[" после пробелов, разбирается
+    как JSON-массив, номер записи - номер элемента.
+    """
+    data = b'\n  [{"text": "a"},\n {"text": "b"}]\n'
+
+    records = run(collect(split(data, size)))
+
+    assert [number for number, _ in records] == [1, 2]
+    assert [json.loads(element)["text"] for _, element in records] == ["a", "b"]
+
+
+def test_iter_records_unfinished_array(run):
+    """
+    Незавершенный JSON-массив - ошибка, полученные элементы
+    при этом уже возвращены.
+    """
+    records = []
+
+    async def consume() -> None:
+        async def stream() -> AsyncIterator[bytes]:
+            yield b'[{"text": "a"}, {"text": "b"'
+
+        async for record in iter_records(stream()):
+            records.append(record)
+
+    with pytest.raises(ValueError, match="не завершен"):
+        run(consume())
+    assert records == [(1, b'{"text": "a"}')]
+
+
+def test_iter_records_empty_stream(run):
+    """
+    Пустой поток и поток из пробелов не содержат записей.
+    """
+    assert run(collect([])) == []
+    assert run(collect([b"  ", b"\n"])) == []
@@ -0,0 +1,263 @@
+"""
+Тесты доставки жалоб на вебхуки с заглушкой stubs.webhook.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime
+
+import aiohttp
+import pytest
+from core.config import WebhookConfig
+from core.dao.webhook import WebhookTargetDao
+from core.enums.complaint import StatusEnum
+from core.models import WebhookDeadLetter, db_helper
+from core.schemas.complaint import ComplaintAllInfoSchema
+from core.schemas.webhook import WebhookTargetCreateSchema, WebhookTargetReadSchema
+from services.shared_store import MemoryStore
+from services.webhooks import WebhookDispatcher
+from sqlalchemy import select
+from stubs.webhook import WebhookStub
+
+CONFIG = WebhookConfig(
+    max_batch_size=3,
+    max_delay=0.3,
+    max_retries=2,
+    retry_delay=0.01,
+    timeout=2.0,
+)
+
+
+def make_complaint(complaint_id: int) -> ComplaintAllInfoSchema:
+    """
+    Создает открытую жалобу, которая подходит для отправки на вебхук.
+    """
+    return ComplaintAllInfoSchema(
+        id=complaint_id,
+        text=f"Жалоба {complaint_id}",
+        status=StatusEnum.open,
+        category="Оплата",
+        timestamp=datetime.now(),
+    )
+
+
+async def register_target(url: str) -> WebhookTargetReadSchema:
+    """
+    Сохраняет вебхук в базе данных, чтобы на него ссылались
+    недоставленные пакеты.
+    """
+    async with db_helper.session_factory() as session:
+        record = await WebhookTargetDao(session=session).add(
+            WebhookTargetCreateSchema(url=url),
+        )
+        await session.commit()
+        return WebhookTargetReadSchema.model_validate(record, from_attributes=True)
+
+
+async def get_dead_letters(target_id: int) -> list[WebhookDeadLetter]:
+    """
+    Возвращает недоставленные пакеты вебхука.
+    """
+    async with db_helper.session_factory() as session:
+        result = await session.execute(
+            select(WebhookDeadLetter).where(WebhookDeadLetter.target_id == target_id)
+        )
+        return list(result.scalars().all())
+
+
+async def deliver(
+    complaints: list[ComplaintAllInfoSchema],
+    fail_first: int = 0,
+    fail_status: int = 500,
+    wait_for: int | None = None,
+) -> tuple[WebhookStub, list[WebhookDeadLetter], float]:
+    """
+    Отправляет жалобы на заглушку и возвращает ее, недоставленные пакеты
+    и время до получения wait_for жалоб (по умолчанию всех).
+
+    Если wait_for равен 0, ожидается завершение всех попыток отправки.
+    """
+    async with (
+        WebhookStub(fail_first=fail_first, fail_status=fail_status) as stub,
+        aiohttp.ClientSession() as client_session,
+    ):
+        # Порт заглушки может повториться, а адрес вебхука уникален
+        target = await register_target(f"{stub.url}?test={uuid.uuid4().hex}")
+        dispatcher = WebhookDispatcher(
+            client_session=client_session,
+            config=CONFIG,
+            store=MemoryStore(),
+        )
+        dispatcher.add_target(target)
+        started = time.monotonic()
+        for complaint in complaints:
+            await dispatcher.publish(complaint)
+        if wait_for == 0:
+            async with asyncio.timeout(10):
+                while not await get_dead_letters(target.id):
+                    await asyncio.sleep(0.05)
+        else:
+            await stub.wait_for(len(complaints) if wait_for is None else wait_for)
+        elapsed = time.monotonic() - started
+        await dispatcher.remove_target(target.id)
+        return stub, await get_dead_letters(target.id), elapsed
+
+
+def test_batches_by_size(run):
+    """
+    Жалобы отправляются пакетами не больше max_batch_size,
+    полные пакеты - без ожидания max_delay.
+    """
+    stub, dead_letters, elapsed = run(deliver([make_complaint(i) for i in range(1, 7)]))
+
+    assert [len(batch) for batch in stub.batches] == [3, 3]
+    assert [complaint["id"] for complaint in stub.complaints] == list(range(1, 7))
+    assert elapsed < CONFIG.max_delay
+    assert dead_letters == []
+
+
+def test_batches_by_delay(run):
+    """
+    Неполный пакет отправляется через max_delay после первой жалобы.
+    """
+    stub, dead_letters, elapsed = run(deliver([make_complaint(1), make_complaint(2)]))
+
+    assert [len(batch) for batch in stub.batches] == [2]
+    assert elapsed >= CONFIG.max_delay
+    assert dead_letters == []
+
+
+def test_skips_closed_and_uncategorized(run):
+    """
+    Закрытые жалобы и жалобы без категории или с категорией "Другое"
+    не отправляются.
+    """
+    closed = make_complaint(1)
+    closed.status = StatusEnum.closed
+    other = make_complaint(2)
+    other.category = "Другое"
+    stub, _, _ = run(deliver([closed, other, make_complaint(3)], wait_for=1))
+
+    assert [complaint["id"] for complaint in stub.complaints] == [3]
+
+
+@pytest.mark.parametrize("fail_status", [500, 503, 408, 429])
+def test_retries_server_errors_and_throttling(run, fail_status):
+    """
+    Ответы 5xx, 408 и 429 повторяются, и пакет доставляется.
+    """
+    stub, dead_letters, _ = run(
+        deliver(
+            [make_complaint(1)],
+            fail_first=CONFIG.max_retries,
+            fail_status=fail_status,
+        )
+    )
+
+    assert stub.requests == CONFIG.max_retries + 1
+    assert [complaint["id"] for complaint in stub.complaints] == [1]
+    assert dead_letters == []
+
+
+@pytest.mark.parametrize("fail_status", [400, 401, 404, 422])
+def test_does_not_retry_client_errors(run, fail_status):
+    """
+    Остальные ответы 4xx не повторяются, пакет сохраняется
+    как недоставленный после первой попытки.
+    """
+    stub, dead_letters, _ = run(
+        deliver([make_complaint(1)], fail_first=1, fail_status=fail_status, wait_for=0)
+    )
+
+    assert stub.requests == 1
+    assert stub.batches == []
+    assert len(dead_letters) == 1
+    assert dead_letters[0].attempts == 1
+    assert dead_letters[0].last_error == f"HTTP {fail_status}"
+
+
+def test_stores_dead_letter_after_retries(run):
+    """
+    Если все попытки завершились ошибкой, пакет сохраняется целиком
+    с количеством попыток и последней ошибкой.
+    """
+    stub, dead_letters, _ = run(
+        deliver(
+            [make_complaint(1), make_complaint(2)],
+            fail_first=CONFIG.max_retries + 1,
+            wait_for=0,
+        )
+    )
+
+    assert stub.requests == CONFIG.max_retries + 1
+    assert len(dead_letters) == 1
+    assert dead_letters[0].attempts == CONFIG.max_retries + 1
+    assert dead_letters[0].last_error == "HTTP 500"
+    payload = json.loads(dead_letters[0].payload)
+    assert [complaint["id"] for complaint in payload["complaints"]] == [1, 2]
+
+
+def test_overflow_is_stored_by_target_task(run):
+    """
+    Жалобы сверх размера очереди учитываются в счетчике без записи
+    в базу данных в publish и сохраняются задачей вебхука одним пакетом.
+    """
+
+    async def main() -> tuple[WebhookStub, list[WebhookDeadLetter], int, int]:
+        async with (
+            WebhookStub() as stub,
+            aiohttp.ClientSession() as client_session,
+        ):
+            target = await register_target(f"{stub.url}?test={uuid.uuid4().hex}")
+            dispatcher = WebhookDispatcher(
+                client_session=client_session,
+                config=CONFIG.model_copy(update={"queue_size": 1}),
+                store=MemoryStore(),
+            )
+            dispatcher.add_target(target)
+            for complaint_id in range(1, 5):
+                await dispatcher.publish(make_complaint(complaint_id))
+            stored_in_publish = len(await get_dead_letters(target.id))
+            async with asyncio.timeout(10):
+                while not (dead_letters := await get_dead_letters(target.id)):
+                    await asyncio.sleep(0.05)
+            await dispatcher.remove_target(target.id)
+            return stub, dead_letters, dispatcher.overflowed, stored_in_publish
+
+    stub, dead_letters, overflowed, stored_in_publish = run(main())
+
+    assert overflowed == 3
+    assert stored_in_publish == 0
+    assert [complaint["id"] for complaint in stub.complaints] == [1]
+    assert len(dead_letters) == 1
+    assert dead_letters[0].attempts == 0
+    payload = json.loads(dead_letters[0].payload)
+    assert [complaint["id"] for complaint in payload["complaints"]] == [2, 3, 4]
+
+
+def test_publish_skips_removed_target(run):
+    """
+    Вебхук, очередь которого уже удалена, пропускается без ошибки.
+    """
+
+    async def main() -> int:
+        async with aiohttp.ClientSession() as client_session:
+            dispatcher = WebhookDispatcher(
+                client_session=client_session,
+                config=CONFIG,
+                store=MemoryStore(),
+            )
+            target = WebhookTargetReadSchema(
+                id=1,
+                url="http://127.0.0.1:9/webhook",
+                active=True,
+            )
+            dispatcher.add_target(target)
+            dispatcher._queues.pop(target.id)
+            await dispatcher.publish(make_complaint(1))
+            await dispatcher.remove_target(target.id)
+            return dispatcher.overflowed
+
+    assert run(main()) == 0